@@ -0,0 +1,196 @@
+"""
+Synthetic corpus generator for the benchmark suite.
+
+Builds realistic task exports of a requested size from the record shapes in
+data/input/original_format.txt and data/input/drill_format.txt, mixed with
+dense non-matching noise lines such as page headers, footers and narrative,
+and with near-miss records that look like tasks but fail the pattern.
+"""
+
+import argparse
+import random
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+# Add src to path
+project_root = Path(__file__).parent.parent
+src_path = project_root / "src"
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+from task_parser import TaskParser
+
+INPUT_DIR = project_root / "data" / "input"
+DEFAULT_CORPUS_DIR = Path(__file__).parent / ".corpus"
+
+SIZES = {
+    "1MB": 1024 * 1024,
+    "100MB": 100 * 1024 * 1024,
+    "1GB": 1024 * 1024 * 1024,
+}
+
+NOISE_TEMPLATES = [
+    "UNCLASSIFIED // FOR TRAINING USE ONLY",
+    "Page {page} of {pages}",
+    "Combined Arms Training Strategy (CATS) Task Selection Report",
+    "Printed {day:02d} Aug 2025 {hour:02d}:{minute:02d}",
+    "The unit {word1} the {word2} while maintaining {word3} and {word4} of the {word5} element.",
+    "Leaders {word1} {word2} during {word3}; see paragraph {page} for {word4} guidance.",
+    "",
+]
+
+# The drill pattern matches any line of three or more words, so its noise
+# starts with punctuation, which cannot begin a drill step
+DRILL_NOISE_TEMPLATES = [
+    "// UNCLASSIFIED // FOR TRAINING USE ONLY //",
+    "=== Page {page} of {pages} ===",
+    "* Combined Arms Training Strategy (CATS) Drill Report",
+    "[Printed {day:02d} Aug 2025 {hour:02d}:{minute:02d}]",
+    "(The unit {word1} the {word2} while maintaining {word3} and {word4} of the {word5} element.)",
+    "> Leaders {word1} {word2} during {word3}; see paragraph {page} for {word4} guidance.",
+    "",
+]
+
+
+def parse_sample_shapes() -> Dict[str, List]:
+    """Parse the sample inputs into field values to recombine."""
+    parser = TaskParser(log_level=40, max_file_size_mb=None)
+    shapes = {}
+    for pattern_type in ("original", "drill"):
+        sample = INPUT_DIR / f"{pattern_type}_format.txt"
+        shapes[pattern_type] = parser.parse_file(str(sample), pattern_type)
+    return shapes
+
+
+class CorpusGenerator:
+    """Generates deterministic synthetic task exports."""
+    
+    def __init__(self, seed: int = 0, noise_ratio: float = 0.6, near_miss_ratio: float = 0.2):
+        """
+        Args:
+            seed: Seed of the random generator
+            noise_ratio: Share of lines that are not records
+            near_miss_ratio: Share of those lines that are near-miss records
+        """
+        self.random = random.Random(seed)
+        self.noise_ratio = noise_ratio
+        self.near_miss_ratio = near_miss_ratio
+        shapes = parse_sample_shapes()
+        self.original = shapes["original"]
+        self.drill = shapes["drill"]
+        
+        titles = [task.title for task in self.original + self.drill]
+        self.words = sorted({word for title in titles for word in title.split()
+                             if word.isalpha() and word != "Approved"})
+        self.proponents = sorted({task.proponent for task in self.original})
+        self.verbs = sorted({task.verb for task in self.drill})
+    
+    def _title(self) -> str:
+        return " ".join(self.random.choice(self.words) for _ in range(self.random.randint(3, 9)))
+    
+    def original_record(self) -> str:
+        """Build one record in the original format."""
+        rnd = self.random
+        proponent = rnd.choice(self.proponents)
+        school = proponent.split(" ", 1)[0]
+        shape = rnd.random()
+        if shape < 0.45:
+            task = f"{school}-CO-{rnd.randint(1000, 9999)}"
+            return f"{rnd.randint(1, 9)}. {task} {self._title()} {proponent} Approved"
+        if shape < 0.9:
+            task = f"{school}-{rnd.randint(100, 999)}-{rnd.randint(1000, 9999):04d}"
+            return f"{task} {self._title()} {proponent} Approved"
+        task = f"{school}-PLT-D{rnd.randint(1000, 9999)}"
+        return f"{task} {self._title()} Battle Drill {proponent} Approved"
+    
+    def drill_record(self) -> str:
+        """Build one record in the drill format."""
+        rnd = self.random
+        return f"D{rnd.randint(1000, 9999)} Approved {rnd.choice(self.verbs)} {self._title()}"
+    
+    def noise_line(self, pattern_type: str = "original") -> str:
+        """Build one line that the patterns of pattern_type do not match."""
+        rnd = self.random
+        words = {f"word{i}": rnd.choice(self.words).lower() for i in range(1, 6)}
+        templates = DRILL_NOISE_TEMPLATES if pattern_type == "drill" else NOISE_TEMPLATES
+        return rnd.choice(templates).format(
+            page=rnd.randint(1, 400), pages=400, day=rnd.randint(1, 28),
+            hour=rnd.randint(0, 23), minute=rnd.randint(0, 59), **words
+        )
+    
+    def near_miss(self, pattern_type: str = "original") -> str:
+        """Build a record that the patterns of pattern_type just fail to match."""
+        rnd = self.random
+        if pattern_type == "drill":
+            record = self.drill_record()
+            # Punctuation after the step, or a bullet before it
+            if rnd.random() < 0.5:
+                return record.replace(" ", ": ", 1)
+            return "# " + record
+        record = self.original_record()
+        shape = rnd.random()
+        if shape < 0.4:
+            # Not yet approved
+            return record[:-len("Approved")] + rnd.choice(["Draft", "Rescinded", "Pending"])
+        if shape < 0.7:
+            # Proponent without the "code - name" separator
+            return record.replace(" - ", " ", 1)
+        # No status at all
+        return record[:-len(" Approved")]
+    
+    def write(self, path: Path, size_bytes: int, pattern_type: str) -> Path:
+        """Write a corpus of roughly size_bytes to path."""
+        record = self.original_record if pattern_type == "original" else self.drill_record
+        path.parent.mkdir(parents=True, exist_ok=True)
+        
+        def line() -> str:
+            rnd = self.random
+            if rnd.random() >= self.noise_ratio:
+                return record()
+            if rnd.random() < self.near_miss_ratio:
+                return self.near_miss(pattern_type)
+            return self.noise_line(pattern_type)
+        
+        written = 0
+        with open(path, "w", encoding="utf-8", newline="\n") as f:
+            while written < size_bytes:
+                lines = [line() for _ in range(2000)]
+                block = "\n".join(lines) + "\n"
+                f.write(block)
+                written += len(block.encode("utf-8"))
+        return path
+
+
+def corpus_path(size_name: str, pattern_type: str, corpus_dir: Path = DEFAULT_CORPUS_DIR) -> Path:
+    """Get the path of a generated corpus."""
+    return corpus_dir / f"{pattern_type}_{size_name}.txt"
+
+
+def ensure_corpus(size_name: str, pattern_type: str, corpus_dir: Path = DEFAULT_CORPUS_DIR,
+                  seed: int = 0) -> Path:
+    """Generate a corpus unless it already exists."""
+    path = corpus_path(size_name, pattern_type, corpus_dir)
+    if not path.exists() or path.stat().st_size < SIZES[size_name]:
+        CorpusGenerator(seed).write(path, SIZES[size_name], pattern_type)
+    return path
+
+
+def main(argv=None) -> int:
+    """Generate corpora from the command line."""
+    cli = argparse.ArgumentParser(description="Generate synthetic benchmark corpora")
+    cli.add_argument("--sizes", default="1MB", help=f"Comma-separated sizes from {', '.join(SIZES)}")
+    cli.add_argument("--types", default="original,drill", help="Comma-separated pattern types")
+    cli.add_argument("--corpus-dir", type=Path, default=DEFAULT_CORPUS_DIR)
+    cli.add_argument("--seed", type=int, default=0)
+    args = cli.parse_args(argv)
+    
+    for size_name in args.sizes.split(","):
+        for pattern_type in args.types.split(","):
+            path = ensure_corpus(size_name, pattern_type, args.corpus_dir, args.seed)
+            print(f"{path} ({path.stat().st_size / 1024 / 1024:.1f} MB)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the task parser.
+
+Times parse_text, remove_duplicates, save_to_csv and the end-to-end
+parse_file for each pattern type on synthetic corpora, and reports MB/s,
+rows/s and peak RSS as JSON. Every case runs in a fresh interpreter so its
+peak RSS is not inflated by earlier cases. Results can be compared against
+a saved baseline, failing when throughput regresses beyond a tolerance.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Add src to path
+project_root = Path(__file__).parent.parent
+src_path = project_root / "src"
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+from corpus import DEFAULT_CORPUS_DIR, SIZES, ensure_corpus
+
+STAGES = ["parse_text", "remove_duplicates", "save_to_csv", "parse_file"]
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in MB, if available."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_case(corpus: Path, pattern_type: str) -> Dict:
+    """Time every stage on one corpus inside the current process."""
+    from task_parser import TaskParser
+    
+    parser = TaskParser(log_level=40, max_file_size_mb=None)
+    size_mb = corpus.stat().st_size / (1024 * 1024)
+    stages = {}
+    
+    def record(stage: str, seconds: float, rows: int) -> None:
+        stages[stage] = {
+            "seconds": round(seconds, 6),
+            "mb_per_s": round(size_mb / seconds, 3) if seconds else None,
+            "rows": rows,
+            "rows_per_s": round(rows / seconds, 1) if seconds else None,
+        }
+    
+    with open(corpus, "r", encoding="utf-8") as f:
+        text = f.read()
+    
+    started = time.perf_counter()
+    tasks = parser.parse_text(text, pattern_type)
+    record("parse_text", time.perf_counter() - started, len(tasks))
+    del text
+    
+    started = time.perf_counter()
+    unique = parser.remove_duplicates(tasks, pattern_type)
+    record("remove_duplicates", time.perf_counter() - started, len(tasks))
+    del tasks
+    
+    with tempfile.TemporaryDirectory() as output_dir:
+        started = time.perf_counter()
+        parser.save_to_csv(unique, os.path.join(output_dir, "out.csv"), pattern_type)
+        record("save_to_csv", time.perf_counter() - started, len(unique))
+    del unique
+    
+    started = time.perf_counter()
+    result = parser.parse_file(str(corpus), pattern_type)
+    record("parse_file", time.perf_counter() - started, len(result))
+    
+    return {"size_mb": round(size_mb, 3), "stages": stages, "peak_rss_mb": peak_rss_mb()}
+
+
+def run_isolated(corpus: Path, pattern_type: str) -> Dict:
+    """Run one case in a fresh interpreter and return its results."""
+    output = subprocess.run(
+        [sys.executable, __file__, "--single", str(corpus), pattern_type],
+        check=True, stdout=subprocess.PIPE, universal_newlines=True
+    ).stdout
+    return json.loads(output)
+
+
+def compare(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """
+    List stages whose throughput fell more than tolerance below the baseline.
+    """
+    regressions = []
+    for case, current in results["cases"].items():
+        previous = baseline.get("cases", {}).get(case)
+        if not previous:
+            continue
+        for stage, metrics in current["stages"].items():
+            before = previous["stages"].get(stage, {}).get("mb_per_s")
+            after = metrics.get("mb_per_s")
+            if before and after is not None and after < before * (1 - tolerance):
+                regressions.append(f"{case} {stage}: {after:.3f} MB/s vs baseline "
+                                   f"{before:.3f} MB/s ({(after / before - 1) * 100:+.1f}%)")
+    return regressions
+
+
+def main(argv=None) -> int:
+    """Run the benchmark suite."""
+    cli = argparse.ArgumentParser(description="Benchmark the task parser")
+    cli.add_argument("--sizes", default="1MB", help=f"Comma-separated sizes from {', '.join(SIZES)}")
+    cli.add_argument("--types", default="original,drill", help="Comma-separated pattern types")
+    cli.add_argument("--corpus-dir", type=Path, default=DEFAULT_CORPUS_DIR)
+    cli.add_argument("--output", type=Path, help="Write the JSON report to this file")
+    cli.add_argument("--baseline", type=Path, help="Baseline report to compare against")
+    cli.add_argument("--tolerance", type=float, default=0.10,
+                     help="Allowed throughput drop against the baseline (0.10 = 10%%)")
+    cli.add_argument("--single", nargs=2, metavar=("CORPUS", "TYPE"), help=argparse.SUPPRESS)
+    args = cli.parse_args(argv)
+    
+    if args.single:
+        print(json.dumps(run_case(Path(args.single[0]), args.single[1])))
+        return 0
+    
+    results = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cases": {},
+    }
+    for size_name in args.sizes.split(","):
+        for pattern_type in args.types.split(","):
+            corpus = ensure_corpus(size_name, pattern_type, args.corpus_dir)
+            case = f"{pattern_type}/{size_name}"
+            print(f"Running {case}...", file=sys.stderr)
+            results["cases"][case] = run_isolated(corpus, pattern_type)
+    
+    report = json.dumps(results, indent=2)
+    if args.output:
+        args.output.write_text(report + "\n", encoding="utf-8")
+    print(report)
+    
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        regressions = compare(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Worst-case benchmark for the match guard.
+
+Builds inputs of long lines that contain "Approved" but no proponent, the
+shape on which the original patterns backtrack polynomially in the line
+length, and times parse_text with and without a MatchGuard. Unguarded time
+per MB grows with the line length; guarded time per MB stays bounded,
+because every line either fits the length limit or is cut off by the budget.
+"""
+
+import argparse
+import json
+import logging
+import sys
+import time
+from pathlib import Path
+
+# Add src to path
+project_root = Path(__file__).parent.parent
+src_path = project_root / "src"
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+from guard import MatchGuard
+from task_parser import TaskParser
+
+
+def pathological_text(line_length: int, lines: int) -> str:
+    """Lines of words ending in "Approved" that no pattern can match."""
+    line = "x " * ((line_length - len("Approved")) // 2) + "Approved\n"
+    return line * lines
+
+
+def time_parse(parser: TaskParser, text: str) -> float:
+    """Seconds parse_text takes on text with the original patterns."""
+    started = time.perf_counter()
+    parser.parse_text(text, "original")
+    return time.perf_counter() - started
+
+
+def main(argv=None) -> int:
+    """Run the worst-case benchmark."""
+    cli = argparse.ArgumentParser(description="Worst-case matching benchmark")
+    cli.add_argument("--lengths", default="500,1000,2000,4000,8000,16000",
+                     help="Comma-separated line lengths")
+    cli.add_argument("--lines", type=int, default=20, help="Lines per input")
+    cli.add_argument("--unguarded-max", type=int, default=4000,
+                     help="Longest line length timed without the guard")
+    cli.add_argument("--no-length-limit", action="store_true",
+                     help="Rely on the time budget alone, without a line length limit")
+    args = cli.parse_args(argv)
+    
+    logging.getLogger("guard").setLevel(logging.ERROR)
+    unguarded = TaskParser(log_level=logging.ERROR)
+    guard = MatchGuard(max_line_length=None) if args.no_length_limit else MatchGuard()
+    guarded = TaskParser(log_level=logging.ERROR, guard=guard)
+    
+    results = []
+    for length in (int(value) for value in args.lengths.split(",")):
+        text = pathological_text(length, args.lines)
+        size_mb = len(text) / (1024 * 1024)
+        row = {"line_length": length, "size_mb": round(size_mb, 4)}
+        
+        guarded.guard.quarantined.clear()
+        seconds = time_parse(guarded, text)
+        row["guarded_s_per_mb"] = round(seconds / size_mb, 3)
+        row["quarantined"] = len(guarded.guard.quarantined)
+        if length <= args.unguarded_max:
+            row["unguarded_s_per_mb"] = round(time_parse(unguarded, text) / size_mb, 3)
+        results.append(row)
+        print(json.dumps(row), file=sys.stderr)
+    
+    print(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -64,9 +64,6 @@ def run_demo():
     for filename in sample_files:
         print(f"\n2. Processing {filename}...")
         
-        # Determine pattern type from filename
-        pattern_type = "original" if "original" in filename else "drill"
-        
         # Set up file paths
         input_path = project_root / "data" / "input" / filename
         output_filename = generate_output_filename(str(input_path), "demo")
@@ -76,9 +73,10 @@ def run_demo():
         output_path.parent.mkdir(parents=True, exist_ok=True)
         
         try:
-            # Parse the file
-            tasks = parser.parse_file(str(input_path), pattern_type)
-            print(f"   Parsed {len(tasks)} tasks")
+            # Parse the file, detecting its pattern type from a sample
+            tasks = parser.parse_file(str(input_path), "auto")
+            pattern_type = tasks.pattern_type
+            print(f"   Parsed {len(tasks)} tasks (detected '{pattern_type}' format)")
             
             # Save to CSV
             parser.save_to_csv(tasks, str(output_path), pattern_type, include_headers=True)
@@ -0,0 +1,225 @@
+"""
+Analytics Module
+
+numpy and pandas export of parse results, and vectorized summaries over
+them. A TaskTable already holds every field as an array of integer codes
+into one copy of each distinct value, which is exactly the layout of a
+numpy dictionary-encoded column or a pandas Categorical. Exports wrap
+those buffers directly instead of building a Python object per row, and
+summaries count codes with numpy, so they cost milliseconds on millions of
+rows.
+
+numpy and pandas are optional ('analytics' extra); the rest of the package
+does not need them.
+
+Author: Jonathan Legro
+Date: 2025-08-01
+"""
+
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Optional, Sequence, Union
+
+try:
+    import numpy as np
+except ImportError:  # Optional 'analytics' extra
+    np = None
+
+try:
+    import pandas as pd
+except ImportError:  # Optional 'analytics' extra
+    pd = None
+
+try:
+    from .config import ANALYTICS_SUMMARY_FIELDS
+    from .fields import PART_FIELDS
+    from .task_parser import ParsedTask, TaskMatcher
+    from .task_table import TaskTable
+except ImportError:
+    from config import ANALYTICS_SUMMARY_FIELDS
+    from fields import PART_FIELDS
+    from task_parser import ParsedTask, TaskMatcher
+    from task_table import TaskTable
+
+
+Tasks = Union[TaskTable, Iterable[ParsedTask]]
+
+
+class EncodedColumn(NamedTuple):
+    """A dictionary-encoded column: categories[codes] are the values."""
+    codes: 'np.ndarray'  # unsigned integer codes, one per row
+    categories: 'np.ndarray'  # distinct values, as an object array of str
+
+    def decode(self) -> 'np.ndarray':
+        """Return the values of the rows as an object array."""
+        return self.categories[self.codes]
+
+
+def _require(module, name: str):
+    """Return an optional module, or explain how to install it."""
+    if module is None:
+        raise ImportError(f"{name} is required for analytics; "
+                          f"install it with: pip install data-analyzer[analytics]")
+    return module
+
+
+def as_table(tasks: Tasks) -> TaskTable:
+    """Return tasks as a TaskTable, building one only if needed."""
+    return tasks if isinstance(tasks, TaskTable) else TaskTable(tasks)
+
+
+def encoded_column(tasks: Tasks, field: str) -> EncodedColumn:
+    """
+    Get one field as numpy codes and categories.
+
+    The codes of a ParsedTask field are a view of the table's own buffer,
+    not a copy; while it is alive, the table cannot grow. The codes of a
+    decomposed part are remapped so that its categories are distinct.
+
+    Args:
+        tasks: TaskTable, or ParsedTask objects to build one from
+        field: A ParsedTask field, or a decomposed part such as 'echelon'
+
+    Raises:
+        KeyError: If field is not a ParsedTask field or part
+    """
+    _require(np, "numpy")
+    codes, values = as_table(tasks).encoded(field)
+    codes = np.frombuffer(codes, dtype=np.uintc) if len(codes) else np.zeros(0, dtype=np.uintc)
+    categories = np.array(values, dtype=object)
+    if field in PART_FIELDS:
+        categories, inverse = np.unique(categories, return_inverse=True)
+        codes = inverse.reshape(-1).astype(np.uintc)[codes]
+    return EncodedColumn(codes, categories)
+
+
+def to_numpy(tasks: Tasks, fields: Optional[Sequence[str]] = None) -> Dict[str, EncodedColumn]:
+    """
+    Export fields as dictionary-encoded numpy columns.
+
+    Args:
+        tasks: TaskTable, or ParsedTask objects to build one from
+        fields: Fields or decomposed parts to export; every ParsedTask
+            field if None
+
+    Returns:
+        Mapping of field name to its EncodedColumn
+    """
+    table = as_table(tasks)
+    return {field: encoded_column(table, field) for field in (fields or TaskMatcher.FIELDS)}
+
+
+def to_dataframe(tasks: Tasks, fields: Optional[Sequence[str]] = None,
+                 include_parts: bool = False) -> 'pd.DataFrame':
+    """
+    Export tasks as a pandas DataFrame with one categorical column per field.
+
+    Each column is built from the field's codes and distinct values, so no
+    string is copied per row; pandas only narrows the codes to the
+    smallest integer type that fits.
+
+    Args:
+        tasks: TaskTable, or ParsedTask objects to build one from
+        fields: Fields or decomposed parts to export; every ParsedTask
+            field if None
+        include_parts: Also export the decomposed parts (see
+            fields.PART_FIELDS)
+    """
+    _require(pd, "pandas")
+    fields = list(fields or TaskMatcher.FIELDS)
+    if include_parts:
+        fields += [part for part in PART_FIELDS if part not in fields]
+    columns = to_numpy(tasks, fields)
+    return pd.DataFrame({
+        field: pd.Categorical.from_codes(column.codes, categories=pd.Index(column.categories))
+        for field, column in columns.items()
+    })
+
+
+def _counts(column: EncodedColumn) -> 'np.ndarray':
+    """Count the rows of each category."""
+    return np.bincount(column.codes, minlength=len(column.categories))
+
+
+def value_counts(tasks: Tasks, field: str) -> 'pd.Series':
+    """
+    Count tasks by the value of one field.
+
+    Args:
+        tasks: TaskTable, or ParsedTask objects to build one from
+        field: A ParsedTask field, or a decomposed part such as 'echelon'
+
+    Returns:
+        Series of counts indexed by value, largest first
+    """
+    _require(pd, "pandas")
+    column = encoded_column(tasks, field)
+    counts = _counts(column)
+    present = counts > 0
+    series = pd.Series(counts[present], index=pd.Index(column.categories[present], name=field),
+                       name="count")
+    return series.sort_values(ascending=False, kind="stable")
+
+
+def summary(tasks: Tasks, fields: Sequence[str] = ANALYTICS_SUMMARY_FIELDS) -> Dict[str, 'pd.Series']:
+    """
+    Count tasks by each of several fields, by default proponent, status and
+    task echelon.
+
+    Returns:
+        Mapping of field name to its value_counts
+    """
+    table = as_table(tasks)
+    return {field: value_counts(table, field) for field in fields}
+
+
+def crosstab(tasks: Tasks, rows: str, columns: str) -> 'pd.DataFrame':
+    """
+    Count tasks by the combination of two fields, e.g. proponent by status.
+
+    Returns:
+        DataFrame of counts with one row per value of rows and one column
+        per value of columns
+    """
+    _require(pd, "pandas")
+    table = as_table(tasks)
+    first, second = encoded_column(table, rows), encoded_column(table, columns)
+    width = len(second.categories)
+    combined = first.codes.astype(np.int64) * width + second.codes
+    counts = np.bincount(combined, minlength=len(first.categories) * width)
+    frame = pd.DataFrame(counts.reshape(len(first.categories), width),
+                         index=pd.Index(first.categories, name=rows),
+                         columns=pd.Index(second.categories, name=columns))
+    return frame.loc[frame.sum(axis=1) > 0, frame.sum(axis=0) > 0]
+
+
+def rollup(results: Mapping[str, Tasks], field: str) -> 'pd.DataFrame':
+    """
+    Count tasks by the value of a field, per file.
+
+    Each file's distinct values are mapped onto one shared set of
+    categories, then its codes are translated and counted as arrays.
+
+    Args:
+        results: Mapping of file path to its tasks, as from parse_files
+        field: A ParsedTask field, or a decomposed part such as 'echelon'
+
+    Returns:
+        DataFrame with one row per file, one column per value and a
+        'total' row
+    """
+    _require(pd, "pandas")
+    columns = {path: encoded_column(tasks, field) for path, tasks in results.items()}
+    shared: Dict[str, int] = {}
+    for column in columns.values():
+        for value in column.categories:
+            shared.setdefault(value, len(shared))
+
+    counts: List['np.ndarray'] = []
+    for column in columns.values():
+        translate = np.array([shared[value] for value in column.categories], dtype=np.intp)
+        counts.append(np.bincount(translate[column.codes], minlength=len(shared)))
+    matrix = np.vstack(counts) if counts else np.zeros((0, len(shared)), dtype=np.intp)
+    frame = pd.DataFrame(matrix, index=pd.Index(list(columns), name="file"),
+                         columns=pd.Index(list(shared), name=field))
+    frame.loc["total"] = frame.sum(axis=0)
+    totals = frame.loc["total"]
+    return frame[totals[totals > 0].sort_values(ascending=False, kind="stable").index]
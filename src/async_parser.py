@@ -0,0 +1,293 @@
+"""
+Async Parser Module
+
+asyncio facade over TaskParser for services that parse from an event loop.
+Reading, matching and writing run as jobs on a shared bounded worker pool,
+so the loop is never blocked by a parse. Each facade holds at most
+max_pending jobs in the pool; further calls wait on the loop, so hundreds of
+concurrent parses queue cheaply instead of piling up behind the pool.
+
+Cancelling a call cancels its job if the job has not started. A running job
+cannot be interrupted, but its result is discarded and its pool slot is only
+freed once it ends. Streaming calls work in batches, so they stop at the
+next batch boundary, and a cancelled save leaves no partial file behind.
+
+Author: Jonathan Legro
+Date: 2025-08-01
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from itertools import islice
+from typing import (Any, AsyncIterable, AsyncIterator, Callable, Dict, Iterable, Iterator,
+                    List, Optional, Tuple, Union)
+
+try:
+    from .config import (ASYNC_BATCH_SIZE, ASYNC_MAX_PENDING, ASYNC_MAX_WORKERS,
+                         STREAM_CHUNK_SIZE)
+    from .metrics import ParseStats
+    from .task_parser import ParsedTask, TaskParser
+    from .writer import CsvOutput
+except ImportError:
+    from config import (ASYNC_BATCH_SIZE, ASYNC_MAX_PENDING, ASYNC_MAX_WORKERS,
+                        STREAM_CHUNK_SIZE)
+    from metrics import ParseStats
+    from task_parser import ParsedTask, TaskParser
+    from writer import CsvOutput
+
+
+_pools: Dict[str, Executor] = {}
+_pools_lock = threading.Lock()
+
+
+def shared_pool(kind: str = "thread") -> Executor:
+    """
+    Return the process-wide worker pool of a kind, creating it on first use.
+
+    Args:
+        kind: 'thread' or 'process'
+
+    Raises:
+        ValueError: If kind is not supported
+    """
+    with _pools_lock:
+        pool = _pools.get(kind)
+        if pool is None:
+            if kind == "thread":
+                pool = ThreadPoolExecutor(ASYNC_MAX_WORKERS, thread_name_prefix="task-parser")
+            elif kind == "process":
+                pool = ProcessPoolExecutor(ASYNC_MAX_WORKERS)
+            else:
+                raise ValueError(f"Unknown pool kind: {kind}")
+            _pools[kind] = pool
+        return pool
+
+
+# One parser per worker process, created on first use
+_worker_parser: Optional[TaskParser] = None
+
+
+def _parse_file_worker(file_path: str, pattern_type: str, as_table: bool,
+                       log_level: int, max_bytes: Optional[int]) -> List[ParsedTask]:
+    """Parse a single file inside a worker process."""
+    global _worker_parser
+    if _worker_parser is None:
+        _worker_parser = TaskParser(log_level)
+    _worker_parser.max_input_bytes = max_bytes
+    return _worker_parser.parse_file(file_path, pattern_type, as_table)
+
+
+def _locked(lock: threading.Lock, function: Callable, *args) -> Any:
+    """Call function while holding lock, so jobs on one object never overlap."""
+    with lock:
+        return function(*args)
+
+
+def _next_batch(tasks: Iterator[ParsedTask], size: int) -> List[ParsedTask]:
+    """Pull up to size tasks from a task iterator."""
+    return list(islice(tasks, size))
+
+
+def _release(loop: asyncio.AbstractEventLoop, slots: asyncio.Semaphore, _future: Future) -> None:
+    """Free a pool slot from whichever thread finished the job."""
+    try:
+        loop.call_soon_threadsafe(slots.release)
+    except RuntimeError:
+        pass  # The loop is closed; nobody is waiting for the slot
+
+
+class _PendingOutput:
+    """
+    CsvOutput driven by pool jobs, whose steps run one at a time.
+
+    abort may be submitted while an earlier step is still running after a
+    cancellation; the lock makes it wait, and once aborted nothing opens.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.output: Optional[CsvOutput] = None
+        self.aborted = False
+
+    def open(self, *args) -> None:
+        with self.lock:
+            if not self.aborted:
+                self.output = CsvOutput(*args)
+
+    def write(self, tasks: List[ParsedTask]) -> int:
+        with self.lock:
+            return self.output.write(tasks)
+
+    def commit(self):
+        with self.lock:
+            return self.output.commit()
+
+    def abort(self) -> None:
+        with self.lock:
+            self.aborted = True
+            if self.output is not None:
+                self.output.abort()
+
+
+async def _batches(tasks: AsyncIterable[ParsedTask], size: int) -> AsyncIterator[List[ParsedTask]]:
+    """Group an async iterable of tasks into lists of up to size tasks."""
+    batch = []
+    async for task in tasks:
+        batch.append(task)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class AsyncTaskParser:
+    """
+    Coroutine versions of TaskParser.parse_file, iter_file and save_to_csv.
+
+    Share one instance across a service: the pending-job limit applies per
+    instance. In a thread pool, matching holds the GIL in short slices, so
+    the loop stays responsive but parses share one core; a process pool
+    runs parse_file on several cores, while streaming and writing always
+    use threads, since generators and open files cannot move between
+    processes. Process workers use their own parser with default settings
+    apart from the size limit, so a cache, metrics recorder or guard of the
+    wrapped parser only applies to thread jobs.
+    """
+
+    def __init__(self, parser: Optional[TaskParser] = None,
+                 executor: Union[str, Executor] = "thread",
+                 max_pending: int = ASYNC_MAX_PENDING):
+        """
+        Initialize the facade.
+
+        Args:
+            parser: Parser to run; a default TaskParser if None
+            executor: 'thread' or 'process' for the shared pool of that kind,
+                or an executor to use instead
+            max_pending: Jobs this facade may have queued or running at once
+        """
+        self.parser = parser or TaskParser()
+        self.executor = shared_pool(executor) if isinstance(executor, str) else executor
+        self.use_processes = isinstance(self.executor, ProcessPoolExecutor)
+        self.io_executor = shared_pool("thread") if self.use_processes else self.executor
+        self.max_pending = max_pending
+        # Created in the running loop on first use, since before Python 3.10
+        # a semaphore binds to the loop current when it is constructed
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._slots_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _loop_slots(self) -> Tuple[asyncio.AbstractEventLoop, asyncio.Semaphore]:
+        """Get the running loop and this facade's semaphore for it."""
+        loop = asyncio.get_running_loop()
+        if self._slots is None or self._slots_loop is not loop:
+            self._slots = asyncio.Semaphore(self.max_pending)
+            self._slots_loop = loop
+        return loop, self._slots
+
+    async def _run(self, executor: Executor, function: Callable, *args) -> Any:
+        """Run a job once a slot is free; the slot is held until the job ends."""
+        loop, slots = self._loop_slots()
+        await slots.acquire()
+        try:
+            future = executor.submit(function, *args)
+        except BaseException:
+            slots.release()
+            raise
+        future.add_done_callback(partial(_release, loop, slots))
+        return await asyncio.wrap_future(future)
+
+    async def parse_file(self, file_path: str, pattern_type: str,
+                         as_table: bool = False) -> List[ParsedTask]:
+        """
+        Parse a file without blocking the event loop; see TaskParser.parse_file.
+
+        Returns:
+            List of ParsedTask objects, or a TaskTable if as_table is set
+        """
+        if self.use_processes:
+            return await self._run(self.executor, _parse_file_worker, file_path, pattern_type,
+                                   as_table, self.parser.logger.level, self.parser.max_input_bytes)
+        return await self._run(self.executor, self.parser.parse_file, file_path, pattern_type, as_table)
+
+    async def iter_tasks(self, file_path: str, pattern_type: str,
+                         batch_size: int = ASYNC_BATCH_SIZE,
+                         chunk_size: int = STREAM_CHUNK_SIZE,
+                         deduplicate: bool = True) -> AsyncIterator[ParsedTask]:
+        """
+        Stream the tasks of a file in input order; see TaskParser.iter_file.
+
+        The file is read and matched chunk by chunk in pool jobs that each
+        produce up to batch_size tasks. The next batch is only requested
+        once the consumer has taken the previous one.
+
+        Args:
+            file_path: Path to the input text file
+            pattern_type: Type of patterns to use, or 'auto' to detect it
+            batch_size: Tasks produced per pool job
+            chunk_size: Approximate number of characters read per chunk
+            deduplicate: Whether to skip tasks that were already yielded
+        """
+        tasks = self.parser.iter_file(file_path, pattern_type, chunk_size, deduplicate)
+        lock = threading.Lock()
+        try:
+            while True:
+                batch = await self._run(self.io_executor, _locked, lock, _next_batch, tasks, batch_size)
+                if not batch:
+                    return
+                for task in batch:
+                    yield task
+        finally:
+            # A cancelled batch may still be running; the lock closes the
+            # file only after it ends
+            self.io_executor.submit(_locked, lock, tasks.close)
+
+    async def save(self, tasks: Union[Iterable[ParsedTask], AsyncIterable[ParsedTask]],
+                   output_path: str, format_type: str = "original",
+                   include_headers: bool = True, append: bool = False,
+                   include_parts: bool = False, batch_size: int = ASYNC_BATCH_SIZE) -> None:
+        """
+        Save tasks to CSV without blocking the event loop; see TaskParser.save_to_csv.
+
+        An async iterable such as iter_tasks() is written batch by batch as
+        it is produced. The file only appears once every task is written;
+        if the call fails or is cancelled, a new file is never created and
+        an append is rolled back.
+
+        Args:
+            tasks: ParsedTask objects, a TaskTable, or an async iterable of tasks
+            output_path: Path for output CSV file
+            format_type: Format type for output
+            include_headers: Whether to include column headers
+            append: Add rows to the end of an existing file
+            include_parts: Add the proponent and task code part columns
+            batch_size: Tasks written per pool job for async iterables
+        """
+        if not isinstance(tasks, AsyncIterable):
+            save = partial(self.parser.save_to_csv, output_path=output_path, format_type=format_type,
+                           include_headers=include_headers, append=append,
+                           include_parts=include_parts)
+            await self._run(self.io_executor, save, tasks)
+            return
+
+        pending = _PendingOutput()
+        stats = ParseStats()
+        with stats.stage("write") as record:
+            try:
+                await self._run(self.io_executor, pending.open, output_path, format_type,
+                                include_headers, append, include_parts)
+                async for batch in _batches(tasks, batch_size):
+                    await self._run(self.io_executor, pending.write, batch)
+                count, nbytes = await self._run(self.io_executor, pending.commit)
+            except BaseException:
+                # Runs after any step still in flight, so the file is gone
+                # by the time the error reaches the caller
+                await asyncio.wrap_future(self.io_executor.submit(pending.abort))
+                raise
+            record.rows += count
+            record.bytes += nbytes
+        if self.parser.metrics is not None:
+            self.parser.metrics.merge(stats)
+        self.parser.logger.info(f"Successfully saved {count} tasks to {output_path}")
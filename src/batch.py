@@ -0,0 +1,316 @@
+"""
+Batch Processing Module
+
+Parses whole directories of task exports across a process pool. Files are
+discovered in sorted order, parsed in parallel, and collected back in that
+same order so results and cross-file deduplication are deterministic.
+
+Author: Jonathan Legro
+Date: 2025-08-01
+"""
+
+import argparse
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Dict, List, Optional, Sequence, Tuple
+
+try:
+    from .config import (AUTO_PATTERN_TYPE, BATCH_MAX_WORKERS, BATCH_CHUNKSIZE,
+                         BLOOM_FALSE_POSITIVE_RATE, MAX_FILE_SIZE_MB, NEAR_DUP_KEEP,
+                         NEAR_DUP_THRESHOLD, SUPPORTED_INPUT_EXTENSIONS)
+    from .dedup import Deduplicator, open_seen_store
+    from .metrics import TaskList
+    from .near_dedup import KEEP_POLICIES, NearDeduplicator
+    from .reader import is_input_file, max_input_bytes
+    from .task_parser import TaskParser, ParsedTask, TaskPatternConfig, generate_output_filename
+except ImportError:
+    from config import (AUTO_PATTERN_TYPE, BATCH_MAX_WORKERS, BATCH_CHUNKSIZE,
+                        BLOOM_FALSE_POSITIVE_RATE, MAX_FILE_SIZE_MB, NEAR_DUP_KEEP,
+                        NEAR_DUP_THRESHOLD, SUPPORTED_INPUT_EXTENSIONS)
+    from dedup import Deduplicator, open_seen_store
+    from metrics import TaskList
+    from near_dedup import KEEP_POLICIES, NearDeduplicator
+    from reader import is_input_file, max_input_bytes
+    from task_parser import TaskParser, ParsedTask, TaskPatternConfig, generate_output_filename
+
+
+# One parser per worker process, created on first use
+_worker_parser: Optional[TaskParser] = None
+
+
+def _parse_file_worker(file_path: str, pattern_type: str, log_level: int,
+                       max_bytes: Optional[int] = max_input_bytes()) -> List[ParsedTask]:
+    """Parse a single file inside a worker process."""
+    global _worker_parser
+    if _worker_parser is None:
+        _worker_parser = TaskParser(log_level)
+    _worker_parser.max_input_bytes = max_bytes
+    return _worker_parser.parse_file(file_path, pattern_type)
+
+
+def find_input_files(directory: str, recursive: bool = False,
+                     extensions: Sequence[str] = tuple(SUPPORTED_INPUT_EXTENSIONS)) -> List[str]:
+    """
+    Find supported input files in a directory.
+    
+    Args:
+        directory: Directory to search
+        recursive: Whether to descend into subdirectories
+        extensions: File extensions to include, optionally followed by a
+            compression extension such as .gz
+        
+    Returns:
+        Sorted list of file paths
+        
+    Raises:
+        NotADirectoryError: If directory doesn't exist
+    """
+    if not os.path.isdir(directory):
+        raise NotADirectoryError(f"Directory not found: {directory}")
+    
+    found = []
+    for root, dirs, files in os.walk(directory):
+        for name in files:
+            if is_input_file(name, extensions):
+                found.append(os.path.join(root, name))
+        if not recursive:
+            break
+    
+    return sorted(found)
+
+
+def parse_files(file_paths: Sequence[str], pattern_type: str,
+                max_workers: Optional[int] = BATCH_MAX_WORKERS,
+                chunksize: int = BATCH_CHUNKSIZE,
+                deduplicate: bool = True,
+                log_level: int = logging.WARNING,
+                deduplicator: Optional[Deduplicator] = None,
+                max_bytes: Optional[int] = max_input_bytes()) -> Dict[str, List[ParsedTask]]:
+    """
+    Parse several files in parallel.
+    
+    Args:
+        file_paths: Files to parse
+        pattern_type: Type of patterns to use, or 'auto' to detect the type
+            of each file in its worker
+        max_workers: Number of worker processes (None uses all cores,
+            1 parses in the current process)
+        chunksize: Number of files handed to a worker at a time
+        deduplicate: Whether to drop tasks already seen in an earlier file
+        log_level: Logging level for the worker parsers
+        deduplicator: Deduplication stage to use across files, e.g. one
+            backed by a seen-set persisted from earlier runs; with 'auto',
+            files of every detected type share its seen-set
+        max_bytes: Largest decompressed size of a file, or None for no
+            limit; see TaskParser's max_file_size_mb
+        
+    Returns:
+        Mapping of file path to its tasks, in the order of file_paths; each
+        task list carries the pattern type it was parsed with as
+        ``pattern_type``
+        
+    Raises:
+        ValueError: If pattern_type is not supported, or is 'auto' and the
+            type of a file cannot be detected
+    """
+    if pattern_type != AUTO_PATTERN_TYPE and pattern_type not in TaskPatternConfig.get_available_types():
+        raise ValueError(f"Unsupported pattern type: {pattern_type}")
+    
+    worker = partial(_parse_file_worker, pattern_type=pattern_type, log_level=log_level,
+                     max_bytes=max_bytes)
+    
+    if max_workers == 1 or len(file_paths) <= 1:
+        parsed = [worker(path) for path in file_paths]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            parsed = list(executor.map(worker, file_paths, chunksize=chunksize))
+    
+    # Task digests depend on the format type, so each detected type gets
+    # its own deduplicator over the shared seen-set
+    deduplicators: Dict[str, Deduplicator] = {}
+    if deduplicate and deduplicator is not None:
+        deduplicators[deduplicator.format_type] = deduplicator
+    
+    results: Dict[str, List[ParsedTask]] = {}
+    for path, tasks in zip(file_paths, parsed):
+        if deduplicate:
+            file_type = getattr(tasks, 'pattern_type', None) or pattern_type
+            if file_type not in deduplicators:
+                store = deduplicator.store if deduplicator is not None else None
+                deduplicators[file_type] = Deduplicator(file_type, store)
+            tasks = TaskList(deduplicators[file_type].filter(tasks), tasks.stats, file_type)
+        results[path] = tasks
+    
+    return results
+
+
+def drop_near_duplicates(results: Dict[str, List[ParsedTask]], format_type: str,
+                         threshold: float = NEAR_DUP_THRESHOLD,
+                         keep: str = NEAR_DUP_KEEP) -> Tuple[Dict[str, List[ParsedTask]],
+                                                             Dict[str, NearDeduplicator]]:
+    """
+    Drop tasks that are near-duplicates of a task in the same or another file.
+    
+    Tasks of each pattern type are compared together, across all files.
+    
+    Args:
+        results: Mapping of input file path to tasks, as from parse_files
+        format_type: Format type of tasks without a pattern type
+        threshold: Lowest title similarity of near-duplicates
+        keep: Which copy survives; see NearDeduplicator
+        
+    Returns:
+        The results without the dropped tasks, and the deduplicator of each
+        pattern type, which holds its merged groups
+    """
+    paths_by_type: Dict[str, List[str]] = {}
+    for path, tasks in results.items():
+        paths_by_type.setdefault(getattr(tasks, 'pattern_type', None) or format_type, []).append(path)
+    
+    kept_results: Dict[str, List[ParsedTask]] = {}
+    deduplicators: Dict[str, NearDeduplicator] = {}
+    for file_type, paths in paths_by_type.items():
+        deduplicator = NearDeduplicator(file_type, threshold, keep)
+        flags = iter(deduplicator.survivors([task for path in paths for task in results[path]]))
+        for path in paths:
+            tasks = results[path]
+            kept_results[path] = TaskList([task for task in tasks if next(flags)],
+                                          getattr(tasks, 'stats', None), getattr(tasks, 'pattern_type', None))
+        deduplicators[file_type] = deduplicator
+    return {path: kept_results[path] for path in results}, deduplicators
+
+
+def save_batch_results(parser: TaskParser, results: Dict[str, List[ParsedTask]],
+                       output_dir: str, format_type: str, merge: bool = True,
+                       suffix: str = "batch", include_parts: bool = False,
+                       compress: str = "") -> List[str]:
+    """
+    Write batch results as one merged CSV or one CSV per input file.
+    
+    Task lists that carry a ``pattern_type`` are written in that format.
+    When merging files of several types, one CSV is written per type.
+    
+    Args:
+        parser: Parser used to write the CSV files
+        results: Mapping of input file path to tasks
+        output_dir: Directory for the output files
+        format_type: Format type for output of tasks without a pattern type
+        merge: Whether to write a single merged CSV
+        suffix: Suffix added to generated filenames
+        include_parts: Add the proponent and task code part columns
+        compress: 'gz' or 'xz' to compress the output files
+        
+    Returns:
+        List of written output paths
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    
+    extension = f".{compress}" if compress else ""
+    
+    def type_of(tasks: List[ParsedTask]) -> str:
+        return getattr(tasks, 'pattern_type', None) or format_type
+    
+    if merge:
+        source = os.path.commonpath([os.path.dirname(os.path.abspath(path)) for path in results]) \
+            if results else output_dir
+        types = list(dict.fromkeys(type_of(tasks) for tasks in results.values())) or [format_type]
+        written = []
+        for output_type in types:
+            type_suffix = suffix if len(types) == 1 else f"{suffix}_{output_type}"
+            output_path = os.path.join(output_dir, generate_output_filename(
+                os.path.normpath(source), type_suffix)) + extension
+            merged = (task for tasks in results.values() if type_of(tasks) == output_type
+                      for task in tasks)
+            parser.save_to_csv(merged, output_path, output_type, include_parts=include_parts)
+            written.append(output_path)
+        return written
+    
+    written = []
+    for input_path, tasks in results.items():
+        output_path = os.path.join(output_dir, generate_output_filename(input_path, suffix)) + extension
+        parser.save_to_csv(tasks, output_path, type_of(tasks), include_parts=include_parts)
+        written.append(output_path)
+    return written
+
+
+def register_cli(subparsers) -> None:
+    """Register the ``batch`` command with the command-line interface."""
+    command = subparsers.add_parser("batch", help="Parse every input file in a directory")
+    command.add_argument("directory", help="Directory containing input text files")
+    command.add_argument("-t", "--type", dest="pattern_type", default="original",
+                         choices=TaskPatternConfig.get_available_types() + [AUTO_PATTERN_TYPE],
+                         help=f"Pattern type to use; '{AUTO_PATTERN_TYPE}' detects it per file")
+    command.add_argument("-o", "--output", dest="output_dir",
+                         help="Output directory (defaults to the input directory)")
+    command.add_argument("-w", "--workers", type=int, default=BATCH_MAX_WORKERS,
+                         help="Number of worker processes")
+    command.add_argument("--chunksize", type=int, default=BATCH_CHUNKSIZE,
+                         help="Files handed to a worker at a time")
+    command.add_argument("--per-file", action="store_true",
+                         help="Write one CSV per input file instead of a merged CSV")
+    command.add_argument("--parts", action="store_true",
+                         help="Add columns for the proponent code, name and level "
+                              "and the task school, echelon and number")
+    command.add_argument("--compress", choices=["gz", "xz"], default="",
+                         help="Compress the output CSV files")
+    command.add_argument("-r", "--recursive", action="store_true",
+                         help="Include files in subdirectories")
+    command.add_argument("--max-size", type=float, default=MAX_FILE_SIZE_MB, metavar="MB",
+                         help="Largest decompressed input file size; 0 for no limit")
+    command.add_argument("--seen", metavar="PATH",
+                         help="Skip tasks emitted by earlier runs, recorded in a sorted "
+                              "digest file (or a Bloom filter if PATH ends in .bloom)")
+    command.add_argument("--fp-rate", type=float, default=BLOOM_FALSE_POSITIVE_RATE,
+                         help="False-positive rate for a new Bloom filter")
+    command.add_argument("--near-duplicates", action="store_true",
+                         help="Also drop tasks that differ only in formatting or have "
+                              "near-identical titles, across all files")
+    command.add_argument("--threshold", type=float, default=NEAR_DUP_THRESHOLD,
+                         help="Lowest title similarity (0-1) of near-duplicates")
+    command.add_argument("--keep", choices=KEEP_POLICIES, default=NEAR_DUP_KEEP,
+                         help="Which copy of a near-duplicate group survives")
+    command.add_argument("--audit", metavar="PATH",
+                         help="With --near-duplicates, write the merged groups to this CSV")
+    command.set_defaults(func=run_batch)
+
+
+def run_batch(args: argparse.Namespace) -> int:
+    """Run the ``batch`` command."""
+    parser = TaskParser(max_file_size_mb=args.max_size or None)
+    deduplicator = None
+    if args.seen:
+        store = open_seen_store(args.seen, false_positive_rate=args.fp_rate)
+        deduplicator = Deduplicator(args.pattern_type, store)
+    
+    try:
+        results = parser.parse_directory(args.directory, args.pattern_type,
+                                         max_workers=args.workers, chunksize=args.chunksize,
+                                         recursive=args.recursive, deduplicator=deduplicator)
+        if args.near_duplicates:
+            results, near = drop_near_duplicates(results, args.pattern_type, args.threshold, args.keep)
+            print(f"Dropped {sum(stage.removed for stage in near.values())} near-duplicate tasks")
+            if args.audit:
+                for file_type, near_deduplicator in near.items():
+                    root, extension = os.path.splitext(args.audit)
+                    near_deduplicator.write_audit(args.audit if len(near) == 1
+                                                  else f"{root}_{file_type}{extension}")
+        output_dir = args.output_dir or args.directory
+        written = save_batch_results(parser, results, output_dir, args.pattern_type,
+                                     merge=not args.per_file, include_parts=args.parts,
+                                     compress=args.compress)
+    except BaseException:
+        # Leave the seen-set untouched so the rows are emitted on the next run
+        if deduplicator is not None:
+            deduplicator.discard()
+        raise
+    
+    if deduplicator is not None:
+        deduplicator.close()
+    
+    total = sum(len(tasks) for tasks in results.values())
+    print(f"Successfully processed {total} tasks from {len(results)} files")
+    for path in written:
+        print(f"  {path}")
+    return 0
@@ -0,0 +1,93 @@
+"""
+Bytes Scanning Module
+
+Matches the task patterns directly against the bytes of a memory-mapped
+file, so exports that are plain ASCII are never decoded as a whole: only the
+captured field slices are. Every pattern is recompiled as a bytes pattern
+and fields are filled from match spans.
+
+Bytes and str patterns agree only on text where ASCII and Unicode semantics
+coincide. is_ascii_safe checks for that: no bytes above 0x7F, no NUL (a
+sign of UTF-16), no carriage return (read_text translates newlines), and no
+0x1C-0x1F separators, which str patterns treat as whitespace and bytes
+patterns do not. Other input is parsed through the str path.
+
+Author: Jonathan Legro
+Date: 2025-08-01
+"""
+
+import mmap
+import re
+from typing import Dict, Optional, Tuple, Union
+
+try:
+    from .task_parser import TaskMatcher
+except ImportError:
+    from task_parser import TaskMatcher
+
+
+Buffer = Union[bytes, mmap.mmap]
+
+_UNSAFE = re.compile(rb"[\x00\r\x1c-\x1f\x80-\xff]")
+
+
+def is_ascii_safe(buffer: Buffer, pos: int = 0, endpos: Optional[int] = None) -> bool:
+    """Whether bytes patterns match buffer[pos:endpos] exactly like str patterns."""
+    if endpos is None:
+        endpos = len(buffer)
+    return _UNSAFE.search(buffer, pos, endpos) is None
+
+
+class BytesMatcher(TaskMatcher):
+    """
+    TaskMatcher whose alternatives run over bytes.
+
+    Shares the patterns, field groups and prefilter parameters of the str
+    matcher it is built from, so matching and scan order are unchanged.
+    """
+
+    def __init__(self, matcher: TaskMatcher):
+        """
+        Recompile the alternatives of a str matcher as bytes patterns.
+
+        Raises:
+            ValueError: If a pattern or anchor is not ASCII
+            re.error: If a pattern uses str-only syntax such as \\u escapes
+        """
+        self.pattern_type = matcher.pattern_type
+        self.patterns = matcher.patterns
+        self.declared_anchors = matcher.declared_anchors
+        self.errors = matcher.errors
+        self._field_groups = matcher._field_groups
+        self.regexes = [re.compile(regex.pattern.encode("ascii"), regex.flags & ~re.UNICODE)
+                        for regex in matcher.regexes]
+        self.prefilters = [
+            None if prefilter is None
+            else (tuple(anchor.encode("ascii") for anchor in prefilter[0]), prefilter[1])
+            for prefilter in matcher.prefilters
+        ]
+
+    def extract(self, alternative: int, match: 're.Match') -> Tuple[str, ...]:
+        """Decode the stripped field slices of a match in FIELDS order."""
+        values = ["", "", "", "", "", ""]
+        buffer = match.string
+        spans = match.regs
+        for position, group in self._field_groups[alternative]:
+            start, end = spans[group]
+            if start < end:
+                # Same result as ASCII on safe text, with a cheaper decoder
+                values[position] = buffer[start:end].strip().decode("latin-1")
+        return tuple(values)
+
+
+_matchers: Dict[TaskMatcher, Optional[BytesMatcher]] = {}
+
+
+def bytes_matcher(matcher: TaskMatcher) -> Optional[BytesMatcher]:
+    """Return the bytes version of a matcher, or None if it has none."""
+    if matcher not in _matchers:
+        try:
+            _matchers[matcher] = BytesMatcher(matcher)
+        except (ValueError, re.error):
+            _matchers[matcher] = None
+    return _matchers[matcher]
@@ -0,0 +1,213 @@
+"""
+Result Cache Module
+
+On-disk cache of parse results so unchanged inputs are not parsed again.
+Entries are keyed by a hash of the file content, the pattern type and the
+fingerprint of its pattern set. File size and modification time are checked
+first so an unchanged file is not even re-hashed. The cache is capped in size
+and evicts the least recently used entries.
+
+Author: Jonathan Legro
+Date: 2025-08-01
+"""
+
+import hashlib
+import json
+import logging
+import os
+import time
+import zlib
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+try:
+    from .config import CACHE_DIR, CACHE_MAX_BYTES
+    from .task_parser import ParsedTask, TaskMatcher, TaskPatternConfig
+except ImportError:
+    from config import CACHE_DIR, CACHE_MAX_BYTES
+    from task_parser import ParsedTask, TaskMatcher, TaskPatternConfig
+
+
+logger = logging.getLogger(__name__)
+
+_encode_fields = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+
+
+def hash_file(file_path: str, block_size: int = 1024 * 1024) -> str:
+    """Hash a file's content without reading it into memory at once."""
+    digest = hashlib.blake2b(digest_size=20)
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def serialize_tasks(tasks: List[ParsedTask]) -> bytes:
+    """
+    Serialize tasks to a compact, compressed byte string.
+    
+    The fields of every task are written in order as one flat JSON array,
+    so any character can appear in a field.
+    """
+    fields = [getattr(task, field) for task in tasks for field in TaskMatcher.FIELDS]
+    return zlib.compress(_encode_fields(fields).encode("utf-8"))
+
+
+def deserialize_tasks(data: bytes) -> List[ParsedTask]:
+    """
+    Rebuild tasks written by serialize_tasks.
+    
+    Raises:
+        ValueError: If the data is not a whole number of task rows
+    """
+    fields = json.loads(zlib.decompress(data).decode("utf-8"))
+    width = len(TaskMatcher.FIELDS)
+    if not isinstance(fields, list) or len(fields) % width:
+        raise ValueError(f"Cache entry is not a list of {width}-field rows")
+    values = iter(fields)
+    return [ParsedTask(*row) for row in zip(*[values] * width)]
+
+
+class ResultCache:
+    """
+    Size-capped, least-recently-used cache of parse_file results.
+    
+    The cache directory holds one compressed entry file per key and an
+    index.json file recording entry sizes, access times and the size/mtime
+    of every file whose content hash is known. Records of files that no
+    longer exist are dropped whenever an entry is stored.
+    """
+    
+    INDEX_NAME = "index.json"
+    
+    def __init__(self, cache_dir: Union[str, Path] = CACHE_DIR, max_bytes: int = CACHE_MAX_BYTES):
+        """Open or create a cache directory."""
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._index = self._load_index()
+        self.hits = 0
+        self.misses = 0
+    
+    def _load_index(self) -> Dict[str, Dict]:
+        """Load the index, starting fresh if it is missing or unreadable."""
+        path = self.cache_dir / self.INDEX_NAME
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+            if isinstance(index.get("entries"), dict) and isinstance(index.get("files"), dict):
+                return index
+        except (OSError, ValueError):
+            pass
+        return {"entries": {}, "files": {}}
+    
+    def _save_index(self) -> None:
+        """Write the index atomically."""
+        path = self.cache_dir / self.INDEX_NAME
+        temp_path = path.with_suffix(".tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(self._index, f)
+        os.replace(temp_path, path)
+    
+    def content_hash(self, file_path: str) -> str:
+        """
+        Get a file's content hash, reusing the last one if size and mtime
+        are unchanged.
+        """
+        stat = os.stat(file_path)
+        key = os.path.abspath(file_path)
+        known = self._index["files"].get(key)
+        if known and known["size"] == stat.st_size and known["mtime_ns"] == stat.st_mtime_ns:
+            return known["hash"]
+        
+        content_hash = hash_file(file_path)
+        self._index["files"][key] = {
+            "size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "hash": content_hash
+        }
+        return content_hash
+    
+    def make_key(self, file_path: str, pattern_type: str) -> str:
+        """Build the cache key for a file and pattern type."""
+        fingerprint = TaskPatternConfig.get_matcher(pattern_type).fingerprint
+        return hashlib.sha256(
+            f"{self.content_hash(file_path)}:{pattern_type}:{fingerprint}".encode("utf-8")
+        ).hexdigest()
+    
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.bin"
+    
+    def get(self, file_path: str, pattern_type: str) -> Optional[List[ParsedTask]]:
+        """Return cached tasks for a file, or None on a miss."""
+        key = self.make_key(file_path, pattern_type)
+        entry = self._index["entries"].get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        
+        try:
+            with open(self._entry_path(key), "rb") as f:
+                tasks = deserialize_tasks(f.read())
+        except (OSError, zlib.error, ValueError, TypeError) as e:
+            logger.warning(f"Dropping unreadable cache entry {key}: {e}")
+            self._remove(key)
+            self._save_index()
+            self.misses += 1
+            return None
+        
+        entry["atime"] = time.time()
+        self._save_index()
+        self.hits += 1
+        return tasks
+    
+    def put(self, file_path: str, pattern_type: str, tasks: List[ParsedTask]) -> None:
+        """Store tasks for a file and evict old entries above the size cap."""
+        key = self.make_key(file_path, pattern_type)
+        data = serialize_tasks(tasks)
+        if len(data) > self.max_bytes:
+            return
+        
+        entry_path = self._entry_path(key)
+        temp_path = entry_path.with_suffix(".tmp")
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, entry_path)
+        
+        self._index["entries"][key] = {"size": len(data), "atime": time.time()}
+        self._evict()
+        self._forget_missing_files()
+        self._save_index()
+    
+    def _remove(self, key: str) -> None:
+        """Delete one entry."""
+        self._index["entries"].pop(key, None)
+        try:
+            self._entry_path(key).unlink()
+        except FileNotFoundError:
+            pass
+    
+    def _evict(self) -> None:
+        """Remove least recently used entries until the cache fits its cap."""
+        entries = self._index["entries"]
+        total = sum(entry["size"] for entry in entries.values())
+        for key in sorted(entries, key=lambda k: entries[k]["atime"]):
+            if total <= self.max_bytes:
+                break
+            total -= entries[key]["size"]
+            self._remove(key)
+    
+    def _forget_missing_files(self) -> None:
+        """Drop the content hashes of files that were deleted or rotated away."""
+        files = self._index["files"]
+        for path in [path for path in files if not os.path.exists(path)]:
+            del files[path]
+    
+    def size(self) -> int:
+        """Total size of all cached entries in bytes."""
+        return sum(entry["size"] for entry in self._index["entries"].values())
+    
+    def clear(self) -> None:
+        """Remove every cached entry."""
+        for key in list(self._index["entries"]):
+            self._remove(key)
+        self._index["files"].clear()
+        self._save_index()
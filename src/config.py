@@ -14,6 +14,9 @@ INPUT_DIR = DATA_DIR / "input"
 OUTPUT_DIR = DATA_DIR / "output"
 CONFIG_DIR = PROJECT_ROOT / "config"
 DOCS_DIR = PROJECT_ROOT / "docs"
+CACHE_DIR = DATA_DIR / "cache"
+CHECKPOINT_DIR = DATA_DIR / "checkpoints"
+INDEX_DIR = DATA_DIR / "title_index"
 
 # Default settings
 DEFAULT_ENCODING = "utf-8"
@@ -26,11 +29,96 @@ LOG_LEVEL = "INFO"
 
 # File patterns
 SUPPORTED_INPUT_EXTENSIONS = [".txt", ".text"]
+COMPRESSED_INPUT_EXTENSIONS = [".gz", ".xz", ".bz2"]  # e.g. export.txt.gz
 OUTPUT_EXTENSION = ".csv"
 
+# Input decoding settings
+ENCODING_SAMPLE_BYTES = 64 * 1024  # decompressed bytes sampled to detect the encoding
+INPUT_FALLBACK_ENCODINGS = ("cp1252",)  # tried when a sample is not valid UTF-8
+
+# CSV output settings
+CSV_WRITE_BUFFER = 1024 * 1024  # bytes buffered before each write to disk
+CSV_BATCH_ROWS = 10_000  # rows handed to writerows at a time
+CSV_GZIP_LEVEL = 6  # gzip level for .csv.gz output; 9 is several times slower
+CSV_LZMA_PRESET = 1  # xz preset for .csv.xz output; higher presets are far slower
+
 # Pattern validation settings
 MAX_PATTERN_LENGTH = 1000
-MAX_FILE_SIZE_MB = 100
+SETTINGS_FILE = CONFIG_DIR / "settings.ini"
+PATTERN_PACK_DIR = CONFIG_DIR / "patterns"  # extra *.ini pattern packs
+PATTERN_RELOAD_INTERVAL = 2.0  # seconds between checks for changed pattern files
+MAX_FILE_SIZE_MB = 100  # limit on the decompressed size of an input file
+
+# Streaming settings
+STREAM_CHUNK_SIZE = 1024 * 1024  # characters read per chunk
+STREAM_OVERLAP_LINES = 8  # lines carried between chunks for multi-line matches
+
+# Prefilter settings
+PREFILTER_MIN_ANCHOR_LENGTH = 4  # shortest literal used to find candidate windows
+
+# Match guard settings
+GUARD_TIME_BUDGET = 0.25  # seconds a block of lines may spend matching
+GUARD_MAX_LINE_LENGTH = 2000  # longer lines are quarantined without matching
+GUARD_BLOCK_LINES = 256  # lines scanned under one time budget
+
+# Field decomposition settings
+FIELD_LOOKUP_MAX_ENTRIES = 1_000_000  # distinct values kept per lookup table
+
+# Format detection settings
+AUTO_PATTERN_TYPE = "auto"  # pattern_type value that detects the type from the input
+DETECT_HEAD_LINES = 200  # lines sampled from the start of a file
+DETECT_SAMPLES = 16  # random offsets sampled after the head
+DETECT_SAMPLE_LINES = 32  # lines read at each random offset
+DETECT_STREAM_CHARS = 1024 * 1024  # decoded characters sampled from compressed or re-encoded input
+DETECT_MIN_CONFIDENCE = 0.05  # lowest margin between the best and second-best type
+DETECT_FALLBACK_TYPE = None  # type used when detection is not confident; None raises
+
+# Batch processing settings
+BATCH_MAX_WORKERS = None  # None uses os.cpu_count()
+BATCH_CHUNKSIZE = 1  # files handed to a worker at a time
+
+# Async API settings
+ASYNC_MAX_WORKERS = None  # threads or processes in the shared pool; None uses the executor default
+ASYNC_MAX_PENDING = 32  # jobs one AsyncTaskParser may have queued or running in the pool
+ASYNC_BATCH_SIZE = 1000  # tasks handed between the pool and the event loop at a time
+
+# Intra-file parallel settings
+PARALLEL_CHUNK_BYTES = 16 * 1024 * 1024  # target size of each byte range
+
+# Deduplication settings
+DEDUP_DIGEST_SIZE = 16  # bytes per task key digest
+BLOOM_DEFAULT_CAPACITY = 10_000_000  # expected number of distinct tasks
+BLOOM_FALSE_POSITIVE_RATE = 0.001
+
+# Near-duplicate detection settings
+NEAR_DUP_THRESHOLD = 0.8  # lowest title similarity (Jaccard of shingles) of near-duplicates
+NEAR_DUP_PERMUTATIONS = 32  # MinHash signature size
+NEAR_DUP_SHINGLE_SIZE = 3  # characters per title shingle
+NEAR_DUP_KEEP = "first"  # copy that survives: 'first', 'last' or 'longest'
+NEAR_DUP_BUCKET_SIZE = 32  # most titles kept per LSH bucket, bounding comparisons per task
+
+# Result cache settings
+CACHE_MAX_BYTES = 256 * 1024 * 1024  # evict least recently used entries above this
+
+# Task store settings
+STORE_PATH = DATA_DIR / "tasks.db"  # SQLite database of parsed tasks
+STORE_BATCH_SIZE = 50_000  # rows written per transaction
+STORE_CACHE_KB = 128 * 1024  # SQLite page cache; keeps index pages hot during bulk loads
+
+# Run diff settings
+DIFF_MEMORY_ROWS = 1_000_000  # rows per side held in memory before spilling partitions to disk
+DIFF_PARTITIONS = 64  # spill files per side; each must fit in memory when compared
+
+# Analytics settings
+ANALYTICS_SUMMARY_FIELDS = ("proponent", "status", "echelon")  # fields counted by analytics.summary
+
+# Title index settings
+INDEX_SEGMENT_ROWS = 1_000_000  # rows per segment; bounds memory while indexing
+INDEX_MAX_SEGMENTS = 8  # segments are merged into one above this
+
+# Watch mode settings
+WATCH_POLL_INTERVAL = 1.0  # seconds between directory scans when polling
+WATCH_DEBOUNCE = 0.5  # seconds a file must stay unchanged before parsing
 
 def ensure_directories():
     """Ensure all required directories exist."""
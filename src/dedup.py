@@ -0,0 +1,327 @@
+"""
+Deduplication Module
+
+Streaming deduplication of parsed tasks on fixed-size digests of their key
+fields. The set of seen digests can live in memory for a single run, or be
+persisted between runs as a sorted digest file (exact) or an on-disk Bloom
+filter (bounded size, configurable false-positive rate).
+
+Author: Jonathan Legro
+Date: 2025-08-01
+"""
+
+import hashlib
+import heapq
+import logging
+import math
+import mmap
+import os
+import struct
+from typing import Iterable, Iterator, Optional, Set
+
+try:
+    from .config import DEDUP_DIGEST_SIZE, BLOOM_DEFAULT_CAPACITY, BLOOM_FALSE_POSITIVE_RATE
+    from .task_parser import ParsedTask
+except ImportError:
+    from config import DEDUP_DIGEST_SIZE, BLOOM_DEFAULT_CAPACITY, BLOOM_FALSE_POSITIVE_RATE
+    from task_parser import ParsedTask
+
+
+logger = logging.getLogger(__name__)
+
+# Separates key fields before hashing so ("ab", "c") and ("a", "bc") differ
+_FIELD_SEPARATOR = "\x1f"
+
+
+def task_digest(task: ParsedTask, format_type: str = "original",
+                digest_size: int = DEDUP_DIGEST_SIZE) -> bytes:
+    """
+    Compute the fixed-size digest of a task's key fields.
+    
+    The key fields are the columns of the output format, so two tasks have
+    the same digest exactly when remove_duplicates would treat them as equal
+    (up to a negligible chance of hash collision).
+    """
+    key = _FIELD_SEPARATOR.join(task.to_list(format_type))
+    return hashlib.blake2b(key.encode("utf-8"), digest_size=digest_size).digest()
+
+
+class MemorySeenSet:
+    """In-memory set of digests, discarded at the end of the run."""
+    
+    def __init__(self):
+        self._digests: Set[bytes] = set()
+    
+    def __contains__(self, digest: bytes) -> bool:
+        return digest in self._digests
+    
+    def __len__(self) -> int:
+        return len(self._digests)
+    
+    def add(self, digest: bytes) -> None:
+        """Record a digest."""
+        self._digests.add(digest)
+    
+    def save(self) -> None:
+        """Nothing to persist for an in-memory set."""
+    
+    def close(self) -> None:
+        """Release resources."""
+    
+    def discard(self) -> None:
+        """Forget the digests added since the last save and close without saving."""
+        self._digests.clear()
+        self.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        # The tasks of a failed run were not written, so they stay unseen
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+
+class DigestFile(MemorySeenSet):
+    """
+    Exact seen-set persisted as a sorted file of fixed-size digests.
+    
+    Digests from earlier runs are looked up by binary search over the
+    memory-mapped file; digests added in this run are kept in memory and
+    merged into the file by save().
+    """
+    
+    def __init__(self, path: str, digest_size: int = DEDUP_DIGEST_SIZE):
+        super().__init__()
+        self.path = path
+        self.digest_size = digest_size
+        self._file = None
+        self._mm: Optional[mmap.mmap] = None
+        self._count = 0
+        self._open()
+    
+    def _open(self) -> None:
+        """Map the existing digest file, if any."""
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            return
+        size = os.path.getsize(self.path)
+        if size % self.digest_size:
+            raise ValueError(f"Corrupt digest file {self.path}: size {size} is not a "
+                             f"multiple of {self.digest_size}")
+        self._file = open(self.path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._count = size // self.digest_size
+    
+    def _persisted(self, index: int) -> bytes:
+        start = index * self.digest_size
+        return self._mm[start:start + self.digest_size]
+    
+    def __contains__(self, digest: bytes) -> bool:
+        if digest in self._digests:
+            return True
+        if self._mm is None:
+            return False
+        
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if self._persisted(middle) < digest:
+                low = middle + 1
+            else:
+                high = middle
+        return low < self._count and self._persisted(low) == digest
+    
+    def __len__(self) -> int:
+        return self._count + len(self._digests)
+    
+    def _iter_persisted(self) -> Iterator[bytes]:
+        for index in range(self._count):
+            yield self._persisted(index)
+    
+    def save(self) -> None:
+        """Merge the new digests into the sorted file and replace it atomically."""
+        if not self._digests:
+            return
+        
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        temp_path = self.path + ".tmp"
+        
+        with open(temp_path, "wb") as out:
+            for digest in heapq.merge(self._iter_persisted(), sorted(self._digests)):
+                out.write(digest)
+        
+        self.close()
+        os.replace(temp_path, self.path)
+        self._digests.clear()
+        self._open()
+        logger.info(f"Saved {self._count} digests to {self.path}")
+    
+    def close(self) -> None:
+        """Unmap the digest file."""
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class BloomFilter(MemorySeenSet):
+    """
+    Seen-set stored as a memory-mapped Bloom filter file.
+    
+    The file size is fixed by the expected capacity and false-positive rate,
+    so memory stays bounded no matter how many runs are recorded. A false
+    positive makes a new task look already seen and drops it.
+    
+    Digests added in this run are kept in memory and only set in the file
+    by save(), so a run that fails can discard() them and leave the filter
+    as it was.
+    """
+    
+    MAGIC = b"DABLOOM1"
+    _HEADER = struct.Struct("<8sQIQ")
+    
+    def __init__(self, path: str, capacity: int = BLOOM_DEFAULT_CAPACITY,
+                 false_positive_rate: float = BLOOM_FALSE_POSITIVE_RATE):
+        super().__init__()
+        if not 0 < false_positive_rate < 1:
+            raise ValueError("false_positive_rate must be between 0 and 1")
+        
+        self.path = path
+        self.capacity = capacity
+        self.false_positive_rate = false_positive_rate
+        
+        if os.path.exists(self.path):
+            with open(self.path, "rb") as f:
+                header = f.read(self._HEADER.size)
+            magic, self.num_bits, self.num_hashes, self.count = self._HEADER.unpack(header)
+            if magic != self.MAGIC:
+                raise ValueError(f"Not a Bloom filter file: {self.path}")
+        else:
+            self.num_bits = max(8, int(-capacity * math.log(false_positive_rate) / math.log(2) ** 2))
+            self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+            self.count = 0
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with open(self.path, "wb") as f:
+                f.write(self._HEADER.pack(self.MAGIC, self.num_bits, self.num_hashes, 0))
+                f.truncate(self._HEADER.size + (self.num_bits + 7) // 8)
+        
+        self._file = open(self.path, "r+b")
+        self._mm = mmap.mmap(self._file.fileno(), 0)
+    
+    def _positions(self, digest: bytes) -> Iterator[int]:
+        """Derive bit positions from a digest by double hashing."""
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:16], "little") | 1
+        for i in range(self.num_hashes):
+            yield (first + i * second) % self.num_bits
+    
+    def __contains__(self, digest: bytes) -> bool:
+        if digest in self._digests:
+            return True
+        offset = self._HEADER.size
+        mm = self._mm
+        return all(mm[offset + (bit >> 3)] & (1 << (bit & 7)) for bit in self._positions(digest))
+    
+    def __len__(self) -> int:
+        return self.count + len(self._digests)
+    
+    def save(self) -> None:
+        """Set the bits for the new digests, write the element count and flush."""
+        if self._mm is None or not self._digests:
+            return
+        offset = self._HEADER.size
+        mm = self._mm
+        for digest in self._digests:
+            for bit in self._positions(digest):
+                mm[offset + (bit >> 3)] |= 1 << (bit & 7)
+        if self.count <= self.capacity < self.count + len(self._digests):
+            logger.warning(f"Bloom filter {self.path} exceeded its capacity of {self.capacity}; "
+                           f"the false-positive rate will rise")
+        self.count += len(self._digests)
+        self._digests.clear()
+        mm[:self._HEADER.size] = self._HEADER.pack(
+            self.MAGIC, self.num_bits, self.num_hashes, self.count)
+        mm.flush()
+    
+    def close(self) -> None:
+        """Save and unmap the filter."""
+        if self._mm is not None:
+            self.save()
+            self._mm.close()
+            self._mm = None
+            self._file.close()
+
+
+def open_seen_store(path: Optional[str], capacity: int = BLOOM_DEFAULT_CAPACITY,
+                    false_positive_rate: float = BLOOM_FALSE_POSITIVE_RATE) -> MemorySeenSet:
+    """
+    Open a seen-set by path: ``.bloom`` files are Bloom filters, any other
+    path is a sorted digest file, and None gives an in-memory set.
+    """
+    if path is None:
+        return MemorySeenSet()
+    if path.endswith(".bloom"):
+        return BloomFilter(path, capacity, false_positive_rate)
+    return DigestFile(path)
+
+
+class Deduplicator:
+    """
+    Inline deduplication stage for streams of ParsedTask objects.
+    
+    Used as a context manager, the seen-set is saved only if the block
+    completes; if it raises, the tasks of this run are discarded.
+    
+    Example:
+        with Deduplicator("original", DigestFile("seen.digests")) as dedup:
+            parser.save_to_csv(dedup.filter(parser.iter_file(path, "original",
+                                                             deduplicate=False)),
+                               output_path)
+    """
+    
+    def __init__(self, format_type: str = "original", store: Optional[MemorySeenSet] = None,
+                 digest_size: int = DEDUP_DIGEST_SIZE):
+        self.format_type = format_type
+        self.store = store if store is not None else MemorySeenSet()
+        self.digest_size = digest_size
+        self.removed = 0
+    
+    def is_new(self, task: ParsedTask) -> bool:
+        """Check a task and record it; returns False for tasks already seen."""
+        digest = task_digest(task, self.format_type, self.digest_size)
+        if digest in self.store:
+            self.removed += 1
+            return False
+        self.store.add(digest)
+        return True
+    
+    def filter(self, tasks: Iterable[ParsedTask]) -> Iterator[ParsedTask]:
+        """Yield only the tasks that have not been seen before."""
+        is_new = self.is_new
+        for task in tasks:
+            if is_new(task):
+                yield task
+    
+    def close(self) -> None:
+        """Persist and close the seen-set."""
+        self.store.save()
+        self.store.close()
+    
+    def discard(self) -> None:
+        """Close the seen-set without recording the tasks of this run."""
+        self.store.discard()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        # The tasks of a failed run were not written, so they stay unseen
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
@@ -0,0 +1,248 @@
+"""
+Format Detection Module
+
+Detects the pattern type of an input from a bounded sample of its lines:
+the head of the file plus blocks of lines at random offsets, read through
+mmap so the cost does not grow with the file size. Every pattern type is
+scored by the share of sampled lines it matches, and the most specific type
+that explains the sample wins.
+
+Author: Jonathan Legro
+Date: 2025-08-01
+"""
+
+import bisect
+import mmap
+import os
+import random
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+
+try:
+    from .config import (DETECT_HEAD_LINES, DETECT_MIN_CONFIDENCE, DETECT_SAMPLE_LINES,
+                         DETECT_SAMPLES, DETECT_STREAM_CHARS, GUARD_MAX_LINE_LENGTH)
+    from .prefilter import analyze_pattern
+    from .reader import input_format, open_input
+except ImportError:
+    from config import (DETECT_HEAD_LINES, DETECT_MIN_CONFIDENCE, DETECT_SAMPLE_LINES,
+                        DETECT_SAMPLES, DETECT_STREAM_CHARS, GUARD_MAX_LINE_LENGTH)
+    from prefilter import analyze_pattern
+    from reader import input_format, open_input
+
+# Share of a type's matched lines that another type must also match for the
+# other type to count as a more general pattern
+SUBSUME_OVERLAP = 0.9
+
+Buffer = Union[str, bytes, mmap.mmap]
+
+_NON_SPACE = re.compile(r"\S")
+
+
+@dataclass
+class Detection:
+    """Outcome of format detection."""
+    pattern_type: Optional[str]
+    confidence: float
+    scores: Dict[str, float] = field(default_factory=dict)
+    lines_sampled: int = 0
+    fallback: bool = False
+
+
+def _read_lines(buffer: Buffer, start: int, count: int, max_line_length: int) -> Tuple[List, int]:
+    """Read up to count complete lines from start, skipping overlong ones."""
+    newline = "\n" if isinstance(buffer, str) else b"\n"
+    size = len(buffer)
+    lines = []
+    position = start
+    while len(lines) < count and position < size:
+        end = buffer.find(newline, position, position + max_line_length + 1)
+        if end == -1:
+            if size - position <= max_line_length:
+                lines.append(buffer[position:size])
+                position = size
+                break
+            # Overlong line: skip to its end
+            end = buffer.find(newline, position)
+            position = size if end == -1 else end + 1
+            continue
+        lines.append(buffer[position:end])
+        position = end + 1
+    return lines, position
+
+
+def sample_lines(buffer: Buffer, head_lines: int = DETECT_HEAD_LINES,
+                 samples: int = DETECT_SAMPLES, sample_lines: int = DETECT_SAMPLE_LINES,
+                 seed: int = 0, max_line_length: int = GUARD_MAX_LINE_LENGTH) -> List[str]:
+    """
+    Sample blocks of complete lines from a text, bytes or mmap buffer.
+
+    Args:
+        buffer: Input to sample
+        head_lines: Lines read from the start
+        samples: Number of random offsets read after the head
+        sample_lines: Lines read at each random offset
+        seed: Seed for the random offsets, so detection is repeatable
+        max_line_length: Longer lines are left out of the sample
+
+    Returns:
+        Blocks of sampled lines, each joined with newlines
+    """
+    def decode(lines: List) -> str:
+        if not lines:
+            return ""
+        if isinstance(lines[0], str):
+            return "\n".join(lines)
+        return b"\n".join(lines).decode("utf-8", errors="replace")
+
+    head, head_end = _read_lines(buffer, 0, head_lines, max_line_length)
+    blocks = [decode(head)]
+
+    size = len(buffer)
+    if head_end < size and samples > 0:
+        rng = random.Random(seed)
+        newline = "\n" if isinstance(buffer, str) else b"\n"
+        seen = set()
+        for offset in sorted(rng.randrange(head_end, size) for _ in range(samples)):
+            # Start at the next line boundary so no partial line is scored
+            start = buffer.find(newline, offset) + 1
+            if start == 0 or start >= size or start in seen:
+                continue
+            seen.add(start)
+            lines, _ = _read_lines(buffer, start, sample_lines, max_line_length)
+            blocks.append(decode(lines))
+    return [block for block in blocks if block]
+
+
+def sample_file(file_path: str, **options) -> List[str]:
+    """
+    Sample blocks of lines from a file through mmap.
+
+    Compressed files and files that are not UTF-8 cannot be sampled at byte
+    offsets, so only their first DETECT_STREAM_CHARS decoded characters are
+    sampled instead.
+
+    Args:
+        file_path: File to sample
+        **options: Sampling options passed to sample_lines
+
+    Returns:
+        Blocks of sampled lines
+    """
+    if os.path.getsize(file_path) == 0:
+        return []
+    compression, encoding = input_format(file_path)
+    if not compression and encoding in ("utf-8", "ascii"):
+        with open(file_path, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return sample_lines(mm, **options)
+    with open_input(file_path, max_bytes=None) as f:
+        return sample_lines(f.read(DETECT_STREAM_CHARS), **options)
+
+
+def _matched_lines(matcher, blocks: List[str]) -> Tuple[Set[Tuple[int, int]], int]:
+    """
+    Find the sampled lines where the text of a match of any alternative starts.
+
+    Returns:
+        (set of (block, line) indexes, number of non-blank lines sampled)
+    """
+    matched = set()
+    total = 0
+    for block_index, block in enumerate(blocks):
+        line_starts = [0]
+        position = block.find("\n")
+        while position != -1:
+            line_starts.append(position + 1)
+            position = block.find("\n", position + 1)
+        total += sum(1 for line in block.split("\n") if line.strip())
+
+        for alternative in range(len(matcher.regexes)):
+            for match in matcher.finditer(alternative, block):
+                # Leading whitespace can reach back over blank lines; count
+                # the line where the matched text starts
+                first = _NON_SPACE.search(block, match.start(), match.end())
+                start = first.start() if first else match.start()
+                matched.add((block_index, bisect.bisect_right(line_starts, start) - 1))
+    return matched, total
+
+
+def _required_literal_length(matcher) -> int:
+    """
+    Characters of literal text every match of a type must contain.
+
+    Used to rank types that match the same lines: the one whose patterns
+    require more literal text is the more specific.
+    """
+    lengths = []
+    for regex in matcher.regexes:
+        anchors, _ = analyze_pattern(regex.pattern, regex.flags)
+        lengths.append(sum(len(anchor) for anchor in anchors))
+    return min(lengths, default=0)
+
+
+def detect_pattern_type(blocks: List[str], matchers: Iterable,
+                        min_confidence: float = DETECT_MIN_CONFIDENCE,
+                        fallback: Optional[str] = None) -> Detection:
+    """
+    Pick the pattern type that best explains a sample of lines.
+
+    Each type is scored by the share of non-blank sampled lines where one of
+    its patterns matches. Types scoring below min_confidence are dropped.
+    A type whose matches include nearly all matches of another remaining
+    type is more general than it and is dropped too; when both match the
+    same number of lines, the one requiring less literal text is dropped.
+    The drill pattern accepts almost any line of four words, including
+    original-format rows, so an original-format sample is won by the
+    original type. The winner's confidence is its score minus the
+    runner-up's.
+
+    Args:
+        blocks: Sampled lines, e.g. from sample_file
+        matchers: TaskMatcher of every candidate type
+        min_confidence: Lowest confidence accepted
+        fallback: Type returned when confidence is too low; None raises
+
+    Returns:
+        The detection outcome
+
+    Raises:
+        ValueError: If confidence is below min_confidence and there is no fallback
+    """
+    matched: Dict[str, Set[Tuple[int, int]]] = {}
+    literals: Dict[str, int] = {}
+    scores: Dict[str, float] = {}
+    total = 0
+    for matcher in matchers:
+        lines, total = _matched_lines(matcher, blocks)
+        matched[matcher.pattern_type] = lines
+        literals[matcher.pattern_type] = _required_literal_length(matcher)
+        scores[matcher.pattern_type] = len(lines) / total if total else 0.0
+
+    def more_general(name: str, other: str) -> bool:
+        if len(matched[other] & matched[name]) < SUBSUME_OVERLAP * len(matched[other]):
+            return False
+        if len(matched[name]) != len(matched[other]):
+            return len(matched[name]) > len(matched[other])
+        return literals[name] < literals[other]
+
+    candidates = [name for name, score in scores.items() if score >= min_confidence and score > 0]
+    specific = [
+        name for name in candidates
+        if not any(other != name and more_general(name, other) for other in candidates)
+    ]
+    ranked = sorted(specific, key=lambda name: scores[name], reverse=True)
+
+    if ranked:
+        runner_up = scores[ranked[1]] if len(ranked) > 1 else 0.0
+        confidence = scores[ranked[0]] - runner_up
+        if confidence >= min_confidence:
+            return Detection(ranked[0], confidence, scores, total)
+    else:
+        confidence = 0.0
+
+    if fallback is not None:
+        return Detection(fallback, confidence, scores, total, fallback=True)
+    summary = ", ".join(f"{name} {score:.0%}" for name, score in scores.items()) or "no patterns"
+    raise ValueError(f"Cannot detect the pattern type from {total} sampled lines "
+                     f"(match rates: {summary})")
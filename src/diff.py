@@ -0,0 +1,367 @@
+"""
+Run Diff Module
+
+Compares two runs, each a CSV snapshot written by an earlier run or a fresh
+parse of an input file, and reports the tasks that were added, removed or
+changed. Tasks are matched on their key field (the task ID, or the drill ID
+for drill output). Both sides are streamed into hash partitions on that key;
+small runs stay in memory, larger ones spill their partitions to temporary
+files, so memory is bounded by one partition rather than by the snapshots.
+Each partition is then compared in a single pass.
+
+Author: Jonathan Legro
+Date: 2025-08-01
+"""
+
+import argparse
+import csv
+import logging
+import marshal
+import os
+import sys
+import tempfile
+import zlib
+from collections import Counter
+from itertools import chain, zip_longest
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, TextIO, Tuple
+
+try:
+    from .config import (AUTO_PATTERN_TYPE, DIFF_MEMORY_ROWS, DIFF_PARTITIONS, OUTPUT_EXTENSION)
+    from .reader import open_input, strip_compression_extension
+    from .task_parser import ParsedTask, TaskMatcher, TaskParser, TaskPatternConfig
+    from .writer import HEADERS, open_output
+except ImportError:
+    from config import (AUTO_PATTERN_TYPE, DIFF_MEMORY_ROWS, DIFF_PARTITIONS, OUTPUT_EXTENSION)
+    from reader import open_input, strip_compression_extension
+    from task_parser import ParsedTask, TaskMatcher, TaskParser, TaskPatternConfig
+    from writer import HEADERS, open_output
+
+
+logger = logging.getLogger(__name__)
+
+FIELDS = TaskMatcher.FIELDS
+
+# Field that identifies a task across runs, per output format
+KEY_FIELDS = {'original': 'task', 'drill': 'step'}
+
+# Rows buffered per partition before they are appended to its spill file
+_SPILL_BATCH = 1000
+
+Row = Tuple[str, ...]
+
+
+class Change(NamedTuple):
+    """A task that differs between the old and the new run."""
+    kind: str  # 'added', 'removed' or 'changed'
+    key: str
+    old: Optional[ParsedTask]
+    new: Optional[ParsedTask]
+    fields: Tuple[str, ...] = ()  # fields that differ, for 'changed'
+
+
+def key_field(format_type: str) -> str:
+    """Return the field tasks of an output format are matched on."""
+    return KEY_FIELDS.get(format_type, KEY_FIELDS['original'])
+
+
+def compared_fields(format_type: str) -> Tuple[str, ...]:
+    """Return the fields compared for changes: every output column but the key."""
+    key = key_field(format_type)
+    columns = ParsedTask.FORMAT_FIELDS.get(format_type, ParsedTask.FORMAT_FIELDS['original'])
+    return tuple(field for field in columns if field != key)
+
+
+def is_snapshot(path: str) -> bool:
+    """Whether a path is a CSV output, possibly compressed, rather than an input file."""
+    return strip_compression_extension(path).lower().endswith(OUTPUT_EXTENSION)
+
+
+def read_snapshot(path: str, format_type: Optional[str] = None) -> Tuple[str, Iterator[ParsedTask]]:
+    """
+    Stream the tasks of a CSV snapshot.
+
+    Snapshots with a header row are read by column name, whatever their
+    format and whether or not they carry part columns. Older snapshots
+    without headers are read by position; their format is inferred from the
+    column count unless given.
+
+    Args:
+        path: CSV file, optionally compressed
+        format_type: Output format of a snapshot without headers
+
+    Returns:
+        (output format, iterator of tasks)
+    """
+    handle = open_input(path, max_bytes=None)
+    reader = csv.reader(handle)
+    first = next(reader, None)
+
+    detected = None
+    columns: Sequence[str] = ()
+    if first is not None:
+        for name, header in HEADERS.items():
+            if first[:len(header)] == header:
+                detected, columns = name, ParsedTask.FORMAT_FIELDS[name]
+                break
+    if detected is None:
+        if format_type is None or format_type == AUTO_PATTERN_TYPE:
+            format_type = 'original' if first is not None and len(first) >= 5 else 'drill'
+        detected = format_type
+        columns = ParsedTask.FORMAT_FIELDS.get(format_type, ParsedTask.FORMAT_FIELDS['original'])
+        rows = reader if first is None else chain([first], reader)
+    else:
+        rows = reader
+
+    def tasks() -> Iterator[ParsedTask]:
+        with handle:
+            for row in rows:
+                if row:
+                    yield ParsedTask(**dict(zip(columns, row)))
+
+    return detected, tasks()
+
+
+def open_run(path: str, pattern_type: str = AUTO_PATTERN_TYPE,
+             parser: Optional[TaskParser] = None) -> Tuple[str, Iterator[ParsedTask]]:
+    """
+    Stream the tasks of one side of a diff.
+
+    Args:
+        path: CSV snapshot, or an input file to parse
+        pattern_type: Pattern type for an input file, or the format of a
+            snapshot without headers; 'auto' detects it
+        parser: Parser for input files
+
+    Returns:
+        (output format, iterator of tasks)
+    """
+    if is_snapshot(path):
+        return read_snapshot(path, pattern_type)
+    parser = parser or TaskParser(logging.WARNING)
+    if pattern_type == AUTO_PATTERN_TYPE:
+        pattern_type = parser.detect_pattern_type(path).pattern_type
+    return pattern_type, parser.iter_file(path, pattern_type)
+
+
+class _Partitions:
+    """
+    Rows of one side of a diff, hash-partitioned on their key.
+
+    Rows stay in memory until more than memory_rows have been added; from
+    then on every partition is appended to its own spill file.
+    """
+
+    def __init__(self, key_index: int, count: int, memory_rows: int, directory: str, name: str):
+        self.key_index = key_index
+        self.count = count
+        self.memory_rows = memory_rows
+        self.directory = directory
+        self.name = name
+        self.rows = 0
+        self._buffers: List[List[Row]] = [[] for _ in range(count)]
+        self._files: Optional[List] = None
+
+    def add(self, tasks: Iterable[ParsedTask]) -> None:
+        """Partition the rows of tasks."""
+        key_index, count, buffers = self.key_index, self.count, self._buffers
+        for task in tasks:
+            row = (task.step, task.task, task.title, task.proponent, task.status, task.verb)
+            # crc32 rather than hash() keeps partitions, and so the report
+            # order, the same from one process to the next
+            index = zlib.crc32(row[key_index].encode("utf-8")) % count
+            buffers[index].append(row)
+            self.rows += 1
+            if self._files is None:
+                if self.rows > self.memory_rows:
+                    self._spill_all()
+            elif len(buffers[index]) >= _SPILL_BATCH:
+                self._spill(index)
+
+    def _spill_all(self) -> None:
+        logger.info(f"Spilling {self.name} rows to {self.count} partitions in {self.directory}")
+        self._files = [open(os.path.join(self.directory, f"{self.name}.{index}"), "wb")
+                       for index in range(self.count)]
+        for index in range(self.count):
+            self._spill(index)
+
+    def _spill(self, index: int) -> None:
+        if self._buffers[index]:
+            marshal.dump(self._buffers[index], self._files[index])
+            self._buffers[index] = []
+
+    @property
+    def spilled(self) -> bool:
+        """Whether the partitions were written to disk."""
+        return self._files is not None
+
+    def finish(self) -> None:
+        """Flush and close the spill files."""
+        if self._files is not None:
+            for index in range(self.count):
+                self._spill(index)
+                self._files[index].close()
+
+    def load(self, index: Optional[int] = None) -> Dict[str, List[Row]]:
+        """Return the rows of one partition, or of all unspilled rows, grouped by key."""
+        groups: Dict[str, List[Row]] = {}
+        if index is None:
+            batches = self._buffers
+        elif self.spilled:
+            batches = _read_spill(os.path.join(self.directory, f"{self.name}.{index}"))
+        else:
+            batches = [self._buffers[index]]
+        key_index = self.key_index
+        for batch in batches:
+            for row in batch:
+                groups.setdefault(row[key_index], []).append(row)
+        return groups
+
+
+def _read_spill(path: str) -> Iterator[List[Row]]:
+    """Read the row batches of a spill file."""
+    with open(path, "rb") as f:
+        while True:
+            try:
+                yield marshal.load(f)
+            except EOFError:
+                return
+
+
+def _compare_key(key: str, old_rows: List[Row], new_rows: List[Row],
+                 compared: Sequence[int]) -> Iterator[Change]:
+    """
+    Compare the rows of one key.
+
+    Identical rows cancel out; the rest are paired in input order as
+    changes, and rows left over on either side were added or removed.
+    """
+    if old_rows == new_rows:
+        return
+    remaining = Counter(new_rows)
+    remaining.subtract(old_rows)
+    old_only = [row for row in old_rows if _take(remaining, row, -1)]
+    new_only = [row for row in new_rows if _take(remaining, row, 1)]
+    for old, new in zip_longest(old_only, new_only):
+        if new is None:
+            yield Change('removed', key, ParsedTask(*old), None)
+        elif old is None:
+            yield Change('added', key, None, ParsedTask(*new))
+        else:
+            fields = tuple(FIELDS[index] for index in compared if old[index] != new[index])
+            yield Change('changed', key, ParsedTask(*old), ParsedTask(*new), fields)
+
+
+def _take(remaining: Counter, row: Row, sign: int) -> bool:
+    """Whether row is unmatched on the side given by sign; consumes one unmatched copy."""
+    if remaining[row] * sign > 0:
+        remaining[row] -= sign
+        return True
+    return False
+
+
+def diff_tasks(old: Iterable[ParsedTask], new: Iterable[ParsedTask],
+               format_type: str = "original", memory_rows: int = DIFF_MEMORY_ROWS,
+               partitions: int = DIFF_PARTITIONS,
+               spill_dir: Optional[str] = None) -> Iterator[Change]:
+    """
+    Find the tasks that were added, removed or changed between two runs.
+
+    Args:
+        old: Tasks of the earlier run
+        new: Tasks of the later run
+        format_type: Output format; decides the key and the compared fields
+        memory_rows: Rows per side held in memory before partitions spill
+            to disk; each partition must also fit in memory when compared
+        partitions: Number of hash partitions used once rows spill
+        spill_dir: Directory for spill files (the system temp directory
+            if None); they are removed when the diff is finished
+
+    Yields:
+        Changes, partition by partition and in key order within each
+        partition; in key order overall when nothing spilled
+    """
+    key_index = FIELDS.index(key_field(format_type))
+    compared = [FIELDS.index(field) for field in compared_fields(format_type)]
+
+    with tempfile.TemporaryDirectory(prefix="diff-", dir=spill_dir) as directory:
+        sides = []
+        for name, tasks in (("old", old), ("new", new)):
+            side = _Partitions(key_index, partitions, memory_rows, directory, name)
+            side.add(tasks)
+            side.finish()
+            sides.append(side)
+        old_side, new_side = sides
+
+        if not (old_side.spilled or new_side.spilled):
+            # Everything fits in memory: one group, so the report is in key order
+            yield from _compare_groups(old_side.load(), new_side.load(), compared)
+            return
+        for index in range(partitions):
+            yield from _compare_groups(old_side.load(index), new_side.load(index), compared)
+
+
+def _compare_groups(old_groups: Dict[str, List[Row]], new_groups: Dict[str, List[Row]],
+                    compared: Sequence[int]) -> Iterator[Change]:
+    """Compare the rows of every key of one partition, in key order."""
+    for key in sorted(old_groups.keys() | new_groups.keys()):
+        yield from _compare_key(key, old_groups.get(key, []), new_groups.get(key, []), compared)
+
+
+def write_report(changes: Iterable[Change], handle: TextIO, format_type: str = "original") -> Counter:
+    """
+    Write changes as CSV: kind, key, changed fields, then old and new columns.
+
+    Returns:
+        Number of changes of each kind
+    """
+    fields = ParsedTask.FORMAT_FIELDS.get(format_type, ParsedTask.FORMAT_FIELDS['original'])
+    columns = HEADERS.get(format_type, HEADERS['original'])
+    writer = csv.writer(handle)
+    writer.writerow(["Change", "Key", "Changed Fields"]
+                    + [f"Old {column}" for column in columns]
+                    + [f"New {column}" for column in columns])
+    empty = [""] * len(fields)
+    counts: Counter = Counter()
+    for change in changes:
+        counts[change.kind] += 1
+        old = [getattr(change.old, field) for field in fields] if change.old else empty
+        new = [getattr(change.new, field) for field in fields] if change.new else empty
+        writer.writerow([change.kind, change.key, " ".join(change.fields)] + old + new)
+    return counts
+
+
+def register_cli(subparsers) -> None:
+    """Register the ``diff`` command with the command-line interface."""
+    command = subparsers.add_parser(
+        "diff", help="Report tasks added, removed or changed between two runs")
+    command.add_argument("old", help="Earlier CSV snapshot, or an input file to parse")
+    command.add_argument("new", help="Later CSV snapshot, or an input file to parse")
+    command.add_argument("-t", "--type", dest="pattern_type", default=AUTO_PATTERN_TYPE,
+                         choices=TaskPatternConfig.get_available_types() + [AUTO_PATTERN_TYPE],
+                         help="Pattern type of input files, or format of snapshots without headers")
+    command.add_argument("-o", "--output",
+                         help="Write the report to this CSV file instead of standard output")
+    command.add_argument("--memory-rows", type=int, default=DIFF_MEMORY_ROWS,
+                         help="Rows held in memory per side before spilling to disk")
+    command.add_argument("--spill-dir", help="Directory for spill files")
+    command.set_defaults(func=run_diff)
+
+
+def run_diff(args: argparse.Namespace) -> int:
+    """Run the ``diff`` command; exits with 1 if the runs differ."""
+    parser = TaskParser(logging.WARNING)
+    old_format, old = open_run(args.old, args.pattern_type, parser)
+    new_format, new = open_run(args.new, args.pattern_type, parser)
+    if old_format != new_format:
+        print(f"Cannot compare {old_format} output with {new_format} output", file=sys.stderr)
+        return 2
+
+    changes = diff_tasks(old, new, new_format, args.memory_rows, spill_dir=args.spill_dir)
+    if args.output:
+        with open_output(args.output) as handle:
+            counts = write_report(changes, handle, new_format)
+    else:
+        counts = write_report(changes, sys.stdout, new_format)
+    print(f"{counts['added']} added, {counts['removed']} removed, {counts['changed']} changed",
+          file=sys.stderr)
+    return 1 if counts else 0
@@ -0,0 +1,134 @@
+"""
+Field Decomposition Module
+
+Breaks the composite proponent and task code fields of a task into typed
+parts: ``07 - Infantry (Collective)`` into proponent code, name and level,
+and ``07-CO-3036`` into school, echelon and number. Each distinct field value
+is decomposed once and kept in a lookup table, so every row carrying the same
+value shares one interned string and one parts object.
+
+Author: Jonathan Legro
+Date: 2025-08-01
+"""
+
+import re
+import sys
+from typing import Callable, Dict, Generic, NamedTuple, Optional, Tuple, TypeVar
+
+try:
+    from .config import FIELD_LOOKUP_MAX_ENTRIES
+except ImportError:
+    from config import FIELD_LOOKUP_MAX_ENTRIES
+
+
+class Proponent(NamedTuple):
+    """Parts of a proponent such as '071 - Infantry (Individual)'."""
+    text: str
+    code: str
+    name: str
+    level: str
+
+
+class TaskCode(NamedTuple):
+    """
+    Parts of a task code such as '07-CO-3036' or '071-410-0010'.
+
+    The middle part is the echelon of a collective task (CO, PLT) and the
+    subject area of an individual task. Codes without dashes, such as drill
+    numbers, only have a number.
+    """
+    text: str
+    school: str
+    echelon: str
+    number: str
+
+
+_PROPONENT = re.compile(r'(?P<code>\d{2,3})\s*-\s*(?P<name>.*?)(?:\s*\((?P<level>[^()]*)\))?')
+
+
+def parse_proponent(text: str) -> Proponent:
+    """Split a proponent into code, name and level; unrecognized text is the name."""
+    match = _PROPONENT.fullmatch(text)
+    if match is None:
+        return Proponent(text, "", text, "")
+    return Proponent(text, match.group('code'), match.group('name'), match.group('level') or "")
+
+
+def parse_task_code(text: str) -> TaskCode:
+    """Split a task code into school, echelon and number."""
+    parts = text.split("-", 2)
+    if len(parts) != 3:
+        return TaskCode(text, "", "", text)
+    return TaskCode(text, *parts)
+
+
+T = TypeVar('T', bound=tuple)
+
+
+class LookupTable(Generic[T]):
+    """
+    Dictionary of decomposed field values keyed by the field text.
+
+    The first lookup of a value decomposes it and interns its text; later
+    lookups return the same parts object. Above max_entries new values are
+    still decomposed but no longer stored, so a column of unique values
+    cannot grow the table without bound.
+    """
+
+    def __init__(self, decompose: Callable[[str], T], max_entries: int = FIELD_LOOKUP_MAX_ENTRIES):
+        """Initialize an empty table around a decompose function."""
+        self.decompose = decompose
+        self.max_entries = max_entries
+        self._entries: Dict[str, T] = {}
+
+    def get(self, text: str) -> T:
+        """Return the parts of a value, decomposing it on first use."""
+        parts = self._entries.get(text)
+        if parts is None:
+            text = sys.intern(text)
+            parts = self.decompose(text)
+            if len(self._entries) < self.max_entries:
+                self._entries[text] = parts
+        return parts
+
+    def intern(self, text: str) -> str:
+        """Return the shared copy of a value's text."""
+        return self.get(text)[0]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        """Drop every stored value."""
+        self._entries.clear()
+
+
+# Shared by every parser in the process
+PROPONENTS: LookupTable[Proponent] = LookupTable(parse_proponent)
+TASK_CODES: LookupTable[TaskCode] = LookupTable(parse_task_code)
+
+# Derived fields: name -> (source field, attribute of its parts)
+PART_FIELDS: Dict[str, Tuple[str, str]] = {
+    'proponent_code': ('proponent', 'code'),
+    'proponent_name': ('proponent', 'name'),
+    'level': ('proponent', 'level'),
+    'school': ('task', 'school'),
+    'echelon': ('task', 'echelon'),
+    'number': ('task', 'number'),
+}
+
+PART_HEADERS = ["Proponent Code", "Proponent Name", "Level", "School", "Echelon", "Number"]
+
+_TABLES = {'proponent': PROPONENTS, 'task': TASK_CODES}
+
+
+def lookup_table(field: str) -> Optional[LookupTable]:
+    """Return the lookup table of a composite field, or None."""
+    return _TABLES.get(field)
+
+
+def part_values(proponent: str, task: str) -> Tuple[str, ...]:
+    """Return the derived field values of a task in PART_FIELDS order."""
+    p = PROPONENTS.get(proponent)
+    t = TASK_CODES.get(task)
+    return (p.code, p.name, p.level, t.school, t.echelon, t.number)
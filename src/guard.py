@@ -0,0 +1,405 @@
+"""
+Match Guard Module
+
+Safe-matching mode for patterns that can backtrack catastrophically. The
+MatchGuard runs a matcher block by block under a time budget. When a block
+exceeds the budget it is retried line by line, and the lines that still do
+are quarantined, as are lines longer than a fixed limit, instead of stalling
+the parse. A static check flags patterns whose quantifiers make such
+backtracking likely.
+
+Author: Jonathan Legro
+Date: 2025-08-01
+"""
+
+import json
+import logging
+import signal
+import string
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    from re import _constants as sre_constants, _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_constants
+    import sre_parse
+
+try:
+    from .config import (GUARD_BLOCK_LINES, GUARD_MAX_LINE_LENGTH, GUARD_TIME_BUDGET,
+                         STREAM_OVERLAP_LINES)
+    from .prefilter import candidate_windows
+except ImportError:
+    from config import (GUARD_BLOCK_LINES, GUARD_MAX_LINE_LENGTH, GUARD_TIME_BUDGET,
+                        STREAM_OVERLAP_LINES)
+    from prefilter import candidate_windows
+
+logger = logging.getLogger(__name__)
+
+_REPEATS = {sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT,
+            getattr(sre_constants, 'POSSESSIVE_REPEAT', sre_constants.MAX_REPEAT)}
+
+# Characters used to decide whether two character sets overlap
+_SAMPLE_CHARS = string.printable + "\u00a0\u00e9"
+
+_CATEGORY_TESTS = {
+    sre_constants.CATEGORY_DIGIT: str.isdecimal,
+    sre_constants.CATEGORY_NOT_DIGIT: lambda c: not c.isdecimal(),
+    sre_constants.CATEGORY_SPACE: str.isspace,
+    sre_constants.CATEGORY_NOT_SPACE: lambda c: not c.isspace(),
+    sre_constants.CATEGORY_WORD: lambda c: c.isalnum() or c == "_",
+    sre_constants.CATEGORY_NOT_WORD: lambda c: not (c.isalnum() or c == "_"),
+}
+
+
+def _char_matches(op, value, char: str, dotall: bool) -> Optional[bool]:
+    """Whether a single-character node matches char, or None if not one."""
+    code = ord(char)
+    if op is sre_constants.LITERAL:
+        return value == code
+    if op is sre_constants.NOT_LITERAL:
+        return value != code
+    if op is sre_constants.ANY:
+        return dotall or char != "\n"
+    if op is sre_constants.IN:
+        negate = False
+        matched = False
+        for item_op, item in value:
+            if item_op is sre_constants.NEGATE:
+                negate = True
+            elif item_op is sre_constants.LITERAL:
+                matched = matched or item == code
+            elif item_op is sre_constants.RANGE:
+                matched = matched or item[0] <= code <= item[1]
+            elif item_op is sre_constants.CATEGORY and item in _CATEGORY_TESTS:
+                matched = matched or _CATEGORY_TESTS[item](char)
+            else:
+                return None
+        return matched != negate
+    return None
+
+
+def _charset(op, value, dotall: bool) -> Optional[frozenset]:
+    """Sample characters a single-character node matches, or None if not one."""
+    chars = set()
+    for char in _SAMPLE_CHARS:
+        matched = _char_matches(op, value, char, dotall)
+        if matched is None:
+            return None
+        if matched:
+            chars.add(char)
+    return frozenset(chars)
+
+
+@dataclass
+class _Atom:
+    """One element of a flattened pattern sequence."""
+    chars: Optional[frozenset]  # None for anything but a single-character node
+    minimum: int
+    unbounded: bool
+    group: Optional[str]
+
+
+def _flatten(items: Sequence, dotall: bool, names: Dict[int, str],
+             group: Optional[str], atoms: List[_Atom], risks: List[str]) -> None:
+    """Flatten a parsed sequence into atoms, recording nested quantifiers."""
+    for op, value in items:
+        if op is sre_constants.SUBPATTERN and not (value[1] or value[2]):
+            _flatten(value[3], dotall, names, names.get(value[0], group), atoms, risks)
+        elif op in _REPEATS:
+            low, high, body = value
+            unbounded = high == sre_constants.MAXREPEAT
+            if len(body) == 1:
+                chars = _charset(body[0][0], body[0][1], dotall)
+            else:
+                chars = None
+            if chars is None:
+                if unbounded and _has_repeat(body):
+                    risks.append(f"nested quantifier ({_describe(group)}): "
+                                 f"backtracking can grow exponentially")
+                atoms.append(_Atom(None, low, False, group))
+            else:
+                atoms.append(_Atom(chars, low, unbounded, group))
+        elif op is sre_constants.AT:
+            continue
+        else:
+            atoms.append(_Atom(_charset(op, value, dotall), 1, False, group))
+
+
+def _has_repeat(items: Sequence) -> bool:
+    """Whether a parsed sequence contains a quantifier that repeats."""
+    for op, value in items:
+        if op in _REPEATS and value[1] > 1:
+            return True
+        if op is sre_constants.SUBPATTERN and _has_repeat(value[3]):
+            return True
+        if op is sre_constants.BRANCH and any(_has_repeat(branch) for branch in value[1]):
+            return True
+    return False
+
+
+def _describe(group: Optional[str]) -> str:
+    """Describe where an atom sits in a pattern."""
+    return f"group '{group}'" if group else "ungrouped"
+
+
+def backtracking_risks(pattern: str, flags: int = 0) -> List[str]:
+    """
+    Flag constructs that make a pattern prone to catastrophic backtracking.
+
+    Two shapes are reported: a quantified group that itself contains a
+    quantifier, such as ``(a+)+``, and two unbounded quantifiers whose
+    character sets overlap with nothing between them that only one can
+    match, such as the ``.+?`` title and proponent of the original
+    patterns, when something after them can still fail. The check is a
+    heuristic: it can miss risky patterns, and flagged ones may be
+    harmless on well-formed input.
+
+    Args:
+        pattern: Regular expression source
+        flags: Flags the pattern is compiled with
+
+    Returns:
+        Human-readable descriptions of each risk, empty if none were found
+    """
+    parsed = sre_parse.parse(pattern, flags)
+    state = getattr(parsed, 'state', None) or getattr(parsed, 'pattern', None)
+    dotall = bool(state.flags & sre_constants.SRE_FLAG_DOTALL)
+    names = {index: name for name, index in state.groupdict.items()}
+
+    risks: List[str] = []
+    atoms: List[_Atom] = []
+    _flatten(parsed, dotall, names, None, atoms, risks)
+
+    for i, first in enumerate(atoms):
+        if not first.unbounded:
+            continue
+        for j in range(i + 1, len(atoms)):
+            atom = atoms[j]
+            if atom.unbounded and atom.chars & first.chars:
+                if any(later.minimum > 0 for later in atoms[j + 1:]):
+                    risks.append(
+                        f"overlapping unbounded quantifiers ({_describe(first.group)}, "
+                        f"{_describe(atom.group)}): backtracking is polynomial in the line "
+                        f"length when the rest of the pattern fails"
+                    )
+                break
+            if atom.minimum == 0:
+                continue
+            if atom.chars is None or not atom.chars & first.chars:
+                break
+    return risks
+
+
+class BudgetExceeded(Exception):
+    """Raised inside a guarded block when its time budget runs out."""
+
+
+@dataclass
+class QuarantinedLine:
+    """A line that was skipped by the match guard."""
+    pattern_type: str
+    alternative: int
+    offset: int
+    reason: str
+    line: str
+
+
+class MatchGuard:
+    """
+    Run pattern matching under a time budget, quarantining what exceeds it.
+
+    Matching runs block by block over whole lines. Each block is scanned
+    under a time budget, enforced with SIGALRM. A block that exceeds it is
+    rescanned line by line with the same budget, and lines that still exceed
+    it are quarantined. Lines longer than max_line_length are quarantined
+    without being matched at all, which bounds the work per line even where
+    the budget cannot be enforced (off the main thread or without SIGALRM).
+
+    Outside quarantined lines the matches equal TaskMatcher.finditer, except
+    that unanchored patterns assume a match spans at most lookahead_lines
+    line breaks, as parse_stream does, and that a line which is only slow
+    because the lines after it are is matched on its own.
+    """
+
+    def __init__(self, time_budget: Optional[float] = GUARD_TIME_BUDGET,
+                 max_line_length: Optional[int] = GUARD_MAX_LINE_LENGTH,
+                 block_lines: int = GUARD_BLOCK_LINES,
+                 lookahead_lines: int = STREAM_OVERLAP_LINES,
+                 quarantine_path: Optional[str] = None):
+        """
+        Initialize the guard.
+
+        Args:
+            time_budget: Seconds a block or line may spend matching, or None
+            max_line_length: Longest line that is matched at all, or None
+            block_lines: Number of lines scanned under one budget
+            lookahead_lines: Line breaks a match of an unanchored pattern may span
+            quarantine_path: File that quarantined lines are appended to as
+                JSON lines, if any
+        """
+        self.time_budget = time_budget
+        self.max_line_length = max_line_length
+        self.block_lines = block_lines
+        self.lookahead_lines = lookahead_lines
+        self.quarantine_path = quarantine_path
+        self.quarantined: List[QuarantinedLine] = []
+        self.timeouts = 0
+        self._armed = False
+
+    @property
+    def can_interrupt(self) -> bool:
+        """Whether the time budget can interrupt matching in this thread."""
+        return (self.time_budget is not None and hasattr(signal, "setitimer")
+                and threading.current_thread() is threading.main_thread())
+
+    def _on_alarm(self, signum, frame) -> None:
+        """Abort the running block if the budget is still armed."""
+        if self._armed:
+            self._armed = False
+            raise BudgetExceeded()
+
+    def _run(self, regex, text: str, start: int, stop: int, end: int,
+             resume: int, interrupt: bool) -> Tuple[List, int]:
+        """
+        Collect the matches starting in [start, stop) under the time budget.
+
+        Returns:
+            (matches, position scanning resumes from)
+
+        Raises:
+            BudgetExceeded: If the block runs out of time
+        """
+        found = []
+        started = time.perf_counter()
+        if interrupt:
+            self._armed = True
+            signal.setitimer(signal.ITIMER_REAL, self.time_budget)
+        try:
+            for match in regex.finditer(text, max(start, resume), end):
+                if match.start() >= stop:
+                    break
+                resume = match.end()
+                found.append(match)
+        finally:
+            if interrupt:
+                self._armed = False
+                signal.setitimer(signal.ITIMER_REAL, 0)
+        if (not interrupt and self.time_budget is not None
+                and time.perf_counter() - started > self.time_budget):
+            logger.warning(f"Matching lines {start}-{stop} took longer than "
+                           f"{self.time_budget}s but could not be interrupted")
+        return found, resume
+
+    def _quarantine(self, matcher, alternative: int, text: str,
+                    start: int, stop: int, reason: str) -> None:
+        """Record a skipped line and append it to the quarantine file."""
+        record = QuarantinedLine(matcher.pattern_type, alternative, start, reason,
+                                 text[start:stop].rstrip("\n"))
+        self.quarantined.append(record)
+        logger.warning(f"Quarantined line at offset {start} ({reason}) "
+                       f"for {matcher.pattern_type} pattern {alternative}")
+        if self.quarantine_path:
+            with open(self.quarantine_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(asdict(record)) + "\n")
+
+    def finditer(self, matcher, alternative: int, text: str, pos: int = 0,
+                 endpos: Optional[int] = None) -> Iterator:
+        """
+        Find the matches of one matcher alternative under the guard.
+
+        Args:
+            matcher: TaskMatcher to run
+            alternative: Index of the pattern alternative
+            text: Text to scan
+            pos: Start of the scanned part of text
+            endpos: End of the scanned part of text
+
+        Yields:
+            Matches in text order, skipping quarantined lines
+        """
+        regex = matcher.regexes[alternative]
+        if endpos is None:
+            endpos = len(text)
+        prefilter = matcher.prefilters[alternative]
+        if prefilter is not None:
+            anchors, span = prefilter
+            regions = [(start, stop) for start, stop, _ in
+                       candidate_windows(text, anchors, span, pos, endpos)]
+        else:
+            span = self.lookahead_lines
+            regions = [(pos, endpos)]
+
+        interrupt = self.can_interrupt
+        previous = signal.signal(signal.SIGALRM, self._on_alarm) if interrupt else None
+        try:
+            resume = pos
+            for region_start, region_stop in regions:
+                for lines in self._blocks(matcher, alternative, text, region_start, region_stop):
+                    found, resume = self._scan_block(regex, matcher, alternative, text, lines,
+                                                     span, endpos, resume, interrupt)
+                    yield from found
+        finally:
+            if interrupt:
+                signal.signal(signal.SIGALRM, previous)
+
+    def _blocks(self, matcher, alternative: int, text: str,
+                start: int, stop: int) -> Iterator[List[Tuple[int, int]]]:
+        """Group the lines of [start, stop) into blocks, quarantining long lines."""
+        block: List[Tuple[int, int]] = []
+        line_start = start
+        while line_start < stop:
+            line_end = text.find("\n", line_start, stop) + 1 or stop
+            if self.max_line_length is not None and line_end - line_start > self.max_line_length:
+                if block:
+                    yield block
+                    block = []
+                self._quarantine(matcher, alternative, text, line_start, line_end, "line too long")
+            else:
+                block.append((line_start, line_end))
+                if len(block) >= self.block_lines:
+                    yield block
+                    block = []
+            line_start = line_end
+        if block:
+            yield block
+
+    def _scan_block(self, regex, matcher, alternative: int, text: str,
+                    lines: List[Tuple[int, int]], span: int, endpos: int,
+                    resume: int, interrupt: bool) -> Tuple[List, int]:
+        """Scan a block, falling back to line by line when it times out."""
+        def lookahead(position: int) -> int:
+            for _ in range(span):
+                if position >= endpos:
+                    break
+                position = text.find("\n", position, endpos) + 1 or endpos
+            return position
+
+        start, stop = lines[0][0], lines[-1][1]
+        try:
+            return self._run(regex, text, start, stop, lookahead(stop), resume, interrupt)
+        except BudgetExceeded:
+            self.timeouts += 1
+
+        found = []
+        for line_start, line_end in lines:
+            try:
+                matches, resume = self._run(regex, text, line_start, line_end,
+                                            lookahead(line_end), resume, interrupt)
+            except BudgetExceeded:
+                self.timeouts += 1
+                try:
+                    # The time may have gone into searching the lines after
+                    # this one for a next match; retry the line on its own
+                    matches, resume = self._run(regex, text, line_start, line_end,
+                                                line_end, resume, interrupt)
+                except BudgetExceeded:
+                    self.timeouts += 1
+                    resume = max(resume, line_end)
+                    self._quarantine(matcher, alternative, text, line_start, line_end,
+                                     "time budget exceeded")
+                    continue
+            found.extend(matches)
+        return found, resume
@@ -0,0 +1,278 @@
+"""
+Incremental Parsing Module
+
+Tail mode for append-only input files. A checkpoint per input records how
+far the file has been parsed, so each run only reads and parses the bytes
+appended since the last one and appends the new rows to the existing CSV.
+Truncated, rotated or rewritten files fall back to a full re-parse.
+Inputs that the input reader would transform (compressed, not UTF-8, or
+with carriage returns) cannot be tailed by byte offset and are re-parsed
+in full with parse_file on every run.
+
+Author: Jonathan Legro
+Date: 2025-08-01
+"""
+
+import argparse
+import codecs
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+try:
+    from .config import CHECKPOINT_DIR, ENCODING_SAMPLE_BYTES, STREAM_OVERLAP_LINES
+    from .dedup import Deduplicator, DigestFile
+    from .reader import detect_compression, detect_encoding
+    from .task_parser import TaskParser, ParsedTask, TaskPatternConfig
+except ImportError:
+    from config import CHECKPOINT_DIR, ENCODING_SAMPLE_BYTES, STREAM_OVERLAP_LINES
+    from dedup import Deduplicator, DigestFile
+    from reader import detect_compression, detect_encoding
+    from task_parser import TaskParser, ParsedTask, TaskPatternConfig
+
+
+# Bytes before the checkpoint offset that must be unchanged for a tail parse
+ANCHOR_BYTES = 4096
+
+
+def _anchor_hash(file_path: str, offset: int) -> str:
+    """Hash the bytes just before offset, used to detect rewritten files."""
+    start = max(0, offset - ANCHOR_BYTES)
+    with open(file_path, "rb") as f:
+        f.seek(start)
+        data = f.read(offset - start)
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def _reader_transform(file_path: str) -> Optional[str]:
+    """Say how the input reader would transform a file, or None for plain UTF-8."""
+    compression = detect_compression(file_path)
+    if compression:
+        return f"{compression} input"
+    with open(file_path, "rb") as f:
+        encoding = detect_encoding(f.read(ENCODING_SAMPLE_BYTES))
+    if encoding not in ("utf-8", "utf-8-sig"):
+        return f"{encoding} input"
+    return None
+
+
+class IncrementalParser:
+    """
+    Parses only the new tail of append-only input files.
+    
+    Each input gets a JSON checkpoint (byte offset, per-pattern resume
+    offsets, inode, size and a hash of the bytes before the offset) and a
+    digest file of the rows already written, so rows are never emitted
+    twice. Only complete lines are parsed; a final line without a trailing
+    newline is picked up once it has been terminated. The last
+    ``overlap_lines`` lines stay behind the checkpoint so records wrapped
+    across lines can still be completed by later appends; blank lines do
+    not count toward them for patterns that can cross any number of them.
+    Records starting in those lines are written by a later run, once enough
+    lines follow them to know they are complete.
+    
+    Only UTF-8 files with LF line endings are tailed; a UTF-8 byte order
+    mark is skipped. Any other input is parsed in full with parse_file on
+    every run, so its CSV always matches parse_file.
+    """
+    
+    def __init__(self, parser: Optional[TaskParser] = None,
+                 checkpoint_dir: Union[str, Path] = CHECKPOINT_DIR,
+                 overlap_lines: int = STREAM_OVERLAP_LINES):
+        """Initialize the incremental parser."""
+        self.parser = parser or TaskParser()
+        self.checkpoint_dir = Path(checkpoint_dir)
+        self.overlap_lines = overlap_lines
+    
+    def _paths(self, input_path: str):
+        """Get the checkpoint and digest file paths for an input."""
+        name = hashlib.sha1(os.path.abspath(input_path).encode("utf-8")).hexdigest()
+        return self.checkpoint_dir / f"{name}.json", self.checkpoint_dir / f"{name}.digests"
+    
+    def load_checkpoint(self, input_path: str) -> Optional[Dict[str, Any]]:
+        """Load the checkpoint for an input, or None if there is none."""
+        checkpoint_path, _ = self._paths(input_path)
+        try:
+            with open(checkpoint_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+    
+    def _save_checkpoint(self, input_path: str, checkpoint: Dict[str, Any]) -> None:
+        """Write a checkpoint atomically."""
+        checkpoint_path, _ = self._paths(input_path)
+        temp_path = checkpoint_path.with_suffix(".tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(checkpoint, f)
+        os.replace(temp_path, checkpoint_path)
+    
+    def needs_full_parse(self, input_path: str, output_path: str, pattern_type: str,
+                         checkpoint: Optional[Dict[str, Any]]) -> Optional[str]:
+        """
+        Decide whether the tail can be parsed from the checkpoint.
+        
+        Returns:
+            The reason a full re-parse is needed, or None
+        """
+        if checkpoint is None:
+            return "no checkpoint"
+        if not os.path.exists(output_path):
+            return "output missing"
+        
+        matcher = TaskPatternConfig.get_matcher(pattern_type)
+        if (checkpoint["output"] != os.path.abspath(output_path)
+                or checkpoint["pattern_type"] != pattern_type
+                or checkpoint["fingerprint"] != matcher.fingerprint):
+            return "settings changed"
+        
+        stat = os.stat(input_path)
+        if stat.st_ino != checkpoint["inode"] or stat.st_dev != checkpoint["device"]:
+            return "file rotated"
+        if stat.st_size < checkpoint["size"]:
+            return "file truncated"
+        if _anchor_hash(input_path, checkpoint["offset"]) != checkpoint["anchor_hash"]:
+            return "file rewritten"
+        return None
+    
+    def update(self, input_path: str, output_path: str, pattern_type: str) -> List[ParsedTask]:
+        """
+        Parse the new tail of a file and append the new rows to its CSV.
+        
+        Args:
+            input_path: Append-only input text file
+            output_path: CSV file the rows are appended to
+            pattern_type: Type of patterns to use
+            
+        Returns:
+            The new, previously unseen tasks written in this run, or every
+            task for inputs that are parsed in full
+            
+        Raises:
+            FileNotFoundError: If the input doesn't exist
+            ValueError: If pattern_type is not supported
+        """
+        if not os.path.isfile(input_path):
+            raise FileNotFoundError(f"File not found: {input_path}")
+        if pattern_type not in TaskPatternConfig.get_available_types():
+            raise ValueError(f"Unsupported pattern type: {pattern_type}")
+        
+        self.checkpoint_dir.mkdir(parents=True, exist_ok=True)
+        logger = self.parser.logger
+        matcher = TaskPatternConfig.get_matcher(pattern_type)
+        _, digests_path = self._paths(input_path)
+        
+        checkpoint = self.load_checkpoint(input_path)
+        reason = self.needs_full_parse(input_path, output_path, pattern_type, checkpoint)
+        if reason is None:
+            offset = checkpoint["offset"]
+            resume = checkpoint["resume"]
+        else:
+            logger.info(f"Full parse of {input_path}: {reason}")
+            offset = 0
+            resume = [0] * len(matcher.regexes)
+            if digests_path.exists():
+                digests_path.unlink()
+        
+        transform = _reader_transform(input_path)
+        if transform is not None:
+            return self._parse_whole(input_path, output_path, pattern_type, transform)
+        
+        stat = os.stat(input_path)
+        with open(input_path, "rb") as f:
+            f.seek(offset)
+            data = f.read(stat.st_size - offset)
+        if offset == 0 and data.startswith(codecs.BOM_UTF8):
+            offset = len(codecs.BOM_UTF8)
+            data = data[offset:]
+            resume = [max(position, offset) for position in resume]
+        
+        # Only complete lines are parsed
+        complete = data[:data.rfind(b"\n") + 1]
+        if b"\r" in complete:
+            return self._parse_whole(input_path, output_path, pattern_type, "carriage returns")
+        try:
+            text = complete.decode("utf-8")
+        except UnicodeDecodeError:
+            return self._parse_whole(input_path, output_path, pattern_type, "not UTF-8")
+        
+        # As in parse_stream, unbounded patterns count only lines with text
+        span = matcher.line_span
+        overlap_lines = self.overlap_lines if span is None else max(self.overlap_lines, span)
+        overlap_start = len(text)
+        carried = 0
+        while carried < overlap_lines and overlap_start > 0:
+            line_start = text.rfind("\n", 0, overlap_start - 1) + 1
+            if span is not None or not text[line_start:overlap_start].isspace():
+                carried += 1
+            overlap_start = line_start
+        
+        tasks = []
+        new_resume = []
+        for alternative in range(len(matcher.regexes)):
+            position = len(data[:resume[alternative] - offset].decode("utf-8"))
+            for match in matcher.finditer(alternative, text, position):
+                # As in parse_stream, a match in the overlap may still grow
+                # with the next append, so it is left for a later run
+                if match.start() >= overlap_start:
+                    break
+                tasks.append(matcher.build_task(alternative, match))
+                position = match.end()
+            new_resume.append(offset + len(text[:max(position, overlap_start)].encode("utf-8")))
+        
+        # The digests are saved only once the rows are appended
+        with Deduplicator(pattern_type, DigestFile(str(digests_path))) as deduplicator:
+            new_tasks = list(deduplicator.filter(tasks))
+            self.parser.save_to_csv(new_tasks, output_path, pattern_type, append=reason is None)
+        
+        new_offset = offset + len(text[:overlap_start].encode("utf-8"))
+        self._save_checkpoint(input_path, {
+            "input": os.path.abspath(input_path),
+            "output": os.path.abspath(output_path),
+            "pattern_type": pattern_type,
+            "fingerprint": matcher.fingerprint,
+            "offset": new_offset,
+            "resume": new_resume,
+            "inode": stat.st_ino,
+            "device": stat.st_dev,
+            "size": stat.st_size,
+            "anchor_hash": _anchor_hash(input_path, new_offset),
+        })
+        
+        logger.info(f"Parsed {len(complete)} new bytes of {input_path}, "
+                    f"appended {len(new_tasks)} tasks")
+        return new_tasks
+    
+    def _parse_whole(self, input_path: str, output_path: str, pattern_type: str,
+                     reason: str) -> List[ParsedTask]:
+        """Parse an input that cannot be tailed with parse_file and rewrite its CSV."""
+        self.parser.logger.info(f"Full parse of {input_path} through the input reader: {reason}")
+        # Without a checkpoint, the next run parses the whole file again
+        for path in self._paths(input_path):
+            if path.exists():
+                path.unlink()
+        tasks = self.parser.parse_file(input_path, pattern_type)
+        self.parser.save_to_csv(tasks, output_path, pattern_type)
+        return tasks
+
+
+def register_cli(subparsers) -> None:
+    """Register the ``tail`` command with the command-line interface."""
+    command = subparsers.add_parser("tail", help="Parse only what was appended to a file since the last run")
+    command.add_argument("input", help="Append-only input text file")
+    command.add_argument("output", help="CSV file to append new rows to")
+    command.add_argument("-t", "--type", dest="pattern_type", default="original",
+                         choices=TaskPatternConfig.get_available_types(),
+                         help="Pattern type to use")
+    command.add_argument("--checkpoint-dir", default=str(CHECKPOINT_DIR),
+                         help="Directory holding the per-input checkpoints")
+    command.set_defaults(func=run_tail)
+
+
+def run_tail(args: argparse.Namespace) -> int:
+    """Run the ``tail`` command."""
+    incremental = IncrementalParser(checkpoint_dir=args.checkpoint_dir)
+    new_tasks = incremental.update(args.input, args.output, args.pattern_type)
+    print(f"Appended {len(new_tasks)} new tasks to '{args.output}'")
+    return 0
@@ -0,0 +1,283 @@
+"""
+Parse Metrics Module
+
+Per-stage instrumentation for TaskParser. A ParseStats records wall time,
+bytes and row counts for each stage of a parse (read, the match pass of each
+pattern alternative, field population, deduplication and CSV write) and can
+be rendered as a dict or as Prometheus text exposition format. The capture()
+context manager adds optional cProfile and tracemalloc data on top.
+
+Author: Jonathan Legro
+Date: 2025-08-01
+"""
+
+import cProfile
+import io
+import pstats
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+class StageStats:
+    """Accumulated measurements of one parse stage."""
+
+    __slots__ = ('name', 'calls', 'seconds', 'bytes', 'rows')
+
+    def __init__(self, name: str):
+        """Initialize an empty stage record."""
+        self.name = name
+        self.calls = 0
+        self.seconds = 0.0
+        self.bytes = 0
+        self.rows = 0
+
+    def to_dict(self) -> Dict[str, float]:
+        """Return the measurements as a plain dict."""
+        return {'calls': self.calls, 'seconds': self.seconds,
+                'bytes': self.bytes, 'rows': self.rows}
+
+    def __repr__(self) -> str:
+        """Return a compact summary of the stage."""
+        return (f"StageStats({self.name!r}, calls={self.calls}, "
+                f"seconds={self.seconds:.6f}, bytes={self.bytes}, rows={self.rows})")
+
+
+class PatternStats:
+    """Accumulated match pass measurements of one pattern alternative."""
+
+    __slots__ = ('pattern_type', 'alternative', 'pattern', 'seconds', 'matches')
+
+    def __init__(self, pattern_type: str, alternative: int, pattern: str):
+        """Initialize an empty pattern record."""
+        self.pattern_type = pattern_type
+        self.alternative = alternative
+        self.pattern = pattern
+        self.seconds = 0.0
+        self.matches = 0
+
+    def to_dict(self) -> Dict[str, object]:
+        """Return the measurements as a plain dict."""
+        return {'pattern_type': self.pattern_type, 'alternative': self.alternative,
+                'pattern': self.pattern, 'seconds': self.seconds, 'matches': self.matches}
+
+
+class ParseStats:
+    """
+    Recorder for per-stage parse measurements.
+
+    TaskParser attaches a fresh ParseStats to every result it returns, and
+    also forwards every measurement to the recorder passed as its ``metrics``
+    argument, so one long-lived ParseStats accumulates totals across calls.
+    Any object with a merge(ParseStats) method can be passed instead to
+    route measurements elsewhere.
+    """
+
+    def __init__(self):
+        """Initialize an empty recorder."""
+        self.stages: Dict[str, StageStats] = {}
+        self.patterns: Dict[Tuple[str, int], PatternStats] = {}
+        # Lines skipped by a MatchGuard
+        self.quarantined = 0
+
+    @contextmanager
+    def stage(self, name: str, nbytes: int = 0) -> Iterator[StageStats]:
+        """
+        Time a block of work as one call of a stage.
+
+        Args:
+            name: Stage name, e.g. 'read' or 'dedup'
+            nbytes: Number of bytes the stage processes
+
+        Yields:
+            The StageStats of the stage; set ``rows`` on it inside the block
+            to count rows, e.g. ``record.rows += len(tasks)``
+        """
+        record = self.stages.get(name)
+        if record is None:
+            record = self.stages[name] = StageStats(name)
+        started = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record.seconds += time.perf_counter() - started
+            record.calls += 1
+            record.bytes += nbytes
+
+    def record_matches(self, pattern_type: str, alternative: int, pattern: str,
+                       matches: int, seconds: float) -> None:
+        """Add the result of one match pass of a pattern alternative."""
+        key = (pattern_type, alternative)
+        record = self.patterns.get(key)
+        if record is None:
+            record = self.patterns[key] = PatternStats(pattern_type, alternative, pattern)
+        record.matches += matches
+        record.seconds += seconds
+
+    def merge(self, other: 'ParseStats') -> None:
+        """Add every measurement of another recorder to this one."""
+        for name, source in other.stages.items():
+            record = self.stages.get(name)
+            if record is None:
+                record = self.stages[name] = StageStats(name)
+            record.calls += source.calls
+            record.seconds += source.seconds
+            record.bytes += source.bytes
+            record.rows += source.rows
+        for source in other.patterns.values():
+            self.record_matches(source.pattern_type, source.alternative, source.pattern,
+                                source.matches, source.seconds)
+        self.quarantined += other.quarantined
+
+    @property
+    def total_seconds(self) -> float:
+        """Wall time summed over all stages."""
+        return sum(record.seconds for record in self.stages.values())
+
+    def to_dict(self) -> Dict[str, object]:
+        """Return every measurement as plain, JSON-serializable data."""
+        return {
+            'stages': {name: record.to_dict() for name, record in self.stages.items()},
+            'patterns': [record.to_dict() for record in self.patterns.values()],
+            'quarantined': self.quarantined,
+        }
+
+    def to_prometheus(self, prefix: str = "task_parser",
+                      labels: Optional[Dict[str, str]] = None) -> str:
+        """
+        Render the measurements in Prometheus text exposition format.
+
+        Args:
+            prefix: Metric name prefix
+            labels: Extra labels added to every sample
+
+        Returns:
+            The exposition text, ending with a newline
+        """
+        def label_text(**extra: object) -> str:
+            pairs = dict(labels or {}, **{key: str(value) for key, value in extra.items()})
+            if not pairs:
+                return ""
+            escaped = (f'{key}="{_escape_label(value)}"' for key, value in pairs.items())
+            return "{" + ",".join(escaped) + "}"
+
+        lines: List[str] = []
+
+        def family(name: str, help_text: str, samples: List[Tuple[str, float]]) -> None:
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} counter")
+            for label, value in samples:
+                lines.append(f"{prefix}_{name}{label} {value:g}")
+
+        stages = list(self.stages.values())
+        family("stage_calls_total", "Number of times each parse stage ran.",
+               [(label_text(stage=s.name), s.calls) for s in stages])
+        family("stage_seconds_total", "Wall time spent in each parse stage.",
+               [(label_text(stage=s.name), s.seconds) for s in stages])
+        family("stage_bytes_total", "Bytes processed by each parse stage.",
+               [(label_text(stage=s.name), s.bytes) for s in stages])
+        family("stage_rows_total", "Rows produced by each parse stage.",
+               [(label_text(stage=s.name), s.rows) for s in stages])
+
+        patterns = list(self.patterns.values())
+        family("pattern_matches_total", "Matches found by each pattern alternative.",
+               [(label_text(type=p.pattern_type, alternative=p.alternative), p.matches)
+                for p in patterns])
+        family("pattern_seconds_total", "Match pass wall time of each pattern alternative.",
+               [(label_text(type=p.pattern_type, alternative=p.alternative), p.seconds)
+                for p in patterns])
+        family("quarantined_lines_total", "Lines skipped by the match guard.",
+               [(label_text(), self.quarantined)])
+        return "\n".join(lines) + "\n"
+
+    def __repr__(self) -> str:
+        """Return a compact summary of the recorder."""
+        return f"ParseStats(stages={list(self.stages)}, seconds={self.total_seconds:.6f})"
+
+
+def _escape_label(value: str) -> str:
+    """Escape a Prometheus label value."""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class TaskList(list):
+    """
+    List of ParsedTask objects carrying the ParseStats of the call that built
+    it, and the pattern type the tasks were parsed with if known.
+    """
+
+    def __init__(self, tasks=(), stats: Optional[ParseStats] = None,
+                 pattern_type: Optional[str] = None):
+        """Initialize the list from tasks, attaching stats and pattern_type."""
+        super().__init__(tasks)
+        self.stats = stats if stats is not None else ParseStats()
+        self.pattern_type = pattern_type
+
+
+class Capture:
+    """Profiling data collected by capture()."""
+
+    def __init__(self):
+        """Initialize an empty capture."""
+        self.profile: Optional[cProfile.Profile] = None
+        self.peak_memory: Optional[int] = None
+        self.memory_snapshot: Optional[tracemalloc.Snapshot] = None
+
+    def profile_report(self, sort: str = "cumulative", limit: int = 25) -> str:
+        """Return the cProfile data as a pstats text report."""
+        if self.profile is None:
+            return ""
+        output = io.StringIO()
+        pstats.Stats(self.profile, stream=output).sort_stats(sort).print_stats(limit)
+        return output.getvalue()
+
+    def top_allocations(self, limit: int = 10) -> List[str]:
+        """Return the largest allocation sites by line, largest first."""
+        if self.memory_snapshot is None:
+            return []
+        return [str(stat) for stat in self.memory_snapshot.statistics('lineno')[:limit]]
+
+
+@contextmanager
+def capture(cpu: bool = True, memory: bool = False) -> Iterator[Capture]:
+    """
+    Collect cProfile and/or tracemalloc data for a block of work.
+
+    Both are expensive, so they are meant for one-off investigations rather
+    than always-on production metrics; use ParseStats for those.
+
+    Args:
+        cpu: Run cProfile over the block
+        memory: Trace allocations with tracemalloc over the block
+
+    Yields:
+        A Capture that is filled in when the block exits
+    """
+    result = Capture()
+    profiler = cProfile.Profile() if cpu else None
+    started_tracing = memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    elif memory:
+        if hasattr(tracemalloc, "reset_peak"):
+            tracemalloc.reset_peak()
+        else:
+            # Python 3.8 has no reset_peak; restarting clears the peak
+            # along with the traces recorded so far
+            frames = tracemalloc.get_traceback_limit()
+            tracemalloc.stop()
+            tracemalloc.start(frames)
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield result
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            result.profile = profiler
+        if memory:
+            result.peak_memory = tracemalloc.get_traced_memory()[1]
+            result.memory_snapshot = tracemalloc.take_snapshot()
+            if started_tracing:
+                tracemalloc.stop()
@@ -0,0 +1,390 @@
+"""
+Near-Duplicate Detection Module
+
+Finds tasks that are the same apart from formatting: whitespace,
+punctuation, case, a step number left in front of a field, or a title
+worded slightly differently. Tasks whose canonical keys are equal are
+merged directly. Titles that still differ, on tasks whose other fields are
+canonically equal, are compared with MinHash signatures and
+locality-sensitive hashing, so only tasks that share a band of their
+signature are ever compared, and each candidate pair is confirmed on the
+exact Jaccard similarity of the titles' character shingles. Buckets are
+capped in size, so each task is compared with a bounded number of others
+and the stage runs in linear time however narrow the vocabulary of titles.
+
+Author: Jonathan Legro
+Date: 2025-08-01
+"""
+
+import csv
+import hashlib
+import logging
+import re
+import unicodedata
+from collections import defaultdict
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+try:
+    from .config import (DEFAULT_ENCODING, NEAR_DUP_BUCKET_SIZE, NEAR_DUP_KEEP,
+                         NEAR_DUP_PERMUTATIONS, NEAR_DUP_SHINGLE_SIZE, NEAR_DUP_THRESHOLD)
+    from .diff import key_field
+    from .task_parser import ParsedTask
+    from .writer import headers
+except ImportError:
+    from config import (DEFAULT_ENCODING, NEAR_DUP_BUCKET_SIZE, NEAR_DUP_KEEP,
+                        NEAR_DUP_PERMUTATIONS, NEAR_DUP_SHINGLE_SIZE, NEAR_DUP_THRESHOLD)
+    from diff import key_field
+    from task_parser import ParsedTask
+    from writer import headers
+
+
+logger = logging.getLogger(__name__)
+
+KEEP_POLICIES = ("first", "last", "longest")
+
+# A list number left in front of a field, e.g. the '1. ' of '1. 07-CO-3036'
+_STEP_PREFIX = re.compile(r"^\s*\d+[.)]\s+")
+_SEPARATORS = re.compile(r"[\W_]+")
+
+_EMPTY_BIN = (1 << 64) - 1
+
+# Lowest chance that two titles at exactly the threshold share a band
+_MIN_RECALL = 0.98
+
+
+def canonical_text(value: str) -> str:
+    """
+    Normalize a field for comparison.
+
+    Unicode compatibility forms, case, a leading list number and runs of
+    whitespace or punctuation are all ignored.
+    """
+    value = unicodedata.normalize("NFKC", value).casefold()
+    value = _STEP_PREFIX.sub("", value)
+    return _SEPARATORS.sub(" ", value).strip()
+
+
+def canonical_fields(format_type: str) -> Tuple[str, ...]:
+    """
+    Return the fields that make up a task's canonical key.
+
+    These are the columns of the output format, except the step number of
+    the original format, which is only the task's position in its list.
+    """
+    columns = ParsedTask.FORMAT_FIELDS.get(format_type, ParsedTask.FORMAT_FIELDS['original'])
+    if format_type == "drill":
+        return columns
+    return tuple(field for field in columns if field != 'step')
+
+
+def canonical_key(task: ParsedTask, format_type: str = "original") -> Tuple[str, ...]:
+    """Return the canonical values of a task's key fields."""
+    return tuple(canonical_text(getattr(task, field)) for field in canonical_fields(format_type))
+
+
+def shingles(text: str, size: int = NEAR_DUP_SHINGLE_SIZE,
+             hashes: Optional[Dict[str, int]] = None) -> Set[int]:
+    """
+    Return the 64-bit hashes of the character shingles of a text.
+
+    Args:
+        text: Canonical text
+        size: Characters per shingle
+        hashes: Cache of shingle hashes to read and fill; titles share
+            most of their shingles, so this saves most of the hashing
+    """
+    if len(text) <= size:
+        pieces = {text}
+    else:
+        pieces = {text[start:start + size] for start in range(len(text) - size + 1)}
+    if hashes is None:
+        hashes = {}
+    result = set()
+    for piece in pieces:
+        value = hashes.get(piece)
+        if value is None:
+            value = hashes[piece] = int.from_bytes(
+                hashlib.blake2b(piece.encode("utf-8"), digest_size=8).digest(), "little")
+        result.add(value)
+    return result
+
+
+def jaccard(first: Set[int], second: Set[int]) -> float:
+    """Jaccard similarity of two sets."""
+    if not first and not second:
+        return 1.0
+    return len(first & second) / len(first | second)
+
+
+def signature(hashes: Iterable[int], size: int = NEAR_DUP_PERMUTATIONS) -> Tuple[int, ...]:
+    """
+    Compute a MinHash signature by one-permutation hashing.
+
+    Each shingle hash is hashed once: it falls into one of size bins and
+    each bin keeps its minimum, which costs one pass over the shingles
+    instead of one per permutation. Empty bins borrow the value of the next
+    filled bin, offset by the distance, so that short titles still compare
+    bin by bin.
+    """
+    bins = [_EMPTY_BIN] * size
+    for value in hashes:
+        index = value % size
+        value //= size
+        if value < bins[index]:
+            bins[index] = value
+    if _EMPTY_BIN in bins:
+        # Walk the bins backwards twice round, so every empty bin has seen
+        # the next filled one by the time it is reached on the second lap
+        source = None
+        for position in range(2 * size - 1, -1, -1):
+            index = position % size
+            if bins[index] < _EMPTY_BIN:
+                source = index
+            elif position < size and source is not None and bins[index] == _EMPTY_BIN:
+                bins[index] = bins[source] + ((source - index) % size) * _EMPTY_BIN
+    return tuple(bins)
+
+
+def lsh_bands(threshold: float, size: int = NEAR_DUP_PERMUTATIONS) -> Tuple[int, int]:
+    """
+    Choose the LSH banding of a signature for a similarity threshold.
+
+    Among the ways to split size bins into equal bands, picks the one with
+    the most rows per band (the fewest false candidates) that still makes
+    two titles at the threshold share a band with high probability.
+
+    Returns:
+        (bands, rows per band)
+    """
+    best = (size, 1)
+    for rows in range(1, size + 1):
+        if size % rows:
+            continue
+        bands = size // rows
+        if 1 - (1 - threshold ** rows) ** bands >= _MIN_RECALL:
+            best = (bands, rows)
+    return best
+
+
+class DuplicateGroup(NamedTuple):
+    """Tasks found to be copies of one another."""
+    kept: ParsedTask
+    merged: List[ParsedTask]
+    similarity: List[float]  # title similarity of each merged task to the kept one
+
+
+class NearDeduplicator:
+    """
+    Deduplication stage that also drops near-duplicate tasks.
+
+    Can be passed to TaskParser.remove_duplicates in place of a
+    Deduplicator. Unlike it, the stage needs all tasks before it can choose
+    which copy survives, so filter() consumes its input before yielding.
+
+    Example:
+        near = NearDeduplicator("original", threshold=0.8, keep="longest")
+        tasks = parser.remove_duplicates(tasks, "original", deduplicator=near)
+        near.write_audit("merged_groups.csv")
+    """
+
+    def __init__(self, format_type: str = "original", threshold: float = NEAR_DUP_THRESHOLD,
+                 keep: str = NEAR_DUP_KEEP, same_key: bool = True,
+                 permutations: int = NEAR_DUP_PERMUTATIONS,
+                 shingle_size: int = NEAR_DUP_SHINGLE_SIZE,
+                 bucket_size: int = NEAR_DUP_BUCKET_SIZE):
+        """
+        Initialize the stage.
+
+        Args:
+            format_type: Output format, which selects the key fields
+            threshold: Lowest title similarity (0-1) of near-duplicates
+            keep: Which copy survives: 'first' or 'last' in input order, or
+                'longest' for the one with the longest title
+            same_key: Only merge tasks with the same canonical task ID (or
+                drill number), so similar titles of distinct tasks stay apart;
+                the other non-title fields must always be equal
+            permutations: MinHash signature size
+            shingle_size: Characters per title shingle
+            bucket_size: Most titles kept per LSH bucket; a task is compared
+                with at most bands * bucket_size others
+
+        Raises:
+            ValueError: If keep or threshold is not supported
+        """
+        if keep not in KEEP_POLICIES:
+            raise ValueError(f"Unknown keep policy: {keep}")
+        if not 0 < threshold <= 1:
+            raise ValueError(f"Similarity threshold must be in (0, 1]: {threshold}")
+        self.format_type = format_type
+        self.threshold = threshold
+        self.keep = keep
+        self.same_key = same_key
+        self.permutations = permutations
+        self.shingle_size = shingle_size
+        self.bucket_size = bucket_size
+        self.bands, self.rows = lsh_bands(threshold, permutations)
+        self.groups: List[DuplicateGroup] = []
+        self.removed = 0
+        self.compared = 0  # candidate titles checked for similarity
+        self._hashes: Dict[str, int] = {}
+
+    def _survivor(self, tasks: Sequence[ParsedTask], members: List[int]) -> int:
+        """Pick the index of the copy that survives from a group."""
+        if self.keep == "last":
+            return members[-1]
+        if self.keep == "longest":
+            return max(members, key=lambda index: (len(tasks[index].title), -index))
+        return members[0]
+
+    def find_groups(self, tasks: Sequence[ParsedTask]) -> List[List[int]]:
+        """
+        Find groups of copies.
+
+        Each distinct canonical key is compared with at most bands *
+        bucket_size others, so the run time grows linearly with the number
+        of tasks. To keep that bound, a bucket holds one title per group and
+        at most bucket_size titles; later titles are still compared with the
+        ones it holds. A similar pair that only meets in full buckets, or
+        through a title that does not represent its group there, can
+        therefore be missed.
+
+        Returns:
+            Index lists of the groups with more than one task, each sorted
+            and the groups ordered by their first index
+        """
+        parent = list(range(len(tasks)))
+
+        def find(index: int) -> int:
+            while parent[index] != index:
+                parent[index] = parent[parent[index]]
+                index = parent[index]
+            return index
+
+        def union(first: int, second: int) -> None:
+            first, second = find(first), find(second)
+            if first != second:
+                parent[max(first, second)] = min(first, second)
+
+        # Exact matches after canonicalization
+        representatives: Dict[Tuple[str, ...], int] = {}
+        for index, task in enumerate(tasks):
+            key = canonical_key(task, self.format_type)
+            first = representatives.setdefault(key, index)
+            if first != index:
+                union(first, index)
+
+        # Near matches among the distinct canonical keys, one signature per title
+        fields = canonical_fields(self.format_type)
+        title_position = fields.index('title')
+        key_position = fields.index(key_field(self.format_type))
+        # Only the title may differ between copies, and with same_key the
+        # task ID must match as well, so these fields are part of every bucket
+        scope_positions = [position for position in range(len(fields))
+                           if position != title_position
+                           and (self.same_key or position != key_position)]
+        # Per distinct title: its signature, and its shingle hashes as a
+        # tuple, which takes far less memory than a set
+        signatures: Dict[str, Tuple[Tuple[int, ...], Tuple[int, ...]]] = {}
+        # Buckets are keyed by hash; a collision only adds a candidate that
+        # the exact similarity check then rejects
+        buckets: Dict[int, List[Tuple[str, Tuple[int, ...], int]]] = defaultdict(list)
+        bands = [slice(band * self.rows, (band + 1) * self.rows) for band in range(self.bands)]
+        for key, index in representatives.items():
+            title = key[title_position]
+            scope = tuple(key[position] for position in scope_positions)
+            if title not in signatures:
+                hashes = shingles(title, self.shingle_size, self._hashes)
+                signatures[title] = (signature(hashes, self.permutations), tuple(hashes))
+            bins, own_shingles = signatures[title]
+            own_set = None
+            # A pair can share several bands; compare each title once
+            similar: Dict[str, bool] = {}
+            for band, columns in enumerate(bands):
+                bucket = buckets[hash((scope, band, bins[columns]))]
+                grouped = False
+                for other_title, other_shingles, other_index in bucket:
+                    if find(other_index) == find(index):
+                        grouped = True
+                        continue
+                    if other_title not in similar:
+                        if own_set is None:
+                            own_set = set(own_shingles)
+                        # Exact Jaccard similarity; both tuples hold distinct hashes
+                        self.compared += 1
+                        common = len(own_set.intersection(other_shingles))
+                        union_size = len(own_shingles) + len(other_shingles) - common
+                        similar[other_title] = common / union_size >= self.threshold
+                    if similar[other_title]:
+                        union(other_index, index)
+                        grouped = True
+                # A bucket holds one title per group, up to bucket_size
+                if not grouped and len(bucket) < self.bucket_size:
+                    bucket.append((title, own_shingles, index))
+
+        members: Dict[int, List[int]] = defaultdict(list)
+        for index in range(len(tasks)):
+            members[find(index)].append(index)
+        return [group for group in members.values() if len(group) > 1]
+
+    def _similarity(self, first: str, second: str) -> float:
+        """Exact Jaccard similarity of the shingles of two canonical titles."""
+        if first == second:
+            return 1.0
+        return jaccard(shingles(first, self.shingle_size, self._hashes),
+                       shingles(second, self.shingle_size, self._hashes))
+
+    def survivors(self, tasks: Sequence[ParsedTask]) -> List[bool]:
+        """
+        Decide which tasks survive, recording the merged groups.
+
+        Returns:
+            One flag per task, True for tasks that are kept
+        """
+        keep = [True] * len(tasks)
+        for members in self.find_groups(tasks):
+            kept = self._survivor(tasks, members)
+            merged = [index for index in members if index != kept]
+            for index in merged:
+                keep[index] = False
+            kept_title = canonical_text(tasks[kept].title)
+            self.groups.append(DuplicateGroup(
+                tasks[kept], [tasks[index] for index in merged],
+                [self._similarity(kept_title, canonical_text(tasks[index].title)) for index in merged]))
+            self.removed += len(merged)
+        return keep
+
+    def filter(self, tasks: Iterable[ParsedTask]) -> Iterator[ParsedTask]:
+        """Yield the surviving tasks in input order."""
+        tasks = tasks if isinstance(tasks, Sequence) else list(tasks)
+        for task, kept in zip(tasks, self.survivors(tasks)):
+            if kept:
+                yield task
+
+    def write_audit(self, output_path: str) -> int:
+        """
+        Write the merged groups recorded so far as CSV.
+
+        Each group lists its surviving task first, then the tasks merged
+        into it with their title similarity to the survivor.
+
+        Returns:
+            Number of groups written
+        """
+        with open(output_path, "w", newline='', encoding=DEFAULT_ENCODING) as f:
+            writer = csv.writer(f)
+            writer.writerow(["Group", "Action", "Similarity"] + headers(self.format_type))
+            for number, group in enumerate(self.groups, 1):
+                writer.writerow([number, "kept", ""] + group.kept.to_list(self.format_type))
+                for task, similarity in zip(group.merged, group.similarity):
+                    writer.writerow([number, "merged", f"{similarity:.3f}"] + task.to_list(self.format_type))
+        logger.info(f"Wrote {len(self.groups)} duplicate groups to {output_path}")
+        return len(self.groups)
+
+    def close(self) -> None:
+        """Nothing to persist; present for parity with Deduplicator."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,296 @@
+"""
+Parallel File Parsing Module
+
+Parses a single large file on several cores. The file is memory-mapped, cut
+into byte ranges that end on newlines, and every range is scanned by a worker
+process with the shared compiled patterns. The parent stitches the ranges back
+together in file order so the result is identical to TaskParser.parse_file.
+
+Author: Jonathan Legro
+Date: 2025-08-01
+"""
+
+import mmap
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Dict, List, Optional, Tuple, Union
+
+try:
+    from .bytescan import bytes_matcher, is_ascii_safe
+    from .config import PARALLEL_CHUNK_BYTES, STREAM_OVERLAP_LINES
+    from .task_parser import ParsedTask, TaskMatcher, TaskPatternConfig
+except ImportError:
+    from bytescan import bytes_matcher, is_ascii_safe
+    from config import PARALLEL_CHUNK_BYTES, STREAM_OVERLAP_LINES
+    from task_parser import ParsedTask, TaskMatcher, TaskPatternConfig
+
+
+# A match found in a range: (start byte, end byte, field values)
+RangeMatch = Tuple[int, int, Tuple[str, ...]]
+
+
+def _advance_lines(mm: mmap.mmap, position: int, lines: int, skip_blank: bool = False) -> int:
+    """
+    Return the offset just after the given number of lines from position.
+    
+    With skip_blank, lines holding only whitespace are not counted, for
+    patterns whose matches can cross any number of them.
+    """
+    while lines > 0:
+        index = mm.find(b"\n", position)
+        if index < 0:
+            return len(mm)
+        if not skip_blank or mm[position:index].strip():
+            lines -= 1
+        position = index + 1
+    return position
+
+
+def has_carriage_return(file_path: str) -> bool:
+    """
+    Whether a file contains a carriage return.
+    
+    parse_file reads with universal newlines, so such files must be decoded
+    rather than split by byte offset to match it.
+    """
+    if os.path.getsize(file_path) == 0:
+        return False
+    with open(file_path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return mm.find(b"\r") >= 0
+
+
+def split_ranges(mm: mmap.mmap, chunk_bytes: int) -> List[Tuple[int, int]]:
+    """
+    Cut a buffer into byte ranges of roughly chunk_bytes that end on newlines.
+    
+    Args:
+        mm: Memory-mapped input
+        chunk_bytes: Target size of each range
+        
+    Returns:
+        List of (start, end) byte offsets covering the whole buffer
+    """
+    size = len(mm)
+    ranges = []
+    start = 0
+    while start < size:
+        end = min(start + chunk_bytes, size)
+        if end < size:
+            index = mm.find(b"\n", end - 1)
+            end = size if index < 0 else index + 1
+        ranges.append((start, end))
+        start = end
+    return ranges
+
+
+class _ByteOffsets:
+    """Converts increasing character offsets of a decoded range to byte offsets."""
+    
+    def __init__(self, text: str, base: int):
+        self.text = text
+        self.base = base
+        self.ascii = text.isascii()
+        self._char = 0
+        self._byte = base
+    
+    def __call__(self, char_offset: int) -> int:
+        if self.ascii:
+            return self.base + char_offset
+        if char_offset < self._char:
+            self._char, self._byte = 0, self.base
+        self._byte += len(self.text[self._char:char_offset].encode("utf-8"))
+        self._char = char_offset
+        return self._byte
+
+
+def _scan_text(text: Union[str, bytes], start: int, end: int, matcher: TaskMatcher,
+               alternative: int) -> List[RangeMatch]:
+    """
+    Scan the text of a range with one alternative.
+    
+    The text covers the range plus its lookahead, so matches that start
+    inside the range may finish beyond it. Only matches starting before
+    end are returned. Bytes text is scanned with a BytesMatcher.
+    """
+    to_bytes = _ByteOffsets(text, start)
+    found = []
+    for match in matcher.finditer(alternative, text):
+        match_start = to_bytes(match.start())
+        if match_start >= end:
+            break
+        found.append((match_start, to_bytes(match.end()), matcher.extract(alternative, match)))
+    return found
+
+
+def _parse_range_worker(file_path: str, pattern_type: str, start: int, end: int,
+                        overlap_lines: int, skip_blank: bool) -> List[List[RangeMatch]]:
+    """Parse one byte range of a file with every alternative of a pattern type."""
+    matcher = TaskPatternConfig.get_matcher(pattern_type)
+    with open(file_path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            lookahead_end = _advance_lines(mm, end, overlap_lines, skip_blank)
+            text = mm[start:lookahead_end]
+    
+    # Plain ASCII ranges are matched as bytes without decoding them
+    ascii_matcher = bytes_matcher(matcher)
+    if ascii_matcher is not None and is_ascii_safe(text):
+        matcher = ascii_matcher
+    else:
+        text = text.decode("utf-8")
+    
+    return [
+        _scan_text(text, start, end, matcher, alternative)
+        for alternative in range(len(matcher.regexes))
+    ]
+
+
+def _stitch(mm: mmap.mmap, matcher: TaskMatcher, alternative: int,
+            ranges: List[Tuple[int, int]], per_range: List[List[RangeMatch]],
+            overlap_lines: int, skip_blank: bool) -> List[RangeMatch]:
+    """
+    Join the matches of one alternative across ranges in file order.
+    
+    When a match runs past the end of its range, the next worker started
+    scanning too early. That range is rescanned from the end of the
+    spilling match until it reaches a match the worker also found; from that
+    point on both scans are identical and the worker results are reused.
+    """
+    stitched: List[RangeMatch] = []
+    last_end = 0
+    
+    for (start, end), matches in zip(ranges, per_range):
+        if last_end > start:
+            worker_starts: Dict[int, int] = {match[0]: i for i, match in enumerate(matches)}
+            lookahead_end = _advance_lines(mm, end, overlap_lines, skip_blank)
+            text = mm[start:lookahead_end].decode("utf-8")
+            to_bytes = _ByteOffsets(text, start)
+            position = len(mm[start:last_end].decode("utf-8")) if last_end < end else len(text)
+            
+            resynced: List[RangeMatch] = []
+            for match in matcher.finditer(alternative, text, position):
+                match_start = to_bytes(match.start())
+                if match_start >= end:
+                    break
+                if match_start in worker_starts:
+                    resynced.extend(matches[worker_starts[match_start]:])
+                    break
+                resynced.append((match_start, to_bytes(match.end()), matcher.extract(alternative, match)))
+            matches = resynced
+        
+        stitched.extend(matches)
+        if matches:
+            last_end = max(last_end, matches[-1][1])
+    
+    return stitched
+
+
+def _dedup_keys(fields_list: List[Tuple[str, ...]], format_type: str) -> List[Tuple[str, ...]]:
+    """Return the first occurrence of every distinct key in a slice, in order."""
+    unique = []
+    seen = set()
+    for fields in fields_list:
+        key = tuple(ParsedTask(*fields).to_list(format_type))
+        if key not in seen:
+            seen.add(key)
+            unique.append(fields)
+    return unique
+
+
+def parse_file_parallel(file_path: str, pattern_type: str,
+                        max_workers: Optional[int] = None,
+                        chunk_bytes: int = PARALLEL_CHUNK_BYTES,
+                        overlap_lines: int = STREAM_OVERLAP_LINES) -> Tuple[List[ParsedTask], int]:
+    """
+    Parse one UTF-8 file with LF line endings across a process pool.
+    
+    Args:
+        file_path: Path to the input text file
+        pattern_type: Type of patterns to use
+        max_workers: Number of worker processes (None uses all cores,
+            1 parses in the current process)
+        chunk_bytes: Target size of each byte range
+        overlap_lines: Lines each range may read past its end to finish a
+            match; raised to the line span of the patterns when it is
+            bounded, and counting only lines with text when it is not
+        
+    Returns:
+        Tuple of (unique tasks in parse_file order, number of raw matches)
+        
+    Raises:
+        ValueError: If pattern_type is not supported
+    """
+    if pattern_type not in TaskPatternConfig.get_available_types():
+        raise ValueError(f"Unsupported pattern type: {pattern_type}")
+    
+    if os.path.getsize(file_path) == 0:
+        return [], 0
+    
+    matcher = TaskPatternConfig.get_matcher(pattern_type)
+    span = matcher.line_span
+    skip_blank = span is None
+    if span is not None:
+        overlap_lines = max(overlap_lines, span)
+    
+    with open(file_path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            ranges = split_ranges(mm, chunk_bytes)
+            serial = max_workers == 1 or len(ranges) == 1
+            executor = None if serial else ProcessPoolExecutor(max_workers=max_workers)
+            mapper = map if executor is None else executor.map
+            
+            try:
+                results = list(mapper(
+                    _parse_range_worker,
+                    repeat(file_path, len(ranges)), repeat(pattern_type, len(ranges)),
+                    [start for start, _ in ranges], [end for _, end in ranges],
+                    repeat(overlap_lines, len(ranges)), repeat(skip_blank, len(ranges))
+                ))
+                
+                # Stitch each alternative in file order, keeping the
+                # alternative-major order of parse_text
+                slices: List[List[RangeMatch]] = []
+                for alternative in range(len(matcher.regexes)):
+                    per_range = [result[alternative] for result in results]
+                    stitched = _stitch(mm, matcher, alternative, ranges, per_range,
+                                       overlap_lines, skip_blank)
+                    slices.extend(_slice_by_ranges(stitched, ranges))
+                
+                # Deduplicate every slice in parallel, then merge in order
+                raw_count = sum(len(piece) for piece in slices)
+                unique_slices = list(mapper(
+                    _dedup_keys,
+                    [[match[2] for match in piece] for piece in slices],
+                    repeat(pattern_type, len(slices))
+                ))
+            finally:
+                if executor is not None:
+                    executor.shutdown()
+    
+    return _merge_unique(unique_slices, pattern_type), raw_count
+
+
+def _slice_by_ranges(matches: List[RangeMatch], ranges: List[Tuple[int, int]]) -> List[List[RangeMatch]]:
+    """Group stitched matches by the range their start falls in."""
+    slices: List[List[RangeMatch]] = [[] for _ in ranges]
+    index = 0
+    for match in matches:
+        while match[0] >= ranges[index][1]:
+            index += 1
+        slices[index].append(match)
+    return slices
+
+
+def _merge_unique(unique_slices: List[List[Tuple[str, ...]]], format_type: str) -> List[ParsedTask]:
+    """Merge per-slice first occurrences into the global first occurrences."""
+    tasks = []
+    seen = set()
+    for piece in unique_slices:
+        for fields in piece:
+            task = ParsedTask(*fields)
+            key = tuple(task.to_list(format_type))
+            if key not in seen:
+                seen.add(key)
+                tasks.append(task)
+    return tasks
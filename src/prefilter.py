@@ -0,0 +1,259 @@
+"""
+Literal Prefilter Module
+
+Finds the regions of a text where a pattern can possibly match, so the
+expensive backtracking regexes only run over candidate line windows instead
+of every byte. A pattern is prefiltered when every match must contain some
+literal strings (its anchors) and can only span a bounded number of lines;
+both are derived from the parsed regex, and anchors can also be declared.
+
+Author: Jonathan Legro
+Date: 2025-08-01
+"""
+
+from typing import Iterator, List, Optional, Sequence, Tuple, Union
+
+try:
+    from re import _constants as sre_constants, _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_constants
+    import sre_parse
+
+try:
+    from .config import PREFILTER_MIN_ANCHOR_LENGTH
+except ImportError:
+    from config import PREFILTER_MIN_ANCHOR_LENGTH
+
+Text = Union[str, bytes]
+
+_NEWLINE = ord("\n")
+
+# Character class categories that include "\n"
+_NEWLINE_CATEGORIES = {
+    sre_constants.CATEGORY_SPACE, sre_constants.CATEGORY_NOT_DIGIT,
+    sre_constants.CATEGORY_NOT_WORD, sre_constants.CATEGORY_LINEBREAK,
+    sre_constants.CATEGORY_UNI_SPACE, sre_constants.CATEGORY_UNI_NOT_DIGIT,
+    sre_constants.CATEGORY_UNI_NOT_WORD, sre_constants.CATEGORY_UNI_LINEBREAK,
+    sre_constants.CATEGORY_LOC_NOT_WORD,
+}
+
+# Zero-width assertions that behave the same inside a line window. End
+# anchors and word boundaries are excluded because a window's endpos looks
+# like the end of the string to them.
+_SAFE_AT_CODES = {sre_constants.AT_BEGINNING, sre_constants.AT_BEGINNING_LINE,
+                  sre_constants.AT_BEGINNING_STRING}
+
+_REPEATS = {sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT,
+            getattr(sre_constants, 'POSSESSIVE_REPEAT', sre_constants.MAX_REPEAT)}
+
+
+class _Unsupported(Exception):
+    """Raised for regex constructs whose line span cannot be bounded safely."""
+
+
+def _class_matches_newline(items: Sequence) -> bool:
+    """Whether a character class (the items of an IN node) can match "\\n"."""
+    negate = False
+    matched = False
+    for op, value in items:
+        if op is sre_constants.NEGATE:
+            negate = True
+        elif op is sre_constants.LITERAL:
+            matched = matched or value == _NEWLINE
+        elif op is sre_constants.RANGE:
+            matched = matched or value[0] <= _NEWLINE <= value[1]
+        elif op is sre_constants.CATEGORY:
+            matched = matched or value in _NEWLINE_CATEGORIES
+        else:
+            raise _Unsupported(op)
+    return matched != negate
+
+
+def _max_newlines(items: Sequence, dotall: bool) -> Optional[int]:
+    """
+    Largest number of "\\n" characters a match of the items can contain.
+
+    Returns:
+        The bound, or None if it is unbounded
+
+    Raises:
+        _Unsupported: For constructs the prefilter cannot reason about
+    """
+    total = 0
+    for op, value in items:
+        if op is sre_constants.LITERAL:
+            count = int(value == _NEWLINE)
+        elif op is sre_constants.NOT_LITERAL:
+            count = int(value != _NEWLINE)
+        elif op is sre_constants.ANY:
+            count = int(dotall)
+        elif op is sre_constants.IN:
+            count = int(_class_matches_newline(value))
+        elif op is sre_constants.AT:
+            if value not in _SAFE_AT_CODES:
+                raise _Unsupported(value)
+            count = 0
+        elif op is sre_constants.SUBPATTERN:
+            add_flags, del_flags, sub = value[1], value[2], value[3]
+            sub_dotall = (dotall or bool(add_flags & sre_constants.SRE_FLAG_DOTALL)) \
+                and not del_flags & sre_constants.SRE_FLAG_DOTALL
+            count = _max_newlines(sub, sub_dotall)
+        elif op is sre_constants.BRANCH:
+            counts = [_max_newlines(branch, dotall) for branch in value[1]]
+            count = None if None in counts else max(counts)
+        elif op in _REPEATS:
+            low, high, sub = value
+            count = _max_newlines(sub, dotall)
+            if count:
+                count = None if high == sre_constants.MAXREPEAT else count * high
+        else:
+            raise _Unsupported(op)
+        if count is None:
+            return None
+        total += count
+    return total
+
+
+def _required_literals(items: Sequence, runs: List[str], current: List[str]) -> None:
+    """
+    Collect runs of literal characters that every match must contain.
+
+    Args:
+        items: Parsed regex items in sequence
+        runs: Completed literal runs, appended to
+        current: Characters of the run being built
+    """
+    def flush() -> None:
+        if current:
+            runs.append("".join(current))
+            current.clear()
+
+    for op, value in items:
+        if op is sre_constants.LITERAL and value != _NEWLINE:
+            current.append(chr(value))
+        elif op is sre_constants.SUBPATTERN and not (value[1] or value[2]):
+            _required_literals(value[3], runs, current)
+        elif op in _REPEATS and value[0] >= 1:
+            flush()
+            _required_literals(value[2], runs, current)
+            flush()
+        else:
+            flush()
+    flush()
+
+
+def analyze_pattern(pattern: str, flags: int = 0) -> Tuple[Tuple[str, ...], Optional[int]]:
+    """
+    Derive the prefilter parameters of a pattern.
+
+    Args:
+        pattern: Regular expression source
+        flags: Flags the pattern is compiled with
+
+    Returns:
+        (anchors, span): literal strings of at least
+        PREFILTER_MIN_ANCHOR_LENGTH characters that every match contains,
+        longest first, and the maximum number of line breaks in a match,
+        or None if the pattern cannot be prefiltered
+    """
+    parsed = sre_parse.parse(pattern, flags)
+    state = getattr(parsed, 'state', None) or getattr(parsed, 'pattern', None)
+    flags = state.flags if state is not None else flags
+
+    try:
+        span = _max_newlines(parsed, bool(flags & sre_constants.SRE_FLAG_DOTALL))
+    except _Unsupported:
+        span = None
+
+    if flags & sre_constants.SRE_FLAG_IGNORECASE:
+        return (), span
+
+    runs: List[str] = []
+    _required_literals(parsed, runs, [])
+    anchors = sorted({run for run in runs if len(run) >= PREFILTER_MIN_ANCHOR_LENGTH},
+                     key=len, reverse=True)
+    return tuple(anchors), span
+
+
+def _start_regions(text: Text, anchor: Text, span: int,
+                   pos: int, endpos: int) -> List[List[int]]:
+    """
+    Regions of text where a match containing anchor can start.
+
+    An anchor occurrence on line k admits match starts on lines k - span to
+    k. Overlapping regions are merged, so the result is sorted and disjoint.
+    """
+    newline = "\n" if isinstance(text, str) else b"\n"
+    find, rfind = text.find, text.rfind
+    regions: List[List[int]] = []
+
+    found = find(anchor, pos, endpos)
+    while found != -1:
+        stop = find(newline, found + len(anchor), endpos)
+        stop = endpos if stop == -1 else stop + 1
+
+        floor = regions[-1][1] if regions else pos
+        start = rfind(newline, pos, found) + 1 or pos
+        for _ in range(span):
+            if start <= floor:
+                break
+            start = rfind(newline, pos, start - 1) + 1 or pos
+
+        if regions and start <= floor:
+            regions[-1][1] = stop
+        else:
+            regions.append([start, stop])
+        found = find(anchor, stop, endpos)
+    return regions
+
+
+def _intersect(left: List[List[int]], right: List[List[int]]) -> List[List[int]]:
+    """Intersect two sorted lists of disjoint half-open regions."""
+    result = []
+    i = j = 0
+    while i < len(left) and j < len(right):
+        start = max(left[i][0], right[j][0])
+        stop = min(left[i][1], right[j][1])
+        if start < stop:
+            result.append([start, stop])
+        if left[i][1] < right[j][1]:
+            i += 1
+        else:
+            j += 1
+    return result
+
+
+def candidate_windows(text: Text, anchors: Sequence[Text], span: int,
+                      pos: int = 0, endpos: Optional[int] = None) -> Iterator[Tuple[int, int, int]]:
+    """
+    Find the windows of text that can contain a match.
+
+    Args:
+        text: Text to search, str or bytes
+        anchors: Literals every match contains, of the same type as text
+        span: Maximum number of line breaks in a match
+        pos: Start of the searched part of text
+        endpos: End of the searched part of text
+
+    Yields:
+        (start, stop, end) in text order: every match that starts in
+        [start, stop) lies entirely within [start, end)
+    """
+    if endpos is None:
+        endpos = len(text)
+
+    regions = _start_regions(text, anchors[0], span, pos, endpos)
+    for anchor in anchors[1:]:
+        if not regions:
+            break
+        regions = _intersect(regions, _start_regions(text, anchor, span, pos, endpos))
+
+    newline = "\n" if isinstance(text, str) else b"\n"
+    find = text.find
+    for start, stop in regions:
+        end = stop
+        for _ in range(span):
+            if end >= endpos:
+                break
+            end = find(newline, end, endpos) + 1 or endpos
+        yield start, stop, end
@@ -0,0 +1,205 @@
+"""
+Input Reader Module
+
+Opens input files for the parser whatever their compression and encoding.
+gzip, xz and bzip2 files are recognized by their magic bytes and
+decompressed as a stream, so no decompressed copy is written to disk. The
+encoding comes from a byte order mark or, failing that, from a bounded
+sample of the decompressed bytes, with DEFAULT_ENCODING as the fallback.
+The size limit applies to the decompressed bytes, so a small archive cannot
+expand into an unbounded amount of text.
+
+Author: Jonathan Legro
+Date: 2025-08-01
+"""
+
+import bz2
+import codecs
+import gzip
+import io
+import logging
+import lzma
+import os
+from typing import BinaryIO, Optional, Sequence, TextIO, Tuple
+
+try:
+    from .config import (COMPRESSED_INPUT_EXTENSIONS, DEFAULT_ENCODING, ENCODING_SAMPLE_BYTES,
+                         INPUT_FALLBACK_ENCODINGS, MAX_FILE_SIZE_MB)
+except ImportError:
+    from config import (COMPRESSED_INPUT_EXTENSIONS, DEFAULT_ENCODING, ENCODING_SAMPLE_BYTES,
+                        INPUT_FALLBACK_ENCODINGS, MAX_FILE_SIZE_MB)
+
+
+logger = logging.getLogger(__name__)
+
+_MAGIC = (
+    (b"\x1f\x8b", "gzip"),
+    (b"\xfd7zXZ\x00", "lzma"),
+    (b"BZh", "bz2"),
+)
+
+# Longest BOMs first, so UTF-32 LE is not mistaken for UTF-16 LE
+_BOMS = (
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+
+class InputTooLarge(ValueError):
+    """Raised when an input decompresses to more than the size limit."""
+
+
+def max_input_bytes(max_file_size_mb: Optional[float] = MAX_FILE_SIZE_MB) -> Optional[int]:
+    """Convert a size limit in MB to bytes; None means no limit."""
+    return None if max_file_size_mb is None else int(max_file_size_mb * 1024 * 1024)
+
+
+def detect_compression(file_path: str) -> str:
+    """Return 'gzip', 'lzma', 'bz2' or '' from the first bytes of a file."""
+    with open(file_path, "rb") as f:
+        head = f.read(6)
+    for magic, kind in _MAGIC:
+        if head.startswith(magic):
+            return kind
+    return ""
+
+
+def detect_encoding(sample: bytes, default: str = DEFAULT_ENCODING,
+                    fallbacks: Sequence[str] = INPUT_FALLBACK_ENCODINGS) -> str:
+    """
+    Guess the encoding of a text from its first bytes.
+
+    A byte order mark decides first. Without one, NUL bytes in every other
+    position mean UTF-16, and otherwise the sample must decode as UTF-8 or
+    else as one of the fallbacks, such as cp1252 from Windows tools.
+    Samples that fit none of these are read with the default encoding.
+
+    Args:
+        sample: Leading bytes of the decompressed input
+        default: Encoding used when nothing else fits
+        fallbacks: Single-byte encodings tried after UTF-8
+
+    Returns:
+        A codec name accepted by open()
+    """
+    for bom, encoding in _BOMS:
+        if sample.startswith(bom):
+            return encoding
+
+    pairs = len(sample) // 2
+    if pairs:
+        even_nuls = sample[0:pairs * 2:2].count(0)
+        odd_nuls = sample[1:pairs * 2:2].count(0)
+        if odd_nuls > pairs * 0.3 and even_nuls == 0:
+            return "utf-16-le"
+        if even_nuls > pairs * 0.3 and odd_nuls == 0:
+            return "utf-16-be"
+
+    for encoding in ("utf-8", *fallbacks):
+        try:
+            # A sample can end inside a multi-byte character
+            codecs.getincrementaldecoder(encoding)().decode(sample, final=False)
+        except UnicodeDecodeError:
+            continue
+        return encoding
+    return default
+
+
+class _LimitedReader(io.RawIOBase):
+    """Raw stream that raises InputTooLarge past a byte limit."""
+
+    def __init__(self, stream: BinaryIO, limit: Optional[int], name: str):
+        self._stream = stream
+        self._limit = limit
+        self._name = name
+        self.consumed = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        count = self._stream.readinto(buffer)
+        self.consumed += count
+        if self._limit is not None and self.consumed > self._limit:
+            raise InputTooLarge(f"{self._name} is larger than the limit of "
+                                f"{self._limit / (1024 * 1024):g} MB")
+        return count
+
+    def close(self) -> None:
+        self._stream.close()
+        super().close()
+
+
+def open_input(file_path: str, encoding: Optional[str] = None,
+               max_bytes: Optional[int] = max_input_bytes(),
+               errors: str = "strict") -> TextIO:
+    """
+    Open an input file as text, decompressing and decoding as needed.
+
+    Args:
+        file_path: Plain, gzip, xz or bzip2 file
+        encoding: Encoding to use instead of detecting it
+        max_bytes: Largest number of decompressed bytes that may be read,
+            or None for no limit
+        errors: Decoding error handler
+
+    Returns:
+        A text stream with universal newlines and no BOM
+
+    Raises:
+        InputTooLarge: From a read, once more than max_bytes were read
+    """
+    kind = detect_compression(file_path)
+    if kind == "gzip":
+        raw = gzip.open(file_path, "rb")
+    elif kind == "lzma":
+        raw = lzma.open(file_path, "rb")
+    elif kind == "bz2":
+        raw = bz2.open(file_path, "rb")
+    else:
+        raw = open(file_path, "rb", buffering=0)
+
+    if max_bytes is not None and not kind and os.path.getsize(file_path) > max_bytes:
+        raw.close()
+        raise InputTooLarge(f"{file_path} is larger than the limit of "
+                            f"{max_bytes / (1024 * 1024):g} MB")
+
+    buffered = io.BufferedReader(_LimitedReader(raw, max_bytes, file_path),
+                                 buffer_size=max(ENCODING_SAMPLE_BYTES, io.DEFAULT_BUFFER_SIZE))
+    if encoding is None:
+        encoding = detect_encoding(buffered.peek(ENCODING_SAMPLE_BYTES)[:ENCODING_SAMPLE_BYTES])
+    if kind or encoding not in ("utf-8", DEFAULT_ENCODING):
+        logger.info(f"Reading {file_path} as {kind or 'uncompressed'} {encoding}")
+    return io.TextIOWrapper(buffered, encoding=encoding, errors=errors)
+
+
+def read_text(file_path: str, encoding: Optional[str] = None,
+              max_bytes: Optional[int] = max_input_bytes()) -> str:
+    """Read a whole input file as text; see open_input."""
+    with open_input(file_path, encoding, max_bytes) as f:
+        return f.read()
+
+
+def input_format(file_path: str) -> Tuple[str, str]:
+    """
+    Return the compression and detected encoding of an input file.
+
+    Returns:
+        (compression, encoding); compression is '' for plain files
+    """
+    with open_input(file_path, max_bytes=None) as f:
+        return detect_compression(file_path), f.encoding
+
+
+def strip_compression_extension(path: str) -> str:
+    """Remove a compression extension such as .gz from a path."""
+    root, extension = os.path.splitext(path)
+    return root if extension.lower() in COMPRESSED_INPUT_EXTENSIONS else path
+
+
+def is_input_file(path: str, extensions: Sequence[str]) -> bool:
+    """Whether a path has an input extension, optionally followed by a compression extension."""
+    return os.path.splitext(strip_compression_extension(path))[1].lower() in extensions
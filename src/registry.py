@@ -0,0 +1,299 @@
+"""
+Pattern Registry Module
+
+Loads the task patterns from config/settings.ini and from pattern-pack files
+in config/patterns/, validates them, and reloads them when the files change.
+Each pack is an INI file with a [patterns] section whose ``<type>_patterns``
+keys hold JSON lists of regular expressions, in the same layout as
+settings.ini. Packs are applied in file name order on top of settings.ini,
+which is applied on top of the built-in defaults; a later file replaces the
+patterns of a type it redefines.
+
+Author: Jonathan Legro
+Date: 2025-08-01
+"""
+
+import argparse
+import configparser
+import hashlib
+import json
+import logging
+import re
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+try:
+    from .config import (MAX_PATTERN_LENGTH, PATTERN_PACK_DIR, PATTERN_RELOAD_INTERVAL,
+                         SETTINGS_FILE)
+except ImportError:
+    from config import (MAX_PATTERN_LENGTH, PATTERN_PACK_DIR, PATTERN_RELOAD_INTERVAL,
+                        SETTINGS_FILE)
+
+logger = logging.getLogger(__name__)
+
+PATTERN_KEY_SUFFIX = "_patterns"
+
+
+def _read_ini(path: Path) -> configparser.ConfigParser:
+    """
+    Read an INI file, tolerating unindented closing brackets.
+
+    Multi-line values must be indented, but list values are easy to write
+    with the closing ``]`` in the first column; such lines are indented
+    before parsing so they stay part of the value.
+    """
+    lines = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        if line.startswith("]"):
+            line = "    " + line
+        lines.append(line)
+
+    parser = configparser.ConfigParser(interpolation=None)
+    parser.read_string("\n".join(lines), source=str(path))
+    return parser
+
+
+def validate_pattern(pattern: object, max_length: int = MAX_PATTERN_LENGTH,
+                     allowed_groups: Optional[Iterable[str]] = None) -> str:
+    """
+    Check that a pattern can be used by the parser.
+
+    Args:
+        pattern: Candidate pattern
+        max_length: Longest pattern accepted
+        allowed_groups: Named groups a pattern may define, if restricted
+
+    Returns:
+        The pattern
+
+    Raises:
+        ValueError: If the pattern is not a non-empty string of at most
+            max_length characters that compiles and only uses allowed groups
+    """
+    if not isinstance(pattern, str) or not pattern:
+        raise ValueError(f"Pattern must be a non-empty string, got {pattern!r}")
+    if len(pattern) > max_length:
+        raise ValueError(f"Pattern is {len(pattern)} characters long, "
+                         f"more than the maximum of {max_length}")
+    try:
+        regex = re.compile(pattern, re.MULTILINE)
+    except re.error as e:
+        raise ValueError(f"Invalid pattern '{pattern}': {e}") from e
+    if allowed_groups is not None:
+        unknown = sorted(set(regex.groupindex) - set(allowed_groups))
+        if unknown:
+            raise ValueError(f"Pattern '{pattern}' defines unknown groups: {', '.join(unknown)}")
+    return pattern
+
+
+def load_pattern_file(path: Path, max_length: int = MAX_PATTERN_LENGTH,
+                      allowed_groups: Optional[Iterable[str]] = None) -> Dict[str, List[str]]:
+    """
+    Load the patterns declared in one INI file.
+
+    Args:
+        path: settings.ini or a pattern-pack file
+        max_length: Longest pattern accepted
+        allowed_groups: Named groups a pattern may define, if restricted
+
+    Returns:
+        Mapping of pattern type to its patterns; empty if the file has no
+        [patterns] section
+
+    Raises:
+        ValueError: If the file cannot be parsed or a pattern is invalid
+    """
+    try:
+        parser = _read_ini(path)
+    except configparser.Error as e:
+        raise ValueError(f"Cannot parse {path}: {e}") from e
+    if not parser.has_section("patterns"):
+        return {}
+
+    patterns = {}
+    for key, value in parser.items("patterns"):
+        if not key.endswith(PATTERN_KEY_SUFFIX):
+            continue
+        pattern_type = key[:-len(PATTERN_KEY_SUFFIX)]
+        try:
+            values = json.loads(value)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"{path}: '{key}' is not a JSON list: {e}") from e
+        if not isinstance(values, list) or not values:
+            raise ValueError(f"{path}: '{key}' must be a non-empty list of patterns")
+        try:
+            patterns[pattern_type] = [validate_pattern(p, max_length, allowed_groups) for p in values]
+        except ValueError as e:
+            raise ValueError(f"{path}: '{key}': {e}") from e
+    return patterns
+
+
+def patterns_fingerprint(pattern_type: str, patterns: Iterable[str]) -> str:
+    """Stable hash of a pattern type and its pattern strings."""
+    digest = hashlib.sha256(pattern_type.encode("utf-8"))
+    for pattern in patterns:
+        digest.update(b"\0" + pattern.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class PatternRegistry:
+    """
+    Pattern types loaded from configuration files, reloaded when they change.
+
+    Reload checks only stat the source files and are throttled to one per
+    reload_interval seconds, so calling maybe_reload() before every parse is
+    cheap. Every process, including pool workers, checks on its own, so
+    long-running processes pick up edited or new pattern packs without a
+    restart. An invalid edit is logged and the last good patterns are kept.
+    """
+
+    def __init__(self, defaults: Optional[Mapping[str, List[str]]] = None,
+                 settings_path: Optional[Path] = SETTINGS_FILE,
+                 pack_dir: Optional[Path] = PATTERN_PACK_DIR,
+                 max_pattern_length: int = MAX_PATTERN_LENGTH,
+                 allowed_groups: Optional[Iterable[str]] = None,
+                 reload_interval: float = PATTERN_RELOAD_INTERVAL,
+                 strict: bool = True):
+        """
+        Initialize the registry and load the patterns.
+
+        Args:
+            defaults: Built-in patterns that the files are applied on top of
+            settings_path: settings.ini to read, or None
+            pack_dir: Directory of pattern-pack files, or None
+            max_pattern_length: Longest pattern accepted
+            allowed_groups: Named groups a pattern may define, if restricted
+            reload_interval: Minimum seconds between checks for changed files
+            strict: Raise if the files are invalid; otherwise log the error
+                and use the defaults until the files are fixed
+
+        Raises:
+            ValueError: If strict and a source file or pattern is invalid
+        """
+        self.defaults = {key: list(value) for key, value in (defaults or {}).items()}
+        self.settings_path = Path(settings_path) if settings_path else None
+        self.pack_dir = Path(pack_dir) if pack_dir else None
+        self.max_pattern_length = max_pattern_length
+        self.allowed_groups = tuple(allowed_groups) if allowed_groups is not None else None
+        self.reload_interval = reload_interval
+
+        self.patterns: Dict[str, List[str]] = self.defaults
+        self.fingerprints: Dict[str, str] = {
+            key: patterns_fingerprint(key, value) for key, value in self.defaults.items()
+        }
+        self.version = 0
+        self._signature: Optional[Tuple] = None
+        self._checked_at = 0.0
+        if strict:
+            self.load()
+        else:
+            self.maybe_reload(force=True)
+
+    def sources(self) -> List[Path]:
+        """Return the files patterns are read from, in the order applied."""
+        paths = []
+        if self.settings_path is not None and self.settings_path.is_file():
+            paths.append(self.settings_path)
+        if self.pack_dir is not None and self.pack_dir.is_dir():
+            paths.extend(sorted(self.pack_dir.glob("*.ini")))
+        return paths
+
+    def _current_signature(self) -> Tuple:
+        """Identify the current state of the source files."""
+        signature = []
+        for path in self.sources():
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            signature.append((str(path), stat.st_mtime_ns, stat.st_size))
+        return tuple(signature)
+
+    def load(self) -> None:
+        """
+        Read every source file and replace the loaded patterns.
+
+        Raises:
+            ValueError: If a source file or pattern is invalid; the loaded
+                patterns are left unchanged
+        """
+        signature = self._current_signature()
+        patterns = {key: list(value) for key, value in self.defaults.items()}
+        for path in self.sources():
+            for pattern_type, values in load_pattern_file(path, self.max_pattern_length,
+                                                          self.allowed_groups).items():
+                if pattern_type in patterns and path != self.settings_path:
+                    logger.info(f"Pattern pack {path.name} replaces the '{pattern_type}' patterns")
+                patterns[pattern_type] = values
+
+        self.patterns = patterns
+        self.fingerprints = {key: patterns_fingerprint(key, value) for key, value in patterns.items()}
+        self._signature = signature
+        self._checked_at = time.monotonic()
+        self.version += 1
+
+    def maybe_reload(self, force: bool = False) -> bool:
+        """
+        Reload the patterns if a source file changed.
+
+        Args:
+            force: Check the files even if the last check was recent
+
+        Returns:
+            True if new patterns were loaded
+        """
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.reload_interval:
+            return False
+        self._checked_at = now
+        if self._current_signature() == self._signature:
+            return False
+
+        try:
+            self.load()
+        except ValueError as e:
+            logger.error(f"Keeping previous patterns; reload failed: {e}")
+            # Do not retry the same broken files on every check
+            self._signature = self._current_signature()
+            return False
+        logger.info(f"Reloaded patterns (version {self.version}) from "
+                    f"{', '.join(str(path) for path in self.sources())}")
+        return True
+
+    def get_patterns(self, pattern_type: str) -> List[str]:
+        """Get patterns for a specific type."""
+        return self.patterns.get(pattern_type, [])
+
+    def get_available_types(self) -> List[str]:
+        """Get list of available pattern types."""
+        return list(self.patterns.keys())
+
+
+def register_cli(subparsers) -> None:
+    """Register the ``patterns`` command with the command-line interface."""
+    command = subparsers.add_parser("patterns", help="List and check the configured patterns")
+    command.add_argument("--check", action="store_true",
+                         help="Also report patterns at risk of catastrophic backtracking")
+    command.set_defaults(func=run_patterns)
+
+
+def run_patterns(args: argparse.Namespace) -> int:
+    """Run the ``patterns`` command."""
+    try:
+        from .task_parser import TaskPatternConfig
+    except ImportError:
+        from task_parser import TaskPatternConfig
+
+    registry = TaskPatternConfig.get_registry()
+    print("Sources: " + (", ".join(str(path) for path in registry.sources()) or "built-in defaults"))
+    for pattern_type in registry.get_available_types():
+        patterns = registry.get_patterns(pattern_type)
+        print(f"{pattern_type}: {len(patterns)} patterns, "
+              f"fingerprint {registry.fingerprints[pattern_type][:12]}")
+
+    if args.check:
+        for pattern, risks in TaskPatternConfig.check_backtracking().items():
+            for risk in risks:
+                print(f"WARNING {pattern}\n    {risk}")
+    return 0
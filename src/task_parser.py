@@ -8,37 +8,115 @@ Author: Jonathan Legro
 Date: 2025-08-01
 """
 
-import csv
+import argparse
 import re
 import os
+import sys
 import logging
+import mmap
+import time
 from datetime import datetime
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Iterable, Iterator, Union
 from dataclasses import dataclass
 
+try:
+    from .config import (AUTO_PATTERN_TYPE, DETECT_FALLBACK_TYPE, DETECT_MIN_CONFIDENCE,
+                         MAX_FILE_SIZE_MB, STREAM_CHUNK_SIZE, STREAM_OVERLAP_LINES)
+    from .detect import Detection, detect_pattern_type, sample_file, sample_lines
+    from .fields import PROPONENTS, TASK_CODES, Proponent, TaskCode, part_values
+    from .metrics import ParseStats, TaskList
+    from .prefilter import analyze_pattern, candidate_windows
+    from .guard import MatchGuard, backtracking_risks
+    from .reader import (input_format, max_input_bytes, open_input, read_text,
+                         strip_compression_extension)
+    from .registry import PatternRegistry, patterns_fingerprint
+except ImportError:
+    from config import (AUTO_PATTERN_TYPE, DETECT_FALLBACK_TYPE, DETECT_MIN_CONFIDENCE,
+                        MAX_FILE_SIZE_MB, STREAM_CHUNK_SIZE, STREAM_OVERLAP_LINES)
+    from detect import Detection, detect_pattern_type, sample_file, sample_lines
+    from fields import PROPONENTS, TASK_CODES, Proponent, TaskCode, part_values
+    from metrics import ParseStats, TaskList
+    from prefilter import analyze_pattern, candidate_windows
+    from guard import MatchGuard, backtracking_risks
+    from reader import (input_format, max_input_bytes, open_input, read_text,
+                        strip_compression_extension)
+    from registry import PatternRegistry, patterns_fingerprint
 
-@dataclass
+
+@dataclass(init=False)
 class ParsedTask:
-    """Data class representing a parsed task."""
-    step: str = ""
-    task: str = ""
-    title: str = ""
-    proponent: str = ""
-    status: str = ""
-    verb: str = ""
-    
-    def to_list(self, format_type: str = "original") -> List[str]:
-        """Convert to list format based on parsing type."""
-        if format_type == "original":
-            return [self.step, self.task, self.title, self.proponent, self.status]
-        elif format_type == "drill":
-            return [self.step, self.status, self.verb, self.title]
+    """
+    Data class representing a parsed task.
+    
+    Instances use __slots__ instead of a per-instance __dict__, which keeps
+    large result lists small. See TaskTable for a columnar alternative.
+    """
+    __slots__ = ('step', 'task', 'title', 'proponent', 'status', 'verb')
+    
+    step: str
+    task: str
+    title: str
+    proponent: str
+    status: str
+    verb: str
+    
+    # Field order of each output format, matching to_list()
+    FORMAT_FIELDS = {
+        'original': ('step', 'task', 'title', 'proponent', 'status'),
+        'drill': ('step', 'status', 'verb', 'title'),
+    }
+    
+    def __init__(self, step: str = "", task: str = "", title: str = "",
+                 proponent: str = "", status: str = "", verb: str = ""):
+        """Initialize a task; every field defaults to an empty string."""
+        self.step = step
+        self.task = task
+        self.title = title
+        self.proponent = proponent
+        self.status = status
+        self.verb = verb
+    
+    def to_list(self, format_type: str = "original", include_parts: bool = False) -> List[str]:
+        """
+        Convert to list format based on parsing type.
+        
+        Args:
+            format_type: Output format
+            include_parts: Append the decomposed proponent and task code
+                parts, in fields.PART_FIELDS order
+        """
+        if format_type == "drill":
+            row = [self.step, self.status, self.verb, self.title]
         else:
-            return [self.step, self.task, self.title, self.proponent, self.status]
+            row = [self.step, self.task, self.title, self.proponent, self.status]
+        if include_parts:
+            row.extend(self.parts())
+        return row
+    
+    @property
+    def proponent_parts(self) -> Proponent:
+        """Code, name and level of the proponent; shared by equal proponents."""
+        return PROPONENTS.get(self.proponent)
+    
+    @property
+    def task_parts(self) -> TaskCode:
+        """School, echelon and number of the task code; shared by equal codes."""
+        return TASK_CODES.get(self.task)
+    
+    def parts(self) -> Tuple[str, ...]:
+        """Return the decomposed field values in fields.PART_FIELDS order."""
+        return part_values(self.proponent, self.task)
 
 
 class TaskPatternConfig:
-    """Configuration class for regex patterns."""
+    """
+    Configuration class for regex patterns.
+    
+    PATTERNS are the built-in defaults. The patterns actually used come from
+    a PatternRegistry that applies config/settings.ini and any pattern packs
+    in config/patterns/ on top of them, and reloads those files when they
+    change.
+    """
     
     PATTERNS = {
         'original': [
@@ -50,24 +128,263 @@ class TaskPatternConfig:
         ]
     }
     
+    # Literals every match of a pattern contains, keyed by pattern. Anchors
+    # are derived from the pattern when possible; declared anchors replace
+    # the derived ones and must really be required, or matches are lost.
+    ANCHORS: Dict[str, Tuple[str, ...]] = {}
+    
+    _registry: Optional[PatternRegistry] = None
+    
+    # Compiled matchers keyed by the content fingerprint of their patterns
+    _matchers: Dict[Tuple[str, Tuple], 'TaskMatcher'] = {}
+    
+    @classmethod
+    def get_registry(cls) -> PatternRegistry:
+        """
+        Get the pattern registry, loading it on first use.
+        
+        Invalid configuration files are logged and the built-in patterns
+        are used until the files are fixed.
+        """
+        if cls._registry is None:
+            cls._registry = PatternRegistry(defaults=cls.PATTERNS,
+                                            allowed_groups=TaskMatcher.FIELDS, strict=False)
+        return cls._registry
+    
+    @classmethod
+    def use_registry(cls, registry: Optional[PatternRegistry]) -> None:
+        """Replace the pattern registry; None reloads the default one on next use."""
+        cls._registry = registry
+    
     @classmethod
     def get_patterns(cls, pattern_type: str) -> List[str]:
         """Get patterns for a specific type."""
-        return cls.PATTERNS.get(pattern_type, [])
+        return cls.get_registry().get_patterns(pattern_type)
     
     @classmethod
     def get_available_types(cls) -> List[str]:
         """Get list of available pattern types."""
-        return list(cls.PATTERNS.keys())
+        return cls.get_registry().get_available_types()
+    
+    @classmethod
+    def check_backtracking(cls, pattern_type: Optional[str] = None) -> Dict[str, List[str]]:
+        """
+        Flag patterns at risk of catastrophic backtracking.
+        
+        Args:
+            pattern_type: Type to check, or None to check every type
+            
+        Returns:
+            Mapping of each risky pattern to descriptions of its risks
+        """
+        types = [pattern_type] if pattern_type is not None else cls.get_available_types()
+        flagged = {}
+        for name in types:
+            for pattern in cls.get_patterns(name):
+                try:
+                    risks = backtracking_risks(pattern, re.MULTILINE)
+                except re.error:
+                    continue
+                if risks:
+                    flagged[pattern] = risks
+        return flagged
+    
+    @classmethod
+    def get_matcher(cls, pattern_type: str) -> 'TaskMatcher':
+        """
+        Get the precompiled matcher for a pattern type.
+        
+        Matchers are compiled once per distinct pattern content and shared by
+        every TaskParser instance. Changed pattern files are picked up here,
+        so a reload only compiles the types whose patterns changed.
+        """
+        registry = cls.get_registry()
+        registry.maybe_reload()
+        patterns = registry.get_patterns(pattern_type)
+        anchors = {pattern: cls.ANCHORS[pattern] for pattern in patterns if pattern in cls.ANCHORS}
+        fingerprint = registry.fingerprints.get(pattern_type) or patterns_fingerprint(pattern_type, patterns)
+        key = (fingerprint, tuple(sorted(anchors.items())))
+        matcher = cls._matchers.get(key)
+        if matcher is None:
+            matcher = TaskMatcher(pattern_type, patterns, anchors)
+            cls._matchers[key] = matcher
+        return matcher
+
+
+class TaskMatcher:
+    """
+    Precompiled matcher for all pattern alternatives of one pattern type.
+    
+    Each alternative is compiled once, and the group numbers of the task
+    fields are resolved up front so tasks are filled without groupdict().
+    Alternatives are still scanned independently: merging them into one
+    alternation would make matches of different alternatives mutually
+    exclusive, dropping rows (such as Battle Drill lines) that today match
+    more than one pattern.
+    
+    Alternatives with literal anchors and a bounded line span are only run
+    over the candidate line windows around their anchors; see prefilter.py.
+    """
+    
+    FIELDS = ('step', 'task', 'title', 'proponent', 'status', 'verb')
+    
+    def __init__(self, pattern_type: str, patterns: Iterable[str],
+                 anchors: Optional[Dict[str, Tuple[str, ...]]] = None,
+                 prefilter: bool = True):
+        """
+        Compile every pattern; invalid patterns are recorded in errors.
+        
+        Args:
+            pattern_type: Name of the pattern type
+            patterns: Regular expressions, one per alternative
+            anchors: Declared anchors keyed by pattern, replacing derived ones
+            prefilter: Whether to restrict matching to candidate windows
+        """
+        self.pattern_type = pattern_type
+        self.patterns = tuple(patterns)
+        self.declared_anchors = dict(anchors or {})
+        self.regexes: List['re.Pattern'] = []
+        self.errors: List[Tuple[str, re.error]] = []
+        self._field_groups: List[List[Tuple[int, int]]] = []
+        # Per alternative, (anchors, span) or None to scan the whole text
+        self.prefilters: List[Optional[Tuple[Tuple[str, ...], int]]] = []
+        # Per alternative, the most line breaks a match can span, or None
+        self.spans: List[Optional[int]] = []
+        
+        for pattern in self.patterns:
+            try:
+                regex = re.compile(pattern, re.MULTILINE)
+            except re.error as e:
+                self.errors.append((pattern, e))
+                continue
+            self.regexes.append(regex)
+            self._field_groups.append([
+                (position, regex.groupindex[field])
+                for position, field in enumerate(self.FIELDS) if field in regex.groupindex
+            ])
+            
+            derived, span = analyze_pattern(pattern, regex.flags)
+            self.spans.append(span)
+            declared = self.declared_anchors.get(pattern)
+            anchors = tuple(declared) if declared is not None else derived
+            if prefilter and anchors and span is not None and all("\n" not in a for a in anchors):
+                self.prefilters.append((anchors, span))
+            else:
+                self.prefilters.append(None)
+    
+    @property
+    def line_span(self) -> Optional[int]:
+        """
+        Most line breaks a match of any alternative can span, or None if a
+        pattern is unbounded (e.g. ``\\s+`` crosses any number of blank lines).
+        """
+        if None in self.spans:
+            return None
+        return max(self.spans, default=0)
+    
+    @property
+    def fingerprint(self) -> str:
+        """Stable hash of the pattern type and its pattern strings."""
+        return patterns_fingerprint(self.pattern_type, self.patterns)
+    
+    def finditer(self, alternative: int, text: str, pos: int = 0,
+                 endpos: Optional[int] = None) -> Iterator['re.Match']:
+        """
+        Find the matches of one alternative, like regex.finditer.
+        
+        With a prefilter the regex only runs over candidate windows, but the
+        matches are identical to a scan of the whole text: a window covers
+        every line a match starting in it can reach, and scanning resumes
+        after the previous match exactly as finditer would.
+        """
+        regex = self.regexes[alternative]
+        if endpos is None:
+            endpos = len(text)
+        prefilter = self.prefilters[alternative]
+        if prefilter is None:
+            yield from regex.finditer(text, pos, endpos)
+            return
+        
+        anchors, span = prefilter
+        resume = pos
+        for start, stop, end in candidate_windows(text, anchors, span, pos, endpos):
+            for match in regex.finditer(text, max(start, resume), end):
+                if match.start() >= stop:
+                    break
+                resume = match.end()
+                yield match
+    
+    def scan(self, text: str, pos: int = 0,
+             endpos: Optional[int] = None) -> Iterator[Tuple[int, 're.Match']]:
+        """
+        Scan text with every alternative, tagging each match.
+        
+        Yields:
+            (alternative index, match) pairs, alternative by alternative
+        """
+        for alternative in range(len(self.regexes)):
+            for match in self.finditer(alternative, text, pos, endpos):
+                yield alternative, match
+    
+    def extract(self, alternative: int, match: 're.Match') -> Tuple[str, ...]:
+        """Return the stripped field values of a match in FIELDS order."""
+        values = ["", "", "", "", "", ""]
+        for position, group in self._field_groups[alternative]:
+            value = match.group(group)
+            if value:
+                values[position] = value.strip()
+        return tuple(values)
+    
+    def build_task(self, alternative: int, match: 're.Match') -> ParsedTask:
+        """
+        Build a ParsedTask from a match of the given alternative.
+        
+        The proponent is decomposed through the shared lookup table, so
+        tasks with equal proponents share one string and parts object. Task
+        codes are mostly distinct within a file and are only decomposed when
+        their parts are read.
+        """
+        step, task, title, proponent, status, verb = self.extract(alternative, match)
+        return ParsedTask(step, task, title, PROPONENTS.intern(proponent), status, verb)
+    
+    def parse(self, text: str) -> List[ParsedTask]:
+        """Parse text into tasks in the same order as TaskParser.parse_text."""
+        build = self.build_task
+        return [build(alternative, match) for alternative, match in self.scan(text)]
 
 
 class TaskParser:
     """Main parser class for task data extraction."""
     
-    def __init__(self, log_level: int = logging.INFO):
-        """Initialize the parser with logging configuration."""
+    def __init__(self, log_level: int = logging.INFO, cache: Optional['ResultCache'] = None,
+                 metrics: Optional[ParseStats] = None, guard: Optional[MatchGuard] = None,
+                 max_file_size_mb: Optional[float] = MAX_FILE_SIZE_MB):
+        """
+        Initialize the parser with logging configuration.
+        
+        Args:
+            log_level: Logging level for the parser
+            cache: Optional result cache consulted by parse_file
+            metrics: Optional recorder that accumulates the stage measurements
+                of every call; any object with a merge(ParseStats) method
+            guard: Optional MatchGuard that parse_text matches under, so
+                pathological lines are quarantined instead of stalling
+            max_file_size_mb: Largest decompressed input size parse_file
+                reads into memory, or None for no limit; iter_file,
+                parse_file_mmap and parse_file_parallel do not hold the
+                whole file in memory and are not limited
+        """
         self.logger = self._setup_logging(log_level)
         self.patterns = TaskPatternConfig()
+        self.cache = cache
+        self.metrics = metrics
+        self.guard = guard
+        self.max_input_bytes = max_input_bytes(max_file_size_mb)
+    
+    def _record(self, stats: ParseStats) -> None:
+        """Forward the measurements of one call to the metrics recorder."""
+        if self.metrics is not None:
+            self.metrics.merge(stats)
     
     def _setup_logging(self, level: int) -> logging.Logger:
         """Set up logging configuration."""
@@ -84,68 +401,312 @@ class TaskParser:
         
         return logger
     
-    def parse_text(self, text: str, pattern_type: str) -> List[ParsedTask]:
+    def parse_text(self, text: str, pattern_type: str, as_table: bool = False) -> List[ParsedTask]:
         """
         Parse text using specified pattern type.
         
         Args:
             text: The text content to parse
-            pattern_type: Type of patterns to use ('original' or 'drill')
+            pattern_type: Type of patterns to use ('original' or 'drill'),
+                or 'auto' to detect it from a sample of the text
+            as_table: Return a columnar TaskTable instead of a list
             
         Returns:
-            List of ParsedTask objects
+            List of ParsedTask objects, or a TaskTable if as_table is set;
+            either carries the ParseStats of the call as ``stats`` and the
+            pattern type used as ``pattern_type``
             
         Raises:
-            ValueError: If pattern_type is not supported
+            ValueError: If pattern_type is not supported, or is 'auto' and
+                cannot be detected
         """
+        if pattern_type == AUTO_PATTERN_TYPE:
+            pattern_type = self._detect(sample_lines(text), "text").pattern_type
         if pattern_type not in self.patterns.get_available_types():
             raise ValueError(f"Unsupported pattern type: {pattern_type}")
         
-        patterns = self.patterns.get_patterns(pattern_type)
-        parsed_tasks = []
+        return self._parse_with(self._get_matcher(pattern_type), text, pattern_type, as_table)
+    
+    def _parse_with(self, matcher: TaskMatcher, text: Union[str, bytes], pattern_type: str,
+                    as_table: bool = False) -> List[ParsedTask]:
+        """Run every alternative of a matcher over text; see parse_text."""
+        self.logger.info(f"Parsing text with {len(matcher.patterns)} patterns of type '{pattern_type}'")
         
-        self.logger.info(f"Parsing text with {len(patterns)} patterns of type '{pattern_type}'")
+        stats = ParseStats()
+        if as_table:
+            parsed_tasks = _task_table_class()()
+            add = parsed_tasks.append_values
+            build = matcher.extract
+        else:
+            parsed_tasks = TaskList(stats=stats, pattern_type=pattern_type)
+            add = parsed_tasks.append
+            build = matcher.build_task
         
-        for pattern in patterns:
-            try:
-                matches = re.finditer(pattern, text, re.MULTILINE)
+        # Each alternative runs its match pass to completion before its
+        # fields are populated, so the two are timed separately
+        text_bytes = len(text)
+        for alternative, regex in enumerate(matcher.regexes):
+            with stats.stage("match", text_bytes) as record:
+                started = time.perf_counter()
+                if self.guard is not None:
+                    quarantined = len(self.guard.quarantined)
+                    matches = list(self.guard.finditer(matcher, alternative, text))
+                    stats.quarantined += len(self.guard.quarantined) - quarantined
+                else:
+                    matches = list(matcher.finditer(alternative, text))
+                record.rows += len(matches)
+                stats.record_matches(pattern_type, alternative, regex.pattern,
+                                     len(matches), time.perf_counter() - started)
+            with stats.stage("populate") as record:
                 for match in matches:
-                    task = ParsedTask()
-                    groups = match.groupdict()
-                    
-                    # Populate task fields based on available groups
-                    for field in ['step', 'task', 'title', 'proponent', 'status', 'verb']:
-                        if field in groups and groups[field]:
-                            setattr(task, field, groups[field].strip())
-                    
-                    parsed_tasks.append(task)
-                    
-            except re.error as e:
-                self.logger.error(f"Regex error with pattern '{pattern}': {e}")
-                continue
+                    add(build(alternative, match))
+                record.rows += len(matches)
+            del matches
+        
+        if as_table:
+            parsed_tasks.stats = stats
+            parsed_tasks.pattern_type = pattern_type
+        self._record(stats)
         
         self.logger.info(f"Successfully parsed {len(parsed_tasks)} tasks")
         return parsed_tasks
     
-    def remove_duplicates(self, tasks: List[ParsedTask], format_type: str = "original") -> List[ParsedTask]:
+    def detect_pattern_type(self, file_path: str,
+                            min_confidence: float = DETECT_MIN_CONFIDENCE,
+                            fallback: Optional[str] = DETECT_FALLBACK_TYPE) -> Detection:
+        """
+        Detect the pattern type of a file from a bounded sample of its lines.
+        
+        Args:
+            file_path: Path to the input text file
+            min_confidence: Lowest margin accepted between the best and
+                second-best type's match rates
+            fallback: Type used when detection is not confident; None raises
+            
+        Returns:
+            The detection outcome
+            
+        Raises:
+            FileNotFoundError: If file doesn't exist
+            ValueError: If the type cannot be detected and there is no fallback
+        """
+        if not os.path.isfile(file_path):
+            raise FileNotFoundError(f"File not found: {file_path}")
+        return self._detect(sample_file(file_path), file_path, min_confidence, fallback)
+    
+    def _detect(self, blocks: List[str], source: str,
+                min_confidence: float = DETECT_MIN_CONFIDENCE,
+                fallback: Optional[str] = DETECT_FALLBACK_TYPE) -> Detection:
+        """Detect the pattern type of sampled lines, logging the outcome."""
+        matchers = [self._get_matcher(name) for name in self.patterns.get_available_types()]
+        detection = detect_pattern_type(blocks, matchers, min_confidence, fallback)
+        if detection.fallback:
+            self.logger.warning(f"Could not detect the pattern type of {source} "
+                                f"(confidence {detection.confidence:.2f}); "
+                                f"using '{detection.pattern_type}'")
+        else:
+            self.logger.info(f"Detected pattern type '{detection.pattern_type}' for {source} "
+                             f"(confidence {detection.confidence:.2f}, "
+                             f"{detection.lines_sampled} lines sampled)")
+        return detection
+    
+    def _get_matcher(self, pattern_type: str) -> TaskMatcher:
+        """Get the shared matcher for a pattern type, logging invalid patterns."""
+        matcher = self.patterns.get_matcher(pattern_type)
+        for pattern, error in matcher.errors:
+            self.logger.error(f"Regex error with pattern '{pattern}': {error}")
+        return matcher
+    
+    def check_patterns(self) -> Dict[str, List[str]]:
+        """
+        Log and return patterns at risk of catastrophic backtracking.
+        
+        Returns:
+            Mapping of each risky pattern to descriptions of its risks
+        """
+        flagged = self.patterns.check_backtracking()
+        for pattern, risks in flagged.items():
+            for risk in risks:
+                self.logger.warning(f"Pattern '{pattern}' at risk: {risk}")
+        return flagged
+    
+    def parse_stream(self, chunks: Iterable[str], pattern_type: str,
+                     chunk_size: int = STREAM_CHUNK_SIZE,
+                     overlap_lines: int = STREAM_OVERLAP_LINES) -> Iterator[ParsedTask]:
+        """
+        Parse an iterable of text pieces, yielding tasks as they are found.
+        
+        Pieces (lines, blocks, or an open file) are buffered until roughly
+        ``chunk_size`` characters of complete lines are available, so memory
+        is bounded by the chunk size rather than the total input size. The
+        last ``overlap_lines`` lines of every chunk are carried into the next
+        one so that patterns spanning line breaks are not cut in half; a
+        match is only emitted once it starts before that carried tail. The
+        tail grows to the line span of the patterns when it is bounded;
+        when it is not, only lines with text are counted, so runs of blank
+        lines of any length are carried.
+        
+        Within a chunk, tasks are yielded pattern by pattern, so the order
+        can differ from parse_text when a type has several patterns.
+        
+        Args:
+            chunks: Iterable of text pieces in input order
+            pattern_type: Type of patterns to use ('original' or 'drill')
+            chunk_size: Approximate number of characters parsed per chunk
+            overlap_lines: Number of lines carried between chunks; must cover
+                the number of lines with text a single match can span
+            
+        Yields:
+            ParsedTask objects in input order, chunk by chunk
+            
+        Raises:
+            ValueError: If pattern_type is not supported
+        """
+        if pattern_type not in self.patterns.get_available_types():
+            raise ValueError(f"Unsupported pattern type: {pattern_type}")
+        
+        matcher = self._get_matcher(pattern_type)
+        span = matcher.line_span
+        if span is not None:
+            overlap_lines = max(overlap_lines, span)
+        
+        # Per pattern, the buffer offset where scanning resumes
+        resume = [0] * len(matcher.regexes)
+        buffer = ""
+        pending: List[str] = []
+        pending_size = 0
+        total = 0
+        
+        def scan(text: str, cut: int) -> Iterator[ParsedTask]:
+            for index in range(len(matcher.regexes)):
+                position = resume[index]
+                for match in matcher.finditer(index, text, position):
+                    if match.start() >= cut:
+                        break
+                    position = match.end()
+                    yield matcher.build_task(index, match)
+                resume[index] = max(position, cut)
+        
+        for piece in chunks:
+            pending.append(piece)
+            pending_size += len(piece)
+            if pending_size < chunk_size:
+                continue
+            
+            text = buffer + "".join(pending)
+            pending, pending_size = [], 0
+            
+            # Only complete lines are parsed; a trailing partial line waits
+            line_end = text.rfind("\n") + 1
+            cut = line_end
+            carried = 0
+            while carried < overlap_lines and cut > 0:
+                start = text.rfind("\n", 0, cut - 1) + 1
+                if span is not None or not text[start:cut].isspace():
+                    carried += 1
+                cut = start
+            
+            if cut <= 0:
+                buffer = text
+                continue
+            
+            for task in scan(text[:line_end], cut):
+                total += 1
+                yield task
+            
+            buffer = text[cut:]
+            resume = [position - cut for position in resume]
+        
+        text = buffer + "".join(pending)
+        for task in scan(text, len(text) + 1):
+            total += 1
+            yield task
+        
+        self.logger.info(f"Successfully streamed {total} tasks")
+    
+    def iter_file(self, file_path: str, pattern_type: str,
+                  chunk_size: int = STREAM_CHUNK_SIZE,
+                  deduplicate: bool = True,
+                  deduplicator: Optional['Deduplicator'] = None) -> Iterator[ParsedTask]:
         """
-        Remove duplicate tasks based on their list representation.
+        Lazily parse a text file without reading it into memory at once.
         
         Args:
-            tasks: List of ParsedTask objects
+            file_path: Path to the input text file
+            pattern_type: Type of patterns to use, or 'auto' to detect it
+            chunk_size: Approximate number of characters read per chunk
+            deduplicate: Whether to skip tasks that were already yielded
+            deduplicator: Digest-based deduplication stage to use, e.g. one
+                backed by a seen-set persisted from earlier runs
+            
+        Yields:
+            ParsedTask objects in input order
+            
+        Raises:
+            FileNotFoundError: If file doesn't exist
+            IOError: If file cannot be read
+        """
+        if not os.path.isfile(file_path):
+            raise FileNotFoundError(f"File not found: {file_path}")
+        if pattern_type == AUTO_PATTERN_TYPE:
+            pattern_type = self.detect_pattern_type(file_path).pattern_type
+        
+        try:
+            # Memory is bounded by the chunk size, so no size limit applies
+            with open_input(file_path, max_bytes=None) as f:
+                self.logger.info(f"Streaming file: {file_path}")
+                pieces = iter(lambda: f.read(chunk_size), '')
+                tasks = self.parse_stream(pieces, pattern_type, chunk_size)
+                
+                if not deduplicate:
+                    yield from tasks
+                    return
+                
+                if deduplicator is None:
+                    deduplicator = _deduplicator_class()(pattern_type)
+                yield from deduplicator.filter(tasks)
+                
+        except IOError as e:
+            self.logger.error(f"Error reading file {file_path}: {e}")
+            raise
+    
+    def remove_duplicates(self, tasks: List[ParsedTask], format_type: str = "original",
+                          deduplicator: Optional['Deduplicator'] = None) -> List[ParsedTask]:
+        """
+        Remove duplicate tasks based on a digest of their list representation.
+        
+        Args:
+            tasks: List of ParsedTask objects or a TaskTable
             format_type: Format type for comparison
+            deduplicator: Digest-based deduplication stage to use; pass one
+                with a persisted seen-set to also drop tasks from earlier runs
             
         Returns:
-            List of unique ParsedTask objects
+            List of unique ParsedTask objects, or a TaskTable for table input;
+            either carries the ParseStats of the call as ``stats``
         """
-        unique_tasks = []
-        seen = set()
+        stats = ParseStats()
+        TaskTable = _task_table_class()
+        if isinstance(tasks, TaskTable):
+            with stats.stage("dedup") as record:
+                if deduplicator is None:
+                    unique_table = tasks.drop_duplicates(format_type)
+                else:
+                    unique_table = TaskTable(deduplicator.filter(tasks))
+                record.rows += len(unique_table)
+            unique_table.stats = stats
+            self._record(stats)
+            removed_count = len(tasks) - len(unique_table)
+            if removed_count > 0:
+                self.logger.info(f"Removed {removed_count} duplicate tasks")
+            return unique_table
         
-        for task in tasks:
-            task_tuple = tuple(task.to_list(format_type))
-            if task_tuple not in seen:
-                seen.add(task_tuple)
-                unique_tasks.append(task)
+        with stats.stage("dedup") as record:
+            if deduplicator is None:
+                deduplicator = _deduplicator_class()(format_type)
+            unique_tasks = TaskList(deduplicator.filter(tasks), stats)
+            record.rows += len(unique_tasks)
+        self._record(stats)
         
         removed_count = len(tasks) - len(unique_tasks)
         if removed_count > 0:
@@ -153,73 +714,346 @@ class TaskParser:
         
         return unique_tasks
     
-    def parse_file(self, file_path: str, pattern_type: str) -> List[ParsedTask]:
+    def parse_file(self, file_path: str, pattern_type: str, as_table: bool = False) -> List[ParsedTask]:
         """
         Parse a text file and return extracted tasks.
         
         Args:
             file_path: Path to the input text file
-            pattern_type: Type of patterns to use
+            pattern_type: Type of patterns to use, or 'auto' to detect it
+                from a sample of the file
+            as_table: Return a columnar TaskTable instead of a list
             
         Returns:
-            List of ParsedTask objects
+            List of ParsedTask objects, or a TaskTable if as_table is set;
+            either carries the ParseStats of every stage of the call as
+            ``stats`` and the pattern type used as ``pattern_type``
             
         Raises:
             FileNotFoundError: If file doesn't exist
             IOError: If file cannot be read
+            InputTooLarge: If the decompressed file exceeds max_file_size_mb
+            ValueError: If pattern_type is 'auto' and cannot be detected
         """
         if not os.path.isfile(file_path):
             raise FileNotFoundError(f"File not found: {file_path}")
         
+        stats = ParseStats()
+        if pattern_type == AUTO_PATTERN_TYPE:
+            with stats.stage("detect"):
+                pattern_type = self.detect_pattern_type(file_path).pattern_type
+        
+        # Only stages run directly here are forwarded to self.metrics;
+        # parse_text and remove_duplicates forward their own
+        use_cache = self.cache is not None and not as_table
+        if use_cache:
+            with stats.stage("cache") as record:
+                cached = self.cache.get(file_path, pattern_type)
+                if cached is not None:
+                    record.rows += len(cached)
+            if cached is not None:
+                self._record(stats)
+                self.logger.info(f"Loaded {len(cached)} tasks from cache for {file_path}")
+                return TaskList(cached, stats, pattern_type)
+        
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                text = f.read()
+            with stats.stage("read") as record:
+                text = read_text(file_path, max_bytes=self.max_input_bytes)
+                record.bytes += len(text)
+            self._record(stats)
             
             self.logger.info(f"Successfully read file: {file_path}")
-            tasks = self.parse_text(text, pattern_type)
-            return self.remove_duplicates(tasks, pattern_type)
+            if as_table:
+                tasks = self.parse_text(text, pattern_type, as_table=True)
+            else:
+                tasks = self.parse_text(text, pattern_type)
+            _merge_stats(stats, tasks)
+            tasks = self.remove_duplicates(tasks, pattern_type)
+            _merge_stats(stats, tasks)
+            tasks.stats = stats
+            tasks.pattern_type = pattern_type
+            
+            if use_cache:
+                self.cache.put(file_path, pattern_type, tasks)
+            return tasks
+            
+        except IOError as e:
+            self.logger.error(f"Error reading file {file_path}: {e}")
+            raise
+    
+    def parse_file_mmap(self, file_path: str, pattern_type: str, as_table: bool = False) -> List[ParsedTask]:
+        """
+        Parse a plain ASCII file by matching bytes patterns over an mmap.
+        
+        The file is never decoded as a whole; only the captured fields are.
+        The result is identical to parse_file, which is used instead for
+        compressed files, text outside bytescan.is_ascii_safe, patterns that
+        cannot be matched as bytes, and parsers with a MatchGuard.
+        
+        Args:
+            file_path: Path to the input text file
+            pattern_type: Type of patterns to use, or 'auto' to detect it
+            as_table: Return a columnar TaskTable instead of a list
+            
+        Returns:
+            List of ParsedTask objects, or a TaskTable if as_table is set,
+            carrying ``stats`` and ``pattern_type`` like parse_file
+            
+        Raises:
+            FileNotFoundError: If file doesn't exist
+            InputTooLarge: If the file falls back to parse_file and exceeds
+                max_file_size_mb
+            ValueError: If pattern_type is not supported
+        """
+        try:
+            from .bytescan import bytes_matcher, is_ascii_safe
+        except ImportError:
+            from bytescan import bytes_matcher, is_ascii_safe
+        
+        if not os.path.isfile(file_path):
+            raise FileNotFoundError(f"File not found: {file_path}")
+        
+        stats = ParseStats()
+        if pattern_type == AUTO_PATTERN_TYPE:
+            with stats.stage("detect"):
+                pattern_type = self.detect_pattern_type(file_path).pattern_type
+        if pattern_type not in self.patterns.get_available_types():
+            raise ValueError(f"Unsupported pattern type: {pattern_type}")
+        
+        size = os.path.getsize(file_path)
+        matcher = bytes_matcher(self._get_matcher(pattern_type))
+        if size == 0 or matcher is None or self.guard is not None:
+            return self.parse_file(file_path, pattern_type, as_table)
+        
+        with open(file_path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                with stats.stage("read") as record:
+                    safe = is_ascii_safe(mm)
+                    record.bytes += size
+                if not safe:
+                    self.logger.info(f"{file_path} is not plain ASCII; decoding it")
+                    return self.parse_file(file_path, pattern_type, as_table)
+                self._record(stats)
+                tasks = self._parse_with(matcher, mm, pattern_type, as_table)
+        
+        _merge_stats(stats, tasks)
+        tasks = self.remove_duplicates(tasks, pattern_type)
+        _merge_stats(stats, tasks)
+        tasks.stats = stats
+        tasks.pattern_type = pattern_type
+        return tasks
+    
+    def parse_file_parallel(self, file_path: str, pattern_type: str,
+                            max_workers: Optional[int] = None,
+                            chunk_bytes: Optional[int] = None) -> List[ParsedTask]:
+        """
+        Parse a large UTF-8 file on several cores.
+        
+        The file is memory-mapped and split into newline-aligned byte ranges
+        that are parsed by worker processes and stitched back together in
+        file order. The result is identical to parse_file. Compressed and
+        non-UTF-8 files cannot be split by byte offset, and files with
+        carriage returns need the newline translation of parse_file, so
+        these are parsed with parse_file instead.
+        
+        Args:
+            file_path: Path to the input text file
+            pattern_type: Type of patterns to use, or 'auto' to detect it
+            max_workers: Number of worker processes (None uses all cores)
+            chunk_bytes: Target size of each byte range
             
+        Returns:
+            List of ParsedTask objects
+            
+        Raises:
+            FileNotFoundError: If file doesn't exist
+            InputTooLarge: If the file falls back to parse_file and exceeds
+                max_file_size_mb
+            ValueError: If pattern_type is not supported
+        """
+        try:
+            from .parallel import has_carriage_return, parse_file_parallel
+            from .config import PARALLEL_CHUNK_BYTES
+        except ImportError:
+            from parallel import has_carriage_return, parse_file_parallel
+            from config import PARALLEL_CHUNK_BYTES
+        
+        if not os.path.isfile(file_path):
+            raise FileNotFoundError(f"File not found: {file_path}")
+        compression, encoding = input_format(file_path)
+        if compression or encoding not in ("utf-8", "ascii"):
+            self.logger.info(f"{file_path} is not plain UTF-8; parsing it on one core")
+            return self.parse_file(file_path, pattern_type)
+        if has_carriage_return(file_path):
+            self.logger.info(f"{file_path} has carriage returns; parsing it on one core")
+            return self.parse_file(file_path, pattern_type)
+        if pattern_type == AUTO_PATTERN_TYPE:
+            pattern_type = self.detect_pattern_type(file_path).pattern_type
+        
+        try:
+            tasks, raw_count = parse_file_parallel(
+                file_path, pattern_type, max_workers=max_workers,
+                chunk_bytes=chunk_bytes or PARALLEL_CHUNK_BYTES
+            )
         except IOError as e:
             self.logger.error(f"Error reading file {file_path}: {e}")
             raise
+        
+        self.logger.info(f"Successfully parsed {raw_count} tasks from {file_path} in parallel")
+        removed_count = raw_count - len(tasks)
+        if removed_count > 0:
+            self.logger.info(f"Removed {removed_count} duplicate tasks")
+        return tasks
+    
+    def parse_directory(self, directory: str, pattern_type: str,
+                        max_workers: Optional[int] = None, chunksize: int = 1,
+                        recursive: bool = False,
+                        deduplicator: Optional['Deduplicator'] = None) -> Dict[str, List[ParsedTask]]:
+        """
+        Parse every supported input file in a directory over a process pool.
+        
+        Args:
+            directory: Directory containing input text files
+            pattern_type: Type of patterns to use, or 'auto' to detect it
+                for each file
+            max_workers: Number of worker processes (None uses all cores)
+            chunksize: Number of files handed to a worker at a time
+            recursive: Whether to include files in subdirectories
+            deduplicator: Deduplication stage to use across files
+            
+        Returns:
+            Mapping of file path to its tasks in sorted path order, with
+            tasks already seen in an earlier file removed
+            
+        Raises:
+            NotADirectoryError: If directory doesn't exist
+            ValueError: If pattern_type is not supported
+        """
+        try:
+            from .batch import find_input_files, parse_files
+        except ImportError:
+            from batch import find_input_files, parse_files
+        
+        file_paths = find_input_files(directory, recursive=recursive)
+        self.logger.info(f"Parsing {len(file_paths)} files from {directory}")
+        
+        results = parse_files(file_paths, pattern_type, max_workers=max_workers,
+                              chunksize=chunksize, log_level=self.logger.level,
+                              deduplicator=deduplicator, max_bytes=self.max_input_bytes)
+        
+        total = sum(len(tasks) for tasks in results.values())
+        self.logger.info(f"Successfully parsed {total} tasks from {len(results)} files")
+        return results
     
-    def save_to_csv(self, tasks: List[ParsedTask], output_path: str, 
-                   format_type: str = "original", include_headers: bool = True) -> None:
+    def save_to_csv(self, tasks: Iterable[ParsedTask], output_path: str, 
+                   format_type: str = "original", include_headers: bool = True,
+                   append: bool = False, include_parts: bool = False) -> None:
         """
         Save parsed tasks to CSV file.
         
+        A new file is written next to output_path and renamed into place, so
+        a failed write leaves any previous file untouched; a failed append is
+        rolled back. Paths ending in .gz, .xz or .lzma are compressed.
+        
         Args:
-            tasks: List of ParsedTask objects to save
+            tasks: ParsedTask objects to save; a generator such as iter_file()
+                is consumed lazily, so the pipeline streams end to end
             output_path: Path for output CSV file
             format_type: Format type for output
             include_headers: Whether to include column headers
+            append: Add rows to the end of an existing file; headers are only
+                written if the file is new or empty
+            include_parts: Add columns for the proponent code, name and level
+                and the task school, echelon and number
             
         Raises:
             IOError: If file cannot be written
         """
         try:
-            with open(output_path, 'w', newline='', encoding='utf-8') as csvfile:
-                writer = csv.writer(csvfile)
-                
-                # Add headers if requested
-                if include_headers:
-                    if format_type == "original":
-                        headers = ["Step", "Task", "Title", "Proponent", "Status"]
-                    elif format_type == "drill":
-                        headers = ["Step", "Status", "Verb", "Title"]
-                    else:
-                        headers = ["Step", "Task", "Title", "Proponent", "Status"]
-                    writer.writerow(headers)
-                
-                # Write task data
-                for task in tasks:
-                    writer.writerow(task.to_list(format_type))
+            from .writer import write_csv
+        except ImportError:
+            from writer import write_csv
+        
+        stats = ParseStats()
+        try:
+            with stats.stage("write") as record:
+                count, nbytes = write_csv(tasks, output_path, format_type, include_headers,
+                                          append, include_parts)
+                record.rows += count
+                record.bytes += nbytes
+            self._record(stats)
             
-            self.logger.info(f"Successfully saved {len(tasks)} tasks to {output_path}")
+            self.logger.info(f"Successfully saved {count} tasks to {output_path}")
             
         except IOError as e:
             self.logger.error(f"Error writing to file {output_path}: {e}")
             raise
+    
+    def save_to_store(self, tasks: Iterable[ParsedTask], store: 'TaskStore',
+                      format_type: str = "original", source: Optional[str] = None) -> int:
+        """
+        Upsert parsed tasks into a TaskStore database.
+        
+        Args:
+            tasks: ParsedTask objects to save, consumed lazily
+            store: Open TaskStore to write to
+            format_type: Pattern type the tasks were parsed with
+            source: Input file the tasks came from, if any
+            
+        Returns:
+            Number of tasks written
+        """
+        stats = ParseStats()
+        with stats.stage("store") as record:
+            count = store.add(tasks, format_type, source)
+            record.rows += count
+        self._record(stats)
+        return count
+
+    def save_to_index(self, tasks: Iterable[ParsedTask], index: 'TitleIndex',
+                      format_type: str = "original") -> int:
+        """
+        Add parsed tasks to a TitleIndex for word search over their titles.
+        
+        Args:
+            tasks: ParsedTask objects to index, consumed lazily
+            index: Open TitleIndex to add to
+            format_type: Pattern type the tasks were parsed with
+            
+        Returns:
+            Number of tasks added; tasks already in the index are skipped
+        """
+        stats = ParseStats()
+        with stats.stage("index") as record:
+            count = index.add(tasks, format_type)
+            record.rows += count
+        self._record(stats)
+        return count
+
+
+def _merge_stats(stats: ParseStats, result: Any) -> None:
+    """Add the stats carried by a result, if any, to stats."""
+    carried = getattr(result, 'stats', None)
+    if carried is not None:
+        stats.merge(carried)
+
+
+def _task_table_class() -> type:
+    """Import TaskTable lazily; its module depends on this one."""
+    try:
+        from .task_table import TaskTable
+    except ImportError:
+        from task_table import TaskTable
+    return TaskTable
+
+
+def _deduplicator_class() -> type:
+    """Import Deduplicator lazily; its module depends on this one."""
+    try:
+        from .dedup import Deduplicator
+    except ImportError:
+        from dedup import Deduplicator
+    return Deduplicator
 
 
 def generate_output_filename(input_path: str, suffix: str = "parsed") -> str:
@@ -233,14 +1067,61 @@ def generate_output_filename(input_path: str, suffix: str = "parsed") -> str:
     Returns:
         Generated output filename
     """
-    base_name = os.path.splitext(os.path.basename(input_path))[0]
+    base_name = os.path.splitext(os.path.basename(strip_compression_extension(input_path)))[0]
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     return f"{base_name}_{suffix}_{timestamp}.csv"
 
 
+def build_cli() -> argparse.ArgumentParser:
+    """Build the argument parser for the ``data-analyzer`` command."""
+    try:
+        from . import batch, diff, incremental, registry, store, title_index, watch
+    except ImportError:
+        import batch
+        import diff
+        import incremental
+        import registry
+        import store
+        import title_index
+        import watch
+    
+    cli = argparse.ArgumentParser(
+        prog="data-analyzer",
+        description="Parse military task data from text files. "
+                    "Run without a command for interactive mode."
+    )
+    subparsers = cli.add_subparsers(dest="command")
+    batch.register_cli(subparsers)
+    incremental.register_cli(subparsers)
+    watch.register_cli(subparsers)
+    registry.register_cli(subparsers)
+    store.register_cli(subparsers)
+    diff.register_cli(subparsers)
+    title_index.register_cli(subparsers)
+    return cli
+
+
 # Example usage and backwards compatibility
-def main():
+def main(argv: Optional[List[str]] = None):
     """Main function for command-line usage."""
+    if argv is None:
+        argv = sys.argv[1:]
+    
+    if argv:
+        cli = build_cli()
+        args = cli.parse_args(argv)
+        if not getattr(args, "func", None):
+            cli.print_help()
+            return 1
+        try:
+            return args.func(args)
+        except (FileNotFoundError, NotADirectoryError, IOError, ValueError) as e:
+            print(f"Error: {e}")
+            return 1
+        except KeyboardInterrupt:
+            print("\nOperation cancelled by user.")
+            return 1
+    
     parser = TaskParser()
     
     try:
@@ -250,14 +1131,16 @@ def main():
         # Get pattern type
         available_types = TaskPatternConfig.get_available_types()
         print(f"Available pattern types: {', '.join(available_types)}")
-        pattern_choice = input("Enter pattern type (original/drill): ").strip().lower()
+        pattern_choice = input(f"Enter pattern type (original/drill/{AUTO_PATTERN_TYPE}): ").strip().lower()
         
-        if pattern_choice not in available_types:
-            print(f"Error: Invalid pattern type. Choose from: {', '.join(available_types)}")
+        if pattern_choice not in available_types + [AUTO_PATTERN_TYPE]:
+            print(f"Error: Invalid pattern type. Choose from: "
+                  f"{', '.join(available_types + [AUTO_PATTERN_TYPE])}")
             return
         
         # Parse tasks
         tasks = parser.parse_file(input_file, pattern_choice)
+        pattern_choice = tasks.pattern_type
         
         if not tasks:
             print("No tasks found with the specified patterns.")
@@ -280,4 +1163,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
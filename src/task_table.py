@@ -0,0 +1,241 @@
+"""
+Task Table Module
+
+A columnar container for large parse results. Every ParsedTask field is
+stored as a dictionary-encoded column: an array of integer codes plus one
+interned copy of each distinct value. Millions of rows then cost a few bytes
+per field instead of a Python object per task.
+
+Author: Jonathan Legro
+Date: 2025-08-01
+"""
+
+import sys
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+try:
+    from .fields import PART_FIELDS, lookup_table
+    from .task_parser import ParsedTask, TaskMatcher
+except ImportError:
+    from fields import PART_FIELDS, lookup_table
+    from task_parser import ParsedTask, TaskMatcher
+
+
+def _analytics():
+    """Import the analytics module lazily; it depends on this one."""
+    try:
+        from . import analytics
+    except ImportError:
+        import analytics
+    return analytics
+
+
+class _Column:
+    """Dictionary-encoded column of strings."""
+    
+    __slots__ = ('values', 'index', 'codes')
+    
+    def __init__(self, values: Optional[List[str]] = None,
+                 index: Optional[Dict[str, int]] = None,
+                 codes: Optional[array] = None):
+        self.values = values if values is not None else []
+        self.index = index if index is not None else {}
+        self.codes = codes if codes is not None else array('I')
+    
+    def encode(self, value: str) -> int:
+        """Return the code for a value, adding it to the dictionary if new."""
+        code = self.index.get(value)
+        if code is None:
+            code = len(self.values)
+            value = sys.intern(value)
+            self.values.append(value)
+            self.index[value] = code
+        return code
+    
+    def take(self, codes: array) -> '_Column':
+        """Return a column over the given codes sharing this dictionary."""
+        return _Column(self.values, self.index, codes)
+
+
+class TaskTable:
+    """
+    Columnar, dictionary-encoded collection of parsed tasks.
+    
+    A TaskTable can be used wherever a list of ParsedTask objects is
+    iterated: iteration and integer indexing materialize ParsedTask rows on
+    demand, while slicing returns another TaskTable sharing the same value
+    dictionaries.
+    """
+    
+    FIELDS = TaskMatcher.FIELDS
+    
+    # ParseStats and pattern type of the call that built the table, set by TaskParser
+    stats = None
+    pattern_type = None
+    
+    def __init__(self, tasks: Iterable[ParsedTask] = ()):
+        """Initialize the table, optionally filling it from ParsedTask objects."""
+        self._columns = [_Column() for _ in self.FIELDS]
+        self.extend(tasks)
+    
+    @classmethod
+    def from_values(cls, rows: Iterable[Sequence[str]]) -> 'TaskTable':
+        """Build a table from field value tuples in FIELDS order."""
+        table = cls()
+        for values in rows:
+            table.append_values(values)
+        return table
+    
+    @classmethod
+    def _from_columns(cls, columns: List[_Column]) -> 'TaskTable':
+        """Build a table around existing columns."""
+        table = cls.__new__(cls)
+        table._columns = columns
+        return table
+    
+    def append_values(self, values: Sequence[str]) -> None:
+        """Append one row given as field values in FIELDS order."""
+        for column, value in zip(self._columns, values):
+            column.codes.append(column.encode(value))
+    
+    def append(self, task: ParsedTask) -> None:
+        """Append one ParsedTask."""
+        self.append_values([getattr(task, field) for field in self.FIELDS])
+    
+    def extend(self, tasks: Iterable[ParsedTask]) -> None:
+        """Append several ParsedTask objects."""
+        for task in tasks:
+            self.append(task)
+    
+    def __len__(self) -> int:
+        return len(self._columns[0].codes)
+    
+    def __iter__(self) -> Iterator[ParsedTask]:
+        for values in zip(*(self.column(field) for field in self.FIELDS)):
+            yield ParsedTask(*values)
+    
+    def __getitem__(self, key: Union[int, slice]) -> Union[ParsedTask, 'TaskTable']:
+        if isinstance(key, slice):
+            return self._from_columns([column.take(column.codes[key]) for column in self._columns])
+        return ParsedTask(*(column.values[column.codes[key]] for column in self._columns))
+    
+    def __repr__(self) -> str:
+        return f"TaskTable(rows={len(self)})"
+    
+    def column(self, field: str) -> List[str]:
+        """
+        Get the decoded values of one field.
+        
+        Args:
+            field: A ParsedTask field, or a decomposed part such as
+                'proponent_code' (see fields.PART_FIELDS)
+        
+        Raises:
+            KeyError: If field is not a ParsedTask field or part
+        """
+        codes, values = self.encoded(field)
+        return [values[code] for code in codes]
+    
+    def _part_column(self, part: str) -> _Column:
+        """
+        Get a decomposed part as a column sharing the source field's codes.
+        
+        Only the distinct values of the source column are decomposed.
+        """
+        source, attribute = PART_FIELDS[part]
+        column = self._columns[self.FIELDS.index(source)]
+        table = lookup_table(source)
+        values = [getattr(table.get(value), attribute) for value in column.values]
+        return _Column(values, None, column.codes)
+    
+    def encoded(self, field: str) -> Tuple[array, List[str]]:
+        """
+        Get one field without decoding it: its integer codes and the values
+        they index.
+        
+        The codes array is the table's own buffer, not a copy. Values are
+        distinct for ParsedTask fields; a decomposed part can repeat a value,
+        since several source values may share it.
+        
+        Raises:
+            KeyError: If field is not a ParsedTask field or part
+        """
+        if field in PART_FIELDS:
+            column = self._part_column(field)
+        elif field in self.FIELDS:
+            column = self._columns[self.FIELDS.index(field)]
+        else:
+            raise KeyError(f"Unknown field: {field}")
+        return column.codes, column.values
+    
+    def to_numpy(self, fields: Optional[Sequence[str]] = None) -> Dict[str, Tuple]:
+        """
+        Export columns as numpy arrays; see analytics.to_numpy.
+        
+        Requires the 'analytics' extra (numpy).
+        """
+        return _analytics().to_numpy(self, fields)
+    
+    def to_dataframe(self, fields: Optional[Sequence[str]] = None, include_parts: bool = False):
+        """
+        Export the table as a pandas DataFrame of categorical columns; see
+        analytics.to_dataframe.
+        
+        Requires the 'analytics' extra (pandas and numpy).
+        """
+        return _analytics().to_dataframe(self, fields, include_parts)
+    
+    def distinct(self, field: str) -> List[str]:
+        """Get the distinct values seen in one field, in first-seen order."""
+        if field not in self.FIELDS:
+            raise KeyError(f"Unknown field: {field}")
+        return list(self._columns[self.FIELDS.index(field)].values)
+    
+    def _format_columns(self, format_type: str) -> List[_Column]:
+        """Get the columns making up a row in the given format."""
+        names = ParsedTask.FORMAT_FIELDS.get(format_type, ParsedTask.FORMAT_FIELDS['original'])
+        return [self._columns[self.FIELDS.index(name)] for name in names]
+    
+    def rows(self, format_type: str = "original", include_parts: bool = False) -> Iterator[List[str]]:
+        """
+        Iterate over rows as lists in the given output format.
+        
+        Args:
+            format_type: Output format
+            include_parts: Append the decomposed parts, as ParsedTask.to_list
+        """
+        columns = self._format_columns(format_type)
+        if include_parts:
+            columns += [self._part_column(part) for part in PART_FIELDS]
+        decoded = [[column.values[code] for code in column.codes] for column in columns]
+        for row in zip(*decoded):
+            yield list(row)
+    
+    def to_list(self, format_type: str = "original") -> List[List[str]]:
+        """Get all rows as lists in the given output format."""
+        return list(self.rows(format_type))
+    
+    def to_tasks(self) -> List[ParsedTask]:
+        """Materialize the table as a list of ParsedTask objects."""
+        return list(self)
+    
+    def drop_duplicates(self, format_type: str = "original") -> 'TaskTable':
+        """
+        Remove duplicate rows, keeping first occurrences.
+        
+        Rows are compared on their integer codes, which is equivalent to
+        comparing the strings because every column has a single dictionary.
+        """
+        code_columns = [column.codes for column in self._format_columns(format_type)]
+        keep = []
+        seen = set()
+        for row_index, key in enumerate(zip(*code_columns)):
+            if key not in seen:
+                seen.add(key)
+                keep.append(row_index)
+        
+        return self._from_columns([
+            column.take(array('I', (column.codes[i] for i in keep)))
+            for column in self._columns
+        ])
@@ -0,0 +1,614 @@
+"""
+Title Index Module
+
+On-disk inverted index over task titles, so parsed results can be searched
+by word without scanning CSV exports. Titles are split into lower-case word
+tokens, and each token maps to the sorted ids of the rows whose title
+contains it.
+
+An index is a directory holding an append-only row file and a few
+immutable segment files. Each add writes new segments and leaves the
+existing ones untouched; once there are more than max_segments they are
+merged into one. Segments are memory-mapped: a lookup binary-searches a
+sorted term table and decodes a single postings list, so a query only
+touches the pages of the terms it names.
+
+Author: Jonathan Legro
+Date: 2025-08-01
+"""
+
+import argparse
+import csv
+import heapq
+import json
+import logging
+import mmap
+import os
+import re
+import shutil
+import struct
+import sys
+from array import array
+from collections import defaultdict
+from itertools import accumulate, chain, groupby, islice
+from operator import itemgetter, sub
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+try:
+    from .config import (AUTO_PATTERN_TYPE, INDEX_DIR, INDEX_MAX_SEGMENTS,
+                         INDEX_SEGMENT_ROWS)
+    from .dedup import Deduplicator, DigestFile
+    from .task_parser import ParsedTask, TaskMatcher, TaskParser, TaskPatternConfig
+except ImportError:
+    from config import (AUTO_PATTERN_TYPE, INDEX_DIR, INDEX_MAX_SEGMENTS,
+                        INDEX_SEGMENT_ROWS)
+    from dedup import Deduplicator, DigestFile
+    from task_parser import ParsedTask, TaskMatcher, TaskParser, TaskPatternConfig
+
+
+logger = logging.getLogger(__name__)
+
+FIELDS = TaskMatcher.FIELDS
+
+_TOKEN = re.compile(r"[^\W_]+")
+# Rows are stored one JSON array of FIELDS values per line
+_encode_row = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+
+# Magic, byte order, term count, first row id, row count
+_HEADER = struct.Struct("<8sB7xQQQ")
+_MAGIC = b"TASKIDX1"
+# Tables are written in native byte order, which the header records
+_BYTE_ORDER = 0 if sys.byteorder == "little" else 1
+
+# Array type codes of the postings widths, narrowest first
+_WIDTHS = {1: 'B', 2: 'H', 4: 'I'}
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lower-case word tokens."""
+    return _TOKEN.findall(text.lower())
+
+
+def _padded(size: int) -> int:
+    """Round a section size up to a multiple of 8 bytes."""
+    return size + (-size % 8)
+
+
+def _pack_deltas(ids: Sequence[int], base: int) -> array:
+    """Delta-encode sorted row ids in the narrowest array that holds the gaps."""
+    deltas = array('I', map(sub, ids, chain((base,), ids)))
+    largest = max(deltas)
+    for width, code in _WIDTHS.items():
+        if largest < 1 << (8 * width):
+            return array(code, deltas)
+    return deltas
+
+
+def write_segment(path: Union[str, Path], postings: Iterable[Tuple[bytes, Sequence[int]]],
+                  base: int, rows: int) -> None:
+    """
+    Write a segment file atomically.
+
+    Layout after the header: term offsets, postings offsets, postings
+    counts, postings widths, the concatenated UTF-8 terms, then each
+    token's postings as the gaps between its row ids, packed as 1, 2 or
+    4-byte integers depending on the largest gap.
+
+    Args:
+        path: Segment file to write
+        postings: (UTF-8 term, sorted row ids) pairs in term byte order
+        base: First row id covered by the segment
+        rows: Number of rows covered by the segment
+    """
+    path = str(path)
+    term_offsets = array('Q', [0])
+    postings_offsets = array('Q')
+    counts = array('I')
+    widths = array('B')
+    terms = bytearray()
+
+    postings_path = path + ".postings.tmp"
+    temp_path = path + ".tmp"
+    try:
+        with open(postings_path, "w+b") as postings_file:
+            position = 0
+            for term, ids in postings:
+                packed = _pack_deltas(ids, base)
+                padding = -position % packed.itemsize
+                postings_file.write(b"\0" * padding)
+                position += padding
+                terms += term
+                term_offsets.append(len(terms))
+                postings_offsets.append(position)
+                counts.append(len(ids))
+                widths.append(packed.itemsize)
+                packed.tofile(postings_file)
+                position += len(packed) * packed.itemsize
+
+            postings_file.seek(0)
+            with open(temp_path, "wb") as out:
+                out.write(_HEADER.pack(_MAGIC, _BYTE_ORDER, len(counts), base, rows))
+                for table in (term_offsets, postings_offsets, counts, widths, terms):
+                    data = bytes(table) if isinstance(table, bytearray) else table.tobytes()
+                    out.write(data + b"\0" * (_padded(len(data)) - len(data)))
+                shutil.copyfileobj(postings_file, out)
+        os.replace(temp_path, path)
+    finally:
+        for leftover in (postings_path, temp_path):
+            if os.path.exists(leftover):
+                os.remove(leftover)
+
+
+class Segment:
+    """Read-only, memory-mapped view of one segment file."""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = str(path)
+        self._file = open(self.path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, order, count, self.base, self.rows = _HEADER.unpack_from(self._mm)
+        except struct.error:
+            magic = None
+        if magic != _MAGIC:
+            self.close()
+            raise ValueError(f"Not an index segment: {self.path}")
+        if order != _BYTE_ORDER:
+            self.close()
+            raise ValueError(f"Index segment {self.path} was written on a machine "
+                             f"with a different byte order")
+
+        self.term_count = count
+        self._view = memoryview(self._mm)
+        position = _HEADER.size
+        self._tables = []
+        for code, length in (('Q', count + 1), ('Q', count), ('I', count), ('B', count)):
+            size = length * array(code).itemsize
+            self._tables.append(self._view[position:position + size].cast(code))
+            position += _padded(size)
+        self._term_offsets, self._postings_offsets, self._counts, self._widths = self._tables
+        self._terms_start = position
+        self._postings_start = position + _padded(self._term_offsets[count])
+
+    def term(self, index: int) -> bytes:
+        """Return the UTF-8 term at a position of the sorted term table."""
+        start = self._terms_start
+        return self._mm[start + self._term_offsets[index]:start + self._term_offsets[index + 1]]
+
+    def _lower_bound(self, term: bytes) -> int:
+        """Position of the first term not less than term."""
+        low, high = 0, self.term_count
+        while low < high:
+            middle = (low + high) // 2
+            if self.term(middle) < term:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def find(self, term: bytes) -> Optional[int]:
+        """Return the position of a term, or None if no row contains it."""
+        index = self._lower_bound(term)
+        if index < self.term_count and self.term(index) == term:
+            return index
+        return None
+
+    def with_prefix(self, prefix: bytes) -> Iterator[int]:
+        """Yield the positions of the terms starting with prefix."""
+        index = self._lower_bound(prefix)
+        while index < self.term_count and self.term(index).startswith(prefix):
+            yield index
+            index += 1
+
+    def count(self, index: int) -> int:
+        """Number of rows containing the term at a position."""
+        return self._counts[index]
+
+    def ids(self, index: int) -> List[int]:
+        """Decode the sorted row ids of the term at a position."""
+        width = self._widths[index]
+        start = self._postings_start + self._postings_offsets[index]
+        with self._view[start:start + width * self._counts[index]] as raw:
+            with raw.cast(_WIDTHS[width]) as deltas:
+                return list(islice(accumulate(deltas, initial=self.base), 1, None))
+
+    def entries(self, order: int) -> Iterator[Tuple[bytes, int, int]]:
+        """Yield (term, order, position) for every term, for merging segments."""
+        for index in range(self.term_count):
+            yield self.term(index), order, index
+
+    def close(self) -> None:
+        """Release the table views and unmap the file."""
+        for view in getattr(self, '_tables', ()):
+            view.release()
+        if getattr(self, '_view', None) is not None:
+            self._view.release()
+            self._view = None
+        self._mm.close()
+        self._file.close()
+
+
+class TitleIndex:
+    """
+    Incrementally updated inverted index of task titles.
+
+    Rows are added once: tasks already indexed (by the digest of their
+    format_type columns, as in remove_duplicates) are skipped, so indexing
+    a file again adds only its new tasks. One process should write to an
+    index at a time.
+
+    Example:
+        with TitleIndex("data/title_index") as index:
+            index.add(parser.parse_file("export.txt", "original"))
+            tasks = index.search("direct fire OR recon*")
+    """
+
+    MANIFEST = "index.json"
+    ROWS = "rows.jsonl"
+    ROW_OFFSETS = "rows.offsets"
+    KEYS = "keys.digests"
+
+    def __init__(self, path: Union[str, Path] = INDEX_DIR,
+                 segment_rows: int = INDEX_SEGMENT_ROWS,
+                 max_segments: int = INDEX_MAX_SEGMENTS):
+        """
+        Open or create an index.
+
+        Args:
+            path: Index directory
+            segment_rows: Rows per segment written by add(); bounds the
+                postings held in memory while indexing
+            max_segments: Segments are merged into one above this
+        """
+        self.path = Path(path)
+        self.segment_rows = segment_rows
+        self.max_segments = max_segments
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._manifest = self._load_manifest()
+        self._segments: List[Segment] = []
+        self._row_maps: List[mmap.mmap] = []
+        self._row_files = []
+        self._offsets = None
+        self._open()
+
+    def _load_manifest(self) -> Dict:
+        """Read the manifest, or start an empty one."""
+        try:
+            with open(self.path / self.MANIFEST, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"rows": 0, "segments": [], "next_segment": 0}
+
+    def _save_manifest(self, manifest: Dict) -> None:
+        """Write the manifest atomically; this commits an update."""
+        temp_path = self.path / (self.MANIFEST + ".tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        os.replace(temp_path, self.path / self.MANIFEST)
+        self._manifest = manifest
+
+    def _commit(self, manifest: Dict) -> None:
+        """Save a new manifest and map the files it lists."""
+        self.close()
+        try:
+            self._save_manifest(manifest)
+        finally:
+            self._open()
+
+    def _open(self) -> None:
+        """Map the committed segments and rows."""
+        self._segments = [Segment(self.path / segment["name"]) for segment in self._manifest["segments"]]
+        if not self._manifest["rows"]:
+            return
+        for name in (self.ROWS, self.ROW_OFFSETS):
+            handle = open(self.path / name, "rb")
+            self._row_files.append(handle)
+            self._row_maps.append(mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ))
+        self._offsets = memoryview(self._row_maps[1])[:8 * (self._manifest["rows"] + 1)].cast('Q')
+
+    def close(self) -> None:
+        """Unmap the index files."""
+        if self._offsets is not None:
+            self._offsets.release()
+            self._offsets = None
+        for item in self._segments + self._row_maps + self._row_files:
+            item.close()
+        self._segments, self._row_maps, self._row_files = [], [], []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __len__(self) -> int:
+        """Return the number of indexed rows."""
+        return self._manifest["rows"]
+
+    @property
+    def segment_count(self) -> int:
+        """Number of segment files in the index."""
+        return len(self._manifest["segments"])
+
+    def _truncate_rows(self) -> int:
+        """
+        Drop row data left behind by an add that was never committed.
+
+        Returns:
+            End offset of the committed rows in the row file
+        """
+        rows = self._manifest["rows"]
+        offsets_path, rows_path = self.path / self.ROW_OFFSETS, self.path / self.ROWS
+        if not offsets_path.exists():
+            with open(offsets_path, "wb") as f:
+                array('Q', [0]).tofile(f)
+        with open(offsets_path, "r+b") as f:
+            f.truncate(8 * (rows + 1))
+            f.seek(8 * rows)
+            end = array('Q', f.read(8))[0]
+        with open(rows_path, "ab") as f:
+            f.truncate(end)
+        return end
+
+    def add(self, tasks: Iterable[ParsedTask], format_type: str = "original") -> int:
+        """
+        Index tasks that are not in the index yet.
+
+        Args:
+            tasks: ParsedTask objects or a TaskTable; consumed lazily
+            format_type: Pattern type the tasks were parsed with, which
+                selects the columns that identify a task
+
+        Returns:
+            Number of rows added
+        """
+        manifest = dict(self._manifest, segments=list(self._manifest["segments"]))
+        dedup = Deduplicator(format_type, DigestFile(str(self.path / self.KEYS)))
+        written = []
+        try:
+            offset = self._truncate_rows()
+            row = first = segment_start = manifest["rows"]
+            postings: Dict[str, array] = defaultdict(lambda: array('I'))
+            with open(self.path / self.ROWS, "ab") as rows_file, \
+                    open(self.path / self.ROW_OFFSETS, "ab") as offsets_file:
+                offsets = array('Q')
+                for task in dedup.filter(tasks):
+                    line = _encode_row([getattr(task, field) for field in FIELDS]).encode("utf-8") + b"\n"
+                    rows_file.write(line)
+                    offset += len(line)
+                    offsets.append(offset)
+                    for token in set(tokenize(task.title)):
+                        postings[token].append(row)
+                    row += 1
+                    if row - segment_start >= self.segment_rows:
+                        written.append(self._write_postings(manifest, postings, segment_start, row))
+                        offsets.tofile(offsets_file)
+                        offsets = array('Q')
+                        postings.clear()
+                        segment_start = row
+                if row > segment_start:
+                    written.append(self._write_postings(manifest, postings, segment_start, row))
+                offsets.tofile(offsets_file)
+        except BaseException:
+            for name in written:
+                os.remove(self.path / name)
+            dedup.store.close()
+            raise
+
+        if row > first:
+            manifest["rows"] = row
+            self._commit(manifest)
+        dedup.close()
+        logger.info(f"Indexed {row - first} tasks in {self.path}")
+        if self.segment_count > self.max_segments:
+            self.compact()
+        return row - first
+
+    def _write_postings(self, manifest: Dict, postings: Dict[str, array],
+                        start: int, end: int) -> str:
+        """Write one segment of in-memory postings and record it in manifest."""
+        name = f"segment-{manifest['next_segment']:06d}.idx"
+        manifest["next_segment"] += 1
+        ordered = sorted((token.encode("utf-8"), ids) for token, ids in postings.items())
+        write_segment(self.path / name, ordered, start, end - start)
+        manifest["segments"].append({"name": name, "base": start, "rows": end - start})
+        return name
+
+    def compact(self) -> None:
+        """Merge every segment into one."""
+        if self.segment_count <= 1:
+            return
+        manifest = dict(self._manifest)
+        name = f"segment-{manifest['next_segment']:06d}.idx"
+        manifest["next_segment"] += 1
+        segments = self._segments
+        merged = heapq.merge(*(segment.entries(order) for order, segment in enumerate(segments)))
+        postings = ((term, [row for _, order, index in entries for row in segments[order].ids(index)])
+                    for term, entries in groupby(merged, key=itemgetter(0)))
+        base = segments[0].base
+        write_segment(self.path / name, postings, base, manifest["rows"] - base)
+
+        old = [segment["name"] for segment in manifest["segments"]]
+        manifest["segments"] = [{"name": name, "base": base, "rows": manifest["rows"] - base}]
+        self._commit(manifest)
+        for old_name in old:
+            os.remove(self.path / old_name)
+        logger.info(f"Merged {len(old)} index segments into {name}")
+
+    def _postings(self, term: str) -> List[int]:
+        """Row ids of an exact token, across segments."""
+        key = term.encode("utf-8")
+        ids = []
+        for segment in self._segments:
+            index = segment.find(key)
+            if index is not None:
+                ids.extend(segment.ids(index))
+        return ids
+
+    def _count(self, term: str) -> int:
+        """Number of rows containing an exact token, without decoding them."""
+        key = term.encode("utf-8")
+        total = 0
+        for segment in self._segments:
+            index = segment.find(key)
+            if index is not None:
+                total += segment.count(index)
+        return total
+
+    def lookup(self, word: str) -> List[int]:
+        """
+        Find the rows whose title contains a word.
+
+        A word that splits into several tokens, e.g. 'anti-armor', matches
+        rows containing all of them.
+
+        Returns:
+            Sorted row ids
+        """
+        return self.all_of(tokenize(word))
+
+    def prefix(self, prefix: str) -> List[int]:
+        """
+        Find the rows whose title contains a token starting with prefix.
+
+        Returns:
+            Sorted row ids
+        """
+        tokens = tokenize(prefix)
+        if not tokens:
+            return []
+        key = tokens[-1].encode("utf-8")
+        matches = set()
+        for segment in self._segments:
+            for index in segment.with_prefix(key):
+                matches.update(segment.ids(index))
+        if len(tokens) > 1:
+            matches.intersection_update(self.all_of(tokens[:-1]))
+        return sorted(matches)
+
+    def all_of(self, words: Iterable[str]) -> List[int]:
+        """
+        Find the rows whose title contains every word.
+
+        Postings are intersected from the rarest token up, and the search
+        stops as soon as the intersection is empty.
+
+        Returns:
+            Sorted row ids
+        """
+        tokens = sorted(set(chain.from_iterable(tokenize(word) for word in words)), key=self._count)
+        if not tokens:
+            return []
+        result = set(self._postings(tokens[0]))
+        for token in tokens[1:]:
+            if not result:
+                break
+            result.intersection_update(self._postings(token))
+        return sorted(result)
+
+    def any_of(self, words: Iterable[str]) -> List[int]:
+        """
+        Find the rows whose title contains at least one of the words.
+
+        Returns:
+            Sorted row ids
+        """
+        result = set()
+        for word in words:
+            result.update(self.lookup(word))
+        return sorted(result)
+
+    def search_ids(self, query: str) -> List[int]:
+        """
+        Run a query and return the sorted ids of the matching rows.
+
+        Words are combined with AND, clauses separated by an upper-case OR
+        with OR, and a word ending in * matches every token it prefixes,
+        e.g. 'direct fire OR recon*'. Matching ignores case and punctuation.
+        """
+        result = set()
+        for clause in re.split(r"\s+OR\s+", query.strip()):
+            words = clause.split()
+            if not words:
+                continue
+            prefixes = [word for word in words if word.endswith("*")]
+            exact = [word for word in words if not word.endswith("*")]
+            matches = set(self.all_of(exact)) if exact else None
+            for word in prefixes:
+                if matches is not None and not matches:
+                    break
+                found = self.prefix(word.rstrip("*"))
+                matches = set(found) if matches is None else matches.intersection(found)
+            result.update(matches)
+        return sorted(result)
+
+    def rows(self, ids: Iterable[int]) -> List[ParsedTask]:
+        """Load the tasks of row ids."""
+        tasks = []
+        rows_map, offsets = (self._row_maps[0] if self._row_maps else None), self._offsets
+        for row in ids:
+            if not 0 <= row < len(self):
+                raise IndexError(f"Row id {row} is not in the index")
+            tasks.append(ParsedTask(*json.loads(rows_map[offsets[row]:offsets[row + 1]])))
+        return tasks
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[ParsedTask]:
+        """
+        Run a query (see search_ids) and load the matching tasks.
+
+        Args:
+            query: Words, OR and prefix* terms
+            limit: Maximum number of tasks returned
+
+        Returns:
+            Matching tasks in the order they were indexed
+        """
+        return self.rows(self.search_ids(query)[:limit])
+
+
+def register_cli(subparsers) -> None:
+    """Register the ``index`` command with the command-line interface."""
+    command = subparsers.add_parser("index", help="Index task titles and search them by word")
+    command.add_argument("--index", default=str(INDEX_DIR), help="Index directory")
+    actions = command.add_subparsers(dest="action", required=True)
+
+    add = actions.add_parser("add", help="Parse input files and index their new tasks")
+    add.add_argument("inputs", nargs="+", help="Input text files")
+    add.add_argument("-t", "--type", dest="pattern_type", default=AUTO_PATTERN_TYPE,
+                     choices=TaskPatternConfig.get_available_types() + [AUTO_PATTERN_TYPE],
+                     help="Pattern type to use")
+    add.set_defaults(func=run_index_add)
+
+    search = actions.add_parser("search", help="Print tasks whose titles match a query as CSV")
+    search.add_argument("query", help="Words to match, e.g. 'direct fire OR recon*'")
+    search.add_argument("--limit", type=int, help="Maximum number of tasks")
+    search.add_argument("--count", action="store_true", help="Only print the number of matches")
+    search.set_defaults(func=run_index_search)
+
+
+def run_index_add(args: argparse.Namespace) -> int:
+    """Run the ``index add`` command."""
+    parser = TaskParser()
+    total = 0
+    with TitleIndex(args.index) as index:
+        for path in args.inputs:
+            tasks = parser.parse_file(path, args.pattern_type)
+            total += parser.save_to_index(tasks, index, tasks.pattern_type)
+        print(f"Indexed {total} new tasks from {len(args.inputs)} files; "
+              f"{len(index)} tasks in '{args.index}'")
+    return 0
+
+
+def run_index_search(args: argparse.Namespace) -> int:
+    """Run the ``index search`` command."""
+    with TitleIndex(args.index) as index:
+        ids = index.search_ids(args.query)
+        if args.count:
+            print(len(ids))
+            return 0
+        writer = csv.writer(sys.stdout)
+        writer.writerow([field.capitalize() for field in FIELDS])
+        for task in index.rows(ids[:args.limit]):
+            writer.writerow([getattr(task, field) for field in FIELDS])
+    return 0
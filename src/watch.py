@@ -0,0 +1,349 @@
+"""
+Watch Mode Module
+
+Long-running mode that watches an input directory and re-parses files as
+they change. Changes are detected with inotify on Linux, or by polling the
+directory with one scandir pass per interval elsewhere. Bursts of writes are
+debounced, changed files are parsed in a worker pool, and every output CSV
+is replaced atomically.
+
+Author: Jonathan Legro
+Date: 2025-08-01
+"""
+
+import argparse
+import ctypes
+import ctypes.util
+import os
+import select
+import signal
+import struct
+import sys
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+try:
+    from .batch import _parse_file_worker
+    from .config import (MAX_FILE_SIZE_MB, OUTPUT_EXTENSION, SUPPORTED_INPUT_EXTENSIONS,
+                         WATCH_DEBOUNCE, WATCH_POLL_INTERVAL)
+    from .reader import is_input_file, strip_compression_extension
+    from .task_parser import TaskParser, TaskPatternConfig
+except ImportError:
+    from batch import _parse_file_worker
+    from config import (MAX_FILE_SIZE_MB, OUTPUT_EXTENSION, SUPPORTED_INPUT_EXTENSIONS,
+                        WATCH_DEBOUNCE, WATCH_POLL_INTERVAL)
+    from reader import is_input_file, strip_compression_extension
+    from task_parser import TaskParser, TaskPatternConfig
+
+
+def _ignore_interrupts() -> None:
+    """Let the watcher process alone handle Ctrl+C."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+class PollingBackend:
+    """Detects changes by comparing size and mtime across directory scans."""
+    
+    name = "poll"
+    
+    def __init__(self, directory: str, extensions: Sequence[str]):
+        self.directory = directory
+        self.extensions = extensions
+        self.snapshot = self._scan()
+    
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        """Stat every input file with a single scandir pass."""
+        snapshot = {}
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.is_file() and is_input_file(entry.name, self.extensions):
+                    stat = entry.stat()
+                    snapshot[entry.path] = (stat.st_size, stat.st_mtime_ns)
+        return snapshot
+    
+    def changes(self, timeout: float) -> Set[str]:
+        """Wait up to timeout and return the input files that changed."""
+        time.sleep(timeout)
+        current = self._scan()
+        changed = {path for path, state in current.items() if self.snapshot.get(path) != state}
+        self.snapshot = current
+        return changed
+    
+    def close(self) -> None:
+        """Release resources."""
+
+
+class InotifyBackend:
+    """Detects changes with Linux inotify through ctypes."""
+    
+    name = "inotify"
+    
+    IN_MODIFY = 0x00000002
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    _EVENT = struct.Struct("iIII")
+    
+    def __init__(self, directory: str, extensions: Sequence[str]):
+        libc = self._libc()
+        if libc is None:
+            raise OSError("inotify is not available on this platform")
+        
+        self.directory = directory
+        self.extensions = extensions
+        self._fd = libc.inotify_init1(os.O_NONBLOCK | getattr(os, "O_CLOEXEC", 0))
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        
+        mask = self.IN_MODIFY | self.IN_CLOSE_WRITE | self.IN_MOVED_TO | self.IN_CREATE
+        if libc.inotify_add_watch(self._fd, os.fsencode(directory), mask) < 0:
+            os.close(self._fd)
+            raise OSError(ctypes.get_errno(), f"Cannot watch {directory}")
+    
+    @staticmethod
+    def _libc():
+        """Load libc if it provides inotify."""
+        if not sys.platform.startswith("linux"):
+            return None
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        except OSError:
+            return None
+        return libc if hasattr(libc, "inotify_init1") else None
+    
+    @classmethod
+    def available(cls) -> bool:
+        """Whether inotify can be used here."""
+        return cls._libc() is not None
+    
+    def changes(self, timeout: float) -> Set[str]:
+        """Wait up to timeout and return the input files that changed."""
+        changed: Set[str] = set()
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        while ready:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                _, _, _, length = self._EVENT.unpack_from(data, offset)
+                offset += self._EVENT.size
+                name = data[offset:offset + length].rstrip(b"\0").decode("utf-8", "replace")
+                offset += length
+                if name and is_input_file(name, self.extensions):
+                    changed.add(os.path.join(self.directory, name))
+            ready, _, _ = select.select([self._fd], [], [], 0)
+        return changed
+    
+    def close(self) -> None:
+        """Stop watching."""
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+class DirectoryWatcher:
+    """
+    Re-parses the input files of a directory whenever they change.
+    
+    Every input ``name.txt`` produces ``name.csv`` in the output directory,
+    rewritten atomically after each change. Startup time and the latency from
+    the first detected change to the rewritten output are logged.
+    """
+    
+    def __init__(self, directory: str, pattern_type: str, output_dir: Optional[str] = None,
+                 interval: float = WATCH_POLL_INTERVAL, debounce: float = WATCH_DEBOUNCE,
+                 max_workers: Optional[int] = None, backend: str = "auto",
+                 parser: Optional[TaskParser] = None,
+                 extensions: Sequence[str] = tuple(SUPPORTED_INPUT_EXTENSIONS)):
+        """
+        Initialize the watcher.
+        
+        Raises:
+            NotADirectoryError: If directory doesn't exist
+            ValueError: If pattern_type or backend is not supported
+        """
+        if not os.path.isdir(directory):
+            raise NotADirectoryError(f"Directory not found: {directory}")
+        if pattern_type not in TaskPatternConfig.get_available_types():
+            raise ValueError(f"Unsupported pattern type: {pattern_type}")
+        if backend not in ("auto", "poll", "inotify"):
+            raise ValueError(f"Unsupported watch backend: {backend}")
+        
+        self.directory = directory
+        self.pattern_type = pattern_type
+        self.output_dir = output_dir or directory
+        self.interval = interval
+        self.debounce = debounce
+        self.max_workers = max_workers
+        self.backend_name = backend
+        self.extensions = extensions
+        self.parser = parser or TaskParser()
+        self.logger = self.parser.logger
+        
+        self.backend = None
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pending: Dict[str, Tuple[float, float]] = {}  # path -> (first seen, last seen)
+        self._running: Dict[Future, Tuple[str, float]] = {}
+        self.latencies: List[float] = []
+        self.startup_seconds: Optional[float] = None
+    
+    def output_path(self, input_path: str) -> str:
+        """Get the output CSV path for an input file."""
+        base_name = os.path.splitext(os.path.basename(strip_compression_extension(input_path)))[0]
+        return os.path.join(self.output_dir, base_name + OUTPUT_EXTENSION)
+    
+    def start(self) -> None:
+        """Open the change backend and parse every existing input once."""
+        started = time.perf_counter()
+        os.makedirs(self.output_dir, exist_ok=True)
+        
+        backend = None
+        if self.backend_name == "inotify":
+            if not InotifyBackend.available():
+                raise OSError("inotify is not available on this platform")
+            backend = InotifyBackend(self.directory, self.extensions)
+        elif self.backend_name == "auto" and InotifyBackend.available():
+            try:
+                backend = InotifyBackend(self.directory, self.extensions)
+            except OSError as e:
+                # e.g. the user's inotify instance or watch limit is used up
+                self.logger.warning(f"Cannot use inotify ({e}); polling instead")
+        self.backend = backend or PollingBackend(self.directory, self.extensions)
+        
+        if self.max_workers != 1:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                 initializer=_ignore_interrupts)
+        
+        now = time.monotonic()
+        with os.scandir(self.directory) as entries:
+            for entry in sorted(entries, key=lambda e: e.name):
+                if entry.is_file() and is_input_file(entry.name, self.extensions):
+                    self._submit(entry.path, now)
+        self._collect(wait=True)
+        
+        self.startup_seconds = time.perf_counter() - started
+        self.logger.info(f"Watching {self.directory} with {self.backend.name} backend; "
+                         f"startup took {self.startup_seconds * 1000:.1f} ms")
+    
+    def _submit(self, path: str, first_seen: float) -> None:
+        """Send a file to the worker pool."""
+        if self._executor is None:
+            future: Future = Future()
+            try:
+                future.set_result(_parse_file_worker(path, self.pattern_type, self.logger.level,
+                                                     self.parser.max_input_bytes))
+            except Exception as e:
+                future.set_exception(e)
+        else:
+            future = self._executor.submit(_parse_file_worker, path, self.pattern_type,
+                                           self.logger.level, self.parser.max_input_bytes)
+        self._running[future] = (path, first_seen)
+    
+    def _collect(self, wait: bool = False) -> List[str]:
+        """Write the outputs of finished parses."""
+        written = []
+        for future in list(self._running):
+            if not wait and not future.done():
+                continue
+            path, first_seen = self._running.pop(future)
+            try:
+                tasks = future.result()
+            except (OSError, ValueError) as e:
+                self.logger.error(f"Failed to parse {path}: {e}")
+                continue
+            
+            output_path = self.output_path(path)
+            try:
+                # save_to_csv renames a complete file into place
+                self.parser.save_to_csv(tasks, output_path, self.pattern_type)
+            except (OSError, ValueError) as e:
+                self.logger.error(f"Failed to write {output_path}: {e}")
+                continue
+            latency = time.monotonic() - first_seen
+            self.latencies.append(latency)
+            self.logger.info(f"Updated {output_path} ({len(tasks)} tasks) "
+                             f"{latency * 1000:.1f} ms after change")
+            written.append(output_path)
+        return written
+    
+    def poll_once(self, timeout: Optional[float] = None) -> List[str]:
+        """
+        Wait for changes once, dispatch debounced files and collect results.
+        
+        Returns:
+            Output paths rewritten during this call
+        """
+        if self.backend is None:
+            self.start()
+        
+        now = time.monotonic()
+        for path in self.backend.changes(self.interval if timeout is None else timeout):
+            first_seen = self._pending.get(path, (now, now))[0]
+            self._pending[path] = (first_seen, now)
+        
+        now = time.monotonic()
+        busy = {path for path, _ in self._running.values()}
+        for path, (first_seen, last_seen) in list(self._pending.items()):
+            if now - last_seen >= self.debounce and path not in busy:
+                del self._pending[path]
+                if os.path.isfile(path):
+                    self._submit(path, first_seen)
+        
+        return self._collect()
+    
+    def run(self, stop_event: Optional[threading.Event] = None) -> None:
+        """Watch until stop_event is set or the process is interrupted."""
+        if self.backend is None:
+            self.start()
+        try:
+            while stop_event is None or not stop_event.is_set():
+                self.poll_once()
+        finally:
+            self.close()
+    
+    def close(self) -> None:
+        """Finish running parses and release the backend and worker pool."""
+        self._collect(wait=True)
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        if self.backend is not None:
+            self.backend.close()
+            self.backend = None
+
+
+def register_cli(subparsers) -> None:
+    """Register the ``watch`` command with the command-line interface."""
+    command = subparsers.add_parser("watch", help="Re-parse input files in a directory as they change")
+    command.add_argument("directory", help="Directory containing input text files")
+    command.add_argument("-t", "--type", dest="pattern_type", default="original",
+                         choices=TaskPatternConfig.get_available_types(),
+                         help="Pattern type to use")
+    command.add_argument("-o", "--output", dest="output_dir",
+                         help="Output directory (defaults to the input directory)")
+    command.add_argument("-w", "--workers", type=int, default=None,
+                         help="Number of worker processes")
+    command.add_argument("--interval", type=float, default=WATCH_POLL_INTERVAL,
+                         help="Seconds between polls or event waits")
+    command.add_argument("--debounce", type=float, default=WATCH_DEBOUNCE,
+                         help="Seconds a file must stay unchanged before it is parsed")
+    command.add_argument("--backend", choices=["auto", "poll", "inotify"], default="auto",
+                         help="Change detection backend")
+    command.add_argument("--max-size", type=float, default=MAX_FILE_SIZE_MB, metavar="MB",
+                         help="Largest decompressed input file size; 0 for no limit")
+    command.set_defaults(func=run_watch)
+
+
+def run_watch(args: argparse.Namespace) -> int:
+    """Run the ``watch`` command until interrupted."""
+    watcher = DirectoryWatcher(args.directory, args.pattern_type, output_dir=args.output_dir,
+                               interval=args.interval, debounce=args.debounce,
+                               max_workers=args.workers, backend=args.backend,
+                               parser=TaskParser(max_file_size_mb=args.max_size or None))
+    print(f"Watching '{args.directory}'. Press Ctrl+C to stop.")
+    watcher.run()
+    return 0
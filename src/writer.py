@@ -0,0 +1,220 @@
+"""
+CSV Writer Module
+
+Bulk CSV output for parse results. Rows are built by precomputed attribute
+getters and handed to csv.writer.writerows in batches through a large write
+buffer. A new file is written to a temporary file next to its destination
+and renamed into place, so readers never see a half-written CSV; an append
+is rolled back to the previous file size if it fails. Output is compressed
+with gzip or lzma when the path ends in .gz, .xz or .lzma.
+
+Author: Jonathan Legro
+Date: 2025-08-01
+"""
+
+import csv
+import gzip
+import io
+import lzma
+import os
+from itertools import islice
+from operator import attrgetter
+from typing import Callable, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    from .config import (CSV_BATCH_ROWS, CSV_GZIP_LEVEL, CSV_LZMA_PRESET, CSV_WRITE_BUFFER,
+                         DEFAULT_ENCODING)
+    from .fields import PART_HEADERS
+    from .task_parser import ParsedTask
+    from .task_table import TaskTable
+except ImportError:
+    from config import (CSV_BATCH_ROWS, CSV_GZIP_LEVEL, CSV_LZMA_PRESET, CSV_WRITE_BUFFER,
+                        DEFAULT_ENCODING)
+    from fields import PART_HEADERS
+    from task_parser import ParsedTask
+    from task_table import TaskTable
+
+
+HEADERS = {
+    'original': ["Step", "Task", "Title", "Proponent", "Status"],
+    'drill': ["Step", "Status", "Verb", "Title"],
+}
+
+COMPRESSED_EXTENSIONS = {'.gz': 'gzip', '.xz': 'lzma', '.lzma': 'lzma'}
+
+
+def headers(format_type: str = "original", include_parts: bool = False) -> List[str]:
+    """Return the header row of an output format."""
+    row = list(HEADERS.get(format_type, HEADERS['original']))
+    if include_parts:
+        row += PART_HEADERS
+    return row
+
+
+def row_getter(format_type: str = "original",
+               include_parts: bool = False) -> Callable[[ParsedTask], Sequence[str]]:
+    """
+    Return a function building the output row of a task.
+
+    The result matches ParsedTask.to_list(format_type, include_parts) but
+    uses one C-level attrgetter call instead of building a list per row.
+    """
+    fields = ParsedTask.FORMAT_FIELDS.get(format_type, ParsedTask.FORMAT_FIELDS['original'])
+    getter = attrgetter(*fields)
+    if not include_parts:
+        return getter
+    return lambda task: getter(task) + task.parts()
+
+
+def compression(path: str) -> str:
+    """Return 'gzip', 'lzma' or '' for the extension of path."""
+    return COMPRESSED_EXTENSIONS.get(os.path.splitext(path)[1].lower(), '')
+
+
+def open_output(path: str, append: bool = False, encoding: str = DEFAULT_ENCODING,
+                buffer_size: int = CSV_WRITE_BUFFER, kind: Optional[str] = None) -> io.TextIOBase:
+    """
+    Open a text file for CSV output, compressed according to its extension.
+
+    Appending to a compressed file adds a new compressed stream, which gzip
+    and xz readers decode as the concatenation of all streams.
+
+    Args:
+        path: File to open
+        append: Add to the end of the file instead of replacing it
+        encoding: Text encoding
+        buffer_size: Size of the write buffer in bytes
+        kind: 'gzip', 'lzma' or '' to override the choice by extension
+    """
+    mode = 'ab' if append else 'wb'
+    if kind is None:
+        kind = compression(path)
+    if kind == 'gzip':
+        raw = gzip.GzipFile(path, mode, compresslevel=CSV_GZIP_LEVEL)
+    elif kind == 'lzma':
+        raw = lzma.LZMAFile(path, mode, preset=CSV_LZMA_PRESET)
+    else:
+        return open(path, mode[0], buffering=buffer_size, newline='', encoding=encoding)
+    return io.TextIOWrapper(io.BufferedWriter(raw, buffer_size), encoding=encoding, newline='')
+
+
+class CsvOutput:
+    """
+    A CSV file being written in steps: open, write batches, then commit.
+
+    write_csv in pieces, for callers that produce rows over time. A new
+    file is only renamed into place by commit; abort removes it, or rolls
+    an append back to the previous file size.
+    """
+
+    def __init__(self, output_path: str, format_type: str = "original",
+                 include_headers: bool = True, append: bool = False,
+                 include_parts: bool = False):
+        """Open the output and write the header row; see write_csv."""
+        self.output_path = output_path
+        self.format_type = format_type
+        self.include_parts = include_parts
+        self.append = append
+        self.count = 0
+        self._existed = append and os.path.exists(output_path)
+        self._existing = os.path.getsize(output_path) if self._existed else 0
+        if self._existing:
+            include_headers = False
+        self._target = output_path if append else f"{output_path}.{os.getpid()}.{id(self)}.tmp"
+
+        self._handle = open_output(self._target, append, kind=compression(output_path))
+        try:
+            self._writer = csv.writer(self._handle)
+            if include_headers:
+                self._writer.writerow(headers(format_type, include_parts))
+        except BaseException:
+            self.abort()
+            raise
+
+    def write(self, tasks: Iterable[ParsedTask], batch_rows: int = CSV_BATCH_ROWS) -> int:
+        """Write the rows of tasks and return how many were written."""
+        written = _write_rows(self._writer, tasks, self.format_type, self.include_parts, batch_rows)
+        self.count += written
+        return written
+
+    def commit(self) -> Tuple[int, int]:
+        """
+        Close the file and move a new file into place.
+
+        Returns:
+            (rows written, bytes added to the file on disk)
+        """
+        try:
+            self._handle.close()
+            if not self.append:
+                os.replace(self._target, self.output_path)
+        except BaseException:
+            self.abort()
+            raise
+        return self.count, os.path.getsize(self.output_path) - self._existing
+
+    def abort(self) -> None:
+        """Close the file and undo everything written to it."""
+        try:
+            self._handle.close()
+        except Exception:
+            pass
+        if self._existed:
+            os.truncate(self.output_path, self._existing)
+        elif os.path.exists(self._target):
+            os.unlink(self._target)
+
+
+def write_csv(tasks: Iterable[ParsedTask], output_path: str, format_type: str = "original",
+              include_headers: bool = True, append: bool = False,
+              include_parts: bool = False, batch_rows: int = CSV_BATCH_ROWS) -> Tuple[int, int]:
+    """
+    Write tasks to a CSV file.
+
+    Args:
+        tasks: ParsedTask objects or a TaskTable; other iterables are
+            consumed lazily in batches of batch_rows
+        output_path: Destination; .gz, .xz and .lzma paths are compressed
+        format_type: Output format
+        include_headers: Whether to write a header row; skipped when
+            appending to a non-empty file
+        append: Add rows to the end of an existing file
+        include_parts: Add the proponent and task code part columns
+        batch_rows: Rows handed to writerows at a time
+
+    Returns:
+        (rows written, bytes added to the file on disk)
+
+    Raises:
+        OSError: If the file cannot be written; a new file is then left
+            untouched and an append is rolled back
+    """
+    output = CsvOutput(output_path, format_type, include_headers, append, include_parts)
+    try:
+        output.write(tasks, batch_rows)
+    except BaseException:
+        output.abort()
+        raise
+    return output.commit()
+
+
+def _write_rows(writer, tasks: Iterable[ParsedTask], format_type: str,
+                include_parts: bool, batch_rows: int) -> int:
+    """Write the rows of tasks and return how many were written."""
+    if isinstance(tasks, TaskTable):
+        writer.writerows(tasks.rows(format_type, include_parts))
+        return len(tasks)
+
+    getter = row_getter(format_type, include_parts)
+    if isinstance(tasks, list):
+        writer.writerows(map(getter, tasks))
+        return len(tasks)
+
+    count = 0
+    iterator = iter(tasks)
+    while True:
+        batch = list(islice(iterator, batch_rows))
+        if not batch:
+            return count
+        writer.writerows(map(getter, batch))
+        count += len(batch)
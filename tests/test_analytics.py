@@ -0,0 +1,114 @@
+"""
+Tests for the numpy/pandas export and vectorized summaries.
+"""
+
+import logging
+import sys
+import unittest
+from collections import Counter
+from pathlib import Path
+
+# Add src directory to path for imports
+project_root = Path(__file__).parent.parent
+src_path = project_root / "src"
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+import analytics
+from task_parser import ParsedTask, TaskParser
+from task_table import TaskTable
+
+INPUT_DIR = project_root / "data" / "input"
+
+TASKS = [
+    ParsedTask("1", "07-CO-3036", "Integrate Fires", "07 - Infantry (Collective)", "Approved"),
+    ParsedTask("2", "07-PLT-1000", "Conduct an Attack", "07 - Infantry (Collective)", "Draft"),
+    ParsedTask("3", "71-CO-5100", "Troop Leading", "71 - Mission Command (Collective)", "Approved"),
+    ParsedTask("4", "071-410-0010", "Leader's Reconnaissance", "071 - Infantry (Individual)", "Approved"),
+    ParsedTask("5", "07-CO-0001", "Defend", "07 - Infantry (Collective)", "Approved"),
+]
+
+
+@unittest.skipUnless(analytics.np is not None and analytics.pd is not None,
+                     "numpy and pandas are not installed")
+class TestAnalytics(unittest.TestCase):
+    """Test cases for the analytics exports and summaries."""
+
+    def setUp(self):
+        """Build a table of sample tasks."""
+        self.table = TaskTable(TASKS)
+
+    def test_to_numpy_shares_the_table_buffer(self):
+        """Test that codes are a view of the table and decode to the values."""
+        columns = self.table.to_numpy(["status", "echelon"])
+        codes, _ = self.table.encoded("status")
+        self.assertTrue(analytics.np.shares_memory(columns["status"].codes,
+                                                   analytics.np.frombuffer(codes, dtype=analytics.np.uintc)))
+        self.assertEqual(columns["status"].decode().tolist(), self.table.column("status"))
+        self.assertEqual(columns["echelon"].decode().tolist(), self.table.column("echelon"))
+        self.assertEqual(sorted(columns["echelon"].categories), ["410", "CO", "PLT"])
+
+    def test_to_dataframe(self):
+        """Test that the DataFrame has categorical columns equal to the tasks."""
+        frame = analytics.to_dataframe(TASKS, include_parts=True)
+        self.assertEqual(list(frame.columns[:6]), list(TaskTable.FIELDS))
+        self.assertEqual(str(frame["proponent"].dtype), "category")
+        self.assertEqual(frame["title"].tolist(), [task.title for task in TASKS])
+        self.assertEqual(frame["proponent_code"].tolist(), ["07", "07", "71", "071", "07"])
+        self.assertEqual(len(analytics.to_dataframe(TaskTable())), 0)
+
+    def test_summaries(self):
+        """Test counts by field, cross tabulation and sliced tables."""
+        counts = analytics.summary(self.table)
+        self.assertEqual(counts["status"].to_dict(), {"Approved": 4, "Draft": 1})
+        self.assertEqual(counts["echelon"].to_dict(), {"CO": 3, "PLT": 1, "410": 1})
+        self.assertEqual(list(counts["proponent"].index)[0], "07 - Infantry (Collective)")
+
+        table = analytics.crosstab(self.table, "proponent_code", "status")
+        self.assertEqual(int(table.loc["07", "Approved"]), 2)
+        self.assertEqual(int(table.loc["07", "Draft"]), 1)
+
+        # A slice shares the dictionary of values it no longer uses
+        self.assertEqual(analytics.value_counts(self.table[2:4], "status").to_dict(), {"Approved": 2})
+
+    def test_rollup_across_files(self):
+        """Test per-file counts over files with their own dictionaries."""
+        parser = TaskParser(logging.WARNING)
+        results = {
+            "a.txt": self.table,
+            "b.txt": TASKS[:2],
+            "sample": parser.parse_file(str(INPUT_DIR / "original_format.txt"), "original", as_table=True),
+        }
+        frame = analytics.rollup(results, "status")
+        self.assertEqual(list(frame.index), ["a.txt", "b.txt", "sample", "total"])
+        self.assertEqual(int(frame.loc["b.txt", "Draft"]), 1)
+        expected = Counter(task.status for tasks in results.values() for task in tasks)
+        self.assertEqual(frame.loc["total"].to_dict(), dict(expected))
+        self.assertEqual(list(frame.columns), [status for status, _ in expected.most_common()])
+
+
+@unittest.skipUnless(analytics.np is None, "numpy is installed")
+class TestWithoutNumpy(unittest.TestCase):
+    """Test cases for environments without the analytics extra."""
+
+    def test_explains_missing_dependency(self):
+        """Test that exports name the extra to install."""
+        with self.assertRaisesRegex(ImportError, r"data-analyzer\[analytics\]"):
+            TaskTable(TASKS).to_numpy()
+
+
+class TestEncoded(unittest.TestCase):
+    """Test cases for TaskTable.encoded, which needs no extra."""
+
+    def test_encoded_fields_and_parts(self):
+        """Test that codes index the values of fields and parts."""
+        table = TaskTable(TASKS)
+        for field in ("status", "proponent_code"):
+            codes, values = table.encoded(field)
+            self.assertEqual([values[code] for code in codes], table.column(field))
+        with self.assertRaises(KeyError):
+            table.encoded("missing")
+
+
+if __name__ == '__main__':
+    unittest.main()
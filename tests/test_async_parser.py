@@ -0,0 +1,164 @@
+"""
+Tests for the asyncio facade.
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+
+# Add src directory to path for imports
+project_root = Path(__file__).parent.parent
+src_path = project_root / "src"
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+from async_parser import AsyncTaskParser
+from task_parser import TaskParser
+
+SAMPLES_DIR = project_root / "data" / "samples"
+
+
+class CountingExecutor(ThreadPoolExecutor):
+    """Thread pool that records the most jobs it ever had outstanding."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.outstanding = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def submit(self, function, *args, **kwargs):
+        """Submit a job and count it until it is done."""
+        with self._lock:
+            self.outstanding += 1
+            self.peak = max(self.peak, self.outstanding)
+        future = super().submit(function, *args, **kwargs)
+        future.add_done_callback(self._done)
+        return future
+
+    def _done(self, _future):
+        with self._lock:
+            self.outstanding -= 1
+
+
+async def produce(tasks, fail_after=None):
+    """Yield tasks from a coroutine, optionally failing part way."""
+    for index, task in enumerate(tasks):
+        if index == fail_after:
+            raise RuntimeError("producer failed")
+        await asyncio.sleep(0)
+        yield task
+
+
+class TestAsyncTaskParser(unittest.TestCase):
+    """Test cases for AsyncTaskParser."""
+
+    def setUp(self):
+        """Create a parser, a sample input and a temporary directory."""
+        self.parser = TaskParser(logging.WARNING)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.input_path = os.path.join(self.tmp.name, "input.txt")
+        text = "\n".join(sample.read_text(encoding="utf-8") for sample in sorted(SAMPLES_DIR.glob("*.txt")))
+        with open(self.input_path, "w", encoding="utf-8") as f:
+            f.write(text * 5)
+        self.expected = self.parser.parse_file(self.input_path, "original")
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        self.tmp.cleanup()
+
+    def read(self, path: str) -> bytes:
+        """Read a file's raw bytes."""
+        with open(path, "rb") as f:
+            return f.read()
+
+    def test_parse_file_and_iter_tasks(self):
+        """Test that the coroutines return what the blocking calls return."""
+        async def run():
+            facade = AsyncTaskParser(self.parser)
+            tasks = await facade.parse_file(self.input_path, "original")
+            streamed = [task async for task in facade.iter_tasks(self.input_path, "original",
+                                                                 batch_size=3, chunk_size=64)]
+            return tasks, streamed
+
+        tasks, streamed = asyncio.run(run())
+        self.assertEqual(tasks, self.expected)
+        self.assertEqual(streamed, list(self.parser.iter_file(self.input_path, "original", chunk_size=64)))
+
+    def test_process_pool(self):
+        """Test parse_file in a process pool."""
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            async def run():
+                facade = AsyncTaskParser(self.parser, executor=pool)
+                return await facade.parse_file(self.input_path, "original", as_table=True)
+
+            table = asyncio.run(run())
+        self.assertEqual(list(table), list(self.expected))
+
+    def test_save_matches_save_to_csv(self):
+        """Test saving a list and streaming an async iterable."""
+        reference = os.path.join(self.tmp.name, "reference.csv")
+        self.parser.save_to_csv(self.expected, reference, "original")
+
+        async def run():
+            facade = AsyncTaskParser(self.parser)
+            await facade.save(self.expected, os.path.join(self.tmp.name, "list.csv"))
+            await facade.save(facade.iter_tasks(self.input_path, "original", batch_size=2),
+                              os.path.join(self.tmp.name, "stream.csv"), batch_size=2)
+
+        asyncio.run(run())
+        for name in ("list.csv", "stream.csv"):
+            self.assertEqual(self.read(os.path.join(self.tmp.name, name)), self.read(reference))
+
+    def test_failed_stream_leaves_no_file(self):
+        """Test that a failing producer creates no output or temp file."""
+        output_path = os.path.join(self.tmp.name, "failed.csv")
+
+        async def run():
+            facade = AsyncTaskParser(self.parser)
+            await facade.save(produce(self.expected, fail_after=3), output_path, batch_size=1)
+
+        with self.assertRaises(RuntimeError):
+            asyncio.run(run())
+        self.assertEqual(sorted(os.listdir(self.tmp.name)), ["input.txt"])
+
+    def test_backpressure_and_cancellation(self):
+        """Test that concurrent calls never exceed max_pending jobs and can be cancelled."""
+        with CountingExecutor(max_workers=4) as pool:
+            async def run():
+                facade = AsyncTaskParser(self.parser, executor=pool, max_pending=2)
+                calls = [asyncio.ensure_future(facade.parse_file(self.input_path, "original"))
+                         for _ in range(40)]
+                await asyncio.sleep(0)
+                for call in calls[20:]:
+                    call.cancel()
+                results = await asyncio.gather(*calls, return_exceptions=True)
+                after = await facade.parse_file(self.input_path, "original")
+                return results, after
+
+            results, after = asyncio.run(run())
+        self.assertLessEqual(pool.peak, 2)
+        self.assertTrue(all(result == self.expected for result in results[:20]))
+        self.assertTrue(all(isinstance(result, asyncio.CancelledError) for result in results[20:]))
+        self.assertEqual(after, self.expected)
+
+    def test_reuse_across_event_loops(self):
+        """Test a facade built outside any loop and used by several asyncio.run calls."""
+        facade = AsyncTaskParser(self.parser, max_pending=1)
+
+        async def run():
+            return await asyncio.gather(*(facade.parse_file(self.input_path, "original")
+                                          for _ in range(3)))
+
+        for _ in range(2):
+            self.assertTrue(all(result == self.expected for result in asyncio.run(run())))
+
+
+if __name__ == '__main__':
+    unittest.main()
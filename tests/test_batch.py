@@ -0,0 +1,136 @@
+"""
+Test suite for the batch processing module.
+
+Tests directory discovery, parallel parsing, cross-file deduplication and output.
+"""
+
+import unittest
+import tempfile
+from unittest import mock
+import os
+import sys
+from pathlib import Path
+
+# Add src directory to path for imports
+project_root = Path(__file__).parent.parent
+src_path = project_root / "src"
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+from batch import drop_near_duplicates, find_input_files, parse_files, save_batch_results
+from task_parser import TaskParser, main
+
+
+ORIGINAL_LINES = [
+    "1. 07-CO-3036 Integrate Indirect Fire Support - Company 07 - Infantry (Collective) Approved",
+    "2. 71-CO-5100 Conduct Troop Leading Procedures 71 - Mission Command (Collective) Approved",
+    "071-410-0010 Conduct a Leader's Reconnaissance 071 - Infantry (Individual) Approved",
+]
+
+
+class TestBatch(unittest.TestCase):
+    """Test cases for batch directory parsing."""
+    
+    def setUp(self):
+        """Create a directory of input files sharing one task."""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.directory = self.tmp.name
+        self.files = []
+        for index, line in enumerate(ORIGINAL_LINES):
+            path = os.path.join(self.directory, f"export_{index}.txt")
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(line + "\n" + ORIGINAL_LINES[0] + "\n")
+            self.files.append(path)
+        with open(os.path.join(self.directory, "notes.md"), 'w', encoding='utf-8') as f:
+            f.write("not an export")
+        self.parser = TaskParser()
+    
+    def tearDown(self):
+        """Remove temporary files."""
+        self.tmp.cleanup()
+    
+    def test_find_input_files(self):
+        """Test that only supported files are found, in sorted order."""
+        self.assertEqual(find_input_files(self.directory), self.files)
+    
+    def test_find_input_files_missing_directory(self):
+        """Test discovery on a missing directory."""
+        with self.assertRaises(NotADirectoryError):
+            find_input_files(os.path.join(self.directory, "missing"))
+    
+    def test_parallel_matches_serial(self):
+        """Test that pool results equal in-process results and keep file order."""
+        serial = parse_files(self.files, "original", max_workers=1)
+        parallel = parse_files(self.files, "original", max_workers=2)
+        
+        self.assertEqual(list(parallel), self.files)
+        self.assertEqual(parallel, serial)
+    
+    def test_cross_file_deduplication(self):
+        """Test that a task shared by every file is kept only once."""
+        results = self.parser.parse_directory(self.directory, "original", max_workers=1)
+        tasks = [task.task for file_tasks in results.values() for task in file_tasks]
+        
+        self.assertEqual(tasks, ["07-CO-3036", "71-CO-5100", "071-410-0010"])
+    
+    def test_near_duplicates_across_files(self):
+        """Test that a reformatted copy in another file is dropped and audited."""
+        with open(self.files[1], 'a', encoding='utf-8') as f:
+            f.write("3. 07-co-3036 integrate indirect fire support, company "
+                    "07 - Infantry (Collective) Approved\n")
+        results = self.parser.parse_directory(self.directory, "original", max_workers=1)
+        kept, near = drop_near_duplicates(results, "original")
+        
+        self.assertEqual(list(kept), self.files)
+        self.assertEqual([task.task for tasks in kept.values() for task in tasks],
+                         ["07-CO-3036", "71-CO-5100", "071-410-0010"])
+        self.assertEqual(near["original"].removed, 1)
+        
+        with tempfile.TemporaryDirectory() as output_dir:
+            audit = os.path.join(output_dir, "audit.csv")
+            exit_code = main(["batch", self.directory, "-o", output_dir, "-w", "1",
+                              "--near-duplicates", "--audit", audit])
+            self.assertEqual(exit_code, 0)
+            with open(audit, 'r', encoding='utf-8') as f:
+                self.assertEqual(len(f.read().splitlines()), 3)  # Header, kept and merged rows
+    
+    def test_save_batch_results(self):
+        """Test merged and per-file CSV output."""
+        results = parse_files(self.files, "original", max_workers=1)
+        with tempfile.TemporaryDirectory() as output_dir:
+            merged = save_batch_results(self.parser, results, output_dir, "original")
+            per_file = save_batch_results(self.parser, results, output_dir, "original", merge=False)
+            
+            self.assertEqual(len(merged), 1)
+            self.assertEqual(len(per_file), len(self.files))
+            with open(merged[0], 'r', encoding='utf-8') as f:
+                self.assertEqual(len(f.read().splitlines()), 4)  # Header plus three tasks
+    
+    def test_batch_command(self):
+        """Test the batch command-line entry point."""
+        with tempfile.TemporaryDirectory() as output_dir:
+            exit_code = main(["batch", self.directory, "-o", output_dir, "-w", "1"])
+            self.assertEqual(exit_code, 0)
+            self.assertEqual(len(os.listdir(output_dir)), 1)
+            
+            # InputTooLarge is reported as an error; 0 lifts the limit
+            self.assertEqual(main(["batch", self.directory, "-o", output_dir, "-w", "1",
+                                   "--max-size", "0.00001"]), 1)
+            self.assertEqual(main(["batch", self.directory, "-o", output_dir, "-w", "1",
+                                   "--max-size", "0"]), 0)
+    
+    def test_failed_save_keeps_rows_for_next_run(self):
+        """Test that rows of a run whose output failed are emitted by the next run."""
+        seen = os.path.join(self.tmp.name, "seen.bloom")
+        with tempfile.TemporaryDirectory() as output_dir:
+            arguments = ["batch", self.directory, "-o", output_dir, "-w", "1", "--seen", seen]
+            with mock.patch("batch.save_batch_results", side_effect=OSError("disk full")):
+                self.assertEqual(main(arguments), 1)
+            self.assertEqual(main(arguments), 0)
+            output_path = os.path.join(output_dir, os.listdir(output_dir)[0])
+            with open(output_path, 'r', encoding='utf-8') as f:
+                self.assertEqual(len(f.read().splitlines()), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+"""
+Tests for the benchmark corpus generator and baseline comparison.
+"""
+
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add src and benchmarks to path
+project_root = Path(__file__).parent.parent
+for path in (project_root / "src", project_root / "benchmarks"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from corpus import CorpusGenerator
+from run_benchmarks import compare
+from task_parser import TaskParser
+
+
+class TestCorpusGenerator(unittest.TestCase):
+    """Test cases for CorpusGenerator."""
+    
+    def test_corpus_is_parseable_and_deterministic(self):
+        """Test generated corpora contain records and repeat for a seed."""
+        parser = TaskParser()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for pattern_type in ("original", "drill"):
+                first = CorpusGenerator(seed=1).write(Path(temp_dir) / f"a_{pattern_type}.txt", 20000, pattern_type)
+                second = CorpusGenerator(seed=1).write(Path(temp_dir) / f"b_{pattern_type}.txt", 20000, pattern_type)
+                
+                self.assertGreaterEqual(first.stat().st_size, 20000)
+                self.assertEqual(first.read_bytes(), second.read_bytes())
+                self.assertGreater(len(parser.parse_file(str(first), pattern_type)), 0)
+    
+    def test_noise_and_near_misses_do_not_match(self):
+        """Test a corpus without records parses to no tasks for either type."""
+        parser = TaskParser()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for pattern_type in ("original", "drill"):
+                generator = CorpusGenerator(seed=2, noise_ratio=1.0, near_miss_ratio=0.5)
+                path = generator.write(Path(temp_dir) / f"{pattern_type}.txt", 50000, pattern_type)
+                
+                self.assertEqual(parser.parse_file(str(path), pattern_type), [])
+
+
+class TestCompare(unittest.TestCase):
+    """Test cases for baseline comparison."""
+    
+    def _report(self, mb_per_s):
+        return {"cases": {"drill/1MB": {"stages": {"parse_text": {"mb_per_s": mb_per_s}}}}}
+    
+    def test_regression_detected(self):
+        """Test a throughput drop beyond the tolerance is reported."""
+        self.assertEqual(len(compare(self._report(8.0), self._report(10.0), 0.1)), 1)
+    
+    def test_within_tolerance(self):
+        """Test small drops and improvements are not reported."""
+        self.assertEqual(compare(self._report(9.5), self._report(10.0), 0.1), [])
+        self.assertEqual(compare(self._report(20.0), self._report(10.0), 0.1), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
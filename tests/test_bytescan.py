@@ -0,0 +1,111 @@
+"""
+Tests for bytes-level parsing over mmap.
+"""
+
+import logging
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add src directory to path for imports
+project_root = Path(__file__).parent.parent
+src_path = project_root / "src"
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+from bytescan import BytesMatcher, bytes_matcher, is_ascii_safe
+from task_parser import TaskMatcher, TaskParser, TaskPatternConfig
+
+DATA_DIR = project_root / "data"
+SAMPLES = sorted((DATA_DIR / "input").glob("*.txt")) + sorted((DATA_DIR / "samples").glob("*.txt"))
+
+
+class TestBytesMatcher(unittest.TestCase):
+    """Test cases for the bytes matcher."""
+
+    def test_is_ascii_safe(self):
+        """Test that only text where bytes and str semantics agree is safe."""
+        self.assertTrue(is_ascii_safe(b"D8005 Approved React\tto Contact\n"))
+        for unsafe in (b"caf\xc3\xa9", b"line\r\n", b"A\x00B\x00", b"field\x1fsep"):
+            self.assertFalse(is_ascii_safe(unsafe), unsafe)
+        self.assertTrue(is_ascii_safe(b"caf\xc3\xa9 ok", 6))
+
+    def test_extract_matches_str_matcher(self):
+        """Test that bytes matches give the same fields as str matches."""
+        for pattern_type in TaskPatternConfig.get_available_types():
+            matcher = TaskPatternConfig.get_matcher(pattern_type)
+            ascii_matcher = bytes_matcher(matcher)
+            self.assertIsInstance(ascii_matcher, BytesMatcher)
+            for sample in SAMPLES:
+                data = sample.read_bytes()
+                if not is_ascii_safe(data):
+                    continue
+                text = data.decode("ascii")
+                self.assertEqual(
+                    [(a, m.span(), matcher.extract(a, m)) for a, m in matcher.scan(text)],
+                    [(a, m.span(), ascii_matcher.extract(a, m)) for a, m in ascii_matcher.scan(data)])
+
+    def test_non_ascii_pattern_has_no_bytes_matcher(self):
+        """Test that a pattern that cannot be matched as bytes is reported."""
+        matcher = TaskMatcher("accented", [r"(?P<task>\S+) Été (?P<title>.+)"])
+        self.assertIsNone(bytes_matcher(matcher))
+
+
+class TestParseFileMmap(unittest.TestCase):
+    """Test cases for TaskParser.parse_file_mmap."""
+
+    def setUp(self):
+        """Create a parser and a temporary directory."""
+        self.parser = TaskParser(logging.WARNING)
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        self.tmp.cleanup()
+
+    def write(self, name: str, data: bytes) -> str:
+        """Write bytes to a file in the temporary directory."""
+        path = os.path.join(self.tmp.name, name)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+
+    def assert_equivalent(self, path: str, pattern_type: str):
+        """Assert that parse_file_mmap and parse_file agree for lists and tables."""
+        expected = self.parser.parse_file(path, pattern_type)
+        tasks = self.parser.parse_file_mmap(path, pattern_type)
+        self.assertEqual(tasks, expected)
+        self.assertEqual(tasks.pattern_type, expected.pattern_type)
+        table = self.parser.parse_file_mmap(path, pattern_type, as_table=True)
+        self.assertEqual(list(table), list(self.parser.parse_file(path, pattern_type, as_table=True)))
+
+    def test_every_sample_matches_str_path(self):
+        """Test every sample in data/ with every pattern type."""
+        for sample in SAMPLES:
+            for pattern_type in TaskPatternConfig.get_available_types() + ["auto"]:
+                with self.subTest(sample=sample.name, pattern_type=pattern_type):
+                    self.assert_equivalent(str(sample), pattern_type)
+
+    def test_unsafe_input_falls_back(self):
+        """Test that non-ASCII, CRLF and compressed-looking input give parse_file results."""
+        data = b"".join(sample.read_bytes() + b"\n" for sample in SAMPLES)
+        for name, content in (("utf8.txt", data.replace(b"Approved React", "Approved Réact".encode())),
+                              ("crlf.txt", data.replace(b"\n", b"\r\n")),
+                              ("sep.txt", data.replace(b" Conduct", b"\x1cConduct")),
+                              ("utf16.txt", data.decode("utf-8").encode("utf-16-le"))):
+            path = self.write(name, content)
+            for pattern_type in TaskPatternConfig.get_available_types():
+                with self.subTest(name=name, pattern_type=pattern_type):
+                    self.assert_equivalent(path, pattern_type)
+
+    def test_stats_and_empty_file(self):
+        """Test that the mmap path records its stages and handles empty files."""
+        tasks = self.parser.parse_file_mmap(str(SAMPLES[0]), "auto")
+        self.assertEqual(set(tasks.stats.stages), {"detect", "read", "match", "populate", "dedup"})
+        self.assertEqual(self.parser.parse_file_mmap(self.write("empty.txt", b""), "original"), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
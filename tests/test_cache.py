@@ -0,0 +1,138 @@
+"""
+Test suite for the result cache module.
+
+Tests serialization, cache hits and invalidation, and LRU eviction.
+"""
+
+import unittest
+import tempfile
+import os
+import sys
+import time
+import zlib
+from pathlib import Path
+from unittest.mock import patch
+
+# Add src directory to path for imports
+project_root = Path(__file__).parent.parent
+src_path = project_root / "src"
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+from cache import ResultCache, serialize_tasks, deserialize_tasks
+from task_parser import TaskParser, ParsedTask
+
+SAMPLE_PATH = project_root / "data" / "samples" / "sample_task_data_1.txt"
+
+
+class TestSerialization(unittest.TestCase):
+    """Test cases for the compact row format."""
+    
+    def test_round_trip(self):
+        """Test that tasks survive serialization unchanged."""
+        tasks = [
+            ParsedTask(step="1", task="07-CO-3036", title="Integrate Fires", proponent="07 - Infantry", status="Approved"),
+            ParsedTask(step="D8005", status="Approved", verb="React", title=""),
+        ]
+        self.assertEqual(deserialize_tasks(serialize_tasks(tasks)), tasks)
+        self.assertEqual(deserialize_tasks(serialize_tasks([])), [])
+    
+    def test_separator_characters_round_trip(self):
+        """Test that control characters and quotes in fields are preserved."""
+        tasks = [
+            ParsedTask(step="1", task="07-CO-3036", title='Unit\x1fSeparator "and"\x1eRecord', status="Approved"),
+            ParsedTask(step="2", task="\x1e", title="\x1f\x1f", proponent="\\"),
+        ]
+        self.assertEqual(deserialize_tasks(serialize_tasks(tasks)), tasks)
+    
+    def test_partial_row_is_rejected(self):
+        """Test that data that is not a whole number of rows is an error."""
+        data = serialize_tasks([ParsedTask(step="1", task="A")])
+        with self.assertRaises(ValueError):
+            deserialize_tasks(zlib.compress(zlib.decompress(data).replace(b',"A"', b"")))
+
+
+class TestResultCache(unittest.TestCase):
+    """Test cases for ResultCache."""
+    
+    def setUp(self):
+        """Create a cache directory and a copy of the sample input."""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = ResultCache(os.path.join(self.tmp.name, "cache"))
+        self.input_path = os.path.join(self.tmp.name, "input.txt")
+        with open(SAMPLE_PATH, 'r', encoding='utf-8') as src, \
+                open(self.input_path, 'w', encoding='utf-8') as dst:
+            dst.write(src.read())
+        self.parser = TaskParser(cache=self.cache)
+    
+    def tearDown(self):
+        """Remove temporary files."""
+        self.tmp.cleanup()
+    
+    def test_hit_returns_same_tasks(self):
+        """Test that a cache hit returns what a real parse returns."""
+        first = self.parser.parse_file(self.input_path, "original")
+        with patch.object(self.parser, 'parse_text') as mock_parse:
+            second = self.parser.parse_file(self.input_path, "original")
+            mock_parse.assert_not_called()
+        
+        self.assertEqual(second, first)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+    
+    def test_unchanged_file_is_not_rehashed(self):
+        """Test that size and mtime short-circuit content hashing."""
+        self.parser.parse_file(self.input_path, "original")
+        with patch("cache.hash_file") as mock_hash:
+            self.parser.parse_file(self.input_path, "original")
+            mock_hash.assert_not_called()
+    
+    def test_changed_content_misses(self):
+        """Test that editing the file invalidates its entry."""
+        self.parser.parse_file(self.input_path, "original")
+        with open(self.input_path, 'a', encoding='utf-8') as f:
+            f.write("\n9. 07-CO-9999 New Task 07 - Infantry (Collective) Approved\n")
+        
+        tasks = self.parser.parse_file(self.input_path, "original")
+        self.assertIn("07-CO-9999", [task.task for task in tasks])
+        self.assertEqual(self.cache.hits, 0)
+    
+    def test_pattern_type_is_part_of_key(self):
+        """Test that different pattern types are cached separately."""
+        self.parser.parse_file(self.input_path, "original")
+        drill = self.parser.parse_file(self.input_path, "drill")
+        self.assertEqual(self.cache.hits, 0)
+        self.assertEqual(drill, TaskParser().parse_file(self.input_path, "drill"))
+    
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted first."""
+        self.parser.parse_file(self.input_path, "original")
+        self.parser.parse_file(self.input_path, "drill")
+        time.sleep(0.01)
+        self.parser.parse_file(self.input_path, "original")  # Refresh original
+        
+        self.cache.max_bytes = self.cache.size() - 1
+        self.cache._evict()
+        
+        self.assertIsNotNone(self.cache.get(self.input_path, "original"))
+        self.assertIsNone(self.cache.get(self.input_path, "drill"))
+    
+    def test_deleted_files_are_forgotten(self):
+        """Test that the index drops the hashes of files that are gone."""
+        other_path = os.path.join(self.tmp.name, "rotated.txt")
+        with open(other_path, 'w', encoding='utf-8') as f:
+            f.write("1. 07-CO-3036 Integrate Fires 07 - Infantry (Collective) Approved\n")
+        self.parser.parse_file(other_path, "original")
+        os.unlink(other_path)
+        
+        self.parser.parse_file(self.input_path, "original")
+        self.assertEqual(list(self.cache._index["files"]), [os.path.abspath(self.input_path)])
+    
+    def test_index_survives_reopen(self):
+        """Test that entries are found by a new cache instance."""
+        expected = self.parser.parse_file(self.input_path, "original")
+        reopened = ResultCache(self.cache.cache_dir)
+        self.assertEqual(reopened.get(self.input_path, "original"), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,142 @@
+"""
+Test suite for the deduplication module.
+
+Tests digest-based deduplication and the persisted seen-sets.
+"""
+
+import unittest
+import tempfile
+import os
+import sys
+from pathlib import Path
+
+# Add src directory to path for imports
+project_root = Path(__file__).parent.parent
+src_path = project_root / "src"
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+from dedup import BloomFilter, Deduplicator, DigestFile, open_seen_store, task_digest
+from task_parser import TaskParser, ParsedTask
+
+
+def make_tasks(count: int, start: int = 0):
+    """Create distinct tasks."""
+    return [ParsedTask(step=str(i), task=f"07-CO-{i:04d}", title=f"Task {i}", status="Approved")
+            for i in range(start, start + count)]
+
+
+class TestTaskDigest(unittest.TestCase):
+    """Test cases for task digests."""
+    
+    def test_digest_uses_format_key_fields(self):
+        """Test that only the format's key fields affect the digest."""
+        first = ParsedTask(step="D8005", status="Approved", verb="React", title="Contact", task="A")
+        second = ParsedTask(step="D8005", status="Approved", verb="React", title="Contact", task="B")
+        
+        self.assertEqual(task_digest(first, "drill"), task_digest(second, "drill"))
+        self.assertNotEqual(task_digest(first, "original"), task_digest(second, "original"))
+        self.assertEqual(len(task_digest(first)), 16)
+    
+    def test_field_boundaries_are_preserved(self):
+        """Test that shifting text between fields changes the digest."""
+        first = ParsedTask(step="1", task="AB", title="C")
+        second = ParsedTask(step="1", task="A", title="BC")
+        self.assertNotEqual(task_digest(first), task_digest(second))
+
+
+class TestDeduplicator(unittest.TestCase):
+    """Test cases for the streaming Deduplicator."""
+    
+    def setUp(self):
+        """Create a temporary directory for seen-sets."""
+        self.tmp = tempfile.TemporaryDirectory()
+    
+    def tearDown(self):
+        """Remove temporary files."""
+        self.tmp.cleanup()
+    
+    def test_filter_matches_remove_duplicates(self):
+        """Test that inline filtering keeps first occurrences in order."""
+        tasks = make_tasks(5) + make_tasks(3)
+        unique = list(Deduplicator("original").filter(iter(tasks)))
+        self.assertEqual(unique, tasks[:5])
+    
+    def test_digest_file_persists_across_runs(self):
+        """Test that a sorted digest file skips rows from earlier runs."""
+        path = os.path.join(self.tmp.name, "seen.digests")
+        
+        with Deduplicator("original", DigestFile(path)) as dedup:
+            self.assertEqual(len(list(dedup.filter(make_tasks(10)))), 10)
+        self.assertEqual(os.path.getsize(path), 10 * 16)
+        
+        with Deduplicator("original", DigestFile(path)) as dedup:
+            emitted = list(dedup.filter(make_tasks(10, start=5)))
+        self.assertEqual([task.step for task in emitted], [str(i) for i in range(10, 15)])
+        
+        with open(path, 'rb') as f:
+            data = f.read()
+        digests = [data[i:i + 16] for i in range(0, len(data), 16)]
+        self.assertEqual(digests, sorted(digests))
+        self.assertEqual(len(digests), 15)
+    
+    def test_bloom_filter_persists_across_runs(self):
+        """Test that a Bloom filter skips rows from earlier runs."""
+        path = os.path.join(self.tmp.name, "seen.bloom")
+        
+        with Deduplicator("original", BloomFilter(path, capacity=1000, false_positive_rate=0.001)) as dedup:
+            list(dedup.filter(make_tasks(100)))
+        
+        store = open_seen_store(path)
+        self.assertIsInstance(store, BloomFilter)
+        self.assertEqual(len(store), 100)
+        with Deduplicator("original", store) as dedup:
+            emitted = list(dedup.filter(make_tasks(200)))
+        self.assertEqual(len(emitted), 100)
+    
+    def test_discard_leaves_seen_set_untouched(self):
+        """Test that a discarded run records none of its tasks."""
+        for name in ("seen.digests", "seen.bloom"):
+            path = os.path.join(self.tmp.name, name)
+            with Deduplicator("original", open_seen_store(path)) as dedup:
+                list(dedup.filter(make_tasks(5)))
+            with open(path, 'rb') as f:
+                saved = f.read()
+            
+            dedup = Deduplicator("original", open_seen_store(path))
+            self.assertEqual(len(list(dedup.filter(make_tasks(10)))), 5)
+            dedup.discard()
+            with open(path, 'rb') as f:
+                self.assertEqual(f.read(), saved)
+            
+            with Deduplicator("original", open_seen_store(path)) as dedup:
+                self.assertEqual(len(list(dedup.filter(make_tasks(10)))), 5)
+    
+    def test_context_manager_discards_on_error(self):
+        """Test that a with block that raises does not save its tasks."""
+        path = os.path.join(self.tmp.name, "seen.digests")
+        with self.assertRaises(OSError):
+            with Deduplicator("original", DigestFile(path)) as dedup:
+                list(dedup.filter(make_tasks(3)))
+                raise OSError("disk full")
+        self.assertFalse(os.path.exists(path))
+    
+    def test_bloom_filter_rejects_invalid_rate(self):
+        """Test that the false-positive rate is validated."""
+        with self.assertRaises(ValueError):
+            BloomFilter(os.path.join(self.tmp.name, "bad.bloom"), false_positive_rate=1.5)
+    
+    def test_parser_remove_duplicates_with_seen_set(self):
+        """Test that remove_duplicates honours a persisted seen-set."""
+        parser = TaskParser()
+        path = os.path.join(self.tmp.name, "seen.digests")
+        
+        with Deduplicator("original", DigestFile(path)) as dedup:
+            parser.remove_duplicates(make_tasks(4), "original", deduplicator=dedup)
+        with Deduplicator("original", DigestFile(path)) as dedup:
+            unique = parser.remove_duplicates(make_tasks(6), "original", deduplicator=dedup)
+        self.assertEqual(unique, make_tasks(2, start=4))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,146 @@
+"""
+Tests for automatic pattern type detection.
+"""
+
+import logging
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add src directory to path for imports
+project_root = Path(__file__).parent.parent
+src_path = project_root / "src"
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+from batch import parse_files, save_batch_results
+from detect import detect_pattern_type, sample_file, sample_lines
+from task_parser import TaskParser, TaskPatternConfig
+
+INPUT_DIR = project_root / "data" / "input"
+
+ORIGINAL_LINE = "071-410-0010 Conduct a Leader's Reconnaissance 071 - Infantry (Individual) Approved"
+DRILL_LINE = "D8005 Approved React Direct Fire Contact While Mounted"
+NOISE_LINE = "Page 12 of 40 -- distribution restricted to training units"
+
+
+def matchers():
+    """Return the matcher of every registered pattern type."""
+    return [TaskPatternConfig.get_matcher(name) for name in TaskPatternConfig.get_available_types()]
+
+
+class TestSampling(unittest.TestCase):
+    """Test cases for line sampling."""
+
+    def test_small_input_is_sampled_whole(self):
+        """Test that an input shorter than the head is sampled completely."""
+        text = "first\nsecond\nthird"
+        self.assertEqual(sample_lines(text), [text])
+        self.assertEqual(sample_lines(text.encode()), [text])
+
+    def test_samples_are_whole_lines(self):
+        """Test that random offsets are realigned to line boundaries."""
+        lines = [f"line {index:06d}" for index in range(5000)]
+        blocks = sample_lines("\n".join(lines), head_lines=10, samples=8, sample_lines=4)
+        self.assertGreater(len(blocks), 1)
+        valid = set(lines)
+        for block in blocks:
+            for line in block.split("\n"):
+                self.assertIn(line, valid)
+
+    def test_sampling_is_bounded(self):
+        """Test that the sample size does not grow with the input."""
+        line = "x" * 60
+        small = sample_lines("\n".join([line] * 2000), head_lines=50, samples=4, sample_lines=10)
+        large = sample_lines("\n".join([line] * 200000), head_lines=50, samples=4, sample_lines=10)
+        count = lambda blocks: sum(block.count("\n") + 1 for block in blocks)
+        self.assertLessEqual(count(small), 90)
+        self.assertLessEqual(count(large), 90)
+
+    def test_overlong_lines_are_skipped(self):
+        """Test that lines longer than the limit are left out of the sample."""
+        text = "short\n" + "y" * 100 + "\nshort again"
+        self.assertEqual(sample_lines(text, max_line_length=20), ["short\nshort again"])
+
+    def test_sample_file(self):
+        """Test sampling a file through mmap, including an empty file."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "empty.txt")
+            open(path, 'w').close()
+            self.assertEqual(sample_file(path), [])
+        blocks = sample_file(str(INPUT_DIR / "drill_format.txt"))
+        self.assertIn(DRILL_LINE, blocks[0])
+
+
+class TestDetectPatternType(unittest.TestCase):
+    """Test cases for scoring sampled lines."""
+
+    def test_sample_files(self):
+        """Test that the bundled samples are detected as their format."""
+        parser = TaskParser(logging.WARNING)
+        self.assertEqual(parser.detect_pattern_type(str(INPUT_DIR / "original_format.txt")).pattern_type,
+                         "original")
+        self.assertEqual(parser.detect_pattern_type(str(INPUT_DIR / "drill_format.txt")).pattern_type,
+                         "drill")
+
+    def test_specific_type_wins_over_general(self):
+        """Test that original wins although drill also matches every line."""
+        blocks = ["\n".join([ORIGINAL_LINE, NOISE_LINE, ORIGINAL_LINE, "", NOISE_LINE])]
+        detection = detect_pattern_type(blocks, matchers())
+        self.assertEqual(detection.pattern_type, "original")
+        self.assertEqual(detection.scores["drill"], 1.0)
+        self.assertEqual(detection.scores["original"], 0.5)
+        self.assertEqual(detection.lines_sampled, 4)
+
+    def test_low_confidence_raises(self):
+        """Test that a sample no type explains raises without a fallback."""
+        with self.assertRaises(ValueError):
+            detect_pattern_type(["", "   "], matchers())
+
+    def test_fallback(self):
+        """Test that the fallback type is used when confidence is too low."""
+        detection = detect_pattern_type([DRILL_LINE], matchers(), min_confidence=1.5,
+                                        fallback="original")
+        self.assertEqual(detection.pattern_type, "original")
+        self.assertTrue(detection.fallback)
+
+
+class TestAutoPatternType(unittest.TestCase):
+    """Test cases for the 'auto' pattern type."""
+
+    def setUp(self):
+        """Create a parser that logs warnings only."""
+        self.parser = TaskParser(logging.WARNING)
+
+    def test_parse_file_auto(self):
+        """Test that 'auto' gives the same tasks as the detected type."""
+        for name, expected in (("original_format.txt", "original"), ("drill_format.txt", "drill")):
+            path = str(INPUT_DIR / name)
+            tasks = self.parser.parse_file(path, "auto")
+            self.assertEqual(tasks.pattern_type, expected)
+            self.assertIn("detect", tasks.stats.stages)
+            self.assertEqual([task.to_list(expected) for task in tasks],
+                             [task.to_list(expected) for task in self.parser.parse_file(path, expected)])
+
+    def test_parse_text_auto(self):
+        """Test that parse_text detects the type of its text."""
+        tasks = self.parser.parse_text(DRILL_LINE, "auto", as_table=True)
+        self.assertEqual(tasks.pattern_type, "drill")
+        self.assertEqual(len(tasks), 1)
+
+    def test_mixed_batch(self):
+        """Test that a mixed batch writes one merged CSV per detected type."""
+        paths = [str(INPUT_DIR / "original_format.txt"), str(INPUT_DIR / "drill_format.txt")]
+        results = parse_files(paths, "auto", max_workers=1)
+        self.assertEqual([results[path].pattern_type for path in paths], ["original", "drill"])
+        with tempfile.TemporaryDirectory() as output_dir:
+            written = save_batch_results(self.parser, results, output_dir, "auto")
+            self.assertEqual(len(written), 2)
+            self.assertTrue(written[0].endswith(".csv") and "_batch_original_" in written[0])
+            self.assertIn("_batch_drill_", written[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+"""
+Tests for the run-to-run diff engine.
+"""
+
+import csv
+import logging
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add src directory to path for imports
+project_root = Path(__file__).parent.parent
+src_path = project_root / "src"
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+from diff import diff_tasks, open_run, read_snapshot
+from task_parser import ParsedTask, TaskParser, build_cli
+
+INPUT_DIR = project_root / "data" / "input"
+LEGACY_DIR = project_root / "data" / "output" / "legacy"
+
+
+def make_task(number: int, title: str = "", status: str = "Approved") -> ParsedTask:
+    """Return an original-format task with a numbered task ID."""
+    return ParsedTask(str(number % 3), f"07-CO-{number:04d}", title or f"Title {number}",
+                      "07 - Infantry (Collective)", status)
+
+
+class TestDiffTasks(unittest.TestCase):
+    """Test cases for diff_tasks."""
+
+    def setUp(self):
+        """Build an old run and a new run with known differences."""
+        self.old = [make_task(i) for i in range(50)]
+        self.new = [make_task(i) for i in range(5, 55)]
+        self.new[10] = make_task(15, status="Superseded")
+        self.new[20] = make_task(25, title="Renamed")
+
+    def summary(self, changes):
+        """Reduce changes to comparable (kind, key, fields) tuples."""
+        return sorted((change.kind, change.key, change.fields) for change in changes)
+
+    def test_added_removed_changed(self):
+        """Test that each kind of difference is reported once, in key order."""
+        changes = list(diff_tasks(self.old, self.new))
+        self.assertEqual([change.key for change in changes], sorted(change.key for change in changes))
+        summary = self.summary(changes)
+        self.assertEqual([key for kind, key, _ in summary if kind == 'removed'],
+                         [f"07-CO-{i:04d}" for i in range(5)])
+        self.assertEqual([key for kind, key, _ in summary if kind == 'added'],
+                         [f"07-CO-{i:04d}" for i in range(50, 55)])
+        self.assertEqual([(key, fields) for kind, key, fields in summary if kind == 'changed'],
+                         [("07-CO-0015", ("status",)), ("07-CO-0025", ("title",))])
+        self.assertEqual(list(diff_tasks(self.old, list(self.old))), [])
+
+    def test_spilled_partitions_match_memory(self):
+        """Test that spilling to disk reports the same changes and cleans up."""
+        with tempfile.TemporaryDirectory() as spill_dir:
+            spilled = list(diff_tasks(iter(self.old), iter(self.new), memory_rows=7,
+                                      partitions=4, spill_dir=spill_dir))
+            self.assertEqual(os.listdir(spill_dir), [])
+        self.assertEqual(self.summary(spilled), self.summary(diff_tasks(self.old, self.new)))
+
+    def test_repeated_keys(self):
+        """Test that identical repeats cancel out and the rest pair up in order."""
+        old = [ParsedTask("07", "D8005", "React", "", "Approved", ""),
+               ParsedTask("17", "D8005", "React", "", "Approved", "")]
+        new = [ParsedTask("17", "D8005", "React", "", "Approved", ""),
+               ParsedTask("07", "D8005", "React", "", "Draft", ""),
+               ParsedTask("19", "D8005", "React", "", "Approved", "")]
+        changes = list(diff_tasks(old, new))
+        self.assertEqual([(change.kind, change.fields) for change in changes],
+                         [("changed", ("status",)), ("added", ())])
+        self.assertEqual(changes[0].old.step, "07")
+
+
+class TestRunSources(unittest.TestCase):
+    """Test cases for snapshot reading and the diff command."""
+
+    def setUp(self):
+        """Create a parser and a temporary directory."""
+        self.parser = TaskParser(logging.WARNING)
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        self.tmp.cleanup()
+
+    def test_snapshot_round_trip(self):
+        """Test that a saved snapshot reads back as the parse, compressed or not."""
+        input_path = str(INPUT_DIR / "original_format.txt")
+        tasks = self.parser.parse_file(input_path, "original")
+        for name in ("snapshot.csv", "snapshot.csv.gz"):
+            path = os.path.join(self.tmp.name, name)
+            self.parser.save_to_csv(tasks, path, "original", include_parts=True)
+            format_type, snapshot = read_snapshot(path)
+            self.assertEqual(format_type, "original")
+            self.assertEqual(list(snapshot), list(tasks))
+            self.assertEqual(list(diff_tasks(open_run(path)[1], open_run(input_path)[1])), [])
+
+    def test_legacy_snapshots_without_headers(self):
+        """Test that headerless snapshots are read by position."""
+        format_type, tasks = read_snapshot(str(LEGACY_DIR / "1_output.csv"))
+        first = next(tasks)
+        self.assertEqual(format_type, "original")
+        self.assertEqual((first.task, first.status), ("07-CO-3036", "Approved"))
+
+    def test_cli_report(self):
+        """Test the diff command's report and exit status."""
+        old_path = os.path.join(self.tmp.name, "old.csv")
+        report_path = os.path.join(self.tmp.name, "report.csv")
+        tasks = self.parser.parse_file(str(INPUT_DIR / "original_format.txt"), "original")
+        self.parser.save_to_csv(tasks[1:], old_path, "original")
+
+        cli = build_cli()
+        args = cli.parse_args(["diff", old_path, str(INPUT_DIR / "original_format.txt"),
+                               "-o", report_path])
+        self.assertEqual(args.func(args), 1)
+        with open(report_path, newline='', encoding='utf-8') as f:
+            rows = list(csv.reader(f))
+        self.assertEqual(rows[0][:3], ["Change", "Key", "Changed Fields"])
+        self.assertEqual(rows[1][:2], ["added", tasks[0].task])
+
+        args = cli.parse_args(["diff", old_path, old_path, "-o", report_path])
+        self.assertEqual(args.func(args), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+"""
+Tests for proponent and task code decomposition.
+"""
+
+import csv
+import logging
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add src directory to path for imports
+project_root = Path(__file__).parent.parent
+src_path = project_root / "src"
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+from fields import (PART_HEADERS, PROPONENTS, LookupTable, Proponent, TaskCode,
+                    parse_proponent, parse_task_code)
+from store import TaskStore
+from task_parser import ParsedTask, TaskParser
+
+INPUT_DIR = project_root / "data" / "input"
+
+
+class TestDecomposition(unittest.TestCase):
+    """Test cases for splitting field values."""
+
+    def test_parse_proponent(self):
+        """Test proponents with and without a level."""
+        self.assertEqual(parse_proponent("071 - Infantry (Individual)"),
+                         Proponent("071 - Infantry (Individual)", "071", "Infantry", "Individual"))
+        self.assertEqual(parse_proponent("71 - Mission Command (Collective)")[1:],
+                         ("71", "Mission Command", "Collective"))
+        self.assertEqual(parse_proponent("19 - Military Police")[1:], ("19", "Military Police", ""))
+        self.assertEqual(parse_proponent("Unknown")[1:], ("", "Unknown", ""))
+        self.assertEqual(parse_proponent("")[1:], ("", "", ""))
+
+    def test_parse_task_code(self):
+        """Test collective, individual and undashed task codes."""
+        self.assertEqual(parse_task_code("07-CO-3036"), TaskCode("07-CO-3036", "07", "CO", "3036"))
+        self.assertEqual(parse_task_code("071-410-0010")[1:], ("071", "410", "0010"))
+        self.assertEqual(parse_task_code("D8005")[1:], ("", "", "D8005"))
+
+    def test_lookup_table_shares_values(self):
+        """Test that equal values share one parts object and string."""
+        table = LookupTable(parse_proponent)
+        first = table.get("".join(["07 - Infantry", " (Collective)"]))
+        second = table.get("".join(["07 - Infantry (", "Collective)"]))
+        self.assertIs(first, second)
+        self.assertIs(table.intern("07 - Infantry (Collective)"), first.text)
+        self.assertEqual(len(table), 1)
+
+    def test_lookup_table_is_bounded(self):
+        """Test that values above max_entries are decomposed but not stored."""
+        table = LookupTable(parse_task_code, max_entries=2)
+        for number in range(5):
+            self.assertEqual(table.get(f"07-CO-{number}").number, str(number))
+        self.assertEqual(len(table), 2)
+
+
+class TestParsedTaskParts(unittest.TestCase):
+    """Test cases for the parts exposed by parse results."""
+
+    def setUp(self):
+        """Create a parser that logs warnings only."""
+        self.parser = TaskParser(logging.WARNING)
+
+    def test_task_properties(self):
+        """Test the parts properties and to_list with parts."""
+        task = ParsedTask("1", "07-CO-3036", "Integrate Fires", "07 - Infantry (Collective)", "Approved")
+        self.assertEqual(task.proponent_parts.name, "Infantry")
+        self.assertEqual(task.task_parts.echelon, "CO")
+        self.assertEqual(task.to_list("original", include_parts=True)[5:],
+                         ["07", "Infantry", "Collective", "07", "CO", "3036"])
+        self.assertEqual(len(task.to_list("drill", include_parts=True)), 4 + len(PART_HEADERS))
+
+    def test_parsed_proponents_are_interned(self):
+        """Test that parsed tasks with equal proponents share one string."""
+        tasks = self.parser.parse_file(str(INPUT_DIR / "original_format.txt"), "original")
+        infantry = [task.proponent for task in tasks if task.proponent == "07 - Infantry (Collective)"]
+        self.assertGreater(len(infantry), 1)
+        self.assertTrue(all(value is infantry[0] for value in infantry))
+        self.assertIs(PROPONENTS.get(infantry[0]), tasks[0].proponent_parts)
+
+    def test_table_parts_match_list_parts(self):
+        """Test that TaskTable part columns and rows match the list path."""
+        path = str(INPUT_DIR / "original_format.txt")
+        tasks = self.parser.parse_file(path, "original")
+        table = self.parser.parse_file(path, "original", as_table=True)
+        self.assertEqual(list(table.rows("original", include_parts=True)),
+                         [task.to_list("original", include_parts=True) for task in tasks])
+        self.assertEqual(table.column("proponent_code"), [task.proponent_parts.code for task in tasks])
+
+    def test_csv_and_store_parts(self):
+        """Test that the CSV writer and the store expose the parts."""
+        tasks = self.parser.parse_file(str(INPUT_DIR / "original_format.txt"), "original")
+        with tempfile.TemporaryDirectory() as tmp:
+            output_path = os.path.join(tmp, "parts.csv")
+            self.parser.save_to_csv(tasks, output_path, "original", include_parts=True)
+            with open(output_path, newline='', encoding='utf-8') as f:
+                rows = list(csv.reader(f))
+            self.assertEqual(rows[0][5:], PART_HEADERS)
+            self.assertEqual(rows[1][5:], ["07", "Infantry", "Collective", "07", "CO", "3036"])
+
+            with TaskStore(os.path.join(tmp, "tasks.db")) as store:
+                store.add(tasks, "original")
+                self.assertEqual(store.count(proponent_code="071", level="Individual"), 2)
+                self.assertEqual(store.count(level="Collective"), len(tasks) - 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
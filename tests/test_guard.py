@@ -0,0 +1,94 @@
+"""
+Tests for the match guard and the backtracking risk check.
+"""
+
+import json
+import os
+import re
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add src directory to path for imports
+project_root = Path(__file__).parent.parent
+src_path = project_root / "src"
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+from guard import MatchGuard, backtracking_risks
+from task_parser import TaskParser, TaskPatternConfig
+
+
+class TestBacktrackingRisks(unittest.TestCase):
+    """Test cases for the static backtracking check."""
+    
+    def test_builtin_patterns(self):
+        """Test the original patterns are flagged and the drill pattern is not."""
+        self.assertEqual(len(TaskPatternConfig.check_backtracking("original")), 2)
+        self.assertEqual(TaskPatternConfig.check_backtracking("drill"), {})
+        
+        risks = TaskPatternConfig.check_backtracking("original")
+        for descriptions in risks.values():
+            self.assertIn("group 'title'", descriptions[0])
+            self.assertIn("group 'proponent'", descriptions[0])
+    
+    def test_known_shapes(self):
+        """Test nested and overlapping quantifiers are flagged."""
+        self.assertIn("nested quantifier", backtracking_risks(r"(a+)+b")[0])
+        self.assertTrue(backtracking_risks(r"\w+\w+x"))
+        self.assertEqual(backtracking_risks(r"\d+\s+\w+"), [])
+        self.assertEqual(backtracking_risks(r"\s+.*"), [])
+
+
+class TestMatchGuard(unittest.TestCase):
+    """Test cases for MatchGuard."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.good = "1. 07-CO-3036 Integrate Indirect Fire Support - Company 07 - Infantry (Collective) Approved\n"
+        self.bad = "x " * 2000 + "Approved\n"
+    
+    def test_matches_unguarded_results(self):
+        """Test guarded parsing equals unguarded parsing on the sample files."""
+        guarded = TaskParser(guard=MatchGuard(block_lines=3))
+        plain = TaskParser()
+        for path in sorted((project_root / "data" / "input").glob("*.txt")):
+            pattern_type = "drill" if "drill" in path.name else "original"
+            text = path.read_text(encoding="utf-8")
+            with self.subTest(path=path.name):
+                self.assertEqual(guarded.parse_text(text, pattern_type),
+                                 plain.parse_text(text, pattern_type))
+        self.assertEqual(guarded.guard.quarantined, [])
+    
+    def test_long_lines_quarantined(self):
+        """Test lines over the length limit are skipped and written out."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            quarantine_path = os.path.join(temp_dir, "quarantine.jsonl")
+            guard = MatchGuard(max_line_length=1000, quarantine_path=quarantine_path)
+            tasks = TaskParser(guard=guard).parse_text(self.good + self.bad + self.good, "original")
+            
+            with open(quarantine_path, encoding="utf-8") as f:
+                records = [json.loads(line) for line in f]
+        
+        self.assertEqual(len(tasks), 2)
+        self.assertEqual(tasks.stats.quarantined, 1)
+        self.assertEqual([r["alternative"] for r in records], [0])
+        self.assertEqual(records[0]["offset"], len(self.good))
+        self.assertEqual(records[0]["reason"], "line too long")
+        self.assertEqual(records[0]["line"], self.bad.rstrip("\n"))
+    
+    @unittest.skipUnless(MatchGuard().can_interrupt, "SIGALRM is not available")
+    def test_time_budget_quarantines_slow_lines(self):
+        """Test a line that exceeds the time budget is cut off."""
+        guard = MatchGuard(time_budget=0.02, max_line_length=None)
+        tasks = TaskParser(guard=guard).parse_text(self.good + self.bad + self.good, "original")
+        
+        self.assertEqual(len(tasks), 2)
+        self.assertGreaterEqual(guard.timeouts, 2)
+        self.assertIn("time budget exceeded", [r.reason for r in guard.quarantined])
+        self.assertTrue(all(r.offset == len(self.good) for r in guard.quarantined))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,195 @@
+"""
+Test suite for the incremental (tail) parsing module.
+
+Tests that appended data is parsed once and that rewrites trigger a full parse.
+"""
+
+import unittest
+import tempfile
+import codecs
+import csv
+import gzip
+import os
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+# Add src directory to path for imports
+project_root = Path(__file__).parent.parent
+src_path = project_root / "src"
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+from incremental import IncrementalParser
+from task_parser import TaskParser
+
+DRILL_LINES = [
+    "D8005 Approved React Direct Fire Contact While Mounted\n",
+    "D9508 Approved Establish Security at the Halt\n",
+    "D1234 Approved Move Under Direct Fire Contact\n",
+    "D9505 Approved Break Contact\n",
+]
+
+
+class TestIncrementalParser(unittest.TestCase):
+    """Test cases for IncrementalParser."""
+    
+    def setUp(self):
+        """Create an input log, an output path and a checkpoint directory."""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.input_path = os.path.join(self.tmp.name, "statuses.log")
+        self.output_path = os.path.join(self.tmp.name, "statuses.csv")
+        self.incremental = IncrementalParser(checkpoint_dir=os.path.join(self.tmp.name, "checkpoints"),
+                                             overlap_lines=1)
+    
+    def tearDown(self):
+        """Remove temporary files."""
+        self.tmp.cleanup()
+    
+    def append(self, text: str) -> None:
+        """Append text to the input log."""
+        with open(self.input_path, 'a', encoding='utf-8') as f:
+            f.write(text)
+    
+    def read_rows(self):
+        """Read the output CSV rows."""
+        with open(self.output_path, 'r', encoding='utf-8', newline='') as f:
+            return list(csv.reader(f))
+    
+    def test_appends_only_new_rows(self):
+        """Test that each run appends only the rows added since the last one."""
+        self.append(DRILL_LINES[0] + DRILL_LINES[1])
+        new_tasks = self.incremental.update(self.input_path, self.output_path, "drill")
+        self.assertEqual([task.step for task in new_tasks], ["D8005"])  # D9508 may still grow
+        
+        self.append(DRILL_LINES[2] + DRILL_LINES[0])  # One new row, one repeat
+        new_tasks = self.incremental.update(self.input_path, self.output_path, "drill")
+        self.assertEqual([task.step for task in new_tasks], ["D9508", "D1234"])
+        
+        self.assertEqual(len(self.incremental.update(self.input_path, self.output_path, "drill")), 0)
+        
+        rows = self.read_rows()
+        self.assertEqual(rows[0], ["Step", "Status", "Verb", "Title"])
+        expected = TaskParser().parse_file(self.input_path, "drill")
+        self.assertEqual(rows[1:], [task.to_list("drill") for task in expected])
+    
+    def test_failed_append_is_retried(self):
+        """Test that rows whose append failed are appended by the next run."""
+        self.append(DRILL_LINES[0] + DRILL_LINES[1])
+        self.incremental.update(self.input_path, self.output_path, "drill")
+        
+        self.append(DRILL_LINES[2])
+        with patch.object(self.incremental.parser, 'save_to_csv', side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                self.incremental.update(self.input_path, self.output_path, "drill")
+        
+        new_tasks = self.incremental.update(self.input_path, self.output_path, "drill")
+        self.assertEqual([task.step for task in new_tasks], ["D9508"])
+        self.assertEqual([row[0] for row in self.read_rows()[1:]], ["D8005", "D9508"])
+    
+    def test_record_across_blank_lines(self):
+        """Test a record completed by an append after a long run of blank lines."""
+        self.append("HEADER\n" + "\n" * 9)
+        self.incremental.update(self.input_path, self.output_path, "drill")
+        self.append(DRILL_LINES[0])
+        self.incremental.update(self.input_path, self.output_path, "drill")
+        
+        expected = TaskParser().parse_file(self.input_path, "drill")
+        self.assertEqual(expected[0].step, "HEADER")
+        self.assertEqual(self.read_rows()[1:], [task.to_list("drill") for task in expected])
+    
+    def test_partial_line_waits_for_newline(self):
+        """Test that an unterminated last line is parsed once completed."""
+        self.append(DRILL_LINES[0] + DRILL_LINES[2] + "D9508 Approved Establish")
+        self.assertEqual(len(self.incremental.update(self.input_path, self.output_path, "drill")), 1)
+        
+        self.append(" Security at the Halt\n" + DRILL_LINES[3])
+        new_tasks = self.incremental.update(self.input_path, self.output_path, "drill")
+        self.assertEqual([task.to_list("drill") for task in new_tasks],
+                         [["D1234", "Approved", "Move", "Under Direct Fire Contact"],
+                          ["D9508", "Approved", "Establish", "Security at the Halt"]])
+    
+    def test_record_split_across_appends(self):
+        """Test that a record at the end of the file waits for the lines completing it."""
+        self.append("D1 Approved React\n")
+        self.assertEqual(self.incremental.update(self.input_path, self.output_path, "drill"), [])
+        
+        self.append("Direct Fire\n")
+        self.incremental.update(self.input_path, self.output_path, "drill")
+        
+        expected = TaskParser().parse_file(self.input_path, "drill")
+        self.assertEqual(expected[0].to_list("drill"), ["D1", "Approved", "React", "Direct Fire"])
+        self.assertEqual(self.read_rows()[1:], [expected[0].to_list("drill")])
+    
+    def test_transformed_input_is_parsed_in_full(self):
+        """Test that compressed, CRLF and cp1252 inputs match parse_file on every run."""
+        contents = {
+            "gzip": gzip.compress("".join(DRILL_LINES[:2]).encode("utf-8")),
+            "crlf": "".join(DRILL_LINES[:2]).replace("\n", "\r\n").encode("utf-8"),
+            "cp1252": ("D8005 Approved React Direct Fire Contact \u2013 Mounted\n"
+                       + DRILL_LINES[1]).encode("cp1252"),
+        }
+        for name, data in contents.items():
+            with self.subTest(input=name):
+                with open(self.input_path, 'wb') as f:
+                    f.write(data)
+                for _ in range(2):
+                    new_tasks = self.incremental.update(self.input_path, self.output_path, "drill")
+                    expected = TaskParser().parse_file(self.input_path, "drill")
+                    self.assertEqual(new_tasks, expected)
+                    self.assertEqual(self.read_rows()[1:], [task.to_list("drill") for task in expected])
+                self.assertIsNone(self.incremental.load_checkpoint(self.input_path))
+    
+    def test_byte_order_mark_is_skipped(self):
+        """Test that a UTF-8 byte order mark does not reach the first row."""
+        with open(self.input_path, 'wb') as f:
+            f.write(codecs.BOM_UTF8 + "".join(DRILL_LINES[:2]).encode("utf-8"))
+        new_tasks = self.incremental.update(self.input_path, self.output_path, "drill")
+        self.assertEqual([task.step for task in new_tasks], ["D8005"])
+        
+        self.append(DRILL_LINES[2])
+        new_tasks = self.incremental.update(self.input_path, self.output_path, "drill")
+        self.assertEqual([task.step for task in new_tasks], ["D9508"])
+        self.assertIsNotNone(self.incremental.load_checkpoint(self.input_path))
+    
+    def test_tail_is_read_from_checkpoint(self):
+        """Test that a tail run does not re-read the whole file."""
+        self.append("".join(DRILL_LINES[:3]))
+        self.incremental.update(self.input_path, self.output_path, "drill")
+        offset = self.incremental.load_checkpoint(self.input_path)["offset"]
+        self.assertGreater(offset, 0)
+        
+        self.append(DRILL_LINES[3])
+        with patch.object(self.incremental.parser, 'save_to_csv') as mock_save:
+            self.incremental.update(self.input_path, self.output_path, "drill")
+            self.assertTrue(mock_save.call_args.kwargs["append"])
+    
+    def test_truncated_file_triggers_full_parse(self):
+        """Test that a truncated or rewritten file is parsed from scratch."""
+        self.append("".join(DRILL_LINES))
+        self.incremental.update(self.input_path, self.output_path, "drill")
+        
+        with open(self.input_path, 'w', encoding='utf-8') as f:
+            f.write(DRILL_LINES[3] + DRILL_LINES[0])
+        new_tasks = self.incremental.update(self.input_path, self.output_path, "drill")
+        
+        self.assertEqual([task.step for task in new_tasks], ["D9505"])
+        self.assertEqual(len(self.read_rows()), 2)  # Header plus the single row
+        reason = self.incremental.needs_full_parse(
+            self.input_path, self.output_path, "drill", self.incremental.load_checkpoint(self.input_path))
+        self.assertIsNone(reason)
+    
+    def test_rewritten_prefix_detected(self):
+        """Test that changing bytes before the checkpoint is detected."""
+        self.append("".join(DRILL_LINES))
+        self.incremental.update(self.input_path, self.output_path, "drill")
+        
+        with open(self.input_path, 'r+', encoding='utf-8') as f:
+            f.write("D0000")
+        checkpoint = self.incremental.load_checkpoint(self.input_path)
+        self.assertEqual(self.incremental.needs_full_parse(
+            self.input_path, self.output_path, "drill", checkpoint), "file rewritten")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+"""
+Tests for parse stage metrics.
+"""
+
+import os
+import pickle
+import sys
+import tempfile
+import tracemalloc
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+# Add src directory to path for imports
+project_root = Path(__file__).parent.parent
+src_path = project_root / "src"
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+from metrics import ParseStats, TaskList, capture
+from task_parser import TaskParser
+
+
+class TestParseStats(unittest.TestCase):
+    """Test cases for ParseStats."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.metrics = ParseStats()
+        self.parser = TaskParser(metrics=self.metrics)
+        self.text = (
+            "1. 07-CO-3036 Integrate Indirect Fire Support - Company 07 - Infantry (Collective) Approved\n"
+            "07-PLT-D9501 React to Contact Battle Drill 07 - Infantry (Collective) Approved\n"
+            "1. 07-CO-3036 Integrate Indirect Fire Support - Company 07 - Infantry (Collective) Approved\n"
+        )
+    
+    def test_parse_file_stats(self):
+        """Test parse_file results carry every stage and match counts."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            input_path = os.path.join(temp_dir, "tasks.txt")
+            with open(input_path, "w", encoding="utf-8") as f:
+                f.write(self.text)
+            
+            tasks = self.parser.parse_file(input_path, "original")
+        
+        stats = tasks.stats
+        self.assertEqual(list(stats.stages), ["read", "match", "populate", "dedup"])
+        self.assertEqual(stats.stages["read"].bytes, len(self.text))
+        self.assertEqual(stats.stages["match"].calls, 2)
+        self.assertEqual(stats.stages["populate"].rows, 4)
+        self.assertEqual(stats.stages["dedup"].rows, len(tasks))
+        self.assertEqual(len(tasks), 3)
+        self.assertEqual([p.matches for p in stats.patterns.values()], [3, 1])
+    
+    def test_metrics_accumulate_without_double_counting(self):
+        """Test the parser recorder sums stages across calls."""
+        tasks = self.parser.parse_text(self.text, "original")
+        self.parser.remove_duplicates(tasks, "original")
+        self.parser.parse_text(self.text, "original", as_table=True)
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            self.parser.save_to_csv(tasks, os.path.join(temp_dir, "out.csv"), "original")
+        
+        self.assertEqual(self.metrics.stages["match"].calls, 4)
+        self.assertEqual(self.metrics.stages["populate"].rows, 8)
+        self.assertEqual(self.metrics.stages["dedup"].calls, 1)
+        self.assertEqual(self.metrics.stages["write"].rows, 4)
+        self.assertGreater(self.metrics.stages["write"].bytes, 0)
+        self.assertEqual(self.metrics.patterns[("original", 0)].matches, 6)
+    
+    def test_prometheus_text(self):
+        """Test the Prometheus exposition output."""
+        self.parser.parse_text(self.text, "original")
+        text = self.metrics.to_prometheus(labels={"host": "a"})
+        
+        self.assertIn("# TYPE task_parser_stage_seconds_total counter", text)
+        self.assertIn('task_parser_stage_rows_total{host="a",stage="populate"} 4', text)
+        self.assertIn('task_parser_pattern_matches_total{host="a",type="original",alternative="1"} 1', text)
+        self.assertTrue(text.endswith("\n"))
+    
+    def test_task_list_pickles_with_stats(self):
+        """Test results keep their stats across process boundaries."""
+        tasks = self.parser.parse_text(self.text, "original")
+        restored = pickle.loads(pickle.dumps(tasks))
+        
+        self.assertIsInstance(restored, TaskList)
+        self.assertEqual(restored, tasks)
+        self.assertEqual(restored.stats.to_dict(), tasks.stats.to_dict())
+
+
+class TestCapture(unittest.TestCase):
+    """Test cases for capture()."""
+    
+    def test_capture_profile_and_memory(self):
+        """Test cProfile and tracemalloc data are collected."""
+        parser = TaskParser()
+        with capture(cpu=True, memory=True) as result:
+            parser.parse_text("2 Battle Drill 1 Conduct Platoon Attack Approved\n" * 100, "original")
+        
+        self.assertIn("parse_text", result.profile_report())
+        self.assertGreater(result.peak_memory, 0)
+        self.assertTrue(result.top_allocations(3))
+    
+    def test_capture_while_tracing_without_reset_peak(self):
+        """Test the Python 3.8 fallback when tracemalloc is already tracing."""
+        tracemalloc.start()
+        self.addCleanup(tracemalloc.stop)
+        with patch("metrics.tracemalloc", wraps=tracemalloc, spec=["start", "stop", "is_tracing",
+                                                                    "get_traceback_limit",
+                                                                    "get_traced_memory",
+                                                                    "take_snapshot"]):
+            with capture(cpu=False, memory=True) as result:
+                bytearray(100000)
+        self.assertGreater(result.peak_memory, 100000)
+        self.assertTrue(tracemalloc.is_tracing())
+
+
+if __name__ == '__main__':
+    unittest.main()
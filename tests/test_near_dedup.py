@@ -0,0 +1,187 @@
+"""
+Tests for near-duplicate detection.
+"""
+
+import csv
+import itertools
+import logging
+import os
+import random
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add src directory to path for imports
+project_root = Path(__file__).parent.parent
+src_path = project_root / "src"
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+from near_dedup import (NearDeduplicator, canonical_key, canonical_text, jaccard, lsh_bands,
+                        shingles, signature)
+from task_parser import ParsedTask, TaskParser
+
+PROPONENT = "07 - Infantry (Collective)"
+
+
+def task(task_id: str, title: str, step: str = "", status: str = "Approved") -> ParsedTask:
+    """Build an original-format task."""
+    return ParsedTask(step, task_id, title, PROPONENT, status)
+
+
+class TestCanonicalForm(unittest.TestCase):
+    """Test cases for canonical keys and signatures."""
+
+    def test_formatting_is_ignored(self):
+        """Test that case, punctuation, spacing and list numbers are ignored."""
+        self.assertEqual(canonical_text("  1. 07-CO-3036 "), "07 co 3036")
+        self.assertEqual(canonical_text("Integrate  Indirect Fire-Support"), "integrate indirect fire support")
+        self.assertEqual(canonical_key(task("07-CO-3036", "React to Contact", step="1")),
+                         canonical_key(task("1. 07-co-3036", "REACT  to contact.")))
+        self.assertNotEqual(canonical_key(task("07-CO-3036", "React to Contact")),
+                            canonical_key(task("07-CO-3036", "React to Contact", status="Draft")))
+
+    def test_signature(self):
+        """Test that equal sets get equal signatures and similar sets share bins."""
+        first = shingles("conduct a leaders reconnaissance of the objective")
+        second = shingles("conduct a leader reconnaissance of the objective")
+        self.assertEqual(signature(first), signature(set(first)))
+        agreement = sum(a == b for a, b in zip(signature(first), signature(second))) / 32
+        self.assertGreater(agreement, 0.5)
+        self.assertEqual(len(signature(shingles("ab"))), 32)
+
+    def test_lsh_bands(self):
+        """Test that banding covers the signature and favors recall at the threshold."""
+        for threshold in (0.5, 0.8, 0.95):
+            bands, rows = lsh_bands(threshold, 32)
+            self.assertEqual(bands * rows, 32)
+            self.assertGreaterEqual(1 - (1 - threshold ** rows) ** bands, 0.98)
+
+
+class TestNearDeduplicator(unittest.TestCase):
+    """Test cases for NearDeduplicator."""
+
+    def setUp(self):
+        """Build tasks with formatting variants and a reworded title."""
+        self.tasks = [
+            task("07-CO-3036", "Integrate Indirect Fire Support - Company", step="1"),
+            task("71-CO-5100", "Conduct Troop Leading Procedures"),
+            task("1. 07-co-3036", "integrate indirect fire support company"),
+            task("07-PLT-3036", "Integrate Indirect Fire Support - Company"),
+            task("07-CO-3036", "Integrate Indirect Fire Supports - Company"),
+        ]
+
+    def test_groups_and_survivors(self):
+        """Test that copies are merged, distinct task IDs are not, and order is kept."""
+        near = NearDeduplicator("original")
+        self.assertEqual(list(near.filter(self.tasks)), [self.tasks[0], self.tasks[1], self.tasks[3]])
+        self.assertEqual(near.removed, 2)
+        self.assertEqual(len(near.groups), 1)
+        self.assertEqual(near.groups[0].merged, [self.tasks[2], self.tasks[4]])
+        self.assertEqual(near.groups[0].similarity[0], 1.0)
+        self.assertLess(near.groups[0].similarity[1], 1.0)
+
+        self.assertEqual(NearDeduplicator("original", same_key=False).find_groups(self.tasks),
+                         [[0, 2, 3, 4]])
+        self.assertEqual(NearDeduplicator("original", threshold=0.99).find_groups(self.tasks), [[0, 2]])
+
+    def test_other_fields_must_match(self):
+        """Test that similar titles with a different proponent or status are not merged."""
+        tasks = [ParsedTask("07", "D8005", "React to Direct Fire Contact While Mounted Rifle Platoon",
+                            "07 - Infantry (Collective)", "Approved"),
+                 ParsedTask("17", "D8005", "React to Direct Fire Contact While Mounted Platoon",
+                            "17 - Armor (Collective)", "Approved"),
+                 task("D8005", "React to Direct Fire Contact While Mounted Rifle Platoons", status="Draft")]
+        for same_key in (True, False):
+            self.assertEqual(NearDeduplicator("original", same_key=same_key).find_groups(tasks), [])
+        self.assertEqual(NearDeduplicator("original").find_groups(tasks + [task("D8005", tasks[0].title)]),
+                         [[0, 3]])
+
+    def test_keep_policies(self):
+        """Test which copy survives under each policy."""
+        tasks = [self.tasks[2], self.tasks[0], self.tasks[4]]
+        for keep, expected in (("first", tasks[0]), ("last", tasks[2]), ("longest", tasks[2])):
+            self.assertEqual(list(NearDeduplicator(keep=keep).filter(tasks)), [expected])
+        with self.assertRaises(ValueError):
+            NearDeduplicator(keep="random")
+
+    def test_drill_format(self):
+        """Test that drills are keyed on their drill number."""
+        drills = [ParsedTask("D8005", "Approved", "React Direct Fire Contact While Mounted", "", "", "React"),
+                  ParsedTask("d8005", "approved", "React Direct Fire Contact, While Mounted", "", "", "react"),
+                  ParsedTask("D9508", "Approved", "React Direct Fire Contact While Mounted", "", "", "React")]
+        self.assertEqual(NearDeduplicator("drill").find_groups(drills), [[0, 1]])
+
+    def test_matches_brute_force(self):
+        """Test that LSH finds every pair above the threshold on generated titles."""
+        rng = random.Random(7)
+        words = "react direct fire contact mounted conduct troop leading procedures platoon".split()
+        tasks = []
+        for number in range(300):
+            title = " ".join(rng.sample(words, 6))
+            tasks.append(task(f"07-CO-{number % 60}", title))
+            if rng.random() < 0.3:
+                tasks.append(task(f"07-CO-{number % 60}", title.replace(" ", "  ", 1) + "s"))
+
+        near = NearDeduplicator("original", threshold=0.7)
+        parent = list(range(len(tasks)))
+
+        def find(index):
+            while parent[index] != index:
+                index = parent[index]
+            return index
+
+        for first, second in itertools.combinations(range(len(tasks)), 2):
+            if tasks[first].task != tasks[second].task:
+                continue
+            similarity = jaccard(shingles(canonical_text(tasks[first].title)),
+                                 shingles(canonical_text(tasks[second].title)))
+            if similarity >= 0.7:
+                parent[max(find(first), find(second))] = min(find(first), find(second))
+        expected = {}
+        for index in range(len(tasks)):
+            expected.setdefault(find(index), []).append(index)
+        self.assertEqual(near.find_groups(tasks), [group for group in expected.values() if len(group) > 1])
+
+    def test_comparisons_are_bounded(self):
+        """Test that each task is compared with at most bands * bucket_size others."""
+        rng = random.Random(3)
+        words = "react direct fire contact mounted conduct troop leading".split()
+        tasks = [task(f"07-CO-{number}", " ".join(rng.sample(words, 5))) for number in range(600)]
+
+        near = NearDeduplicator("original", same_key=False, bucket_size=2)
+        groups = near.find_groups(tasks)
+        self.assertLessEqual(near.compared, len(tasks) * near.bands * 2)
+        uncapped = NearDeduplicator("original", same_key=False, bucket_size=len(tasks))
+        uncapped.find_groups(tasks)
+        self.assertGreater(uncapped.compared, len(tasks) * near.bands * 2)
+
+        # Every merge is still a confirmed similar pair
+        titles = [shingles(canonical_text(item.title)) for item in tasks]
+        for group in groups:
+            for index in group[1:]:
+                self.assertTrue(any(jaccard(titles[index], titles[other]) >= near.threshold
+                                    for other in group if other != index))
+
+    def test_remove_duplicates_and_audit(self):
+        """Test use as a remove_duplicates stage and the audit CSV."""
+        parser = TaskParser(logging.WARNING)
+        near = NearDeduplicator("original")
+        unique = parser.remove_duplicates(self.tasks, "original", deduplicator=near)
+        self.assertEqual(len(unique), 3)
+        self.assertEqual(unique.stats.stages["dedup"].rows, 3)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "audit.csv")
+            self.assertEqual(near.write_audit(path), 1)
+            with open(path, newline='', encoding='utf-8') as f:
+                rows = list(csv.reader(f))
+        self.assertEqual(rows[0], ["Group", "Action", "Similarity", "Step", "Task", "Title",
+                                   "Proponent", "Status"])
+        self.assertEqual([row[:3] for row in rows[1:3]], [["1", "kept", ""], ["1", "merged", "1.000"]])
+        self.assertEqual(rows[2][4], "1. 07-co-3036")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+"""
+Test suite for the parallel file parsing module.
+
+Tests range splitting and that parallel output matches serial parse_file exactly.
+"""
+
+import unittest
+import tempfile
+import mmap
+import os
+import sys
+from pathlib import Path
+
+# Add src directory to path for imports
+project_root = Path(__file__).parent.parent
+src_path = project_root / "src"
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+from parallel import split_ranges
+from task_parser import TaskParser
+
+SAMPLES_DIR = project_root / "data" / "samples"
+
+
+def build_corpus() -> str:
+    """Build a corpus with wrapped records, blank lines and non-ASCII text."""
+    lines = []
+    for sample in sorted(SAMPLES_DIR.glob("*.txt")):
+        lines.extend(sample.read_text(encoding="utf-8").splitlines())
+    
+    corpus = []
+    for index in range(400):
+        line = lines[(index * 7) % len(lines)]
+        if index % 5 == 0:
+            line = line.replace(" ", "\n", 2)  # Record wrapped across lines
+        elif index % 11 == 0:
+            line += " Été"
+        elif index % 13 == 0:
+            line = ""
+        corpus.append(line)
+    return "\n".join(corpus)
+
+
+class TestSplitRanges(unittest.TestCase):
+    """Test cases for newline-aligned range splitting."""
+    
+    def test_ranges_cover_file_on_line_boundaries(self):
+        """Test that ranges are contiguous and end on newlines."""
+        data = b"alpha\nbravo charlie\ndelta\n\necho"
+        with tempfile.TemporaryFile() as f:
+            f.write(data)
+            f.flush()
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                ranges = split_ranges(mm, 4)
+        
+        self.assertEqual(ranges[0][0], 0)
+        self.assertEqual(ranges[-1][1], len(data))
+        for (_, end), (start, _) in zip(ranges, ranges[1:]):
+            self.assertEqual(end, start)
+            self.assertEqual(data[end - 1:end], b"\n")
+
+
+class TestParseFileParallel(unittest.TestCase):
+    """Test cases comparing parallel and serial parsing."""
+    
+    def setUp(self):
+        """Write the corpus to a temporary file."""
+        self.parser = TaskParser()
+        with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.txt', encoding='utf-8') as tmp:
+            tmp.write(build_corpus())
+            self.input_path = tmp.name
+    
+    def tearDown(self):
+        """Remove temporary files."""
+        os.unlink(self.input_path)
+    
+    def write_csv(self, tasks, pattern_type) -> bytes:
+        """Write tasks to CSV and return the raw bytes."""
+        output_path = self.input_path + ".csv"
+        try:
+            self.parser.save_to_csv(tasks, output_path, pattern_type)
+            with open(output_path, 'rb') as f:
+                return f.read()
+        finally:
+            os.unlink(output_path)
+    
+    def test_output_matches_serial_byte_for_byte(self):
+        """Test that parallel CSV output is identical to serial parse_file."""
+        for pattern_type in ("original", "drill"):
+            serial = self.write_csv(self.parser.parse_file(self.input_path, pattern_type), pattern_type)
+            for max_workers in (1, 2):
+                with self.subTest(pattern_type=pattern_type, max_workers=max_workers):
+                    tasks = self.parser.parse_file_parallel(
+                        self.input_path, pattern_type, max_workers=max_workers, chunk_bytes=256)
+                    self.assertEqual(self.write_csv(tasks, pattern_type), serial)
+    
+    def test_crlf_output_matches_serial(self):
+        """Test that parallel parsing of CRLF input matches serial parse_file."""
+        with open(self.input_path, 'rb') as f:
+            corpus = f.read()
+        with open(self.input_path, 'wb') as f:
+            f.write(b"Page 3 of 9\r\n071-420-0009 Conduct Dismounted Movement "
+                    b"071 - Infantry (Individual) Approved\r\n" + corpus.replace(b"\n", b"\r\n"))
+        for pattern_type in ("original", "drill"):
+            serial = self.write_csv(self.parser.parse_file(self.input_path, pattern_type), pattern_type)
+            for max_workers in (1, 2):
+                with self.subTest(pattern_type=pattern_type, max_workers=max_workers):
+                    tasks = self.parser.parse_file_parallel(
+                        self.input_path, pattern_type, max_workers=max_workers, chunk_bytes=256)
+                    self.assertEqual(self.write_csv(tasks, pattern_type), serial)
+    
+    def test_match_across_long_blank_run(self):
+        """Test a drill match whose whitespace spans more lines than the overlap."""
+        with open(self.input_path, 'w', encoding='utf-8') as f:
+            f.write("HEADER\n" + "\n" * 9 + "D8005 Approved React Direct Fire\n" + " \n" * 12 + "D9508\n")
+        serial = self.parser.parse_file(self.input_path, "drill")
+        self.assertEqual(serial[0].to_list("drill"), ["HEADER", "D8005", "Approved", "React Direct Fire"])
+        for max_workers in (1, 2):
+            with self.subTest(max_workers=max_workers):
+                tasks = self.parser.parse_file_parallel(self.input_path, "drill",
+                                                        max_workers=max_workers, chunk_bytes=4)
+                self.assertEqual(tasks, serial)
+    
+    def test_empty_file(self):
+        """Test parsing an empty file."""
+        with tempfile.NamedTemporaryFile(delete=False, suffix='.txt') as tmp:
+            empty_path = tmp.name
+        try:
+            self.assertEqual(self.parser.parse_file_parallel(empty_path, "original"), [])
+        finally:
+            os.unlink(empty_path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+"""
+Tests for the literal prefilter.
+"""
+
+import random
+import re
+import sys
+import unittest
+from pathlib import Path
+
+# Add src directory to path for imports
+project_root = Path(__file__).parent.parent
+src_path = project_root / "src"
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+from prefilter import analyze_pattern, candidate_windows
+from task_parser import TaskMatcher, TaskPatternConfig
+
+
+class TestAnalyzePattern(unittest.TestCase):
+    """Test cases for analyze_pattern."""
+    
+    def test_original_patterns(self):
+        """Test anchors and line spans derived from the built-in patterns."""
+        first, second = TaskPatternConfig.get_patterns("original")
+        self.assertEqual(analyze_pattern(first, re.MULTILINE), (("Approved",), 6))
+        self.assertEqual(analyze_pattern(second, re.MULTILINE), (("Battle Drill", "Approved"), 6))
+    
+    def test_unprefilterable_patterns(self):
+        """Test patterns without anchors or with unbounded spans."""
+        drill = TaskPatternConfig.get_patterns("drill")[0]
+        self.assertEqual(analyze_pattern(drill, re.MULTILINE), ((), None))
+        self.assertIsNone(analyze_pattern(r"Approved\s+\w+")[1])
+        self.assertIsNone(analyze_pattern(r"(?s)Approved.+")[1])
+        self.assertIsNone(analyze_pattern(r"Approved$")[1])
+        self.assertEqual(analyze_pattern(r"(?i)Approved .+")[0], ())
+        self.assertEqual(analyze_pattern(r"(?:Approved|Pending) .+"), ((), 0))
+
+
+class TestCandidateWindows(unittest.TestCase):
+    """Test cases for candidate_windows."""
+    
+    def test_windows_cover_span(self):
+        """Test windows start span lines above an anchor and reach span lines below."""
+        text = "a\nb\nc\nd Approved\ne\nf\ng\nh\n"
+        windows = list(candidate_windows(text, ("Approved",), 2))
+        self.assertEqual(windows, [(text.index("b"), text.index("\ne") + 1, text.index("g"))])
+    
+    def test_bytes_text(self):
+        """Test windows over bytes use the same offsets as over str."""
+        text = "x\ny Approved\nz\n" * 3
+        self.assertEqual(list(candidate_windows(text.encode(), (b"Approved",), 1)),
+                         list(candidate_windows(text, ("Approved",), 1)))
+
+
+class TestPrefilteredMatcher(unittest.TestCase):
+    """Test cases for prefiltered TaskMatcher scans."""
+    
+    def setUp(self):
+        """Set up matchers with and without the prefilter."""
+        patterns = TaskPatternConfig.get_patterns("original")
+        self.fast = TaskMatcher("original", patterns)
+        self.slow = TaskMatcher("original", patterns, prefilter=False)
+    
+    def _matches(self, matcher, alternative, text, pos=0, endpos=None):
+        return [(match.span(), match.groups())
+                for match in matcher.finditer(alternative, text, pos, endpos)]
+    
+    def test_identical_to_full_scan(self):
+        """Test prefiltered matches equal full-text matches on random texts."""
+        rng = random.Random(7)
+        tokens = ["Approved", "Battle Drill", "07 - Infantry", "1.", "07-PLT-",
+                  "\n", "\n\n", " ", "\t", "x", "abc", "12 -", "- "]
+        for _ in range(500):
+            text = "".join(rng.choice(tokens) for _ in range(rng.randint(0, 60)))
+            pos = rng.randint(0, len(text))
+            endpos = rng.randint(pos, len(text))
+            for alternative in (0, 1):
+                for args in ((), (pos,), (pos, endpos)):
+                    self.assertEqual(self._matches(self.fast, alternative, text, *args),
+                                     self._matches(self.slow, alternative, text, *args),
+                                     repr((text, args)))
+    
+    def test_sample_files(self):
+        """Test the sample input files parse identically."""
+        for path in sorted((project_root / "data" / "input").glob("*.txt")):
+            text = path.read_text(encoding="utf-8")
+            for alternative in (0, 1):
+                with self.subTest(path=path.name, alternative=alternative):
+                    self.assertEqual(self._matches(self.fast, alternative, text),
+                                     self._matches(self.slow, alternative, text))
+    
+    def test_declared_anchors(self):
+        """Test declared anchors replace the derived ones."""
+        pattern = TaskPatternConfig.get_patterns("original")[0]
+        matcher = TaskMatcher("original", [pattern], anchors={pattern: ("Company",)})
+        self.assertEqual(matcher.prefilters, [(("Company",), 6)])
+        
+        text = "1. 07-CO-3036 Fire Support - Company 07 - Infantry Approved\n"
+        self.assertEqual(len(matcher.parse(text)), 1)
+        self.assertEqual(matcher.parse(text.replace("Company", "Troop")), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,157 @@
+"""
+Tests for reading compressed and non-UTF-8 input.
+"""
+
+import bz2
+import gzip
+import logging
+import lzma
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add src directory to path for imports
+project_root = Path(__file__).parent.parent
+src_path = project_root / "src"
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+from batch import find_input_files, parse_files
+from reader import (InputTooLarge, detect_compression, detect_encoding, input_format,
+                    open_input, read_text)
+from task_parser import TaskParser, generate_output_filename
+
+INPUT_DIR = project_root / "data" / "input"
+
+COMPRESSORS = {".gz": gzip.compress, ".xz": lzma.compress, ".bz2": bz2.compress}
+
+
+class TestDetection(unittest.TestCase):
+    """Test cases for compression and encoding detection."""
+
+    def setUp(self):
+        """Create a temporary directory."""
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        self.tmp.cleanup()
+
+    def write(self, name: str, data: bytes) -> str:
+        """Write bytes to a file in the temporary directory."""
+        path = os.path.join(self.tmp.name, name)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+
+    def test_compression_from_magic_bytes(self):
+        """Test that compression is recognized by content, not extension."""
+        data = b"D8005 Approved React\n"
+        self.assertEqual(detect_compression(self.write("a.txt", gzip.compress(data))), "gzip")
+        self.assertEqual(detect_compression(self.write("b.txt", lzma.compress(data))), "lzma")
+        self.assertEqual(detect_compression(self.write("c.txt", bz2.compress(data))), "bz2")
+        self.assertEqual(detect_compression(self.write("d.gz", data)), "")
+
+    def test_detect_encoding(self):
+        """Test BOMs, UTF-16 without a BOM, UTF-8 and the cp1252 fallback."""
+        text = "Conduct a Leader’s Reconnaissance\n"
+        self.assertEqual(detect_encoding(text.encode("utf-8-sig")), "utf-8-sig")
+        self.assertEqual(detect_encoding(text.encode("utf-16")), "utf-16")
+        self.assertEqual(detect_encoding(text.encode("utf-16-le")), "utf-16-le")
+        self.assertEqual(detect_encoding(text.encode("utf-16-be")), "utf-16-be")
+        self.assertEqual(detect_encoding(text.encode("utf-8")), "utf-8")
+        self.assertEqual(detect_encoding(text.encode("cp1252")), "cp1252")
+        # A sample cut inside a multi-byte character is still UTF-8
+        self.assertEqual(detect_encoding(text.encode("utf-8")[:25]), "utf-8")
+
+    def test_open_input_decodes(self):
+        """Test that compressed, BOM-prefixed and CRLF input reads as plain text."""
+        text = "Leader’s Reconnaissance\nSecond line\n"
+        path = self.write("x.txt.gz", gzip.compress(text.replace("\n", "\r\n").encode("utf-16")))
+        self.assertEqual(read_text(path), text)
+        self.assertEqual(input_format(path), ("gzip", "utf-16"))
+
+    def test_size_limit_applies_to_decompressed_bytes(self):
+        """Test that a small archive of a large text is rejected while reading."""
+        data = b"x" * 4096 + b"\n"
+        path = self.write("big.txt.gz", gzip.compress(data * 64))
+        self.assertLess(os.path.getsize(path), 4096)
+        with self.assertRaises(InputTooLarge):
+            read_text(path, max_bytes=64 * 1024)
+        self.assertEqual(len(read_text(path, max_bytes=None)), len(data) * 64)
+        with self.assertRaises(InputTooLarge):
+            open_input(self.write("big.txt", data * 64), max_bytes=1024)
+
+
+class TestParsing(unittest.TestCase):
+    """Test cases for parsing compressed and re-encoded input."""
+
+    def setUp(self):
+        """Create a parser and a temporary directory."""
+        self.parser = TaskParser(logging.WARNING)
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        self.tmp.cleanup()
+
+    def copies(self, name: str):
+        """Yield compressed and re-encoded copies of a sample input file."""
+        with open(INPUT_DIR / name, 'rb') as f:
+            data = f.read()
+        for extension, compress in COMPRESSORS.items():
+            path = os.path.join(self.tmp.name, name + extension)
+            with open(path, 'wb') as f:
+                f.write(compress(data))
+            yield path
+        for encoding in ("utf-16", "utf-8-sig"):
+            path = os.path.join(self.tmp.name, f"{encoding}_{name}")
+            with open(path, 'wb') as f:
+                f.write(data.decode("utf-8").encode(encoding))
+            yield path
+
+    def test_parse_matches_plain_file(self):
+        """Test that every parse path gives the plain file's tasks."""
+        for name, pattern_type in (("original_format.txt", "original"), ("drill_format.txt", "drill")):
+            expected = self.parser.parse_file(str(INPUT_DIR / name), pattern_type)
+            for path in self.copies(name):
+                with self.subTest(path=os.path.basename(path)):
+                    self.assertEqual(self.parser.parse_file(path, pattern_type), expected)
+                    self.assertEqual(list(self.parser.iter_file(path, pattern_type)), expected)
+                    self.assertEqual(self.parser.parse_file(path, "auto").pattern_type, pattern_type)
+                    self.assertEqual(self.parser.parse_file_parallel(path, pattern_type, max_workers=1),
+                                     expected)
+
+    def test_parser_size_limit(self):
+        """Test that max_file_size_mb limits the decompressed size of whole-file reads."""
+        path = next(self.copies("original_format.txt"))
+        parser = TaskParser(logging.WARNING, max_file_size_mb=0.0001)
+        with self.assertRaises(InputTooLarge):
+            parser.parse_file(path, "original")
+        with self.assertRaises(InputTooLarge):
+            parse_files([path], "original", max_bytes=parser.max_input_bytes)
+        self.assertEqual(parse_files([path], "original", max_bytes=None)[path],
+                         self.parser.parse_file(str(INPUT_DIR / "original_format.txt"), "original"))
+
+    def test_streaming_paths_are_not_limited(self):
+        """Test that paths that do not hold the whole file ignore the limit."""
+        plain = str(INPUT_DIR / "original_format.txt")
+        expected = self.parser.parse_file(plain, "original")
+        parser = TaskParser(logging.WARNING, max_file_size_mb=0.0001)
+        self.assertEqual(list(parser.iter_file(next(self.copies("original_format.txt")), "original")),
+                         expected)
+        self.assertEqual(parser.parse_file_mmap(plain, "original"), expected)
+        self.assertEqual(parser.parse_file_parallel(plain, "original", max_workers=1), expected)
+
+    def test_compressed_files_are_discovered(self):
+        """Test that batch discovery and output names handle .txt.gz files."""
+        paths = list(self.copies("drill_format.txt"))
+        found = [os.path.basename(path) for path in find_input_files(self.tmp.name)]
+        self.assertEqual(found, sorted(os.path.basename(path) for path in paths))
+        self.assertTrue(generate_output_filename(paths[0]).startswith("drill_format_parsed_"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+"""
+Tests for the pattern registry.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add src directory to path for imports
+project_root = Path(__file__).parent.parent
+src_path = project_root / "src"
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+from registry import PatternRegistry, load_pattern_file, validate_pattern
+from task_parser import TaskMatcher, TaskParser, TaskPatternConfig
+
+PACK = """[patterns]
+# Tasks of another proponent
+signal_patterns = [
+    "(?P<task>SIG-\\\\d+)\\\\s(?P<title>.+?)\\\\s(?P<status>Approved)"
+]
+"""
+
+
+class TestPatternFiles(unittest.TestCase):
+    """Test cases for loading and validating pattern files."""
+    
+    def test_settings_match_builtin_patterns(self):
+        """Test config/settings.ini declares the built-in patterns."""
+        patterns = load_pattern_file(project_root / "config" / "settings.ini")
+        self.assertEqual(patterns, TaskPatternConfig.PATTERNS)
+    
+    def test_unindented_closing_bracket(self):
+        """Test a closing bracket in the first column stays part of the list."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "pack.ini"
+            path.write_text(PACK.replace("    ]", "]"), encoding="utf-8")
+            patterns = load_pattern_file(path)
+        self.assertEqual(patterns, {"signal": [r"(?P<task>SIG-\d+)\s(?P<title>.+?)\s(?P<status>Approved)"]})
+    
+    def test_validation(self):
+        """Test invalid patterns are rejected."""
+        with self.assertRaises(ValueError):
+            validate_pattern("a" * 11, max_length=10)
+        with self.assertRaises(ValueError):
+            validate_pattern("(unclosed")
+        with self.assertRaises(ValueError):
+            validate_pattern("")
+        with self.assertRaises(ValueError):
+            validate_pattern("(?P<colour>x)", allowed_groups=TaskMatcher.FIELDS)
+        self.assertEqual(validate_pattern("(?P<title>x)", allowed_groups=TaskMatcher.FIELDS), "(?P<title>x)")
+
+
+class TestPatternRegistry(unittest.TestCase):
+    """Test cases for PatternRegistry and its use by TaskPatternConfig."""
+    
+    def setUp(self):
+        """Set up a registry over a temporary pattern-pack directory."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.pack_dir = Path(self.temp_dir.name)
+        self.pack_path = self.pack_dir / "signal.ini"
+        self.pack_path.write_text(PACK, encoding="utf-8")
+        self.registry = PatternRegistry(
+            defaults=TaskPatternConfig.PATTERNS, settings_path=None, pack_dir=self.pack_dir,
+            allowed_groups=TaskMatcher.FIELDS, reload_interval=0
+        )
+        TaskPatternConfig.use_registry(self.registry)
+    
+    def tearDown(self):
+        """Restore the default registry."""
+        TaskPatternConfig.use_registry(None)
+        self.temp_dir.cleanup()
+    
+    def _edit_pack(self, text):
+        self.pack_path.write_text(text, encoding="utf-8")
+        stat = self.pack_path.stat()
+        os.utime(self.pack_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    
+    def test_pack_adds_type(self):
+        """Test a pattern pack adds a new type usable by the parser."""
+        self.assertEqual(TaskPatternConfig.get_available_types(), ["original", "drill", "signal"])
+        tasks = TaskParser().parse_text("SIG-12 Install Antenna Approved\n", "signal")
+        self.assertEqual(tasks[0].to_list("signal"), ["", "SIG-12", "Install Antenna", "", "Approved"])
+    
+    def test_hot_reload(self):
+        """Test edited packs are reloaded and matchers are only rebuilt on change."""
+        matcher = TaskPatternConfig.get_matcher("signal")
+        self.assertIs(TaskPatternConfig.get_matcher("signal"), matcher)
+        original_matcher = TaskPatternConfig.get_matcher("original")
+        
+        self._edit_pack(PACK.replace("SIG-", "SC-"))
+        changed = TaskPatternConfig.get_matcher("signal")
+        self.assertIsNot(changed, matcher)
+        self.assertIn("SC-", changed.patterns[0])
+        self.assertIs(TaskPatternConfig.get_matcher("original"), original_matcher)
+        
+        self._edit_pack(PACK)
+        self.assertIs(TaskPatternConfig.get_matcher("signal"), matcher)
+    
+    def test_invalid_reload_keeps_patterns(self):
+        """Test an invalid edit is ignored until it is fixed."""
+        version = self.registry.version
+        self._edit_pack(PACK.replace("(?P<title>", "(?P<colour>"))
+        self.assertFalse(self.registry.maybe_reload())
+        self.assertEqual(self.registry.version, version)
+        self.assertIn("signal", self.registry.get_available_types())
+        
+        with self.assertRaises(ValueError):
+            PatternRegistry(settings_path=None, pack_dir=self.pack_dir,
+                            allowed_groups=TaskMatcher.FIELDS)
+
+
+if __name__ == '__main__':
+    unittest.main()
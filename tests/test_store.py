@@ -0,0 +1,139 @@
+"""
+Tests for the SQLite task store.
+"""
+
+import io
+import logging
+import os
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+
+# Add src directory to path for imports
+project_root = Path(__file__).parent.parent
+src_path = project_root / "src"
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+from metrics import ParseStats
+from store import TaskStore
+from task_parser import ParsedTask, TaskParser, main
+
+INPUT_DIR = project_root / "data" / "input"
+
+
+def make_tasks():
+    """Return a few tasks from two proponents."""
+    return [
+        ParsedTask("1", "07-CO-3036", "Integrate Indirect Fire Support - Company",
+                   "07 - Infantry (Collective)", "Approved"),
+        ParsedTask("2", "71-CO-5100", "Conduct Troop Leading Procedures",
+                   "71 - Mission Command (Collective)", "Approved"),
+        ParsedTask("", "071-410-0010", "Conduct a Leader's Reconnaissance",
+                   "071 - Infantry (Individual)", "Draft"),
+    ]
+
+
+class TestTaskStore(unittest.TestCase):
+    """Test cases for TaskStore."""
+
+    def setUp(self):
+        """Open a store in a temporary directory."""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "tasks.db")
+        self.store = TaskStore(self.path, batch_size=2)
+
+    def tearDown(self):
+        """Close the store and remove the directory."""
+        self.store.close()
+        self.tmp.cleanup()
+
+    def test_add_and_query(self):
+        """Test filtering by task, proponent prefix, status and title."""
+        self.assertEqual(self.store.add(make_tasks(), "original", source="a.txt"), 3)
+        self.assertEqual(len(self.store), 3)
+        self.assertEqual(self.store.query(task="71-CO-5100")[0].title, "Conduct Troop Leading Procedures")
+        self.assertEqual([t.task for t in self.store.query(proponent="07")],
+                         ["07-CO-3036", "071-410-0010"])
+        self.assertEqual([t.task for t in self.store.query(proponent="07 - ")], ["07-CO-3036"])
+        self.assertEqual(self.store.count(status="Approved"), 2)
+        self.assertEqual(self.store.count(title="Conduct", status="Draft"), 1)
+        self.assertEqual(len(self.store.query(limit=1)), 1)
+        self.assertEqual(self.store.count(source="b.txt"), 0)
+
+    def test_upsert(self):
+        """Test that adding the same tasks again updates instead of duplicating."""
+        self.store.add(make_tasks(), "original", source="a.txt")
+        created = self.store.connection.execute("SELECT MIN(created_at) FROM tasks").fetchone()[0]
+        self.store.add(make_tasks(), "original", source="b.txt")
+        self.assertEqual(len(self.store), 3)
+        self.assertEqual(self.store.count(source="b.txt"), 3)
+        self.assertEqual(self.store.connection.execute(
+            "SELECT MIN(created_at) FROM tasks").fetchone()[0], created)
+
+    def test_wal_and_indexes(self):
+        """Test that the database uses WAL and indexed lookups."""
+        mode = self.store.connection.execute("PRAGMA journal_mode").fetchone()[0]
+        self.assertEqual(mode, "wal")
+        for column, value in (("task", "x"), ("status", "x")):
+            plan = self.store.connection.execute(
+                f"EXPLAIN QUERY PLAN SELECT * FROM tasks WHERE {column} = ?", (value,)).fetchall()
+            self.assertIn(f"tasks_{column}", str(plan))
+        where, params = self.store._where(None, "071", None, None, None, None)
+        plan = self.store.connection.execute(f"EXPLAIN QUERY PLAN SELECT * FROM tasks{where}",
+                                             params).fetchall()
+        self.assertIn("tasks_proponent", str(plan))
+
+    def test_bulk_load_restores_indexes(self):
+        """Test that a load into an empty store, even one that fails, ends indexed."""
+        def failing():
+            yield from make_tasks()
+            raise OSError("read error")
+
+        with self.assertRaises(OSError):
+            self.store.add(failing(), "original")
+        self.assertEqual(len(self.store), 2)  # The first full batch was committed
+        self.store.add(make_tasks(), "original")
+        self.assertEqual(self.store.connection.execute("PRAGMA synchronous").fetchone()[0], 1)
+        indexes = {row[0] for row in self.store.connection.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND name LIKE 'tasks_%'")}
+        self.assertEqual(indexes, {"tasks_task", "tasks_proponent", "tasks_status", "tasks_proponent_code"})
+        self.assertEqual([t.task for t in self.store.query(proponent_code="071", level="Individual")],
+                         ["071-410-0010"])
+
+    def test_save_to_store(self):
+        """Test storing a parsed file through the parser, with metrics."""
+        metrics = ParseStats()
+        parser = TaskParser(logging.WARNING, metrics=metrics)
+        tasks = parser.parse_file(str(INPUT_DIR / "drill_format.txt"), "drill")
+        self.assertEqual(parser.save_to_store(tasks, self.store, "drill"), len(tasks))
+        self.assertEqual(metrics.stages["store"].rows, len(tasks))
+        self.assertEqual(self.store.query(pattern_type="drill", task="")[0].status, "Approved")
+
+
+class TestStoreCommand(unittest.TestCase):
+    """Test cases for the store command."""
+
+    def test_load_and_query(self):
+        """Test loading the samples and querying them from the command line."""
+        with tempfile.TemporaryDirectory() as tmp:
+            db = os.path.join(tmp, "tasks.db")
+            inputs = [str(INPUT_DIR / "original_format.txt"), str(INPUT_DIR / "drill_format.txt")]
+            with redirect_stdout(io.StringIO()):
+                self.assertEqual(main(["store", "--db", db, "load"] + inputs), 0)
+            output = io.StringIO()
+            with redirect_stdout(output):
+                self.assertEqual(main(["store", "--db", db, "query", "--proponent", "071"]), 0)
+            lines = output.getvalue().splitlines()
+            self.assertEqual(lines[0], "Step,Task,Title,Proponent,Status,Verb")
+            self.assertTrue(lines[1].startswith(",071-410-0010,"))
+            output = io.StringIO()
+            with redirect_stdout(output):
+                main(["store", "--db", db, "query", "--type", "drill", "--count"])
+            self.assertEqual(output.getvalue().strip(), "3")
+
+
+if __name__ == '__main__':
+    unittest.main()
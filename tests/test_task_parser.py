@@ -7,7 +7,7 @@ Tests various parsing scenarios, error handling, and edge cases.
 import unittest
 import tempfile
 import os
-from unittest.mock import patch, mock_open
+from unittest.mock import patch
 import sys
 from pathlib import Path
 
@@ -22,7 +22,7 @@ if str(project_root) not in sys.path:
     sys.path.insert(0, str(project_root))
 
 try:
-    from task_parser import TaskParser, ParsedTask, TaskPatternConfig, generate_output_filename
+    from task_parser import TaskParser, ParsedTask, TaskPatternConfig, TaskMatcher, generate_output_filename
 except ImportError as e:
     print(f"Import error: {e}")
     print(f"Current working directory: {os.getcwd()}")
@@ -79,6 +79,30 @@ class TestTaskPatternConfig(unittest.TestCase):
         types = TaskPatternConfig.get_available_types()
         self.assertIn("original", types)
         self.assertIn("drill", types)
+    
+    def test_get_matcher_is_shared(self):
+        """Test that matchers are compiled once and reused."""
+        matcher = TaskPatternConfig.get_matcher("original")
+        self.assertIsInstance(matcher, TaskMatcher)
+        self.assertIs(TaskPatternConfig.get_matcher("original"), matcher)
+        self.assertEqual(len(matcher.regexes), len(TaskPatternConfig.get_patterns("original")))
+    
+    def test_matcher_tags_alternatives(self):
+        """Test that scan reports which alternative produced each match."""
+        line = "07-PLT-D8005 React to Contact Rifle Platoon Battle Drill 07 - Infantry (Collective) Approved"
+        matcher = TaskPatternConfig.get_matcher("original")
+        alternatives = [alternative for alternative, _ in matcher.scan(line)]
+        self.assertEqual(alternatives, [0, 1])
+        
+        drill_task = matcher.build_task(1, list(matcher.scan(line))[1][1])
+        self.assertEqual(drill_task.step, "07")
+        self.assertEqual(drill_task.task, "D8005")
+    
+    def test_matcher_records_invalid_patterns(self):
+        """Test that invalid patterns are skipped and reported."""
+        matcher = TaskMatcher("broken", [r"(?P<step>\d+", r"(?P<step>\d+)"])
+        self.assertEqual(len(matcher.regexes), 1)
+        self.assertEqual(len(matcher.errors), 1)
 
 
 class TestTaskParser(unittest.TestCase):
@@ -125,14 +149,61 @@ class TestTaskParser(unittest.TestCase):
         with self.assertRaises(FileNotFoundError):
             self.parser.parse_file("nonexistent.txt", "original")
     
-    @patch("builtins.open", new_callable=mock_open, read_data="test content")
+    @patch("task_parser.read_text", return_value="test content")
     @patch("os.path.isfile", return_value=True)
-    def test_parse_file_success(self, mock_isfile, mock_file):
+    def test_parse_file_success(self, mock_isfile, mock_read):
         """Test successful file parsing."""
         with patch.object(self.parser, 'parse_text', return_value=[]) as mock_parse:
             tasks = self.parser.parse_file("test.txt", "original")
             mock_parse.assert_called_once_with("test content", "original")
     
+    def test_parse_stream_matches_parse_text(self):
+        """Test that chunked streaming finds the same tasks as parse_text."""
+        text = (self.sample_original_text + "\nPage footer\n") * 50
+        expected = sorted(tuple(t.to_list("original")) for t in self.parser.parse_text(text, "original"))
+        
+        pieces = [text[i:i + 37] for i in range(0, len(text), 37)]
+        streamed = self.parser.parse_stream(pieces, "original", chunk_size=200, overlap_lines=4)
+        
+        self.assertEqual(sorted(tuple(t.to_list("original")) for t in streamed), expected)
+    
+    def test_stream_carries_long_blank_runs(self):
+        """Test a match whose whitespace spans more lines than the overlap."""
+        text = "HEADER\n" + "\n" * 9 + "D8005 Approved React Direct Fire\n" + " \n" * 12 + "D9508\n"
+        expected = [task.to_list("drill") for task in self.parser.parse_text(text, "drill")]
+        self.assertEqual(expected[0], ["HEADER", "D8005", "Approved", "React Direct Fire"])
+        
+        with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.txt') as tmp:
+            tmp.write(text)
+            input_path = tmp.name
+        try:
+            for chunk_size in (1, 4, 16):
+                with self.subTest(chunk_size=chunk_size):
+                    tasks = self.parser.iter_file(input_path, "drill", chunk_size=chunk_size)
+                    self.assertEqual([task.to_list("drill") for task in tasks], expected)
+        finally:
+            os.unlink(input_path)
+    
+    def test_iter_file_streams_to_csv(self):
+        """Test that iter_file output can be streamed straight into save_to_csv."""
+        with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.txt') as tmp:
+            tmp.write(self.sample_drill_text * 3)
+            input_path = tmp.name
+        output_path = input_path + ".csv"
+        
+        try:
+            tasks = self.parser.iter_file(input_path, "drill", chunk_size=16)
+            self.assertNotIsInstance(tasks, list)
+            self.parser.save_to_csv(tasks, output_path, "drill")
+            
+            with open(output_path, 'r', encoding='utf-8') as f:
+                rows = f.read().splitlines()
+            self.assertEqual(len(rows), 3)  # Header plus two unique drills
+        finally:
+            os.unlink(input_path)
+            if os.path.exists(output_path):
+                os.unlink(output_path)
+    
     def test_save_to_csv(self):
         """Test saving tasks to CSV file."""
         tasks = [
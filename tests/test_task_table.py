@@ -0,0 +1,104 @@
+"""
+Test suite for the columnar task table.
+
+Tests dictionary encoding, row views, slicing, deduplication and parser integration.
+"""
+
+import unittest
+import tempfile
+import os
+import sys
+from pathlib import Path
+
+# Add src directory to path for imports
+project_root = Path(__file__).parent.parent
+src_path = project_root / "src"
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+from task_parser import TaskParser, ParsedTask
+from task_table import TaskTable
+
+
+class TestParsedTaskSlots(unittest.TestCase):
+    """Test cases for the slotted ParsedTask."""
+    
+    def test_no_instance_dict(self):
+        """Test that tasks do not carry a per-instance __dict__."""
+        task = ParsedTask(step="1")
+        self.assertFalse(hasattr(task, "__dict__"))
+        with self.assertRaises(AttributeError):
+            task.extra = "value"
+
+
+class TestTaskTable(unittest.TestCase):
+    """Test cases for TaskTable."""
+    
+    def setUp(self):
+        """Set up a table with a repeated proponent and one duplicate row."""
+        self.tasks = [
+            ParsedTask(step="1", task="07-CO-3036", title="Integrate Fires", proponent="07 - Infantry", status="Approved"),
+            ParsedTask(step="2", task="07-CO-3027", title="Direct Fires", proponent="07 - Infantry", status="Approved"),
+            ParsedTask(step="1", task="07-CO-3036", title="Integrate Fires", proponent="07 - Infantry", status="Approved"),
+        ]
+        self.table = TaskTable(self.tasks)
+    
+    def test_iteration_round_trips_tasks(self):
+        """Test that iterating yields equal ParsedTask objects."""
+        self.assertEqual(len(self.table), 3)
+        self.assertEqual(list(self.table), self.tasks)
+        self.assertEqual(self.table[1], self.tasks[1])
+    
+    def test_values_are_dictionary_encoded(self):
+        """Test that repeated values are stored once."""
+        self.assertEqual(self.table.distinct("proponent"), ["07 - Infantry"])
+        self.assertEqual(self.table.column("status"), ["Approved"] * 3)
+    
+    def test_slicing_returns_table(self):
+        """Test that slicing returns a TaskTable view of the rows."""
+        part = self.table[1:]
+        self.assertIsInstance(part, TaskTable)
+        self.assertEqual(part.to_tasks(), self.tasks[1:])
+    
+    def test_to_list_matches_row_format(self):
+        """Test that row views match ParsedTask.to_list."""
+        for format_type in ("original", "drill"):
+            self.assertEqual(self.table.to_list(format_type),
+                             [task.to_list(format_type) for task in self.tasks])
+    
+    def test_drop_duplicates(self):
+        """Test that duplicates are removed keeping first occurrences."""
+        unique = self.table.drop_duplicates("original")
+        self.assertEqual(unique.to_tasks(), self.tasks[:2])
+    
+    def test_unknown_column(self):
+        """Test requesting an unknown column."""
+        with self.assertRaises(KeyError):
+            self.table.column("unknown")
+
+
+class TestParserTableOutput(unittest.TestCase):
+    """Test cases for TaskTable results from TaskParser."""
+    
+    def test_parse_file_as_table_matches_list(self):
+        """Test that table results and CSV output match the list path."""
+        parser = TaskParser()
+        input_path = str(project_root / "data" / "samples" / "sample_task_data_1.txt")
+        
+        tasks = parser.parse_file(input_path, "original")
+        table = parser.parse_file(input_path, "original", as_table=True)
+        
+        self.assertIsInstance(table, TaskTable)
+        self.assertEqual(table.to_tasks(), tasks)
+        
+        with tempfile.TemporaryDirectory() as output_dir:
+            list_path = os.path.join(output_dir, "list.csv")
+            table_path = os.path.join(output_dir, "table.csv")
+            parser.save_to_csv(tasks, list_path)
+            parser.save_to_csv(table, table_path)
+            with open(list_path, 'rb') as a, open(table_path, 'rb') as b:
+                self.assertEqual(a.read(), b.read())
+
+
+if __name__ == '__main__':
+    unittest.main()
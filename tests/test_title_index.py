@@ -0,0 +1,152 @@
+"""
+Tests for the inverted title index.
+"""
+
+import io
+import logging
+import os
+import random
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+
+# Add src directory to path for imports
+project_root = Path(__file__).parent.parent
+src_path = project_root / "src"
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+from metrics import ParseStats
+from task_parser import ParsedTask, TaskParser, build_cli
+from title_index import Segment, TitleIndex, tokenize, write_segment
+
+INPUT_DIR = project_root / "data" / "input"
+WORDS = ["direct", "fire", "reconnaissance", "recover", "react", "company", "platoon",
+         "conduct", "anti-armor", "Défense"]
+
+
+def random_tasks(count: int, seed: int) -> list:
+    """Build tasks with random titles drawn from WORDS."""
+    rng = random.Random(seed)
+    return [ParsedTask(str(number), f"07-CO-{seed}-{number}",
+                       " ".join(rng.sample(WORDS, rng.randint(1, 4))),
+                       "07 - Infantry (Collective)", "Approved")
+            for number in range(count)]
+
+
+class TestTitleIndex(unittest.TestCase):
+    """Test cases for TitleIndex."""
+
+    def setUp(self):
+        """Create a temporary index directory."""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "index")
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        self.tmp.cleanup()
+
+    def matching(self, tasks, predicate):
+        """Row ids of the tasks whose title tokens satisfy predicate, by brute force."""
+        return [row for row, task in enumerate(tasks) if predicate(set(tokenize(task.title)))]
+
+    def test_tokenize(self):
+        """Test that titles split into lower-case words without punctuation."""
+        self.assertEqual(tokenize("React to Direct-Fire Contact (Mounted) - Défense"),
+                         ["react", "to", "direct", "fire", "contact", "mounted", "défense"])
+
+    def check_queries(self, index, tasks):
+        """Compare AND, OR and prefix queries with brute force."""
+        self.assertEqual(index.search_ids("direct fire"),
+                         self.matching(tasks, lambda t: {"direct", "fire"} <= t))
+        self.assertEqual(index.search_ids("platoon OR anti-armor"),
+                         self.matching(tasks, lambda t: "platoon" in t or {"anti", "armor"} <= t))
+        self.assertEqual(index.search_ids("REC* fire"),
+                         self.matching(tasks, lambda t: "fire" in t and
+                                       any(token.startswith("rec") for token in t)))
+        self.assertEqual(index.search_ids("défense"), self.matching(tasks, lambda t: "défense" in t))
+        self.assertEqual(index.search_ids("missing OR mis*"), [])
+
+    def test_queries_across_segments(self):
+        """Test queries over several segments and after they are merged."""
+        tasks = random_tasks(500, seed=1)
+        with TitleIndex(self.path, segment_rows=128, max_segments=4) as index:
+            self.assertEqual(index.add(tasks[:300]), 300)
+            self.assertEqual(index.segment_count, 3)
+            self.check_queries(index, tasks[:300])
+
+            index.add(tasks[300:])
+            self.assertEqual(index.segment_count, 1)
+            self.check_queries(index, tasks)
+            self.assertEqual(index.search("company", limit=3),
+                             [task for task in tasks if "company" in task.title][:3])
+        self.assertEqual(sorted(os.listdir(self.path)),
+                         ["index.json", "keys.digests", "rows.jsonl", "rows.offsets", "segment-000005.idx"])
+
+    def test_incremental_updates(self):
+        """Test that reopened indexes skip known tasks and append new ones."""
+        tasks = random_tasks(100, seed=2)
+        with TitleIndex(self.path) as index:
+            index.add(tasks[:60])
+        with TitleIndex(self.path) as index:
+            self.assertEqual(index.add(tasks), 40)
+            self.assertEqual(len(index), 100)
+            self.assertEqual(index.rows([0, 99]), [tasks[0], tasks[99]])
+            self.assertEqual(index.lookup("conduct"), self.matching(tasks, lambda t: "conduct" in t))
+
+    def test_uncommitted_rows_are_discarded(self):
+        """Test that rows written by an interrupted add are dropped."""
+        tasks = random_tasks(20, seed=3)
+        with TitleIndex(self.path) as index:
+            index.add(tasks[:10])
+        for name in (TitleIndex.ROWS, TitleIndex.ROW_OFFSETS):
+            with open(os.path.join(self.path, name), "ab") as f:
+                f.write(b"partial row data")
+        with TitleIndex(self.path) as index:
+            index.add(tasks[10:])
+            self.assertEqual(index.rows(range(20)), tasks)
+
+    def test_segment_format(self):
+        """Test the segment round trip and rejection of other files."""
+        path = os.path.join(self.tmp.name, "segment.idx")
+        write_segment(path, [(b"a", [5, 6, 300]), (b"b", [5, 70000]), (b"c", [9])], base=5, rows=70000)
+        segment = Segment(path)
+        try:
+            self.assertEqual([segment.ids(segment.find(term)) for term in (b"a", b"b", b"c")],
+                             [[5, 6, 300], [5, 70000], [9]])
+            self.assertIsNone(segment.find(b"ab"))
+            self.assertEqual(list(segment.with_prefix(b"b")), [1])
+        finally:
+            segment.close()
+
+        with open(path, "wb") as f:
+            f.write(b"not a segment")
+        with self.assertRaises(ValueError):
+            Segment(path)
+
+    def test_save_to_index_and_cli(self):
+        """Test the pipeline stage and the index command."""
+        metrics = ParseStats()
+        parser = TaskParser(logging.WARNING, metrics=metrics)
+        input_path = str(INPUT_DIR / "original_format.txt")
+        tasks = parser.parse_file(input_path, "original")
+        with TitleIndex(self.path) as index:
+            self.assertEqual(parser.save_to_index(tasks, index), len(tasks))
+        self.assertEqual(metrics.stages["index"].rows, len(tasks))
+
+        cli = build_cli()
+        args = cli.parse_args(["index", "--index", self.path, "add", input_path, "-t", "original"])
+        output = io.StringIO()
+        with redirect_stdout(output):
+            self.assertEqual(args.func(args), 0)
+            args = cli.parse_args(["index", "--index", self.path, "search", "integrate", "--count"])
+            self.assertEqual(args.func(args), 0)
+        self.assertIn("Indexed 0 new tasks", output.getvalue())
+        self.assertEqual(output.getvalue().splitlines()[-1],
+                         str(sum("integrate" in tokenize(task.title) for task in tasks)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,152 @@
+"""
+Test suite for the watch mode module.
+
+Tests change detection backends, debouncing and atomic output rewrites.
+"""
+
+import unittest
+import tempfile
+import os
+import sys
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+# Add src directory to path for imports
+project_root = Path(__file__).parent.parent
+src_path = project_root / "src"
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+from watch import DirectoryWatcher, InotifyBackend, PollingBackend
+
+DRILL_LINE = "D8005 Approved React Direct Fire Contact While Mounted\n"
+
+
+class TestDirectoryWatcher(unittest.TestCase):
+    """Test cases for DirectoryWatcher."""
+    
+    def setUp(self):
+        """Create input and output directories."""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.input_dir = os.path.join(self.tmp.name, "input")
+        self.output_dir = os.path.join(self.tmp.name, "output")
+        os.makedirs(self.input_dir)
+        self.input_path = os.path.join(self.input_dir, "drills.txt")
+        self.write(DRILL_LINE)
+    
+    def tearDown(self):
+        """Remove temporary files."""
+        self.tmp.cleanup()
+    
+    def write(self, text: str) -> None:
+        """Rewrite the input file."""
+        with open(self.input_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+    
+    def make_watcher(self, backend: str = "poll", debounce: float = 0.0) -> DirectoryWatcher:
+        """Create a started in-process watcher."""
+        watcher = DirectoryWatcher(self.input_dir, "drill", output_dir=self.output_dir,
+                                   interval=0.01, debounce=debounce, max_workers=1, backend=backend)
+        watcher.start()
+        self.addCleanup(watcher.close)
+        return watcher
+    
+    def read_output(self) -> str:
+        """Read the output CSV for the input file."""
+        with open(os.path.join(self.output_dir, "drills.csv"), 'r', encoding='utf-8') as f:
+            return f.read()
+    
+    def test_startup_parses_existing_files(self):
+        """Test that existing inputs are parsed when watching starts."""
+        watcher = self.make_watcher()
+        self.assertIn("D8005", self.read_output())
+        self.assertIsNotNone(watcher.startup_seconds)
+    
+    def test_change_rewrites_output(self):
+        """Test that modifying an input rewrites its output."""
+        watcher = self.make_watcher()
+        time.sleep(0.01)
+        self.write(DRILL_LINE + "D9508 Approved Establish Security at the Halt\n")
+        
+        written = []
+        for _ in range(50):
+            written.extend(watcher.poll_once())
+            if written:
+                break
+        
+        self.assertEqual(written, [os.path.join(self.output_dir, "drills.csv")])
+        self.assertIn("D9508", self.read_output())
+        self.assertEqual(len(watcher.latencies), 2)
+        self.assertEqual([name for name in os.listdir(self.output_dir) if name.endswith(".tmp")], [])
+    
+    def test_failed_write_keeps_watching(self):
+        """Test that an output that cannot be written is logged and retried on the next change."""
+        watcher = self.make_watcher()
+        time.sleep(0.01)
+        self.write(DRILL_LINE + "D9508 Approved Establish Security at the Halt\n")
+        
+        with patch.object(watcher.parser, 'save_to_csv', side_effect=OSError("No space left on device")), \
+                self.assertLogs(watcher.logger, level="ERROR") as logs:
+            for _ in range(50):
+                watcher.poll_once()
+                if not watcher._pending and not watcher._running:
+                    break
+        self.assertIn("Failed to write", logs.output[0])
+        self.assertNotIn("D9508", self.read_output())
+        
+        time.sleep(0.01)
+        self.write(DRILL_LINE + "D9508 Approved Establish Security at the Halt\n" + DRILL_LINE)
+        written = []
+        for _ in range(50):
+            written.extend(watcher.poll_once())
+            if written:
+                break
+        self.assertIn("D9508", self.read_output())
+    
+    def test_auto_falls_back_to_polling(self):
+        """Test that auto polls when inotify is present but cannot be set up."""
+        with patch.object(InotifyBackend, 'available', return_value=True), \
+                patch.object(InotifyBackend, '__init__', side_effect=OSError(24, "Too many open files")), \
+                self.assertLogs(level="WARNING") as logs:
+            watcher = self.make_watcher(backend="auto")
+        self.assertEqual(watcher.backend.name, PollingBackend.name)
+        self.assertIn("polling instead", logs.output[0])
+        
+        with patch.object(InotifyBackend, 'available', return_value=True), \
+                patch.object(InotifyBackend, '__init__', side_effect=OSError(28, "No space left on device")):
+            with self.assertRaises(OSError):
+                self.make_watcher(backend="inotify")
+    
+    def test_debounce_waits_for_quiet_period(self):
+        """Test that a file is not parsed while it keeps changing."""
+        watcher = self.make_watcher(debounce=60.0)
+        time.sleep(0.01)
+        self.write(DRILL_LINE * 2)
+        
+        self.assertEqual(watcher.poll_once(), [])
+        self.assertIn(self.input_path, watcher._pending)
+    
+    def test_ignores_unsupported_files(self):
+        """Test that non-input files are not reported by the poller."""
+        backend = PollingBackend(self.input_dir, (".txt",))
+        with open(os.path.join(self.input_dir, "notes.md"), 'w', encoding='utf-8') as f:
+            f.write("notes")
+        self.assertEqual(backend.changes(0), set())
+    
+    @unittest.skipUnless(InotifyBackend.available(), "inotify is not available")
+    def test_inotify_backend_reports_changes(self):
+        """Test that the inotify backend reports written input files."""
+        backend = InotifyBackend(self.input_dir, (".txt",))
+        self.addCleanup(backend.close)
+        self.write(DRILL_LINE * 3)
+        self.assertEqual(backend.changes(1.0), {self.input_path})
+    
+    def test_invalid_directory(self):
+        """Test watching a missing directory."""
+        with self.assertRaises(NotADirectoryError):
+            DirectoryWatcher(os.path.join(self.tmp.name, "missing"), "drill")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+"""
+Tests for the bulk CSV writer.
+"""
+
+import csv
+import gzip
+import io
+import lzma
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add src directory to path for imports
+project_root = Path(__file__).parent.parent
+src_path = project_root / "src"
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+from task_parser import ParsedTask
+from task_table import TaskTable
+from writer import headers, row_getter, write_csv
+
+
+def make_tasks(count: int = 5):
+    """Return count distinct tasks."""
+    return [ParsedTask(str(i), f"07-CO-{i:04d}", f"Title, with comma {i}",
+                       "07 - Infantry (Collective)", "Approved", f"Verb{i}")
+            for i in range(count)]
+
+
+def reference_csv(tasks, format_type: str = "original", include_parts: bool = False) -> bytes:
+    """Build the expected CSV bytes with csv.writer.writerow and to_list."""
+    buffer = io.StringIO(newline='')
+    writer = csv.writer(buffer)
+    writer.writerow(headers(format_type, include_parts))
+    for task in tasks:
+        writer.writerow(task.to_list(format_type, include_parts))
+    return buffer.getvalue().encode("utf-8")
+
+
+class FailingTasks:
+    """Iterable that raises after yielding some tasks."""
+
+    def __iter__(self):
+        yield from make_tasks(3)
+        raise OSError("disk full")
+
+
+class TestWriteCsv(unittest.TestCase):
+    """Test cases for write_csv."""
+
+    def setUp(self):
+        """Create a temporary output directory."""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "out.csv")
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        self.tmp.cleanup()
+
+    def read(self, path: str) -> bytes:
+        """Read a file's raw bytes."""
+        with open(path, 'rb') as f:
+            return f.read()
+
+    def test_row_getter_matches_to_list(self):
+        """Test that the precomputed getters build the same rows as to_list."""
+        task = make_tasks(1)[0]
+        for format_type in ("original", "drill", "other"):
+            for include_parts in (False, True):
+                self.assertEqual(list(row_getter(format_type, include_parts)(task)),
+                                 task.to_list(format_type, include_parts))
+
+    def test_output_matches_writerow(self):
+        """Test lists, generators and tables in small batches give identical bytes."""
+        tasks = make_tasks(25)
+        expected = reference_csv(tasks)
+        for source in (tasks, (task for task in tasks), TaskTable(tasks)):
+            self.assertEqual(write_csv(source, self.path, batch_rows=4)[0], 25)
+            self.assertEqual(self.read(self.path), expected)
+        write_csv(tasks, self.path, "drill", include_parts=True)
+        self.assertEqual(self.read(self.path), reference_csv(tasks, "drill", True))
+
+    def test_compressed_output(self):
+        """Test that .gz and .xz paths are compressed, including appends."""
+        tasks = make_tasks(10)
+        expected = reference_csv(tasks)
+        for extension, opener in ((".gz", gzip.open), (".xz", lzma.open)):
+            path = self.path + extension
+            write_csv(tasks[:4], path)
+            write_csv(tasks[4:], path, append=True)
+            with opener(path, 'rb') as f:
+                self.assertEqual(f.read(), expected)
+
+    def test_failed_write_leaves_previous_file(self):
+        """Test that a failed write keeps the old file and removes the temp file."""
+        write_csv(make_tasks(2), self.path)
+        before = self.read(self.path)
+        with self.assertRaises(OSError):
+            write_csv(FailingTasks(), self.path, batch_rows=2)
+        self.assertEqual(self.read(self.path), before)
+        self.assertEqual(os.listdir(self.tmp.name), ["out.csv"])
+
+    def test_failed_append_is_rolled_back(self):
+        """Test that a failed append truncates back to the previous size."""
+        count, nbytes = write_csv(make_tasks(2), self.path)
+        self.assertEqual(nbytes, os.path.getsize(self.path))
+        before = self.read(self.path)
+        with self.assertRaises(OSError):
+            write_csv(FailingTasks(), self.path, append=True, batch_rows=2)
+        self.assertEqual(self.read(self.path), before)
+
+        missing = os.path.join(self.tmp.name, "new.csv")
+        with self.assertRaises(OSError):
+            write_csv(FailingTasks(), missing, append=True)
+        self.assertFalse(os.path.exists(missing))
+
+
+if __name__ == '__main__':
+    unittest.main()